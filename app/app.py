@@ -12,7 +12,7 @@ from app.middleware.combined_auth_middleware import setup_combined_auth_middlewa
 from app.middleware.rate_limit_middleware import setup_rate_limit_middleware
 from app.middleware.security_headers_middleware import setup_security_headers_middleware
 from app.middleware.telemetry_middleware import setup_telemetry_middleware
-from app.middleware.request_id_middleware import setup_request_id_middleware
+from app.middleware.request_context_middleware import setup_request_context_middleware
 from app.middleware.performance_middleware import setup_performance_middleware
 from app.utils.logging import get_logger
 from app.utils.structured_logging import (
@@ -87,12 +87,10 @@ def create_app() -> FastAPI:
         ],
     )
 
-    # Correlation IDs
-    setup_request_id_middleware(app)
-
-    # Performance optimizations (compression, caching headers)
+    # Performance optimizations (compression, caching headers); X-Process-Time
+    # comes from the request context middleware
     try:
-        setup_performance_middleware(app)
+        setup_performance_middleware(app, timing_headers=False)
         logger.info("Performance optimization middleware enabled")
     except Exception:
         logger.error("Failed to enable performance middleware", exc_info=True)
@@ -178,6 +176,11 @@ def create_app() -> FastAPI:
     setup_error_handling(app, include_debug_details=include_debug)
     logger.info("Unified error handling system enabled")
 
+    # Request ID, correlation ID, timing and locale, computed once per request.
+    # Registered last so it is the outermost layer and every other middleware
+    # reads these values from request.state instead of recomputing them.
+    setup_request_context_middleware(app)
+
     # ---------------- Recovery hooks (background health monitor) ----------------
     try:
         # Define minimal no-op recovery workflow; actions can be extended later
@@ -87,6 +87,111 @@ class Config:
     LLM_REQUEST_TIMEOUT = int(os.getenv("LLM_REQUEST_TIMEOUT", "45"))
     CONCURRENT_EXECUTION_TIMEOUT = int(os.getenv("CONCURRENT_EXECUTION_TIMEOUT", "70"))
 
+    # Adaptive (AIMD) per-provider concurrency shared across all requests
+    ADAPTIVE_CONCURRENCY_ENABLED = os.getenv("ADAPTIVE_CONCURRENCY_ENABLED", "true").lower() == "true"
+    # "model" keys limits by provider:model, "provider" by provider only
+    ADAPTIVE_CONCURRENCY_SCOPE = os.getenv("ADAPTIVE_CONCURRENCY_SCOPE", "model").lower()
+    ADAPTIVE_CONCURRENCY_INITIAL = int(os.getenv("ADAPTIVE_CONCURRENCY_INITIAL", "8"))
+    ADAPTIVE_CONCURRENCY_MIN = int(os.getenv("ADAPTIVE_CONCURRENCY_MIN", "1"))
+    ADAPTIVE_CONCURRENCY_MAX = int(os.getenv("ADAPTIVE_CONCURRENCY_MAX", "64"))
+    # Seconds a call may wait in the queue before failing
+    ADAPTIVE_CONCURRENCY_QUEUE_TIMEOUT = float(os.getenv("ADAPTIVE_CONCURRENCY_QUEUE_TIMEOUT", "30"))
+    # Back off when recent latency exceeds this multiple of the median
+    ADAPTIVE_CONCURRENCY_LATENCY_TOLERANCE = float(
+        os.getenv("ADAPTIVE_CONCURRENCY_LATENCY_TOLERANCE", "2.0")
+    )
+    # Minimum seconds between multiplicative decreases
+    ADAPTIVE_CONCURRENCY_COOLDOWN = float(os.getenv("ADAPTIVE_CONCURRENCY_COOLDOWN", "2.0"))
+
+    # Header-driven provider quota buckets: fail fast instead of sending requests that would 429
+    PROVIDER_QUOTA_ENABLED = os.getenv("PROVIDER_QUOTA_ENABLED", "true").lower() == "true"
+    # Output tokens reserved per request before the real usage is known
+    PROVIDER_QUOTA_OUTPUT_TOKENS = int(os.getenv("PROVIDER_QUOTA_OUTPUT_TOKENS", "1024"))
+    # How long a provider stays excluded after a 429 without reset information
+    PROVIDER_RATE_LIMIT_BLOCK_SECONDS = float(os.getenv("PROVIDER_RATE_LIMIT_BLOCK_SECONDS", "60"))
+
+    # Provider circuit breakers: "memory" keeps state per process, "redis" shares it across workers
+    CIRCUIT_BREAKER_STORE = os.getenv("CIRCUIT_BREAKER_STORE", "memory").lower()
+    CIRCUIT_BREAKER_REDIS_URL = os.getenv("CIRCUIT_BREAKER_REDIS_URL", "")  # defaults to REDIS_URL
+    # Failure rate is measured over a sliding window of fixed-size buckets
+    CIRCUIT_BREAKER_WINDOW_SECONDS = float(os.getenv("CIRCUIT_BREAKER_WINDOW_SECONDS", "60"))
+    CIRCUIT_BREAKER_BUCKET_SECONDS = float(os.getenv("CIRCUIT_BREAKER_BUCKET_SECONDS", "5"))
+    # Open once at least MIN_CALLS calls in the window failed at FAILURE_RATE or worse
+    CIRCUIT_BREAKER_MIN_CALLS = int(os.getenv("CIRCUIT_BREAKER_MIN_CALLS", "5"))
+    CIRCUIT_BREAKER_FAILURE_RATE = float(os.getenv("CIRCUIT_BREAKER_FAILURE_RATE", "0.5"))
+    CIRCUIT_BREAKER_OPEN_SECONDS = float(os.getenv("CIRCUIT_BREAKER_OPEN_SECONDS", "60"))
+    # Concurrent trial calls allowed while half-open; that many successes close the circuit
+    CIRCUIT_BREAKER_HALF_OPEN_PROBES = int(os.getenv("CIRCUIT_BREAKER_HALF_OPEN_PROBES", "1"))
+
+    # Orchestrator SSE events: "memory" is per worker, "redis" fans out across workers (Redis Streams)
+    SSE_EVENT_BUS_BACKEND = os.getenv("SSE_EVENT_BUS_BACKEND", "memory").lower()
+    SSE_REDIS_URL = os.getenv("SSE_REDIS_URL", "")  # defaults to REDIS_URL
+    # Frames buffered per subscriber before the oldest are dropped
+    SSE_QUEUE_SIZE = int(os.getenv("SSE_QUEUE_SIZE", "1000"))
+    # Events kept per channel for Last-Event-ID replay
+    SSE_REPLAY_SIZE = int(os.getenv("SSE_REPLAY_SIZE", "256"))
+    # Seconds without events before a channel is collected / kept after completion
+    SSE_IDLE_TTL = float(os.getenv("SSE_IDLE_TTL", "300"))
+    SSE_COMPLETED_TTL = float(os.getenv("SSE_COMPLETED_TTL", "60"))
+    SSE_MAX_CHANNELS = int(os.getenv("SSE_MAX_CHANNELS", "10000"))
+    SSE_MAX_BUFFERED_BYTES = int(os.getenv("SSE_MAX_BUFFERED_BYTES", str(64 * 1024 * 1024)))
+    SSE_HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))
+    # Close each SSE connection after this many seconds (0 = never); clients resume via Last-Event-ID.
+    # Kept short under TESTING because TestClient buffers the whole response body.
+    SSE_MAX_CONNECTION_SECONDS = float(
+        os.getenv("SSE_MAX_CONNECTION_SECONDS", "2" if TESTING else "0")
+    )
+
+    # Background provider health prober: probes run on the event loop, never on the request path.
+    # Off by default: each probe is a billed provider call. Enable with HEALTH_PROBE_STORE=redis
+    # so one worker probes per model per interval instead of every worker.
+    HEALTH_PROBE_ENABLED = os.getenv("HEALTH_PROBE_ENABLED", "false").lower() == "true"
+    HEALTH_PROBE_INTERVAL_SECONDS = float(os.getenv("HEALTH_PROBE_INTERVAL_SECONDS", "300"))
+    # Each model's next probe is due after interval * (1 +/- JITTER) so probes never line up
+    HEALTH_PROBE_JITTER = float(os.getenv("HEALTH_PROBE_JITTER", "0.2"))
+    HEALTH_PROBE_CONCURRENCY = int(os.getenv("HEALTH_PROBE_CONCURRENCY", "2"))
+    # Probe results older than this are treated as unknown
+    HEALTH_PROBE_STALE_SECONDS = float(os.getenv("HEALTH_PROBE_STALE_SECONDS", "900"))
+    # "memory" probes from every worker, "redis" shares one probe budget and the results
+    HEALTH_PROBE_STORE = os.getenv("HEALTH_PROBE_STORE", "memory").lower()
+    HEALTH_PROBE_REDIS_URL = os.getenv("HEALTH_PROBE_REDIS_URL", "")  # defaults to REDIS_URL
+
+    # Hedged requests: fire one backup request when a model exceeds its rolling p95.
+    # Off by default because every hedge is an extra paid provider call.
+    ENABLE_HEDGED_REQUESTS = os.getenv("ENABLE_HEDGED_REQUESTS", "false").lower() == "true"
+    HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "95"))
+    HEDGE_LATENCY_WINDOW = int(os.getenv("HEDGE_LATENCY_WINDOW", "200"))
+    # No hedging for a model until this many latency samples exist
+    HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))
+    # Budget: hedges <= ratio * primary requests + burst per minute, capped absolutely
+    HEDGE_BUDGET_RATIO = float(os.getenv("HEDGE_BUDGET_RATIO", "0.1"))
+    HEDGE_BUDGET_BURST = int(os.getenv("HEDGE_BUDGET_BURST", "2"))
+    HEDGE_MAX_PER_MINUTE = int(os.getenv("HEDGE_MAX_PER_MINUTE", "30"))
+    # Allow duplicating the same model when no alternative provider is available
+    HEDGE_SAME_MODEL = os.getenv("HEDGE_SAME_MODEL", "false").lower() == "true"
+
+    # Saved pipeline outputs (options.save_outputs): write-behind JSONL segments
+    PIPELINE_OUTPUT_DIR = os.getenv("PIPELINE_OUTPUT_DIR", "pipeline_outputs")
+    PIPELINE_OUTPUT_COMPRESSION = os.getenv("PIPELINE_OUTPUT_COMPRESSION", "none").lower()  # none|gzip
+    PIPELINE_OUTPUT_SEGMENT_MAX_BYTES = int(
+        os.getenv("PIPELINE_OUTPUT_SEGMENT_MAX_BYTES", str(64 * 1024 * 1024))
+    )
+    PIPELINE_OUTPUT_QUEUE_SIZE = int(os.getenv("PIPELINE_OUTPUT_QUEUE_SIZE", "1000"))
+    PIPELINE_OUTPUT_BATCH_SIZE = int(os.getenv("PIPELINE_OUTPUT_BATCH_SIZE", "100"))
+    PIPELINE_OUTPUT_FLUSH_INTERVAL = float(os.getenv("PIPELINE_OUTPUT_FLUSH_INTERVAL", "1.0"))
+    # Max seconds a request waits for queue space before its record is dropped
+    PIPELINE_OUTPUT_ENQUEUE_TIMEOUT = float(os.getenv("PIPELINE_OUTPUT_ENQUEUE_TIMEOUT", "0.1"))
+
+    # Pipeline execution: "barrier" (stage by stage) or "dataflow" (per-model overlap)
+    PIPELINE_EXECUTION_MODE = os.getenv("PIPELINE_EXECUTION_MODE", "barrier").lower()
+    # Responses needed before peer review (and revisions before synthesis) may start
+    PIPELINE_DATAFLOW_QUORUM = int(os.getenv("PIPELINE_DATAFLOW_QUORUM", "2"))
+    # Seconds to wait for stragglers once the revision quorum is met
+    PIPELINE_DATAFLOW_TAIL_GRACE = float(os.getenv("PIPELINE_DATAFLOW_TAIL_GRACE", "1.0"))
+    PIPELINE_DATAFLOW_CANCEL_SLOW_TAIL = (
+        os.getenv("PIPELINE_DATAFLOW_CANCEL_SLOW_TAIL", "true").lower() == "true"
+    )
+
     # Orchestration Model Requirements
     MINIMUM_MODELS_REQUIRED = int(os.getenv("MINIMUM_MODELS_REQUIRED", "3"))
     ENABLE_SINGLE_MODEL_FALLBACK = os.getenv("ENABLE_SINGLE_MODEL_FALLBACK", "false").lower() == "true"
@@ -111,6 +216,16 @@ class Config:
         os.getenv("JWT_ACCESS_TOKEN_EXPIRE_MINUTES", "30")
     )
     JWT_REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("JWT_REFRESH_TOKEN_EXPIRE_DAYS", "7"))
+    # Cache resolved principals per credential so auth skips JWT decode and the
+    # DB lookup on repeat requests (seconds; 0 disables). Entries never outlive
+    # the token's exp. Off under TESTING so patched users don't leak across tests.
+    AUTH_PRINCIPAL_CACHE_TTL = float(
+        os.getenv("AUTH_PRINCIPAL_CACHE_TTL", "0" if TESTING else "60")
+    )
+    AUTH_PRINCIPAL_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_PRINCIPAL_CACHE_MAX_ENTRIES", "10000"))
+    # Write API key last_used_at in periodic bulk updates (seconds; 0 = commit per request)
+    API_KEY_USAGE_FLUSH_INTERVAL = float(os.getenv("API_KEY_USAGE_FLUSH_INTERVAL", "5"))
+    API_KEY_USAGE_MAX_PENDING = int(os.getenv("API_KEY_USAGE_MAX_PENDING", "10000"))
 
     # Database
     DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./ultra.db")
@@ -124,10 +239,44 @@ class Config:
     CACHE_TTL = int(os.getenv("CACHE_TTL", "3600"))
     ENABLE_ORCHESTRATION_CACHING = os.getenv("ENABLE_ORCHESTRATION_CACHING", "true").lower() == "true"
     CACHE_TTL_ORCHESTRATION = int(os.getenv("CACHE_TTL_ORCHESTRATION", "900"))
+    # Semantic (embedding-similarity) cache in front of pipeline and per-model calls
+    SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "false").lower() == "true"
+    SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92"))
+    # Per-model prompts share long templates, so require a closer match there
+    SEMANTIC_CACHE_MODEL_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_MODEL_THRESHOLD", "0.97"))
+    SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "5000"))
+    # Least recently used namespaces (model set + options, or one model) beyond this are dropped
+    SEMANTIC_CACHE_MAX_NAMESPACES = int(os.getenv("SEMANTIC_CACHE_MAX_NAMESPACES", "128"))
+    SEMANTIC_CACHE_TTL = int(os.getenv("SEMANTIC_CACHE_TTL", "3600"))
+    SEMANTIC_CACHE_DIM = int(os.getenv("SEMANTIC_CACHE_DIM", "512"))
+    # "hashing" or "sentence-transformers:<model name>"
+    SEMANTIC_CACHE_EMBEDDER = os.getenv("SEMANTIC_CACHE_EMBEDDER", "hashing")
+    # Coalesce identical in-flight pipeline runs: "redis" (cross-worker), "local", or "off"
+    PIPELINE_SINGLE_FLIGHT = os.getenv("PIPELINE_SINGLE_FLIGHT", "redis").lower()
+    PIPELINE_SINGLE_FLIGHT_LOCK_TTL = float(os.getenv("PIPELINE_SINGLE_FLIGHT_LOCK_TTL", "180"))
+    PIPELINE_SINGLE_FLIGHT_WAIT_TIMEOUT = float(
+        os.getenv("PIPELINE_SINGLE_FLIGHT_WAIT_TIMEOUT", "240")
+    )
+    # Redis value encoding: serializer (msgpack|json) and compression (zstd|zlib|none)
+    CACHE_SERIALIZER = os.getenv("CACHE_SERIALIZER", "msgpack")
+    CACHE_COMPRESSION = os.getenv("CACHE_COMPRESSION", "zstd")
+    CACHE_COMPRESSION_THRESHOLD = int(os.getenv("CACHE_COMPRESSION_THRESHOLD", "1024"))
+    # In-memory cache tier bounds (LRU eviction + background expiry sweep)
+    MEMORY_CACHE_MAX_ENTRIES = int(os.getenv("MEMORY_CACHE_MAX_ENTRIES", "10000"))
+    MEMORY_CACHE_MAX_BYTES = int(os.getenv("MEMORY_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    MEMORY_CACHE_SWEEP_INTERVAL = float(os.getenv("MEMORY_CACHE_SWEEP_INTERVAL", "60"))
+    # Comma-separated per-prefix byte budgets, e.g. "pipeline=33554432"
+    MEMORY_CACHE_PREFIX_BUDGETS = os.getenv("MEMORY_CACHE_PREFIX_BUDGETS", "")
 
     # Feature flags
     ENABLE_MOCK_LLM = os.getenv("ENABLE_MOCK_LLM", "false").lower() == "true"
     ENABLE_RATE_LIMIT = os.getenv("ENABLE_RATE_LIMIT", "true").lower() == "true"
+    # Share of a client's limit each worker may admit without asking Redis while the
+    # client is under half its limit (0 = always ask); off under TESTING for exact counts
+    RATE_LIMIT_LOCAL_FRACTION = float(
+        os.getenv("RATE_LIMIT_LOCAL_FRACTION", "0" if TESTING else "0.1")
+    )
+    RATE_LIMIT_LOCAL_SYNC_INTERVAL = float(os.getenv("RATE_LIMIT_LOCAL_SYNC_INTERVAL", "1"))
     ENABLE_AUTH = os.getenv("ENABLE_AUTH", "true").lower() == "true"
     ENABLE_SECURITY_HEADERS = (
         os.getenv("ENABLE_SECURITY_HEADERS", "true").lower() == "true"
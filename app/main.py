@@ -10,7 +10,7 @@ from app.services.model_registry import ModelRegistry
 from app.services.prompt_service import get_prompt_service
 from app.services.orchestration_service import OrchestrationService
 from app.services.quality_evaluation import QualityEvaluationService
-from app.services.rate_limiter import RateLimiter
+from app.services.rate_limiter import get_shared_rate_limiter
 from app.services.model_selection import SmartModelSelector
 from app.services.provider_health_manager import provider_health_manager
 
@@ -127,7 +127,7 @@ def initialize_services() -> Dict[str, Any]:
     quality_evaluator = QualityEvaluationService()
 
     # Initialize rate limiter
-    rate_limiter = RateLimiter()
+    rate_limiter = get_shared_rate_limiter()
 
     # Initialize model selector (shared across services)
     model_selector = SmartModelSelector()
@@ -172,6 +172,76 @@ def configure_app(app: FastAPI, services: Dict[str, Any]) -> None:
         if not FAST_STARTUP:
             await log_startup_readiness()
 
+    @app.on_event("startup")
+    async def start_cache_sweeper():
+        """Schedule periodic expiry of the in-memory cache tier."""
+        try:
+            services["cache_service"].start_sweeper()
+        except Exception as e:
+            logger.warning(f"Cache sweeper failed to start: {e}")
+
+    @app.on_event("shutdown")
+    async def stop_cache_sweeper():
+        try:
+            await services["cache_service"].stop_sweeper()
+        except Exception:
+            pass
+
+    @app.on_event("startup")
+    async def start_health_prober():
+        """Probe provider health in the background instead of on the request path."""
+        from app.services.health_prober import get_health_prober
+        from app.services.model_catalog import refresh_model_catalog
+
+        # Build the model catalog up front and rebuild it whenever health flips
+        refresh_model_catalog("startup")
+        get_health_prober().add_listener(lambda _snapshot: refresh_model_catalog("health changed"))
+        if not Config.HEALTH_PROBE_ENABLED:
+            return
+        try:
+            get_health_prober().start()
+        except Exception as e:
+            logger.warning(f"Health prober failed to start: {e}")
+
+    @app.on_event("shutdown")
+    async def stop_health_prober():
+        from app.services.health_prober import get_health_prober
+
+        try:
+            await get_health_prober().stop()
+        except Exception:
+            pass
+
+    @app.on_event("startup")
+    async def start_api_key_usage_recorder():
+        """Batch API key last-use writes instead of committing one per request."""
+        from app.services.api_key_usage_recorder import get_api_key_usage_recorder
+
+        try:
+            get_api_key_usage_recorder().start()
+        except Exception as e:
+            logger.warning(f"API key usage recorder failed to start: {e}")
+
+    @app.on_event("shutdown")
+    async def flush_api_key_usage():
+        """Write pending API key last-use times before the process exits."""
+        from app.services.api_key_usage_recorder import get_api_key_usage_recorder
+
+        try:
+            await get_api_key_usage_recorder().aclose()
+        except Exception as e:
+            logger.warning(f"API key usage recorder failed to flush: {e}")
+
+    @app.on_event("shutdown")
+    async def flush_pipeline_outputs():
+        """Write any queued pipeline outputs before the process exits."""
+        from app.services.pipeline_output_writer import get_pipeline_output_writer
+
+        try:
+            await get_pipeline_output_writer().aclose()
+        except Exception as e:
+            logger.warning(f"Pipeline output writer failed to flush: {e}")
+
     # Log startup message
     logger.info("✅ App loaded correctly")
     logger.info("Available orchestrator endpoints:")
@@ -8,6 +8,10 @@ This package contains middleware components for security, authentication, and re
 from .combined_auth_middleware import setup_combined_auth_middleware
 from .performance_middleware import setup_performance_middleware
 from .rate_limit_middleware import RateLimitMiddleware, setup_rate_limit_middleware
+from .request_context_middleware import (
+    RequestContextMiddleware,
+    setup_request_context_middleware,
+)
 from .request_id_middleware import setup_request_id_middleware
 from .request_tracking_middleware import RequestTrackingMiddleware
 from .security_headers_middleware import (
@@ -20,10 +24,12 @@ __all__ = [
     "setup_combined_auth_middleware",
     "setup_performance_middleware",
     "setup_rate_limit_middleware",
+    "setup_request_context_middleware",
     "setup_request_id_middleware",
     "setup_security_headers_middleware",
     "setup_telemetry_middleware",
     "RateLimitMiddleware",
+    "RequestContextMiddleware",
     "RequestTrackingMiddleware",
     "SecurityHeadersMiddleware",
 ]
@@ -5,25 +5,28 @@ This middleware checks for authentication using either Bearer tokens or API keys
 and ensures that admin and debug routes are properly protected.
 """
 
-from typing import Callable, List, Optional
+import asyncio
+from typing import Any, List, Optional
 
+import jwt
 from fastapi import Request, Response, status
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from app.config import Config
 from app.database.connection import get_db_session
 from app.models.base_models import ErrorResponse
+from app.services.api_key_usage_recorder import get_api_key_usage_recorder
 from app.services.auth_service import auth_service
-from app.utils.jwt_utils import decode_token, is_token_expired
+from app.services.principal_cache import PrincipalCache, credential_key, get_principal_cache
+from app.utils.jwt_utils import decode_token
 from app.utils.logging import get_logger
 
 # Set up logger
 logger = get_logger("combined_auth_middleware")
 
 
-class CombinedAuthMiddleware(BaseHTTPMiddleware):
+class CombinedAuthMiddleware:
     """Middleware for combined JWT and API key authentication"""
 
     def __init__(
@@ -33,6 +36,7 @@ class CombinedAuthMiddleware(BaseHTTPMiddleware):
         protected_paths: Optional[List[str]] = None,
         auth_header: str = "Authorization",
         api_key_header: str = "X-API-Key",
+        principal_cache: Optional[PrincipalCache] = None,
     ):
         """
         Initialize combined auth middleware
@@ -43,35 +47,49 @@ class CombinedAuthMiddleware(BaseHTTPMiddleware):
             protected_paths: Paths that require authentication (e.g., admin, debug)
             auth_header: Name of the header containing the auth token
             api_key_header: Name of the header containing the API key
+            principal_cache: Cache of resolved principals (default: the shared one)
         """
-        super().__init__(app)
+        self.app = app
         self.public_paths = public_paths or []
         self.protected_paths = protected_paths or ["/api/admin", "/api/debug"]
         self.auth_header = auth_header
         self.api_key_header = api_key_header
+        self.public_prefixes = tuple(self.public_paths)
+        self.principal_cache = (
+            principal_cache if principal_cache is not None else get_principal_cache()
+        )
         logger.info(
             f"Initialized CombinedAuthMiddleware with {len(self.public_paths)} public paths and {len(self.protected_paths)} protected paths"
         )
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Authenticate the request, or answer it with an auth error response"""
+        if scope["type"] != "http" or not Config.ENABLE_AUTH:
+            await self.app(scope, receive, send)
+            return
+
+        # Skip authentication for public paths
+        if scope["path"].startswith(self.public_prefixes):
+            await self.app(scope, receive, send)
+            return
+
+        error_response = await self._authenticate(Request(scope, receive))
+        if error_response is not None:
+            await error_response(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
+    async def _authenticate(self, request: Request) -> Optional[Response]:
         """
-        Process the request and validate authentication
+        Validate authentication and populate request.state
 
         Args:
             request: FastAPI request object
-            call_next: Next middleware/route handler
 
         Returns:
-            Response
+            Error response to send instead of calling the app, or None to proceed
         """
-        # Skip authentication if disabled
-        if not Config.ENABLE_AUTH:
-            return await call_next(request)
-
-        # Skip authentication for public paths
         path = request.url.path
-        if any(path.startswith(public_path) for public_path in self.public_paths):
-            return await call_next(request)
 
         # Check if this is a protected path
         is_protected = any(path.startswith(protected_path) for protected_path in self.protected_paths)
@@ -81,7 +99,7 @@ class CombinedAuthMiddleware(BaseHTTPMiddleware):
             logger.info("🧪 TESTING bypass active via X-Test-Mode header")
             request.state.user_id = "test_user_id"
             request.state.is_authenticated = True
-            return await call_next(request)
+            return None
 
         # Try to authenticate with JWT token first
         auth_header = request.headers.get(self.auth_header, "")
@@ -93,7 +111,7 @@ class CombinedAuthMiddleware(BaseHTTPMiddleware):
                 request.state.user_id = auth_result["user_id"]
                 request.state.is_authenticated = True
                 request.state.auth_method = "jwt"
-                return await call_next(request)
+                return None
             elif is_protected:
                 # If JWT auth failed and this is a protected path, return error
                 return self._create_auth_error_response(
@@ -112,7 +130,7 @@ class CombinedAuthMiddleware(BaseHTTPMiddleware):
                 request.state.is_authenticated = True
                 request.state.auth_method = "api_key"
                 request.state.api_key = api_key
-                return await call_next(request)
+                return None
             elif is_protected:
                 # If API key auth failed and this is a protected path, return error
                 return self._create_auth_error_response(
@@ -131,7 +149,7 @@ class CombinedAuthMiddleware(BaseHTTPMiddleware):
 
         # For non-protected paths, allow access without authentication
         request.state.is_authenticated = False
-        return await call_next(request)
+        return None
 
     async def _authenticate_with_jwt(self, token: str) -> Optional[dict]:
         """
@@ -143,44 +161,52 @@ class CombinedAuthMiddleware(BaseHTTPMiddleware):
         Returns:
             Dict with user info if authenticated, None otherwise
         """
+        key = credential_key("jwt", token)
+        cached = self.principal_cache.get(key)
+        if cached is not None:
+            return {"user": cached.user, "user_id": cached.user_id}
+
         try:
-            # Check if token is expired
-            if is_token_expired(token):
+            # Verifies signature and expiry in a single decode
+            try:
+                payload = decode_token(token)
+            except jwt.ExpiredSignatureError:
                 logger.warning("JWT token has expired")
                 return None
-
-            # Decode token
-            payload = decode_token(token)
             if not payload:
                 logger.warning("Failed to decode JWT token")
                 return None
 
+            jti = payload.get("jti")
+            if self.principal_cache.is_revoked(jti):
+                logger.warning("JWT token has been revoked")
+                return None
+
             # Get user ID from token
             user_id = payload.get("sub")
             if not user_id:
                 logger.warning("No user ID in JWT token payload")
                 return None
+            try:
+                user_id_int = int(user_id)
+            except ValueError:
+                logger.error(f"Invalid user ID format in token: {user_id}")
+                return None
 
-            # Verify user exists in database
-            with get_db_session() as db:
-                try:
-                    user_id_int = int(user_id)
-                    user = auth_service.get_user(db, user_id_int)
-
-                    if not user:
-                        logger.warning(f"User with ID {user_id} not found in database")
-                        return None
-
-                    return {
-                        "user": user,
-                        "user_id": user_id,
-                    }
-                except ValueError:
-                    logger.error(f"Invalid user ID format in token: {user_id}")
-                    return None
-                except Exception as e:
-                    logger.error(f"Error verifying user: {str(e)}")
-                    return None
+            # Verify user exists in database, off the event loop
+            user = await asyncio.to_thread(self._load_user, user_id_int)
+            if not user:
+                logger.warning(f"User with ID {user_id} not found in database")
+                return None
+
+            exp = payload.get("exp")
+            self.principal_cache.put(
+                key, user, user_id, jti, exp if isinstance(exp, (int, float)) else None
+            )
+            return {
+                "user": user,
+                "user_id": user_id,
+            }
 
         except Exception as e:
             logger.error(f"JWT authentication error: {str(e)}")
@@ -196,21 +222,42 @@ class CombinedAuthMiddleware(BaseHTTPMiddleware):
         Returns:
             Dict with user info if authenticated, None otherwise
         """
+        key = credential_key("api_key", api_key)
+        cached = self.principal_cache.get(key)
+        if cached is not None:
+            # verify_api_key records the use on a miss; record hits here
+            recorder = get_api_key_usage_recorder()
+            if recorder.running:
+                recorder.record(api_key)
+            return {"user": cached.user, "user_id": cached.user_id}
+
         try:
-            with get_db_session() as db:
-                user = auth_service.verify_api_key(db, api_key)
-                if not user:
-                    logger.warning("Invalid API key")
-                    return None
-
-                return {
-                    "user": user,
-                    "user_id": str(user.id),
-                }
+            user = await asyncio.to_thread(self._verify_api_key, api_key)
+            if not user:
+                logger.warning("Invalid API key")
+                return None
+
+            self.principal_cache.put(key, user, str(user.id))
+            return {
+                "user": user,
+                "user_id": str(user.id),
+            }
         except Exception as e:
             logger.error(f"API key authentication error: {str(e)}")
             return None
 
+    @staticmethod
+    def _load_user(user_id: int) -> Any:
+        """Blocking user lookup; run in a worker thread"""
+        with get_db_session() as db:
+            return auth_service.get_user(db, user_id)
+
+    @staticmethod
+    def _verify_api_key(api_key: str) -> Any:
+        """Blocking API key lookup; run in a worker thread"""
+        with get_db_session() as db:
+            return auth_service.verify_api_key(db, api_key)
+
     def _create_auth_error_response(
         self, message: str, code: str, status_code: int
     ) -> JSONResponse:
@@ -1,86 +1,77 @@
 """Middleware for extracting and managing locale information from requests."""
 
-from typing import Callable
+from functools import lru_cache
 
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import Response
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from app.utils.logging import get_logger
 from app.utils.user_messages import Locale
 
 logger = get_logger(__name__)
 
-
-class LocaleMiddleware(BaseHTTPMiddleware):
+DEFAULT_LOCALE = Locale.EN_US.value
+
+# Map common language codes to our supported locales
+_LANGUAGE_MAPPING = {
+    "en": Locale.EN_US,
+    "es": Locale.ES_ES,
+    "fr": Locale.FR_FR,
+    "de": Locale.DE_DE,
+    "ja": Locale.JA_JP,
+    "zh": Locale.ZH_CN,
+}
+_SUPPORTED = {locale.value for locale in Locale}
+
+
+def parse_accept_language(accept_language: str) -> str:
+    """Parse Accept-Language header to extract primary locale."""
+    # Accept-Language format: "en-US,en;q=0.9,es;q=0.8"
+    if not accept_language:
+        return DEFAULT_LOCALE
+
+    # Take the first language, e.g. "en-US" -> "en_US"
+    primary = accept_language.split(",", 1)[0].split(";", 1)[0].strip()
+    return primary.replace("-", "_") or DEFAULT_LOCALE
+
+
+@lru_cache(maxsize=256)
+def resolve_locale(accept_language: str) -> str:
+    """Return the supported locale for an Accept-Language value (cached)."""
+    locale_str = parse_accept_language(accept_language)
+    if locale_str in _SUPPORTED:
+        return locale_str
+    # Try to match by language code only
+    language_code = locale_str.split("_")[0].lower()
+    if language_code in _LANGUAGE_MAPPING:
+        return _LANGUAGE_MAPPING[language_code].value
+    return DEFAULT_LOCALE
+
+
+class LocaleMiddleware:
     """Middleware to extract and set locale information from requests."""
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """Extract locale from request headers and set in request state."""
-        # Get locale from Accept-Language header
-        accept_language = request.headers.get("Accept-Language", "en-US")
-
-        # Parse the primary locale
-        locale_str = self._parse_accept_language(accept_language)
-
-        # Convert to our Locale enum if valid
-        locale = self._validate_locale(locale_str)
-
-        # Store in request state
-        request.state.locale = locale
-
-        logger.debug(f"Request locale set to: {locale}")
-
-        # Process request
-        response = await call_next(request)
-
-        # Add Content-Language header to response
-        response.headers["Content-Language"] = locale
-
-        return response
-
-    def _parse_accept_language(self, accept_language: str) -> str:
-        """Parse Accept-Language header to extract primary locale."""
-        # Accept-Language format: "en-US,en;q=0.9,es;q=0.8"
-        if not accept_language:
-            return "en-US"
-
-        # Split by comma and take the first one
-        languages = accept_language.split(",")
-        if not languages:
-            return "en-US"
-
-        # Get the first language
-        primary = languages[0].split(";")[0].strip()
-
-        # Convert to our format (e.g., "en-US" -> "en_US")
-        return primary.replace("-", "_")
-
-    def _validate_locale(self, locale_str: str) -> str:
-        """Validate locale string and return valid Locale or default."""
-        try:
-            # Check if it's a valid locale
-            locale_enum = Locale(locale_str)
-            return locale_str
-        except ValueError:
-            # Try to match by language code only
-            language_code = locale_str.split("_")[0].lower()
-
-            # Map common language codes to our supported locales
-            language_mapping = {
-                "en": Locale.EN_US,
-                "es": Locale.ES_ES,
-                "fr": Locale.FR_FR,
-                "de": Locale.DE_DE,
-                "ja": Locale.JA_JP,
-                "zh": Locale.ZH_CN,
-            }
-
-            if language_code in language_mapping:
-                return language_mapping[language_code].value
-
-            # Default to English
-            return Locale.EN_US.value
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        state = scope.setdefault("state", {})
+        locale = state.get("locale")
+        if locale is None:
+            locale = resolve_locale(Headers(scope=scope).get("accept-language", "en-US"))
+            state["locale"] = locale
+
+        async def send_with_language(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)["Content-Language"] = locale
+            await send(message)
+
+        await self.app(scope, receive, send_with_language)
 
 
 def setup_locale_middleware(app):
@@ -2,151 +2,297 @@
 Performance optimization middleware for FastAPI.
 """
 
+import asyncio
 import time
-import gzip
-from typing import Callable, Dict, Any
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import StreamingResponse
-import io
+import zlib
+from typing import Callable, Dict, Optional
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from app.utils.logging import get_logger
 
+try:  # Optional codecs; gzip is always available
+    import brotli
+except ImportError:  # pragma: no cover - depends on environment
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - depends on environment
+    zstandard = None
+
 logger = get_logger("performance_middleware")
 
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript")
 
-class CompressionMiddleware(BaseHTTPMiddleware):
-    """Middleware to compress responses for better performance."""
-    
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        # Process the request
-        response = await call_next(request)
-        
-        # Check if client accepts gzip
-        accept_encoding = request.headers.get("accept-encoding", "")
-        if "gzip" not in accept_encoding.lower():
-            return response
-        
-        # Only compress for successful responses with sufficient content
-        if response.status_code != 200:
-            return response
-            
-        # Check content type - only compress text-based responses
-        content_type = response.headers.get("content-type", "")
-        compressible_types = ["application/json", "text/", "application/javascript"]
-        
-        if not any(ct in content_type for ct in compressible_types):
-            return response
-        
-        # For streaming responses, we need special handling
-        if isinstance(response, StreamingResponse):
-            return response
-        
-        # Read response body
-        body = b""
-        async for chunk in response.body_iterator:
-            body += chunk
-        
-        # Only compress if body is large enough (>1KB)
-        if len(body) < 1024:
-            # Return original response
-            return Response(
-                content=body,
-                status_code=response.status_code,
-                headers=dict(response.headers),
-                media_type=response.media_type
-            )
-        
-        # Compress the body
-        compressed = gzip.compress(body)
-        
-        # Only use compression if it actually reduces size
-        if len(compressed) >= len(body):
-            return Response(
-                content=body,
-                status_code=response.status_code,
-                headers=dict(response.headers),
-                media_type=response.media_type
-            )
-        
-        # Return compressed response
-        headers = dict(response.headers)
-        headers["content-encoding"] = "gzip"
-        headers["content-length"] = str(len(compressed))
-        headers.pop("content-length", None)  # Remove original length
-        
-        return Response(
-            content=compressed,
-            status_code=response.status_code,
-            headers=headers,
-            media_type=response.media_type
+
+class _GzipEncoder:
+    def __init__(self, level: int):
+        self._z = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes, flush: bool) -> bytes:
+        out = self._z.compress(data)
+        return out + self._z.flush(zlib.Z_SYNC_FLUSH) if flush else out
+
+    def finish(self) -> bytes:
+        return self._z.flush(zlib.Z_FINISH)
+
+
+class _BrotliEncoder:
+    def __init__(self, level: int):
+        # Brotli quality 11 is far too slow for live responses
+        self._c = brotli.Compressor(quality=min(level, 5))
+
+    def compress(self, data: bytes, flush: bool) -> bytes:
+        out = self._c.process(data)
+        return out + self._c.flush() if flush else out
+
+    def finish(self) -> bytes:
+        return self._c.finish()
+
+
+class _ZstdEncoder:
+    def __init__(self, level: int):
+        self._c = zstandard.ZstdCompressor(level=min(level, 10)).compressobj()
+
+    def compress(self, data: bytes, flush: bool) -> bytes:
+        out = self._c.compress(data)
+        return out + self._c.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK) if flush else out
+
+    def finish(self) -> bytes:
+        return self._c.flush()
+
+
+def available_encodings() -> Dict[str, Callable[[int], object]]:
+    """Encodings this process can produce, in server preference order."""
+    encoders: Dict[str, Callable[[int], object]] = {}
+    if brotli is not None:
+        encoders["br"] = _BrotliEncoder
+    if zstandard is not None:
+        encoders["zstd"] = _ZstdEncoder
+    encoders["gzip"] = _GzipEncoder
+    return encoders
+
+
+def negotiate_encoding(accept_encoding: str, encoders: Dict[str, Callable]) -> Optional[str]:
+    """Pick the best encoding from an Accept-Encoding header (honours q-values)."""
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            weights[name.strip()] = q
+    wildcard = weights.get("*", 0.0)
+    best, best_q = None, 0.0
+    for name in encoders:  # ties go to server preference order
+        q = weights.get(name, wildcard)
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+class CompressionMiddleware:
+    """Pure-ASGI response compression that never buffers a whole body.
+
+    Bodies are compressed chunk by chunk with a streaming compressor (brotli
+    or zstd when installed and accepted, otherwise gzip). Event streams are
+    flushed after every chunk so each SSE frame reaches the client without
+    delay. Chunks of ``offload_size`` bytes or more are compressed in a worker
+    thread to keep the event loop responsive. Single-message bodies smaller
+    than ``minimum_size`` are sent as-is.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        level: int = 6,
+        offload_size: int = 256 * 1024,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.level = level
+        self.offload_size = offload_size
+        self.encoders = available_encodings()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(
+            Headers(scope=scope).get("accept-encoding", ""), self.encoders
         )
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self._send = send
+        self._start: Optional[Message] = None
+        self._encoder = None
+        self._passthrough = False
+        self._flush_each_chunk = False
 
+    async def send(self, message: Message) -> None:
+        if self._passthrough:
+            await self._send(message)
+            return
+        if message["type"] == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            content_type = headers.get("content-type", "")
+            if (
+                "content-encoding" in headers
+                or message["status"] in (204, 304)
+                or not any(ct in content_type for ct in COMPRESSIBLE_TYPES)
+            ):
+                self._passthrough = True
+                await self._send(message)
+                return
+            self._flush_each_chunk = content_type.startswith("text/event-stream")
+            self._start = message
+            return
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
 
-class CacheControlMiddleware(BaseHTTPMiddleware):
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self._encoder is None:
+            if not more_body and len(body) < self.middleware.minimum_size:
+                self._passthrough = True
+                await self._send(self._start)
+                await self._send(message)
+                return
+            await self._begin()
+
+        compressed = await self._compress(body, flush=self._flush_each_chunk and more_body)
+        if not more_body:
+            compressed += self._encoder.finish()
+        if compressed or not more_body:
+            await self._send(
+                {"type": "http.response.body", "body": compressed, "more_body": more_body}
+            )
+
+    async def _begin(self) -> None:
+        headers = MutableHeaders(raw=list(self._start["headers"]))
+        headers["content-encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        if "content-length" in headers:
+            del headers["content-length"]
+        self._start["headers"] = headers.raw
+        self._encoder = self.middleware.encoders[self.encoding](self.middleware.level)
+        await self._send(self._start)
+
+    async def _compress(self, body: bytes, flush: bool) -> bytes:
+        if len(body) >= self.middleware.offload_size:
+            return await asyncio.to_thread(self._encoder.compress, body, flush)
+        return self._encoder.compress(body, flush)
+
+
+class CacheControlMiddleware:
     """Middleware to add cache control headers."""
-    
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        response = await call_next(request)
-        
-        # Add cache headers based on endpoint
-        path = request.url.path
-        
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        cache_control = self.cache_control_for(scope["method"], scope["path"])
+        if cache_control is None:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cache_control(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)["cache-control"] = cache_control
+            await send(message)
+
+        await self.app(scope, receive, send_with_cache_control)
+
+    @staticmethod
+    def cache_control_for(method: str, path: str) -> Optional[str]:
+        """Return the cache-control value for an endpoint, or None to leave it alone."""
         # Static assets - cache for 1 year
         if path.startswith("/assets/") or path.endswith((".js", ".css", ".png", ".jpg", ".ico")):
-            response.headers["cache-control"] = "public, max-age=31536000, immutable"
-        
+            return "public, max-age=31536000, immutable"
+
         # API responses - different caching strategies
-        elif path.startswith("/api/"):
+        if path.startswith("/api/"):
             if path.endswith("/available-models"):
                 # Cache model list for 5 minutes
-                response.headers["cache-control"] = "public, max-age=300"
-            elif path.endswith("/health"):
+                return "public, max-age=300"
+            if path.endswith("/health"):
                 # Don't cache health checks
-                response.headers["cache-control"] = "no-cache, no-store, must-revalidate"
-            elif request.method == "GET":
+                return "no-cache, no-store, must-revalidate"
+            if method == "GET":
                 # Cache GET requests for 1 minute
-                response.headers["cache-control"] = "private, max-age=60"
-            else:
-                # Don't cache POST/PUT/DELETE
-                response.headers["cache-control"] = "no-cache, no-store"
-        
-        return response
+                return "private, max-age=60"
+            # Don't cache POST/PUT/DELETE
+            return "no-cache, no-store"
+        return None
 
 
-class PerformanceHeadersMiddleware(BaseHTTPMiddleware):
+class PerformanceHeadersMiddleware:
     """Add performance-related headers."""
-    
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         # Track request timing
-        start_time = time.time()
-        
-        response = await call_next(request)
-        
-        # Add timing header
-        process_time = time.time() - start_time
-        response.headers["X-Process-Time"] = f"{process_time:.3f}"
-        
-        # Add other performance headers
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["X-Frame-Options"] = "DENY"
-        
-        # Enable connection keep-alive
-        response.headers["Connection"] = "keep-alive"
-        
-        return response
-
-
-def setup_performance_middleware(app):
-    """Setup all performance optimization middleware."""
-    
+        start_time = time.perf_counter()
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                # Time to first byte; streaming bodies keep going after this
+                headers["X-Process-Time"] = f"{time.perf_counter() - start_time:.3f}"
+                headers["X-Content-Type-Options"] = "nosniff"
+                headers["X-Frame-Options"] = "DENY"
+                # Enable connection keep-alive
+                headers["Connection"] = "keep-alive"
+            await send(message)
+
+        await self.app(scope, receive, send_with_timing)
+
+
+def setup_performance_middleware(app, timing_headers: bool = True):
+    """
+    Setup all performance optimization middleware.
+
+    Args:
+        app: FastAPI application
+        timing_headers: Add PerformanceHeadersMiddleware; apps using
+            RequestContextMiddleware already get X-Process-Time from it
+    """
+
     # Add compression middleware
     app.add_middleware(CompressionMiddleware)
-    
+
     # Add cache control
     app.add_middleware(CacheControlMiddleware)
-    
+
     # Add performance headers
-    app.add_middleware(PerformanceHeadersMiddleware)
-    
-    logger.info("Performance optimization middleware enabled")
\ No newline at end of file
+    if timing_headers:
+        app.add_middleware(PerformanceHeadersMiddleware)
+
+    logger.info("Performance optimization middleware enabled")
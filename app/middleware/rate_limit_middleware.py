@@ -4,12 +4,12 @@ Rate limiting middleware for the Ultra backend.
 This middleware applies rate limits based on user subscription tier or IP address.
 """
 
-from typing import Callable, List, Optional
+from typing import List, Optional
 
-from fastapi import Request, Response, status
+from fastapi import Request, status
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from app.config import Config
 from app.services.rate_limit_service import rate_limit_service
@@ -19,7 +19,7 @@ from app.utils.logging import get_logger
 logger = get_logger("rate_limit_middleware")
 
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
+class RateLimitMiddleware:
     """Middleware for rate limiting API requests"""
 
     def __init__(
@@ -34,7 +34,7 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
             app: ASGI application
             excluded_paths: Paths to exclude from rate limiting
         """
-        super().__init__(app)
+        self.app = app
         self.excluded_paths = excluded_paths or [
             "/health",
             "/metrics",
@@ -44,45 +44,46 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
             "/api/openapi.json",
             "/favicon.ico",
         ]
+        self.excluded_prefixes = tuple(self.excluded_paths)
         logger.info(
             f"Initialized RateLimitMiddleware with {len(self.excluded_paths)} excluded paths"
         )
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        """
-        Process the request and apply rate limiting
-
-        Args:
-            request: FastAPI request object
-            call_next: Next middleware/route handler
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Apply rate limiting to the request and add rate limit headers"""
+        # Skip rate limiting if disabled or for excluded paths
+        if (
+            scope["type"] != "http"
+            or not Config.ENABLE_RATE_LIMIT
+            or scope["path"].startswith(self.excluded_prefixes)
+        ):
+            await self.app(scope, receive, send)
+            return
 
-        Returns:
-            Response
-        """
-        # Skip rate limiting if disabled
-        if not Config.ENABLE_RATE_LIMIT:
-            return await call_next(request)
-
-        # Skip rate limiting for excluded paths
-        if any(request.url.path.startswith(path) for path in self.excluded_paths):
-            return await call_next(request)
+        request = Request(scope, receive)
 
         # Skip rate limiting for test requests
         if request.headers.get("X-Test-Mode") == "true":
-            return await call_next(request)
+            await self.app(scope, receive, send)
+            return
 
         # Get user from request state (set by auth middleware)
         user = getattr(request.state, "user", None)
 
         # Check rate limit
-        result = rate_limit_service.check_rate_limit(request, user)
+        result = await rate_limit_service.check_rate_limit(request, user)
+        limit_headers = {
+            "X-RateLimit-Limit": str(result.limit),
+            "X-RateLimit-Remaining": str(result.remaining),
+            "X-RateLimit-Reset": str(result.reset_at),
+        }
 
         # If rate limited, return 429 response
         if not result.is_allowed:
             logger.warning(
                 f"Rate limit exceeded for {rate_limit_service.get_client_identifier(request, user)}"
             )
-            
+
             response = JSONResponse(
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
                 content={
@@ -91,26 +92,28 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
                     "code": "rate_limit_exceeded",
                     "retry_after": result.retry_after,
                 },
+                headers=limit_headers,
             )
-            
-            # Add rate limit headers
-            response.headers["X-RateLimit-Limit"] = str(result.limit)
-            response.headers["X-RateLimit-Remaining"] = str(result.remaining)
-            response.headers["X-RateLimit-Reset"] = str(result.reset_at)
             if result.retry_after:
                 response.headers["Retry-After"] = str(result.retry_after)
-            
-            return response
 
-        # Process the request
-        response = await call_next(request)
+            await response(scope, receive, send)
+            return
+
+        if not result.enforced:
+            # Redis was unreachable: limiting is off, so do not advertise a limit
+            await self.app(scope, receive, send)
+            return
 
-        # Always add rate limit headers
-        response.headers["X-RateLimit-Limit"] = str(result.limit)
-        response.headers["X-RateLimit-Remaining"] = str(result.remaining)
-        response.headers["X-RateLimit-Reset"] = str(result.reset_at)
+        async def send_with_limits(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                # Always add rate limit headers
+                headers = MutableHeaders(scope=message)
+                for name, value in limit_headers.items():
+                    headers[name] = value
+            await send(message)
 
-        return response
+        await self.app(scope, receive, send_with_limits)
 
 
 def setup_rate_limit_middleware(
@@ -0,0 +1,104 @@
+"""
+Request context middleware.
+
+Computes the per-request values every other layer used to derive on its own -
+request ID, correlation ID, start time and locale - exactly once, in a single
+pass over the request headers. The values are stored in the ASGI scope state
+(so `request.state.request_id` etc. work as before) and echoed on the response
+together with the processing time.
+
+This is a pure ASGI middleware: it never wraps the response body, so
+streaming responses pass through untouched.
+"""
+
+import time
+import uuid
+from typing import Any, Dict
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.middleware.locale_middleware import resolve_locale
+from app.utils.logging import CorrelationContext, get_logger
+
+logger = get_logger("request_context_middleware")
+
+_REQUEST_ID = b"x-request-id"
+_CORRELATION_ID = b"x-correlation-id"
+_TRACE_ID = b"x-trace-id"
+_ACCEPT_LANGUAGE = b"accept-language"
+_WANTED = frozenset((_REQUEST_ID, _CORRELATION_ID, _TRACE_ID, _ACCEPT_LANGUAGE))
+
+
+def request_context(scope: Scope) -> Dict[str, Any]:
+    """Return the scope state dict that holds the request context."""
+    return scope.setdefault("state", {})
+
+
+class RequestContextMiddleware:
+    """Fused request ID, correlation ID, timing and locale middleware."""
+
+    def __init__(self, app: ASGIApp, timing_header: bool = True) -> None:
+        """
+        Args:
+            app: ASGI application
+            timing_header: Whether to add X-Process-Time to responses
+        """
+        self.app = app
+        self.timing_header = timing_header
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        found: Dict[bytes, bytes] = {}
+        for name, value in scope["headers"]:
+            if name in _WANTED and name not in found:
+                found[name] = value
+
+        request_id = found[_REQUEST_ID].decode("latin-1") if _REQUEST_ID in found else None
+        if not request_id:
+            request_id = f"req_{uuid.uuid4().hex[:16]}"
+        correlation = found.get(_CORRELATION_ID) or found.get(_TRACE_ID)
+        correlation_id = correlation.decode("latin-1") if correlation else request_id
+        accept_language = found.get(_ACCEPT_LANGUAGE)
+        locale = resolve_locale(accept_language.decode("latin-1")) if accept_language else None
+
+        state = request_context(scope)
+        state["request_id"] = request_id
+        state["correlation_id"] = correlation_id
+        state["request_start"] = start
+        state["locale"] = locale or resolve_locale("")
+
+        context_headers = [
+            (b"x-request-id", request_id.encode("latin-1")),
+            (b"x-correlation-id", correlation_id.encode("latin-1")),
+        ]
+        if locale:
+            context_headers.append((b"content-language", locale.encode("latin-1")))
+
+        async def send_with_context(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = [
+                    (name, value)
+                    for name, value in message.get("headers", ())
+                    if name.lower() not in (_REQUEST_ID, _CORRELATION_ID)
+                ]
+                headers.extend(context_headers)
+                if self.timing_header:
+                    elapsed = time.perf_counter() - start
+                    headers.append((b"x-process-time", f"{elapsed:.3f}".encode("latin-1")))
+                message["headers"] = headers
+            await send(message)
+
+        CorrelationContext.set_correlation_id(correlation_id)
+        try:
+            await self.app(scope, receive, send_with_context)
+        finally:
+            CorrelationContext.clear_correlation_id()
+
+
+def setup_request_context_middleware(app: ASGIApp, timing_header: bool = True) -> None:
+    """Attach the RequestContextMiddleware to the app (add it last so it runs first)."""
+    app.add_middleware(RequestContextMiddleware, timing_header=timing_header)
@@ -5,11 +5,10 @@ This module provides a FastAPI middleware that adds security headers to response
 to help protect against common web vulnerabilities like XSS, clickjacking, and more.
 """
 
-from typing import Callable, Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from app.utils.logging import get_logger
 
@@ -17,7 +16,7 @@ from app.utils.logging import get_logger
 logger = get_logger("security_headers_middleware", "logs/security.log")
 
 
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
+class SecurityHeadersMiddleware:
     """Middleware for adding security headers to responses"""
 
     def __init__(
@@ -50,7 +49,7 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
             permissions_policy: Permissions-Policy value
             exclude_paths: Paths to exclude from security headers
         """
-        super().__init__(app)
+        self.app = app
         self.csp_directives = csp_directives or {
             "default-src": "'self'",
             "script-src": "'self'",
@@ -78,103 +77,104 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
             "/api/openapi.json",
             "/swagger-ui",
         ]
+        self.exclude_prefixes = tuple(self.exclude_paths)
+        # Header values never change per request, so build them once
+        self.security_headers = self._build_headers()
         logger.info(
             f"Initialized SecurityHeadersMiddleware with {len(self.csp_directives)} CSP directives"
         )
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        """
-        Process the request and add security headers to the response
-
-        Args:
-            request: FastAPI request objec
-            call_next: Next middleware/route handler
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Add security headers to the response of every non-excluded path."""
+        if scope["type"] != "http" or scope["path"].startswith(self.exclude_prefixes):
+            await self.app(scope, receive, send)
+            return
 
-        Returns:
-            Response with security headers
-        """
-        # Process the reques
-        response = await call_next(request)
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                for name, value in self.security_headers:
+                    headers[name] = value
+            await send(message)
 
-        # Skip adding headers for excluded paths
-        if any(request.url.path.startswith(path) for path in self.exclude_paths):
-            return response
+        await self.app(scope, receive, send_with_headers)
 
-        # Add security headers
-        self._add_content_security_policy(response)
-        self._add_hsts_header(response)
-        self._add_basic_security_headers(response)
+    def _build_headers(self) -> List[Tuple[str, str]]:
+        """
+        Build the security headers added to every response
 
-        return response
+        Returns:
+            List of (header name, value) pairs
+        """
+        headers = []
+        csp_value = self._content_security_policy()
+        if csp_value:
+            headers.append(("Content-Security-Policy", csp_value))
+        headers.append(("Strict-Transport-Security", self._hsts_value()))
+        headers.extend([
+            ("X-Frame-Options", self.frame_options),
+            ("X-Content-Type-Options", self.content_type_options),
+            ("X-XSS-Protection", self.xss_protection),
+            ("Referrer-Policy", self.referrer_policy),
+        ])
+        if self.permissions_policy:
+            headers.append(("Permissions-Policy", self.permissions_policy))
+        return headers
 
-    def _add_content_security_policy(self, response: Response) -> None:
+    def _content_security_policy(self) -> Optional[str]:
         """
-        Add Content-Security-Policy header to response
+        Build the Content-Security-Policy header value
 
-        Args:
-            response: FastAPI response object
+        Returns:
+            CSP header value, or None when no directives are configured
         """
-        if self.csp_directives:
-            # Ensure critical domains are always included
-            directives = dict(self.csp_directives)
-
-            # Always include Google Fonts in style-src
-            if "style-src" in directives:
-                if "fonts.googleapis.com" not in directives["style-src"]:
-                    directives["style-src"] += " https://fonts.googleapis.com"
-
-            # Always include Google Fonts in font-src
-            if "font-src" in directives:
-                if "fonts.gstatic.com" not in directives["font-src"]:
-                    directives["font-src"] += " https://fonts.gstatic.com"
-
-            # Restrict connect-src to staging/prod API domains and Google Fonts
-            if "connect-src" in directives:
-                connect = directives["connect-src"]
-                allowed = [
-                    "https://ultrai-staging-api.onrender.com",
-                    "wss://ultrai-staging-api.onrender.com",
-                    "https://ultrai-prod-api.onrender.com",
-                    "wss://ultrai-prod-api.onrender.com",
-                ]
-                for d in allowed:
-                    if d not in connect:
-                        connect += f" {d}"
-                directives["connect-src"] = connect
-
-            csp_value = "; ".join(
-                f"{key} {value}" for key, value in directives.items()
-            )
-            response.headers["Content-Security-Policy"] = csp_value
-
-    def _add_hsts_header(self, response: Response) -> None:
+        if not self.csp_directives:
+            return None
+
+        # Ensure critical domains are always included
+        directives = dict(self.csp_directives)
+
+        # Always include Google Fonts in style-src
+        if "style-src" in directives:
+            if "fonts.googleapis.com" not in directives["style-src"]:
+                directives["style-src"] += " https://fonts.googleapis.com"
+
+        # Always include Google Fonts in font-src
+        if "font-src" in directives:
+            if "fonts.gstatic.com" not in directives["font-src"]:
+                directives["font-src"] += " https://fonts.gstatic.com"
+
+        # Restrict connect-src to staging/prod API domains and Google Fonts
+        if "connect-src" in directives:
+            connect = directives["connect-src"]
+            allowed = [
+                "https://ultrai-staging-api.onrender.com",
+                "wss://ultrai-staging-api.onrender.com",
+                "https://ultrai-prod-api.onrender.com",
+                "wss://ultrai-prod-api.onrender.com",
+            ]
+            for d in allowed:
+                if d not in connect:
+                    connect += f" {d}"
+            directives["connect-src"] = connect
+
+        return "; ".join(
+            f"{key} {value}" for key, value in directives.items()
+        )
+
+    def _hsts_value(self) -> str:
         """
-        Add Strict-Transport-Security header to response
+        Build the Strict-Transport-Security header value
 
-        Args:
-            response: FastAPI response objec
+        Returns:
+            HSTS header value
         """
         hsts_value = f"max-age={self.hsts_max_age}"
         if self.hsts_include_subdomains:
             hsts_value += "; includeSubDomains"
         if self.hsts_preload:
             hsts_value += "; preload"
-        response.headers["Strict-Transport-Security"] = hsts_value
-
-    def _add_basic_security_headers(self, response: Response) -> None:
-        """
-        Add basic security headers to response
-
-        Args:
-            response: FastAPI response objec
-        """
-        response.headers["X-Frame-Options"] = self.frame_options
-        response.headers["X-Content-Type-Options"] = self.content_type_options
-        response.headers["X-XSS-Protection"] = self.xss_protection
-        response.headers["Referrer-Policy"] = self.referrer_policy
-
-        if self.permissions_policy:
-            response.headers["Permissions-Policy"] = self.permissions_policy
+        return hsts_value
 
 
 def setup_security_headers_middleware(
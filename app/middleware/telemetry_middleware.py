@@ -9,11 +9,9 @@ This middleware:
 """
 
 import time
-from typing import Callable
 
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+from fastapi import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from app.services.telemetry_service import telemetry
 from app.utils.logging import get_logger, CorrelationContext
@@ -21,37 +19,39 @@ from app.utils.logging import get_logger, CorrelationContext
 logger = get_logger(__name__)
 
 
-class TelemetryMiddleware(BaseHTTPMiddleware):
+class TelemetryMiddleware:
     """Middleware for request telemetry."""
 
     def __init__(self, app: ASGIApp):
         """Initialize telemetry middleware."""
-        super().__init__(app)
+        self.app = app
         logger.info("Telemetry middleware initialized")
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """
         Process request with telemetry.
 
-        Args:
-            request: FastAPI request
-            call_next: Next middleware/handler
-
-        Returns:
-            Response with telemetry recorded
+        The duration is recorded when the response body has been fully sent,
+        so streaming responses are measured end to end.
         """
         # Skip telemetry for metrics endpoint to avoid recursion
-        if request.url.path == "/api/metrics":
-            return await call_next(request)
-        
-        # Start timing
-        start_time = time.time()
-        
+        if scope["type"] != "http" or scope["path"] == "/api/metrics":
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+        state = scope.get("state", {})
+
+        # Start timing (reuse the request context start time when available)
+        start_time = state.get("request_start") or time.perf_counter()
+
         # Extract request attributes
-        method = request.method
-        path = request.url.path
-        request_id = request.headers.get("X-Request-ID", CorrelationContext.get_correlation_id())
-        
+        method = scope["method"]
+        path = scope["path"]
+        request_id = state.get("request_id") or request.headers.get(
+            "X-Request-ID", CorrelationContext.get_correlation_id()
+        )
+
         # Create span attributes
         span_attributes = {
             "http.method": method,
@@ -62,49 +62,37 @@ class TelemetryMiddleware(BaseHTTPMiddleware):
             "http.user_agent": request.headers.get("User-Agent", "unknown"),
             "request.id": request_id,
         }
-        
+
         # Add user info if available
-        if hasattr(request.state, "user_id"):
-            span_attributes["user.id"] = request.state.user_id
-        if hasattr(request.state, "auth_method"):
-            span_attributes["auth.method"] = request.state.auth_method
-        
+        if "user_id" in state:
+            span_attributes["user.id"] = state["user_id"]
+        if "auth_method" in state:
+            span_attributes["auth.method"] = state["auth_method"]
+
+        status_code = 500
+        response_size = 0
+
+        async def send_with_telemetry(message: Message) -> None:
+            nonlocal status_code, response_size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                for name, value in message.get("headers", ()):
+                    if name.lower() == b"content-length":
+                        response_size = int(value)
+                        break
+            await send(message)
+
         # Start trace span
         with telemetry.trace_span(f"{method} {path}", span_attributes) as span:
             try:
                 # Process request
-                response = await call_next(request)
-                
-                # Update span with response info
-                if span:
-                    span.set_attribute("http.status_code", response.status_code)
-                    span.set_attribute("http.response.size", 
-                                     int(response.headers.get("content-length", 0)))
-                
-                # Record metrics
-                duration_ms = (time.time() - start_time) * 1000
-                telemetry.record_request(method, path, response.status_code, duration_ms)
-                
-                # Log request completion
-                logger.info(
-                    f"{method} {path} completed",
-                    extra={
-                        "requestId": request_id,
-                        "method": method,
-                        "path": path,
-                        "status": response.status_code,
-                        "duration_ms": duration_ms,
-                    }
-                )
-                
-                return response
-                
+                await self.app(scope, receive, send_with_telemetry)
             except Exception as e:
                 # Record error
-                duration_ms = (time.time() - start_time) * 1000
+                duration_ms = (time.perf_counter() - start_time) * 1000
                 telemetry.record_request(method, path, 500, duration_ms)
                 telemetry.record_error("request_error", stage="middleware")
-                
+
                 logger.error(
                     f"Request failed: {method} {path}",
                     extra={
@@ -116,9 +104,30 @@ class TelemetryMiddleware(BaseHTTPMiddleware):
                     },
                     exc_info=True
                 )
-                
+
                 raise
 
+            # Update span with response info
+            if span:
+                span.set_attribute("http.status_code", status_code)
+                span.set_attribute("http.response.size", response_size)
+
+            # Record metrics
+            duration_ms = (time.perf_counter() - start_time) * 1000
+            telemetry.record_request(method, path, status_code, duration_ms)
+
+            # Log request completion
+            logger.info(
+                f"{method} {path} completed",
+                extra={
+                    "requestId": request_id,
+                    "method": method,
+                    "path": path,
+                    "status": status_code,
+                    "duration_ms": duration_ms,
+                }
+            )
+
 
 def setup_telemetry_middleware(app: ASGIApp) -> None:
     """
@@ -28,6 +28,7 @@ class StreamEventType(str, Enum):
     # Model events
     MODEL_START = "model_start"
     MODEL_RESPONSE = "model_response"
+    MODEL_CHUNK = "model_chunk"
     MODEL_COMPLETE = "model_complete"
     MODEL_ERROR = "model_error"
     
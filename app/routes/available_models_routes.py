@@ -8,6 +8,7 @@ from pydantic import BaseModel, Field
 import os
 
 from app.utils.logging import get_logger
+from app.services.model_catalog import get_model_catalog
 from app.services.model_availability import (
     ModelAvailabilityChecker,
     AvailabilityStatus,
@@ -53,228 +54,17 @@ def create_router() -> APIRouter:
         their availability, token limits, and basic cost information.
         Only shows models that have API keys configured.
         """
-        # Check which API keys are configured
-        openai_configured = bool(os.getenv("OPENAI_API_KEY"))
-        anthropic_configured = bool(os.getenv("ANTHROPIC_API_KEY"))
-        google_configured = bool(os.getenv("GOOGLE_API_KEY"))
-        huggingface_configured = bool(os.getenv("HUGGINGFACE_API_KEY"))
-
-        available_models = []
-
-        # OpenAI Models (only add if API key is configured)
-        if openai_configured:
-            openai_models = [
-                # GPT-4 Models
-                ModelInfo(
-                    name="gpt-4o",
-                    provider="openai",
-                    status="available",
-                    max_tokens=128000,
-                    cost_per_1k_tokens=0.005
-                ),
-                ModelInfo(
-                    name="gpt-4o-mini",
-                    provider="openai",
-                    status="available",
-                    max_tokens=128000,
-                    cost_per_1k_tokens=0.00015
-                ),
-                ModelInfo(
-                    name="gpt-4-turbo-preview",
-                    provider="openai",
-                    status="available",
-                    max_tokens=128000,
-                    cost_per_1k_tokens=0.01
-                ),
-                ModelInfo(
-                    name="gpt-4",
-                    provider="openai",
-                    status="available",
-                    max_tokens=8192,
-                    cost_per_1k_tokens=0.03
-                ),
-                # O1 Reasoning Models
-                ModelInfo(
-                    name="o1-preview",
-                    provider="openai",
-                    status="available",
-                    max_tokens=128000,
-                    cost_per_1k_tokens=0.015
-                ),
-                ModelInfo(
-                    name="o1-mini",
-                    provider="openai",
-                    status="available",
-                    max_tokens=65536,
-                    cost_per_1k_tokens=0.003
-                ),
-                # GPT-3.5 Models
-                ModelInfo(
-                    name="gpt-3.5-turbo",
-                    provider="openai",
-                    status="available",
-                    max_tokens=16385,
-                    cost_per_1k_tokens=0.0005
-                ),
-                ModelInfo(
-                    name="gpt-3.5-turbo-16k",
-                    provider="openai",
-                    status="available",
-                    max_tokens=16385,
-                    cost_per_1k_tokens=0.003
-                ),
-            ]
-            available_models.extend(openai_models)
-
-        # Anthropic Models (only add if API key is configured)
-        if anthropic_configured:
-            anthropic_models = [
-                # Claude 3.5 Models
-                ModelInfo(
-                    name="claude-3-5-sonnet-20241022",
-                    provider="anthropic",
-                    status="available",
-                    max_tokens=200000,
-                    cost_per_1k_tokens=0.003
-                ),
-                ModelInfo(
-                    name="claude-3-5-haiku-20241022",
-                    provider="anthropic",
-                    status="available",
-                    max_tokens=200000,
-                    cost_per_1k_tokens=0.0008
-                ),
-                # Claude 3 Models
-                ModelInfo(
-                    name="claude-3-opus-20240229",
-                    provider="anthropic",
-                    status="available",
-                    max_tokens=200000,
-                    cost_per_1k_tokens=0.015
-                ),
-                ModelInfo(
-                    name="claude-3-sonnet-20240229",
-                    provider="anthropic",
-                    status="available",
-                    max_tokens=200000,
-                    cost_per_1k_tokens=0.003
-                ),
-                ModelInfo(
-                    name="claude-3-haiku-20240307",
-                    provider="anthropic",
-                    status="available",
-                    max_tokens=200000,
-                    cost_per_1k_tokens=0.00025
-                ),
-                # Legacy aliases for compatibility
-                ModelInfo(
-                    name="claude-3-sonnet",
-                    provider="anthropic",
-                    status="available",
-                    max_tokens=200000,
-                    cost_per_1k_tokens=0.003
-                ),
-            ]
-            available_models.extend(anthropic_models)
-
-        # Google Models (only add if API key is configured)
-        if google_configured:
-            google_models = [
-                # Gemini 1.5 Models
-                ModelInfo(
-                    name="gemini-1.5-pro",
-                    provider="google",
-                    status="available",
-                    max_tokens=1000000,
-                    cost_per_1k_tokens=0.0035
-                ),
-                ModelInfo(
-                    name="gemini-1.5-pro-latest",
-                    provider="google",
-                    status="available",
-                    max_tokens=2000000,
-                    cost_per_1k_tokens=0.0035
-                ),
-                ModelInfo(
-                    name="gemini-1.5-flash",
-                    provider="google",
-                    status="available",
-                    max_tokens=1000000,
-                    cost_per_1k_tokens=0.00035
-                ),
-                ModelInfo(
-                    name="gemini-1.5-flash-latest",
-                    provider="google",
-                    status="available",
-                    max_tokens=1000000,
-                    cost_per_1k_tokens=0.00035
-                ),
-                # Gemini 2.0 Models (Experimental)
-                ModelInfo(
-                    name="gemini-2.0-flash-exp",
-                    provider="google",
-                    status="available",
-                    max_tokens=1000000,
-                    cost_per_1k_tokens=0.0
-                ),
-                # Legacy names
-                ModelInfo(
-                    name="gemini-pro",
-                    provider="google",
-                    status="available",
-                    max_tokens=1000000,
-                    cost_per_1k_tokens=0.0035
-                ),
-            ]
-            available_models.extend(google_models)
-
-        # HuggingFace Models (only add if API key is configured)
-        if huggingface_configured:
-            huggingface_models = [
-                ModelInfo(
-                    name="meta-llama/Meta-Llama-3-8B-Instruct",
-                    provider="huggingface",
-                    status="available",
-                    max_tokens=8192,
-                    cost_per_1k_tokens=0.0
-                ),
-                ModelInfo(
-                    name="meta-llama/Meta-Llama-3-70B-Instruct",
-                    provider="huggingface",
-                    status="available",
-                    max_tokens=8192,
-                    cost_per_1k_tokens=0.0
-                ),
-                ModelInfo(
-                    name="mistralai/Mistral-7B-Instruct-v0.1",
-                    provider="huggingface",
-                    status="available",
-                    max_tokens=32768,
-                    cost_per_1k_tokens=0.0
-                ),
-                ModelInfo(
-                    name="mistralai/Mixtral-8x7B-Instruct-v0.1",
-                    provider="huggingface",
-                    status="available",
-                    max_tokens=32768,
-                    cost_per_1k_tokens=0.0
-                ),
-                ModelInfo(
-                    name="google/gemma-7b-it",
-                    provider="huggingface",
-                    status="available",
-                    max_tokens=8192,
-                    cost_per_1k_tokens=0.0
-                ),
-                ModelInfo(
-                    name="microsoft/phi-2",
-                    provider="huggingface",
-                    status="available",
-                    max_tokens=2048,
-                    cost_per_1k_tokens=0.0
-                ),
-            ]
-            available_models.extend(huggingface_models)
+        # Only models whose provider API key is configured, precomputed in the catalog
+        available_models = [
+            ModelInfo(
+                name=spec.name,
+                provider=spec.provider,
+                status="available",
+                max_tokens=spec.max_tokens,
+                cost_per_1k_tokens=spec.cost_per_1k_tokens,
+            )
+            for spec in get_model_catalog().listing
+        ]
 
         try:
             # Check if we have the model registry for dynamic model info
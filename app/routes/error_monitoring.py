@@ -132,14 +132,9 @@ async def reset_circuit_breaker(request: Request, provider: str):
     """
     try:
         if provider in enhanced_error_handler.circuit_breakers:
-            circuit_state = enhanced_error_handler.circuit_breakers[provider]
-            
-            # Reset to healthy state
-            from app.services.enhanced_error_handler import ProviderState
-            circuit_state.state = ProviderState.HEALTHY
-            circuit_state.consecutive_failures = 0
-            circuit_state.next_retry_time = None
-            
+            # Reset to healthy state (also clears shared breaker state)
+            await enhanced_error_handler.reset_provider_circuit(provider)
+
             logger.info(
                 f"Circuit breaker manually reset for provider: {provider}",
                 extra={"provider": provider, "action": "manual_reset"}
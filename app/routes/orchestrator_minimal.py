@@ -14,11 +14,8 @@ from app.services.output_formatter import OutputFormatter
 from app.middleware.combined_auth_middleware import require_auth, AuthUser
 from app.models.streaming_response import StreamingAnalysisRequest, StreamingConfig
 from app.services.provider_health_manager import provider_health_manager
-# from app.services.sse_event_bus import sse_event_bus  # DISABLED - was hanging
-class MockSSE:
-    async def publish(self, *args, **kwargs):
-        pass
-sse_event_bus = MockSSE()
+from app.services.sse_event_bus import SSECapacityError, sse_event_bus
+from app.services.stream_session import StreamSession
 from app.services.analysis_storage_service import AnalysisStorageService
 from app.database.session import get_db
 from app.database.models.analysis import AnalysisType, OutputFormat
@@ -118,17 +115,23 @@ def create_router() -> APIRouter:
 
         Query params:
           - correlation_id: trace id to subscribe to
+
+        Reconnecting clients send ``Last-Event-ID`` and receive the events they
+        missed that are still buffered.
         """
         if not correlation_id:
             raise HTTPException(status_code=400, detail="correlation_id is required")
 
         # Allow read-only access (auth optional based on middleware config)
-        async def gen():
-            async for frame in sse_event_bus.subscribe(correlation_id):
-                yield frame
+        try:
+            frames = sse_event_bus.subscribe(
+                correlation_id, last_event_id=http_request.headers.get("last-event-id")
+            )
+        except SSECapacityError as e:
+            raise HTTPException(status_code=503, detail=str(e))
 
         return StreamingResponse(
-            gen(),
+            frames,
             media_type="text/event-stream",
             headers={
                 "Cache-Control": "no-cache",
@@ -275,6 +278,7 @@ def create_router() -> APIRouter:
         This endpoint provides the core analysis functionality by routing
         requests through the multi-stage orchestration pipeline.
         """
+        corr_id = ""
         try:
             import time
 
@@ -721,6 +725,9 @@ def create_router() -> APIRouter:
                     logger.warning(f"Failed to mark analysis session as failed: {storage_error}")
             
             raise HTTPException(status_code=500, detail=f"An unexpected error occurred: {str(e)}")
+        finally:
+            # End event subscribers for this request
+            await sse_event_bus.complete(corr_id)
 
     @router.post(
         "/orchestrator/analyze/stream",
@@ -766,7 +773,12 @@ def create_router() -> APIRouter:
 
             orchestration_service = http_request.app.state.orchestration_service
 
-            # Check if service supports streaming
+            # Check if service supports streaming; per-stream state lives in
+            # StreamSession, so one streaming service is shared by all requests
+            if not hasattr(orchestration_service, "stream_pipeline") and hasattr(
+                http_request.app.state, "streaming_orchestration_service"
+            ):
+                orchestration_service = http_request.app.state.streaming_orchestration_service
             if not hasattr(orchestration_service, "stream_pipeline"):
                 # Try to import and create streaming service
                 try:
@@ -820,17 +832,24 @@ def create_router() -> APIRouter:
                     logger.error(f"Model selection failed: {e}")
                     selected_models = ["gpt-4o"]
 
+            # The session stops provider calls as soon as the client goes away
+            session = StreamSession(
+                buffer_size=streaming_config.buffer_size,
+                is_disconnected=http_request.is_disconnected,
+            )
+
             # Create async generator for streaming
             async def event_stream():
                 """Generate Server-Sent Events."""
                 try:
-                    async for event in orchestration_service.stream_pipeline(
+                    async for event in session.run(orchestration_service.stream_pipeline(
                         input_data=request.query,
                         options=request.options,
                         user_id=request.user_id,
                         selected_models=selected_models,
-                        stream_config=streaming_config
-                    ):
+                        stream_config=streaming_config,
+                        session=session
+                    )):
                         yield event
                 except Exception as e:
                     logger.error(f"Streaming error: {str(e)}")
@@ -0,0 +1,219 @@
+"""
+Write-behind recording of API key ``last_used_at``.
+
+Verifying an API key used to commit a ``last_used_at`` update on every
+request: one write transaction per read. Instead, ``record`` keeps only the
+latest use time per key in memory, and a background task writes everything
+pending in a single bulk UPDATE every ``flush_interval`` seconds. It flushes
+sooner once ``max_pending`` distinct keys are waiting.
+
+A flush that fails puts its timestamps back so the next flush retries them.
+``aclose`` writes whatever is pending, so a graceful stop loses nothing. The
+UPDATE only ever moves ``last_used_at`` forward, so workers flushing
+concurrently cannot overwrite a newer time with an older one.
+"""
+
+import asyncio
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, ContextManager, Dict, Optional
+
+from app.config import Config
+from app.utils.logging import get_logger
+
+try:
+    from prometheus_client import Gauge, Histogram
+
+    ULTRA_API_KEY_USAGE_PENDING = Gauge(
+        "ultra_api_key_usage_pending", "API keys with a last-use time waiting to be written"
+    )
+    ULTRA_API_KEY_USAGE_FLUSH_SECONDS = Histogram(
+        "ultra_api_key_usage_flush_seconds", "Time to write one batch of API key last-use times"
+    )
+except Exception:  # pragma: no cover - metrics are optional
+    ULTRA_API_KEY_USAGE_PENDING = None
+    ULTRA_API_KEY_USAGE_FLUSH_SECONDS = None
+
+logger = get_logger("api_key_usage_recorder")
+
+
+def _default_session_factory() -> ContextManager[Any]:
+    from app.database.connection import get_db_session
+
+    return get_db_session()
+
+
+def write_last_used(session: Any, pending: Dict[str, datetime]) -> int:
+    """Apply {api key: last use} in one executemany UPDATE; returns rows updated."""
+    from sqlalchemy import bindparam, or_, update
+
+    from app.database.models.user import ApiKey
+
+    table = ApiKey.__table__
+    statement = (
+        update(table)
+        .where(table.c.key == bindparam("b_key"))
+        .where(or_(table.c.last_used_at.is_(None), table.c.last_used_at < bindparam("b_used_at")))
+        .values(last_used_at=bindparam("b_used_at"))
+    )
+    result = session.execute(
+        statement, [{"b_key": key, "b_used_at": used_at} for key, used_at in pending.items()]
+    )
+    session.commit()
+    return result.rowcount if result.rowcount is not None and result.rowcount >= 0 else len(pending)
+
+
+class ApiKeyUsageRecorder:
+    """Coalesces API key last-use times and writes them in periodic bulk updates."""
+
+    def __init__(
+        self,
+        flush_interval: float = 5.0,
+        max_pending: int = 10000,
+        session_factory: Callable[[], ContextManager[Any]] = _default_session_factory,
+        clock: Callable[[], datetime] = datetime.utcnow,
+    ):
+        """
+        Args:
+            flush_interval: Seconds between bulk writes; 0 disables write-behind
+                and callers fall back to updating the row themselves
+            max_pending: Flush early once this many distinct keys are waiting
+            session_factory: Context manager yielding a database session
+            clock: Source of last-use timestamps (naive UTC, like the column)
+        """
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.session_factory = session_factory
+        self.clock = clock
+        self.stats = {
+            "recorded": 0,
+            "coalesced": 0,
+            "written": 0,
+            "flushes": 0,
+            "failures": 0,
+            "last_flush_ms": 0.0,
+        }
+        # Guarded by _lock: record() is called from auth worker threads
+        self._pending: Dict[str, datetime] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = asyncio.Lock()
+        self._stopping = False
+        self._wake: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.flush_interval > 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    def record(self, api_key: str, used_at: Optional[datetime] = None) -> None:
+        """Note a use of `api_key`; only the latest time per key is kept. Thread-safe."""
+        used_at = used_at or self.clock()
+        with self._lock:
+            previous = self._pending.get(api_key)
+            if previous is None:
+                self._pending[api_key] = used_at
+            else:
+                self.stats["coalesced"] += 1
+                if used_at > previous:
+                    self._pending[api_key] = used_at
+            self.stats["recorded"] += 1
+            pending = len(self._pending)
+        self._publish_pending(pending)
+        if pending >= self.max_pending and self.running:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    def start(self) -> None:
+        """Start the background flusher on the running loop (idempotent)."""
+        if self.running or not self.enabled:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._stopping = False
+        self._task = asyncio.create_task(self._run(), name="api_key_usage_recorder")
+
+    async def flush(self) -> int:
+        """Write everything pending now. Returns the number of keys written."""
+        async with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+            if not batch:
+                return 0
+            started = time.perf_counter()
+            try:
+                await asyncio.to_thread(self._write, batch)
+            except Exception as e:
+                self.stats["failures"] += 1
+                self._restore(batch)
+                logger.error(f"Failed to write last-use time for {len(batch)} API keys: {e}")
+                return 0
+            elapsed = time.perf_counter() - started
+            self.stats["flushes"] += 1
+            self.stats["written"] += len(batch)
+            self.stats["last_flush_ms"] = round(elapsed * 1000, 2)
+            if ULTRA_API_KEY_USAGE_FLUSH_SECONDS:
+                ULTRA_API_KEY_USAGE_FLUSH_SECONDS.observe(elapsed)
+            self._publish_pending(len(self._pending))
+            return len(batch)
+
+    async def aclose(self) -> None:
+        """Stop the flusher and write whatever is still pending (call on shutdown)."""
+        task, self._task = self._task, None
+        if task is not None and not task.done():
+            # Let an in-progress flush finish rather than cancelling it mid-write
+            self._stopping = True
+            self._wake.set()
+            await task
+        await self.flush()
+
+    def _write(self, batch: Dict[str, datetime]) -> None:
+        with self.session_factory() as session:
+            write_last_used(session, batch)
+
+    def _restore(self, batch: Dict[str, datetime]) -> None:
+        with self._lock:
+            for key, used_at in batch.items():
+                newer = self._pending.get(key)
+                if newer is None or used_at > newer:
+                    self._pending[key] = used_at
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            self._wake.clear()
+            timer = self._loop.call_later(self.flush_interval, self._wake.set)
+            try:
+                await self._wake.wait()
+            finally:
+                timer.cancel()
+            await self.flush()
+
+    def _publish_pending(self, pending: int) -> None:
+        if ULTRA_API_KEY_USAGE_PENDING:
+            ULTRA_API_KEY_USAGE_PENDING.set(pending)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "pending": self.pending_count, "running": self.running}
+
+
+# Global recorder shared by the auth service and the auth middleware
+_api_key_usage_recorder: Optional[ApiKeyUsageRecorder] = None
+
+
+def get_api_key_usage_recorder() -> ApiKeyUsageRecorder:
+    """Get the process-wide API key usage recorder."""
+    global _api_key_usage_recorder
+    if _api_key_usage_recorder is None:
+        _api_key_usage_recorder = ApiKeyUsageRecorder(
+            flush_interval=Config.API_KEY_USAGE_FLUSH_INTERVAL,
+            max_pending=Config.API_KEY_USAGE_MAX_PENDING,
+        )
+    return _api_key_usage_recorder
@@ -43,6 +43,8 @@ from app.database.connection import get_db
 from app.database.models.user import ApiKey, SubscriptionTier, User
 from app.database.repositories.user import UserRepository
 from app.models.auth import TokenResponse, UserCreate
+from app.services.api_key_usage_recorder import get_api_key_usage_recorder
+from app.services.principal_cache import get_principal_cache
 from app.utils.exceptions import AuthenticationException
 from app.utils.logging import get_logger
 from app.utils.password import check_password_strength, verify_password
@@ -523,6 +525,9 @@ class AuthService:
             db, db_obj=user, obj_in={"hashed_password": hashed_password}
         )
 
+        # Sessions authenticated with the old credentials must re-verify
+        get_principal_cache().invalidate_user(user_id)
+
         logger.info(f"Password changed successfully for user {user.email}")
         return True
 
@@ -643,6 +648,7 @@ class AuthService:
             api_key.is_active = False
             db.add(api_key)
             db.commit()
+            get_principal_cache().invalidate_user(user_id)
 
             logger.info(f"API key '{api_key.name}' revoked for user {user_id}")
             return True
@@ -674,10 +680,14 @@ class AuthService:
                 )
                 return None
 
-            # Update last used timestamp
-            api_key.last_used_at = datetime.utcnow()
-            db.add(api_key)
-            db.commit()
+            # Update last used timestamp, batched by the write-behind recorder
+            recorder = get_api_key_usage_recorder()
+            if recorder.running:
+                recorder.record(api_key.key)
+            else:
+                api_key.last_used_at = datetime.utcnow()
+                db.add(api_key)
+                db.commit()
 
             # Get user
             user = self.user_repository.get_by_id(db, api_key.user_id)
@@ -744,6 +754,7 @@ class AuthService:
             updated_user = self.user_repository.update(
                 db, db_obj=user, obj_in=safe_profile_data
             )
+            get_principal_cache().invalidate_user(user_id)
 
             # Return updated user info
             return {
@@ -0,0 +1,252 @@
+"""
+Binary codecs for values stored in the Redis cache tier.
+
+Payloads are framed with a two-byte header so the reader knows which
+serializer and compressor produced them:
+
+    byte 0: MAGIC (0xC1 - unused in msgpack and never a valid UTF-8 lead byte)
+    byte 1: (serializer << 4) | compressor
+
+Values written before the header existed (plain JSON text or raw strings)
+are still decoded for backward compatibility.
+
+Dataclasses and enums are tagged on the way in and rebuilt on the way out,
+but only for types registered with ``register_cache_type`` so a cache entry
+can never instantiate arbitrary classes.
+"""
+
+import dataclasses
+import json
+import zlib
+from enum import Enum
+from typing import Any, Callable, Dict, Optional, Tuple, Type
+
+from app.config import Config
+from app.utils.logging import get_logger
+
+try:  # Optional fast binary serializer
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+try:  # Optional better-ratio compressor
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+logger = get_logger("cache_codec")
+
+MAGIC = 0xC1
+
+SERIALIZER_JSON = 0
+SERIALIZER_MSGPACK = 1
+
+COMPRESSION_NONE = 0
+COMPRESSION_ZLIB = 1
+COMPRESSION_ZSTD = 2
+
+_DATACLASS_TAG = "__dc__"
+_ENUM_TAG = "__enum__"
+_MAP_TAG = "__map__"
+_TUPLE_TAG = "__tuple__"
+
+_TYPE_REGISTRY: Dict[str, Type] = {}
+
+
+def _type_name(cls: Type) -> str:
+    return f"{cls.__module__}.{cls.__qualname__}"
+
+
+def register_cache_type(cls: Type) -> Type:
+    """Allow a dataclass or Enum to round-trip through the cache.
+
+    Usable as a decorator or called directly after the class definition.
+    """
+    if not (dataclasses.is_dataclass(cls) or issubclass(cls, Enum)):
+        raise TypeError(f"{cls!r} is neither a dataclass nor an Enum")
+    _TYPE_REGISTRY[_type_name(cls)] = cls
+    return cls
+
+
+def _to_plain(value: Any) -> Any:
+    """Convert a value tree into JSON/msgpack-safe primitives with type tags."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value).decode("utf-8", errors="replace")
+    if isinstance(value, Enum):
+        return {_ENUM_TAG: _type_name(type(value)), "v": _to_plain(value.value)}
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        fields = {
+            f.name: _to_plain(getattr(value, f.name)) for f in dataclasses.fields(value)
+        }
+        return {_DATACLASS_TAG: _type_name(type(value)), "f": fields}
+    if isinstance(value, dict):
+        if all(isinstance(k, str) for k in value):
+            return {k: _to_plain(v) for k, v in value.items()}
+        return {_MAP_TAG: [[_to_plain(k), _to_plain(v)] for k, v in value.items()]}
+    if isinstance(value, tuple):
+        return {_TUPLE_TAG: [_to_plain(v) for v in value]}
+    if isinstance(value, (list, set, frozenset)):
+        return [_to_plain(v) for v in value]
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+def _from_plain(value: Any) -> Any:
+    """Inverse of ``_to_plain``; unknown tags are returned as plain dicts."""
+    if isinstance(value, list):
+        return [_from_plain(v) for v in value]
+    if not isinstance(value, dict):
+        return value
+    if _DATACLASS_TAG in value and "f" in value:
+        cls = _TYPE_REGISTRY.get(value[_DATACLASS_TAG])
+        fields = {k: _from_plain(v) for k, v in value["f"].items()}
+        if cls is None:
+            return fields
+        try:
+            return cls(**fields)
+        except TypeError as e:
+            logger.warning(f"Could not rebuild cached {value[_DATACLASS_TAG]}: {e}")
+            return fields
+    if _ENUM_TAG in value and "v" in value:
+        cls = _TYPE_REGISTRY.get(value[_ENUM_TAG])
+        raw = _from_plain(value["v"])
+        try:
+            return cls(raw) if cls is not None else raw
+        except ValueError:
+            return raw
+    if _MAP_TAG in value and len(value) == 1:
+        return {_from_plain(k): _from_plain(v) for k, v in value[_MAP_TAG]}
+    if _TUPLE_TAG in value and len(value) == 1:
+        return tuple(_from_plain(v) for v in value[_TUPLE_TAG])
+    return {k: _from_plain(v) for k, v in value.items()}
+
+
+def _serializers() -> Dict[int, Tuple[Callable[[Any], bytes], Callable[[bytes], Any]]]:
+    table = {
+        SERIALIZER_JSON: (
+            lambda obj: json.dumps(obj, separators=(",", ":")).encode("utf-8"),
+            lambda data: json.loads(data),
+        )
+    }
+    if msgpack is not None:
+        table[SERIALIZER_MSGPACK] = (
+            lambda obj: msgpack.packb(obj, use_bin_type=True),
+            lambda data: msgpack.unpackb(data, raw=False, strict_map_key=False),
+        )
+    return table
+
+
+def _compressors() -> Dict[int, Tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]]:
+    table = {
+        COMPRESSION_NONE: (lambda b: b, lambda b: b),
+        COMPRESSION_ZLIB: (lambda b: zlib.compress(b, 6), zlib.decompress),
+    }
+    if zstandard is not None:
+        table[COMPRESSION_ZSTD] = (
+            lambda b: zstandard.ZstdCompressor(level=3).compress(b),
+            lambda b: zstandard.ZstdDecompressor().decompress(b),
+        )
+    return table
+
+
+_SERIALIZER_NAMES = {"json": SERIALIZER_JSON, "msgpack": SERIALIZER_MSGPACK}
+_COMPRESSION_NAMES = {
+    "none": COMPRESSION_NONE,
+    "zlib": COMPRESSION_ZLIB,
+    "zstd": COMPRESSION_ZSTD,
+}
+
+
+class CacheCodec:
+    """Encode Python values to framed bytes for Redis and back."""
+
+    def __init__(
+        self,
+        serializer: str = "msgpack",
+        compression: str = "zlib",
+        compression_threshold: int = 1024,
+    ):
+        self._serializers = _serializers()
+        self._compressors = _compressors()
+
+        serializer_id = _SERIALIZER_NAMES.get(serializer, SERIALIZER_JSON)
+        if serializer_id not in self._serializers:
+            logger.info(f"Cache serializer '{serializer}' unavailable, using json")
+            serializer_id = SERIALIZER_JSON
+        compression_id = _COMPRESSION_NAMES.get(compression, COMPRESSION_NONE)
+        if compression_id not in self._compressors:
+            logger.info(f"Cache compression '{compression}' unavailable, using zlib")
+            compression_id = COMPRESSION_ZLIB
+
+        self.serializer_id = serializer_id
+        self.compression_id = compression_id
+        self.compression_threshold = compression_threshold
+
+    @property
+    def serializer(self) -> str:
+        return next(k for k, v in _SERIALIZER_NAMES.items() if v == self.serializer_id)
+
+    @property
+    def compression(self) -> str:
+        return next(k for k, v in _COMPRESSION_NAMES.items() if v == self.compression_id)
+
+    def encode(self, value: Any) -> bytes:
+        dumps, _ = self._serializers[self.serializer_id]
+        body = dumps(_to_plain(value))
+        compression_id = COMPRESSION_NONE
+        if self.compression_id != COMPRESSION_NONE and len(body) >= self.compression_threshold:
+            compress, _ = self._compressors[self.compression_id]
+            compressed = compress(body)
+            # Only keep compression when it actually saves bytes
+            if len(compressed) < len(body):
+                body, compression_id = compressed, self.compression_id
+        header = bytes((MAGIC, (self.serializer_id << 4) | compression_id))
+        return header + body
+
+    def decode(self, data: Any) -> Any:
+        if data is None:
+            return None
+        if isinstance(data, str):
+            return self._decode_legacy(data)
+        data = bytes(data)
+        if len(data) < 2 or data[0] != MAGIC:
+            return self._decode_legacy(data)
+
+        serializer_id, compression_id = data[1] >> 4, data[1] & 0x0F
+        try:
+            _, decompress = self._compressors[compression_id]
+            _, loads = self._serializers[serializer_id]
+        except KeyError:
+            raise ValueError(
+                f"Cached payload uses unsupported codec "
+                f"(serializer={serializer_id}, compression={compression_id})"
+            )
+        return _from_plain(loads(decompress(data[2:])))
+
+    @staticmethod
+    def _decode_legacy(data: Any) -> Any:
+        text = data.decode("utf-8", errors="replace") if isinstance(data, bytes) else data
+        try:
+            return json.loads(text)
+        except Exception:
+            return text
+
+
+def build_cache_codec(
+    serializer: Optional[str] = None,
+    compression: Optional[str] = None,
+    compression_threshold: Optional[int] = None,
+) -> CacheCodec:
+    """Build a codec from explicit arguments or Config defaults."""
+    return CacheCodec(
+        serializer=serializer or Config.CACHE_SERIALIZER,
+        compression=compression or Config.CACHE_COMPRESSION,
+        compression_threshold=(
+            compression_threshold
+            if compression_threshold is not None
+            else Config.CACHE_COMPRESSION_THRESHOLD
+        ),
+    )
@@ -2,10 +2,15 @@
 Advanced caching service for UltraAI Core with Redis support and fallback.
 """
 
+import asyncio
 import json
 import hashlib
+import heapq
+import math
 import time
-from typing import Any, Optional, Dict, Callable, Iterable
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from typing import Any, Optional, Dict, Callable, Iterable, Iterator, List, Tuple
 import os
 import inspect
 from functools import wraps
@@ -16,6 +21,8 @@ from redis.backoff import ExponentialBackoff
 from redis.exceptions import RedisError, ConnectionError, TimeoutError
 
 from app.config import Config
+from app.services.cache_codec import CacheCodec, build_cache_codec
+from app.services.semantic_cache import get_semantic_cache
 from app.utils.logging import get_logger
 
 # Optional Prometheus metrics support
@@ -34,6 +41,14 @@ try:
     ULTRA_CACHE_REDIS_AVAILABLE = Gauge(
         "ultra_cache_redis_available", "1 if Redis available, else 0"
     )
+    ULTRA_CACHE_MEMORY_BYTES = Gauge(
+        "ultra_cache_memory_bytes", "Estimated bytes held by in-memory cache"
+    )
+    ULTRA_CACHE_MEMORY_EVICTIONS = Counter(
+        "ultra_cache_memory_evictions_total",
+        "Total in-memory cache evictions",
+        ["reason"],
+    )
 except Exception:  # pragma: no cover - metrics are optional
     ULTRA_CACHE_HITS = None
     ULTRA_CACHE_MISSES = None
@@ -41,16 +56,207 @@ except Exception:  # pragma: no cover - metrics are optional
     ULTRA_CACHE_MEMORY_FALLBACKS = None
     ULTRA_CACHE_MEMORY_SIZE = None
     ULTRA_CACHE_REDIS_AVAILABLE = None
+    ULTRA_CACHE_MEMORY_BYTES = None
+    ULTRA_CACHE_MEMORY_EVICTIONS = None
 
 logger = get_logger("cache_service")
 
 
+def _estimate_size(value: Any) -> int:
+    """Cheap byte-size estimate for a cached value."""
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode("utf-8", errors="ignore"))
+    try:
+        return len(json.dumps(value, default=str))
+    except Exception:
+        return len(str(value))
+
+
+def _key_prefix(key: str) -> str:
+    """Budget bucket for a key: everything before the first ':'."""
+    return key.split(":", 1)[0]
+
+
+def parse_prefix_budgets(spec: str) -> Dict[str, int]:
+    """Parse "pipeline=33554432,llm=8388608" into a prefix -> bytes mapping."""
+    budgets: Dict[str, int] = {}
+    for part in (spec or "").split(","):
+        if "=" not in part:
+            continue
+        name, _, raw = part.partition("=")
+        try:
+            budgets[name.strip()] = int(raw.strip())
+        except ValueError:
+            logger.warning(f"Ignoring invalid cache prefix budget: {part!r}")
+    return budgets
+
+
+class BoundedMemoryCache(MutableMapping):
+    """LRU in-memory tier bounded by entry count, total bytes and per-prefix bytes.
+
+    Entries are the ``{"value", "expires_at"}`` dicts CacheService always
+    stored, so existing dict-style access keeps working. Eviction is O(1)
+    from the head of an OrderedDict; expiry uses a min-heap with lazy
+    deletion so the sweeper only touches entries that actually expired.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        max_bytes: int = 64 * 1024 * 1024,
+        prefix_budgets: Optional[Dict[str, int]] = None,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.prefix_budgets = dict(prefix_budgets or {})
+        self._data: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._prefix_lru: Dict[str, "OrderedDict[str, None]"] = {}
+        self._prefix_bytes: Dict[str, int] = {}
+        self._expiry_heap: List[Tuple[float, str]] = []
+        self.total_bytes = 0
+        self.evictions: Dict[str, int] = {
+            "capacity": 0,
+            "bytes": 0,
+            "prefix_budget": 0,
+            "expired": 0,
+        }
+
+    # --- Mapping protocol ---
+    def __getitem__(self, key: str) -> Dict[str, Any]:
+        return self._data[key]
+
+    def __setitem__(self, key: str, entry: Dict[str, Any]) -> None:
+        if key in self._data:
+            self._remove(key)
+        size = entry.get("size")
+        if size is None:
+            size = _estimate_size(entry.get("value"))
+            entry["size"] = size
+        prefix = _key_prefix(key)
+        self._data[key] = entry
+        self._prefix_lru.setdefault(prefix, OrderedDict())[key] = None
+        self._prefix_bytes[prefix] = self._prefix_bytes.get(prefix, 0) + size
+        self.total_bytes += size
+        expires_at = entry.get("expires_at")
+        if expires_at is not None:
+            heapq.heappush(self._expiry_heap, (expires_at, key))
+            if len(self._expiry_heap) > 2 * len(self._data) + 64:
+                self._compact_heap()
+        self._enforce_limits(key, prefix)
+
+    def __delitem__(self, key: str) -> None:
+        if key not in self._data:
+            raise KeyError(key)
+        self._remove(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._data
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._prefix_lru.clear()
+        self._prefix_bytes.clear()
+        self._expiry_heap.clear()
+        self.total_bytes = 0
+
+    # --- LRU / expiry ---
+    def touch(self, key: str) -> None:
+        """Mark ``key`` as most recently used."""
+        self._data.move_to_end(key)
+        self._prefix_lru[_key_prefix(key)].move_to_end(key)
+
+    def purge_expired(self, now: Optional[float] = None) -> int:
+        """Drop every entry whose TTL has passed; returns the number removed."""
+        now = time.time() if now is None else now
+        removed = 0
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            expires_at, key = heapq.heappop(heap)
+            entry = self._data.get(key)
+            # Stale heap node: key was deleted or re-set with a new TTL
+            if entry is None or entry.get("expires_at") != expires_at:
+                continue
+            self._remove(key)
+            self._record_eviction("expired")
+            removed += 1
+        return removed
+
+    def _remove(self, key: str) -> Dict[str, Any]:
+        entry = self._data.pop(key)
+        prefix = _key_prefix(key)
+        bucket = self._prefix_lru.get(prefix)
+        if bucket is not None:
+            bucket.pop(key, None)
+            if not bucket:
+                del self._prefix_lru[prefix]
+        size = entry.get("size", 0)
+        remaining = self._prefix_bytes.get(prefix, 0) - size
+        if remaining > 0:
+            self._prefix_bytes[prefix] = remaining
+        else:
+            self._prefix_bytes.pop(prefix, None)
+        self.total_bytes -= size
+        return entry
+
+    def _enforce_limits(self, new_key: str, prefix: str) -> None:
+        budget = self.prefix_budgets.get(prefix)
+        if budget is not None:
+            bucket = self._prefix_lru[prefix]
+            while self._prefix_bytes.get(prefix, 0) > budget and len(bucket) > 1:
+                oldest = next(iter(bucket))
+                if oldest == new_key:
+                    break
+                self._remove(oldest)
+                self._record_eviction("prefix_budget")
+        while self.max_entries and len(self._data) > self.max_entries:
+            self._evict_oldest("capacity")
+        while self.max_bytes and self.total_bytes > self.max_bytes and len(self._data) > 1:
+            if next(iter(self._data)) == new_key:
+                break
+            self._evict_oldest("bytes")
+
+    def _evict_oldest(self, reason: str) -> None:
+        oldest = next(iter(self._data))
+        self._remove(oldest)
+        self._record_eviction(reason)
+
+    def _record_eviction(self, reason: str) -> None:
+        self.evictions[reason] = self.evictions.get(reason, 0) + 1
+        if ULTRA_CACHE_MEMORY_EVICTIONS:
+            ULTRA_CACHE_MEMORY_EVICTIONS.labels(reason=reason).inc()
+
+    def _compact_heap(self) -> None:
+        self._expiry_heap = [
+            (entry["expires_at"], key)
+            for key, entry in self._data.items()
+            if entry.get("expires_at") is not None
+        ]
+        heapq.heapify(self._expiry_heap)
+
+    def prefix_usage(self) -> Dict[str, int]:
+        return dict(self._prefix_bytes)
+
+
 class CacheService:
     """Advanced caching service with Redis and in-memory fallback."""
 
-    def __init__(self):
+    def __init__(self, codec: Optional[CacheCodec] = None):
         self.redis_client: Optional[redis.Redis] = None
-        self.memory_cache: Dict[str, Dict[str, Any]] = {}
+        self.codec: CacheCodec = codec or build_cache_codec()
+        self.memory_cache: BoundedMemoryCache = BoundedMemoryCache(
+            max_entries=Config.MEMORY_CACHE_MAX_ENTRIES,
+            max_bytes=Config.MEMORY_CACHE_MAX_BYTES,
+            prefix_budgets=parse_prefix_budgets(Config.MEMORY_CACHE_PREFIX_BUDGETS),
+        )
+        self._sweeper_task: Optional[asyncio.Task] = None
         # Backward-compat attribute names expected by tests
         self.redis = None  # alias to redis_client
         self._memory_cache = self.memory_cache
@@ -80,8 +286,8 @@ class CacheService:
             retry = Retry(ExponentialBackoff(), retries=3)
             self.redis_client = redis.from_url(
                 redis_url,
-                encoding="utf-8",
-                decode_responses=True,
+                # Values are framed binary payloads produced by self.codec
+                decode_responses=False,
                 socket_connect_timeout=5,
                 socket_timeout=5,
                 retry=retry,
@@ -101,6 +307,8 @@ class CacheService:
             if key in self.memory_cache:
                 entry = self.memory_cache[key]
                 if ignore_ttl or entry["expires_at"] > time.time():
+                    if isinstance(self.memory_cache, BoundedMemoryCache):
+                        self.memory_cache.touch(key)
                     # Count as cache hit
                     self.cache_stats["hits"] += 1
                     if ULTRA_CACHE_MEMORY_FALLBACKS:
@@ -133,11 +341,7 @@ class CacheService:
                         self.cache_stats["hits"] += 1
                         if ULTRA_CACHE_HITS:
                             ULTRA_CACHE_HITS.inc()
-                        try:
-                            return json.loads(value)
-                        except Exception:
-                            # Return raw value if not JSON
-                            return value.decode() if isinstance(value, (bytes, bytearray)) else value
+                        return self.codec.decode(value)
                 except Exception as e:
                     logger.warning(f"Redis get error, falling back to memory: {e}")
                     self.cache_stats["errors"] += 1
@@ -153,11 +357,16 @@ class CacheService:
             return None
 
     def set(self, key: str, value: Any, ttl: int = 3600) -> bool:
-        """Synchronous set into memory cache (test path)."""
+        """Synchronous set into memory cache (test path).
+
+        A non-positive ``ttl`` means "do not cache": any existing entry is dropped.
+        """
         try:
+            if ttl <= 0:
+                self.delete(key)
+                return True
             self.memory_cache[key] = {"value": value, "expires_at": time.time() + ttl}
-            if ULTRA_CACHE_MEMORY_SIZE:
-                ULTRA_CACHE_MEMORY_SIZE.set(len(self.memory_cache))
+            self._update_memory_gauges()
             return True
         except Exception as e:
             logger.error(f"Cache set error: {e}")
@@ -167,21 +376,21 @@ class CacheService:
             return False
 
     async def aset(self, key: str, value: Any, ttl: int = 3600) -> bool:
-        """Async set supporting Redis; falls back to memory."""
+        """Async set supporting Redis; falls back to memory.
+
+        A non-positive ``ttl`` means "do not cache" in both tiers: any existing
+        entry is dropped instead of being stored without expiry.
+        """
         try:
-            # Try to JSON serialize for Redis storage; fall back to string
-            try:
-                if isinstance(value, (str, bytes)):
-                    serialized_value = value
-                else:
-                    serialized_value = json.dumps(value)
-            except Exception:
-                serialized_value = str(value)
+            if ttl is not None and ttl <= 0:
+                await self.adelete(key)
+                self.delete(key)
+                return True
             backend = self.redis or self.redis_client
             if backend:
                 try:
-                    # Tests expect .set(key, value, ex=None)
-                    await backend.set(key, serialized_value, ex=None)
+                    payload = self.codec.encode(value)
+                    await backend.set(key, payload, ex=self._redis_ttl(ttl))
                     return True
                 except Exception as e:
                     logger.warning(f"Redis set error, falling back to memory: {e}")
@@ -199,6 +408,13 @@ class CacheService:
                 ULTRA_CACHE_ERRORS.inc()
             return False
 
+    @staticmethod
+    def _redis_ttl(ttl: Optional[float]) -> Optional[int]:
+        """Redis EX seconds for ``ttl``; None means no expiry (callers drop ttl <= 0)."""
+        if ttl is None:
+            return None
+        return max(1, int(math.ceil(ttl)))
+
     def delete(self, key: str) -> bool:
         """Synchronous delete from memory cache."""
         try:
@@ -206,8 +422,7 @@ class CacheService:
             if key in self.memory_cache:
                 del self.memory_cache[key]
                 deleted = True
-            if ULTRA_CACHE_MEMORY_SIZE:
-                ULTRA_CACHE_MEMORY_SIZE.set(len(self.memory_cache))
+            self._update_memory_gauges()
             return deleted
         except Exception as e:
             logger.error(f"Cache delete error: {e}")
@@ -273,12 +488,60 @@ class CacheService:
     async def _cleanup_memory_cache(self):
         """Clean up expired entries from memory cache."""
         current_time = time.time()
-        expired_keys = [
-            k for k, v in self.memory_cache.items() if v["expires_at"] <= current_time
-        ]
-        for key in expired_keys:
-            del self.memory_cache[key]
-        logger.info(f"Cleaned up {len(expired_keys)} expired cache entries")
+        if isinstance(self.memory_cache, BoundedMemoryCache):
+            removed = self.memory_cache.purge_expired(current_time)
+        else:
+            expired_keys = [
+                k for k, v in self.memory_cache.items() if v["expires_at"] <= current_time
+            ]
+            for key in expired_keys:
+                del self.memory_cache[key]
+            removed = len(expired_keys)
+        self._update_memory_gauges()
+        if removed:
+            logger.info(f"Cleaned up {removed} expired cache entries")
+        return removed
+
+    def _purge_semantic_cache(self) -> int:
+        """Drop expired semantic cache entries; no-op while that cache is disabled."""
+        semantic_cache = get_semantic_cache()
+        return semantic_cache.purge_expired() if semantic_cache is not None else 0
+
+    def start_sweeper(self, interval: Optional[float] = None) -> None:
+        """Start the background expiry sweeper on the running event loop."""
+        if self._sweeper_task and not self._sweeper_task.done():
+            return
+        interval = interval or Config.MEMORY_CACHE_SWEEP_INTERVAL
+        if interval <= 0:
+            return
+
+        async def _sweep_loop():
+            while True:
+                await asyncio.sleep(interval)
+                try:
+                    await self._cleanup_memory_cache()
+                    self._purge_semantic_cache()
+                except Exception as e:
+                    logger.warning(f"Memory cache sweep failed: {e}")
+
+        self._sweeper_task = asyncio.create_task(_sweep_loop())
+        logger.info(f"Memory cache sweeper started (interval={interval}s)")
+
+    async def stop_sweeper(self) -> None:
+        """Cancel the background expiry sweeper if running."""
+        task, self._sweeper_task = self._sweeper_task, None
+        if task and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def _update_memory_gauges(self) -> None:
+        if ULTRA_CACHE_MEMORY_SIZE:
+            ULTRA_CACHE_MEMORY_SIZE.set(len(self.memory_cache))
+        if ULTRA_CACHE_MEMORY_BYTES and isinstance(self.memory_cache, BoundedMemoryCache):
+            ULTRA_CACHE_MEMORY_BYTES.set(self.memory_cache.total_bytes)
 
     # --- Synchronous helpers expected by unit tests ---
     def exists(self, key: str) -> bool:
@@ -326,20 +589,33 @@ class CacheService:
         hit_rate = (self.cache_stats["hits"] / total_requests) if total_requests > 0 else 0
 
         # Update gauges if available
-        if ULTRA_CACHE_MEMORY_SIZE:
-            ULTRA_CACHE_MEMORY_SIZE.set(len(self.memory_cache))
+        self._update_memory_gauges()
         if ULTRA_CACHE_REDIS_AVAILABLE:
             ULTRA_CACHE_REDIS_AVAILABLE.set(1 if self.redis_client is not None else 0)
 
-        return {
+        stats = {
             **self.cache_stats,
             "hit_rate": round(hit_rate, 2),
             "memory_cache_size": len(self.memory_cache),
             "redis_available": self.redis_client is not None,
         }
+        if isinstance(self.memory_cache, BoundedMemoryCache):
+            evictions = dict(self.memory_cache.evictions)
+            stats.update(
+                {
+                    "memory_cache_bytes": self.memory_cache.total_bytes,
+                    "memory_cache_max_entries": self.memory_cache.max_entries,
+                    "memory_cache_max_bytes": self.memory_cache.max_bytes,
+                    "memory_prefix_bytes": self.memory_cache.prefix_usage(),
+                    "evictions": sum(evictions.values()),
+                    "evictions_by_reason": evictions,
+                }
+            )
+        return stats
 
     async def close(self):
         """Close cache connections."""
+        await self.stop_sweeper()
         # Close redis_client if present
         if self.redis_client and hasattr(self.redis_client, "close"):
             try:
@@ -0,0 +1,430 @@
+"""
+Failure-rate circuit breakers with a pluggable state store.
+
+One ``CircuitBreakerEngine`` decides whether a provider may be called. The
+decision is driven by the failure rate over a sliding window made of
+fixed-size time buckets rather than by a consecutive-failure counter, so a
+provider that fails every other call trips just like one that is hard down:
+
+    closed     calls flow; once the window holds at least ``min_calls`` calls
+               and ``failure_rate`` of them failed, the circuit opens
+    open       calls are rejected until ``open_seconds`` have passed
+    half_open  up to ``half_open_probes`` trial calls are let through; that
+               many successes close the circuit, any failure re-opens it
+
+State lives in a store:
+
+- ``InMemoryBreakerStore`` keeps it per process (the default).
+- ``RedisBreakerStore`` keeps it in Redis so every worker sees the same
+  circuit. Each decision is a single Lua script, so the read-modify-write of
+  window buckets and state is atomic across workers. Keys expire once a
+  provider goes quiet.
+
+If Redis is unreachable the engine falls back to a local in-memory store and
+keeps serving decisions; it returns to Redis on the next successful call.
+"""
+
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from app.config import Config
+from app.utils.logging import get_logger
+
+try:
+    from prometheus_client import Counter
+
+    ULTRA_CIRCUIT_BREAKER_TRANSITIONS = Counter(
+        "ultra_circuit_breaker_transitions_total",
+        "Circuit breaker state transitions observed by this process",
+        ["key", "state"],
+    )
+    ULTRA_CIRCUIT_BREAKER_STORE_ERRORS = Counter(
+        "ultra_circuit_breaker_store_errors_total",
+        "Circuit breaker decisions served by the local fallback store",
+    )
+except Exception:  # pragma: no cover - metrics are optional
+    ULTRA_CIRCUIT_BREAKER_TRANSITIONS = None
+    ULTRA_CIRCUIT_BREAKER_STORE_ERRORS = None
+
+logger = get_logger("circuit_breaker_engine")
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+@dataclass(frozen=True)
+class BreakerPolicy:
+    """Thresholds shared by every store."""
+
+    window_seconds: float = 60.0
+    bucket_seconds: float = 5.0
+    min_calls: int = 5
+    failure_rate: float = 0.5
+    open_seconds: float = 60.0
+    half_open_probes: int = 1
+
+    @property
+    def ttl_seconds(self) -> float:
+        """How long idle state is kept; outlives any open or half-open period."""
+        return self.window_seconds + 2 * self.open_seconds
+
+
+@dataclass
+class BreakerDecision:
+    """Result of ``allow`` or ``record`` for one key."""
+
+    state: str
+    allowed: bool = True
+    retry_after: float = 0.0
+    calls: int = 0
+    failures: int = 0
+
+    @property
+    def failure_rate(self) -> float:
+        return self.failures / self.calls if self.calls else 0.0
+
+
+@dataclass
+class _LocalCircuit:
+    state: str = STATE_CLOSED
+    open_until: float = 0.0
+    probes: int = 0
+    probe_since: float = 0.0
+    successes: int = 0
+    # bucket index -> [calls, failures]
+    buckets: Dict[int, List[int]] = field(default_factory=dict)
+    touched: float = 0.0
+
+
+class InMemoryBreakerStore:
+    """Per-process breaker state."""
+
+    def __init__(self):
+        self._circuits: Dict[str, _LocalCircuit] = {}
+
+    def _circuit(self, key: str, policy: BreakerPolicy, now: float) -> _LocalCircuit:
+        circuit = self._circuits.get(key)
+        if circuit is None or now - circuit.touched > policy.ttl_seconds:
+            circuit = self._circuits[key] = _LocalCircuit()
+        circuit.touched = now
+        return circuit
+
+    async def allow(self, key: str, policy: BreakerPolicy, now: float) -> BreakerDecision:
+        circuit = self._circuit(key, policy, now)
+        if circuit.state == STATE_CLOSED:
+            return BreakerDecision(STATE_CLOSED)
+        if circuit.state == STATE_OPEN:
+            if now < circuit.open_until:
+                return BreakerDecision(STATE_OPEN, False, circuit.open_until - now)
+            circuit.state = STATE_HALF_OPEN
+            circuit.probes = circuit.successes = 0
+            circuit.probe_since = now
+        if circuit.probes >= policy.half_open_probes and now - circuit.probe_since >= policy.open_seconds:
+            # Probes that never reported back are presumed lost
+            circuit.probes = 0
+        if circuit.probes < policy.half_open_probes:
+            circuit.probes += 1
+            circuit.probe_since = now
+            return BreakerDecision(STATE_HALF_OPEN)
+        return BreakerDecision(
+            STATE_HALF_OPEN, False, policy.open_seconds - (now - circuit.probe_since)
+        )
+
+    async def record(
+        self, key: str, success: bool, policy: BreakerPolicy, now: float
+    ) -> BreakerDecision:
+        circuit = self._circuit(key, policy, now)
+        bucket = math.floor(now / policy.bucket_seconds)
+        oldest = bucket - math.floor(policy.window_seconds / policy.bucket_seconds) + 1
+        counts = circuit.buckets.setdefault(bucket, [0, 0])
+        counts[0] += 1
+        if not success:
+            counts[1] += 1
+        for stale in [b for b in circuit.buckets if b < oldest]:
+            del circuit.buckets[stale]
+        calls = sum(c for c, _ in circuit.buckets.values())
+        failures = sum(f for _, f in circuit.buckets.values())
+
+        if circuit.state == STATE_HALF_OPEN:
+            circuit.probes = max(circuit.probes - 1, 0)
+            if not success:
+                circuit.state = STATE_OPEN
+                circuit.open_until = now + policy.open_seconds
+            else:
+                circuit.successes += 1
+                if circuit.successes >= policy.half_open_probes:
+                    self._circuits[key] = _LocalCircuit(touched=now)
+                    return BreakerDecision(STATE_CLOSED)
+        elif circuit.state == STATE_CLOSED:
+            if calls >= policy.min_calls and failures >= calls * policy.failure_rate:
+                circuit.state = STATE_OPEN
+                circuit.open_until = now + policy.open_seconds
+        retry_after = max(circuit.open_until - now, 0.0) if circuit.state == STATE_OPEN else 0.0
+        return BreakerDecision(circuit.state, True, retry_after, calls, failures)
+
+    async def reset(self, key: str) -> None:
+        self._circuits.pop(key, None)
+
+
+# KEYS[1] state hash. ARGV: now_ms, half_open_probes, open_ms, ttl_ms
+# Returns {allowed, state, retry_after_ms}
+_ALLOW_SCRIPT = """
+local now = tonumber(ARGV[1])
+local probes_max = tonumber(ARGV[2])
+local open_ms = tonumber(ARGV[3])
+local ttl = tonumber(ARGV[4])
+local s = redis.call('HMGET', KEYS[1], 'state', 'open_until', 'probes', 'probe_since')
+local state = s[1] or 'closed'
+if state == 'closed' then
+  return {1, state, 0}
+end
+if state == 'open' then
+  local open_until = tonumber(s[2]) or 0
+  if now < open_until then
+    return {0, state, open_until - now}
+  end
+  state = 'half_open'
+  redis.call('HSET', KEYS[1], 'state', state, 'probes', 0, 'successes', 0, 'probe_since', now)
+  s[3] = 0
+  s[4] = now
+end
+local probes = tonumber(s[3]) or 0
+local probe_since = tonumber(s[4]) or 0
+if probes >= probes_max and now - probe_since >= open_ms then
+  probes = 0
+end
+redis.call('PEXPIRE', KEYS[1], ttl)
+if probes < probes_max then
+  redis.call('HSET', KEYS[1], 'probes', probes + 1, 'probe_since', now)
+  return {1, state, 0}
+end
+return {0, state, open_ms - (now - probe_since)}
+"""
+
+# KEYS[1] state hash, KEYS[2] window hash ("<bucket>:c" / "<bucket>:f" fields)
+# ARGV: now_ms, success, bucket_ms, window_ms, min_calls, failure_rate,
+#       open_ms, half_open_probes, ttl_ms
+# Returns {state, calls, failures, retry_after_ms}
+_RECORD_SCRIPT = """
+local now = tonumber(ARGV[1])
+local ok = ARGV[2] == '1'
+local bucket_ms = tonumber(ARGV[3])
+local window_ms = tonumber(ARGV[4])
+local min_calls = tonumber(ARGV[5])
+local rate = tonumber(ARGV[6])
+local open_ms = tonumber(ARGV[7])
+local probes_max = tonumber(ARGV[8])
+local ttl = tonumber(ARGV[9])
+
+local bucket = math.floor(now / bucket_ms)
+local oldest = bucket - math.floor(window_ms / bucket_ms) + 1
+redis.call('HINCRBY', KEYS[2], bucket .. ':c', 1)
+if not ok then
+  redis.call('HINCRBY', KEYS[2], bucket .. ':f', 1)
+end
+local calls, failures = 0, 0
+local fields = redis.call('HGETALL', KEYS[2])
+for i = 1, #fields, 2 do
+  local name = fields[i]
+  local sep = string.find(name, ':', 1, true)
+  if tonumber(string.sub(name, 1, sep - 1)) < oldest then
+    redis.call('HDEL', KEYS[2], name)
+  elseif string.sub(name, sep + 1) == 'c' then
+    calls = calls + tonumber(fields[i + 1])
+  else
+    failures = failures + tonumber(fields[i + 1])
+  end
+end
+redis.call('PEXPIRE', KEYS[2], ttl)
+
+local s = redis.call('HMGET', KEYS[1], 'state', 'open_until', 'probes', 'successes')
+local state = s[1] or 'closed'
+local open_until = tonumber(s[2]) or 0
+if state == 'half_open' then
+  local probes = math.max((tonumber(s[3]) or 0) - 1, 0)
+  if not ok then
+    state = 'open'
+    open_until = now + open_ms
+    redis.call('HSET', KEYS[1], 'state', state, 'open_until', open_until, 'probes', 0)
+  else
+    local successes = (tonumber(s[4]) or 0) + 1
+    if successes >= probes_max then
+      redis.call('DEL', KEYS[1], KEYS[2])
+      return {'closed', 0, 0, 0}
+    end
+    redis.call('HSET', KEYS[1], 'probes', probes, 'successes', successes)
+  end
+elseif state == 'closed' then
+  if calls >= min_calls and failures >= calls * rate then
+    state = 'open'
+    open_until = now + open_ms
+    redis.call('HSET', KEYS[1], 'state', state, 'open_until', open_until)
+  end
+end
+redis.call('PEXPIRE', KEYS[1], ttl)
+local retry = 0
+if state == 'open' then
+  retry = math.max(open_until - now, 0)
+end
+return {state, calls, failures, retry}
+"""
+
+
+def _text(value: Any) -> str:
+    return value.decode() if isinstance(value, bytes) else str(value)
+
+
+class RedisBreakerStore:
+    """Breaker state shared by all workers through Redis (atomic Lua scripts)."""
+
+    def __init__(self, client: Any, prefix: str = "ultra:circuit"):
+        self.client = client
+        self.prefix = prefix
+        self._allow = client.register_script(_ALLOW_SCRIPT)
+        self._record = client.register_script(_RECORD_SCRIPT)
+
+    def _keys(self, key: str) -> List[str]:
+        return [f"{self.prefix}:{key}", f"{self.prefix}:{key}:window"]
+
+    async def allow(self, key: str, policy: BreakerPolicy, now: float) -> BreakerDecision:
+        allowed, state, retry_ms = await self._allow(
+            keys=self._keys(key)[:1],
+            args=[
+                int(now * 1000),
+                policy.half_open_probes,
+                int(policy.open_seconds * 1000),
+                int(policy.ttl_seconds * 1000),
+            ],
+        )
+        return BreakerDecision(_text(state), bool(int(allowed)), max(int(retry_ms), 0) / 1000)
+
+    async def record(
+        self, key: str, success: bool, policy: BreakerPolicy, now: float
+    ) -> BreakerDecision:
+        state, calls, failures, retry_ms = await self._record(
+            keys=self._keys(key),
+            args=[
+                int(now * 1000),
+                1 if success else 0,
+                int(policy.bucket_seconds * 1000),
+                int(policy.window_seconds * 1000),
+                policy.min_calls,
+                repr(policy.failure_rate),
+                int(policy.open_seconds * 1000),
+                policy.half_open_probes,
+                int(policy.ttl_seconds * 1000),
+            ],
+        )
+        return BreakerDecision(
+            _text(state), True, int(retry_ms) / 1000, int(calls), int(failures)
+        )
+
+    async def reset(self, key: str) -> None:
+        await self.client.delete(*self._keys(key))
+
+
+class CircuitBreakerEngine:
+    """Failure-rate circuit breakers keyed by provider, backed by a store."""
+
+    def __init__(
+        self,
+        store: Optional[Any] = None,
+        policy: Optional[BreakerPolicy] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.store = store if store is not None else InMemoryBreakerStore()
+        self.policy = policy or BreakerPolicy()
+        # Wall-clock time so that every worker agrees on bucket boundaries
+        self.clock = clock
+        self.fallback = InMemoryBreakerStore()
+        self._store_failing = False
+        self._last_state: Dict[str, str] = {}
+        self.stats = {"allowed": 0, "rejected": 0, "store_errors": 0}
+
+    async def allow(self, key: str) -> BreakerDecision:
+        """Decide whether a call to ``key`` may go ahead (claims a probe when half-open)."""
+        decision = await self._call("allow", key, self.policy, self.clock())
+        self.stats["allowed" if decision.allowed else "rejected"] += 1
+        self._observe(key, decision.state)
+        return decision
+
+    async def record(self, key: str, success: bool) -> BreakerDecision:
+        """Record the outcome of a call to ``key``."""
+        decision = await self._call("record", key, success, self.policy, self.clock())
+        self._observe(key, decision.state)
+        return decision
+
+    async def reset(self, key: str) -> None:
+        """Close the circuit for ``key`` and forget its window."""
+        await self.fallback.reset(key)
+        if self.store is not self.fallback:
+            try:
+                await self.store.reset(key)
+            except Exception as e:
+                logger.warning(f"Circuit breaker store reset failed for {key}: {e}")
+        self._last_state.pop(key, None)
+
+    async def _call(self, method: str, *args: Any) -> BreakerDecision:
+        try:
+            decision = await getattr(self.store, method)(*args)
+        except Exception as e:
+            self.stats["store_errors"] += 1
+            if ULTRA_CIRCUIT_BREAKER_STORE_ERRORS:
+                ULTRA_CIRCUIT_BREAKER_STORE_ERRORS.inc()
+            if not self._store_failing:
+                logger.warning(f"Circuit breaker store unavailable, using local state: {e}")
+                self._store_failing = True
+            return await getattr(self.fallback, method)(*args)
+        if self._store_failing:
+            logger.info("Circuit breaker store recovered")
+            self._store_failing = False
+        return decision
+
+    def _observe(self, key: str, state: str) -> None:
+        previous = self._last_state.get(key, STATE_CLOSED)
+        if state == previous:
+            return
+        self._last_state[key] = state
+        if ULTRA_CIRCUIT_BREAKER_TRANSITIONS:
+            ULTRA_CIRCUIT_BREAKER_TRANSITIONS.labels(key=key, state=state).inc()
+        logger.info(f"Circuit breaker for {key}: {previous} -> {state}")
+
+
+def policy_from_config() -> BreakerPolicy:
+    return BreakerPolicy(
+        window_seconds=Config.CIRCUIT_BREAKER_WINDOW_SECONDS,
+        bucket_seconds=Config.CIRCUIT_BREAKER_BUCKET_SECONDS,
+        min_calls=Config.CIRCUIT_BREAKER_MIN_CALLS,
+        failure_rate=Config.CIRCUIT_BREAKER_FAILURE_RATE,
+        open_seconds=Config.CIRCUIT_BREAKER_OPEN_SECONDS,
+        half_open_probes=Config.CIRCUIT_BREAKER_HALF_OPEN_PROBES,
+    )
+
+
+def _store_from_config() -> Any:
+    if Config.CIRCUIT_BREAKER_STORE != "redis":
+        return InMemoryBreakerStore()
+    redis_url = Config.CIRCUIT_BREAKER_REDIS_URL or Config.REDIS_URL
+    try:
+        import redis.asyncio as redis
+
+        client = redis.from_url(redis_url, socket_connect_timeout=1, socket_timeout=1)
+        return RedisBreakerStore(client)
+    except Exception as e:
+        logger.error(f"Failed to initialize Redis circuit breaker store: {e}")
+        return InMemoryBreakerStore()
+
+
+# Global engine so every caller consults the same circuits
+_circuit_breaker_engine: Optional[CircuitBreakerEngine] = None
+
+
+def get_circuit_breaker_engine() -> CircuitBreakerEngine:
+    """Get the process-wide circuit breaker engine."""
+    global _circuit_breaker_engine
+    if _circuit_breaker_engine is None:
+        _circuit_breaker_engine = CircuitBreakerEngine(_store_from_config(), policy_from_config())
+    return _circuit_breaker_engine
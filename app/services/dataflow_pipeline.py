@@ -0,0 +1,319 @@
+"""
+Dataflow (stage-overlapping) execution of the 3-stage Ultra Synthesis™ pipeline.
+
+The default pipeline runs initial_response, peer_review_and_revision and
+ultra_synthesis as strict barriers, so each stage waits for its slowest
+model. In dataflow mode:
+
+- every model's initial request starts at once;
+- when a quorum of initial responses exists, each model that has responded
+  starts its peer review against the peers available at that moment; models
+  that respond later start their review as soon as they arrive;
+- synthesis starts once a quorum of revisions is in, optionally after a
+  short grace period for stragglers;
+- remaining slow-tail requests are either cancelled or allowed to finish
+  alongside synthesis (their output then appears in the stage results but
+  not in the synthesis), depending on configuration.
+
+Each model's initial response and peer review go through the orchestrator's
+public stage methods (``initial_response``, ``peer_review_and_revision``) with
+a one-model list, and synthesis through ``ultra_synthesis``, so prompts, API
+key checks, caching and error handling match the barrier pipeline. Stage outputs keep the same shape as the barrier
+pipeline, so callers and the cache see identical structures.
+"""
+
+import asyncio
+import time
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from app.config import Config
+from app.services.orchestration_service import PipelineResult
+from app.utils.logging import get_logger
+
+logger = get_logger("dataflow_pipeline")
+
+class DataflowPipelineRunner:
+    """Runs the pipeline with per-model stage overlap and quorum gates."""
+
+    def __init__(
+        self,
+        orchestrator: Any,
+        quorum: Optional[int] = None,
+        tail_grace: Optional[float] = None,
+        cancel_slow_tail: Optional[bool] = None,
+    ):
+        self.orchestrator = orchestrator
+        self.quorum = quorum if quorum is not None else Config.PIPELINE_DATAFLOW_QUORUM
+        self.tail_grace = (
+            tail_grace if tail_grace is not None else Config.PIPELINE_DATAFLOW_TAIL_GRACE
+        )
+        self.cancel_slow_tail = (
+            cancel_slow_tail
+            if cancel_slow_tail is not None
+            else Config.PIPELINE_DATAFLOW_CANCEL_SLOW_TAIL
+        )
+
+    async def run(
+        self, input_data: Any, models: List[str], options: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, PipelineResult]:
+        prompt = str(input_data)
+        quorum = max(1, min(self.quorum, len(models)))
+        start = time.monotonic()
+        deadline = start + Config.INITIAL_RESPONSE_TIMEOUT + Config.PEER_REVIEW_TIMEOUT
+
+        initial: Dict[str, str] = {}
+        initial_errors: Dict[str, str] = {}
+        revised: Dict[str, str] = {}
+        revision_ok: List[str] = []
+        latencies: Dict[str, Dict[str, float]] = {m: {} for m in models}
+
+        tasks: Dict[asyncio.Task, Tuple[str, str]] = {}
+        pending: Set[asyncio.Task] = set()
+
+        def launch(stage: str, model: str, responses: Optional[Dict[str, str]] = None) -> None:
+            if stage == "initial":
+                call = partial(self._initial, prompt, model, options)
+            else:
+                call = partial(self._review, prompt, model, responses or {}, options)
+            task = asyncio.create_task(self._timed(call), name=f"{stage}_{model}")
+            tasks[task] = (stage, model)
+            pending.add(task)
+
+        for model in models:
+            launch("initial", model)
+
+        reviews_started = False
+        synthesis_at: Optional[float] = None
+
+        while pending:
+            now = time.monotonic()
+            wake_at = deadline if synthesis_at is None else min(deadline, synthesis_at)
+            if now >= wake_at:
+                break
+            done, _ = await asyncio.wait(
+                pending, timeout=wake_at - now, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                pending.discard(task)
+                stage, model = tasks[task]
+                output, elapsed = self._task_output(task)
+                latencies[model][stage] = elapsed
+
+                if stage == "initial":
+                    if "generated_text" in output:
+                        initial[model] = output["generated_text"]
+                        if reviews_started:
+                            # Late arrival: review against everything available now
+                            launch("review", model, dict(initial))
+                    else:
+                        initial_errors[model] = str(output.get("error", "Unknown error"))
+                else:
+                    if "generated_text" in output:
+                        revised[model] = output["generated_text"]
+                        revision_ok.append(model)
+                    else:
+                        # Same policy as the barrier pipeline: keep the original answer
+                        revised[model] = initial[model]
+
+            initial_pending = sum(1 for t in pending if tasks[t][0] == "initial")
+            if not reviews_started and (
+                len(initial) >= quorum or (initial_pending == 0 and len(initial) >= 2)
+            ):
+                reviews_started = True
+                snapshot = dict(initial)
+                for model in snapshot:
+                    launch("review", model, snapshot)
+            elif not reviews_started and initial_pending == 0:
+                # Fewer than two answers: nothing to peer review
+                break
+
+            if synthesis_at is None and reviews_started:
+                reachable = len(initial) + initial_pending
+                if len(revised) >= min(quorum, reachable):
+                    synthesis_at = time.monotonic() + self.tail_grace
+
+        tail = [t for t in pending if not t.done()]
+        if tail and self.cancel_slow_tail:
+            for task in tail:
+                task.cancel()
+            await asyncio.gather(*tail, return_exceptions=True)
+        cancelled = [f"{tasks[t][0]}:{tasks[t][1]}" for t in tail if self.cancel_slow_tail]
+
+        initial_output = self._initial_output(prompt, models, initial)
+        peer_output = self._peer_output(initial_output, initial, revised, revision_ok)
+        overlap_elapsed = time.monotonic() - start
+
+        synthesis_task = asyncio.create_task(
+            self._synthesize(peer_output, initial, revision_ok, models, options)
+        )
+        if tail and not self.cancel_slow_tail:
+            # Let stragglers finish alongside synthesis; they are reported, not synthesised
+            remaining = max(0.0, deadline - time.monotonic())
+            done, still_pending = await asyncio.wait(tail, timeout=remaining)
+            for task in still_pending:
+                task.cancel()
+                cancelled.append(f"{tasks[task][0]}:{tasks[task][1]}")
+            for task in done:
+                stage, model = tasks[task]
+                output, elapsed = self._task_output(task)
+                latencies[model][stage] = elapsed
+                if stage == "initial" and "generated_text" in output:
+                    initial_output["responses"][model] = output["generated_text"]
+                elif stage == "review" and "generated_text" in output:
+                    peer_output["late_revisions"][model] = output["generated_text"]
+        synthesis_result = await synthesis_task
+
+        metrics = {
+            "execution_mode": "dataflow",
+            "quorum": quorum,
+            "overlap_duration_seconds": overlap_elapsed,
+            "model_latency_seconds": latencies,
+            "cancelled": cancelled,
+            "initial_errors": initial_errors,
+        }
+        logger.info(
+            f"🌊 Dataflow pipeline finished initial+review in {overlap_elapsed:.2f}s "
+            f"({len(initial)}/{len(models)} answered, {len(revision_ok)} revised, "
+            f"{len(cancelled)} cancelled)"
+        )
+        return {
+            "initial_response": PipelineResult(
+                stage_name="initial_response",
+                output=initial_output,
+                performance_metrics=metrics,
+                error=None if initial else "No models produced an initial response",
+            ),
+            "peer_review_and_revision": PipelineResult(
+                stage_name="peer_review_and_revision",
+                output=peer_output,
+                performance_metrics=metrics,
+            ),
+            "ultra_synthesis": synthesis_result,
+        }
+
+    async def _timed(
+        self, call: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Tuple[Dict[str, Any], float]:
+        started = time.monotonic()
+        result = await call()
+        return result, time.monotonic() - started
+
+    async def _initial(
+        self, prompt: str, model: str, options: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """One model's initial response through the orchestrator's stage method."""
+        output = await self.orchestrator.initial_response(prompt, [model], options)
+        text = (output.get("responses") or {}).get(model)
+        if text is not None:
+            return {"generated_text": text}
+        error = (output.get("failed_models") or {}).get(model) or output.get("error")
+        return {"error": error or "No response"}
+
+    async def _review(
+        self,
+        prompt: str,
+        model: str,
+        responses: Dict[str, str],
+        options: Optional[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        """One model's peer review against ``responses`` through the stage method."""
+        output = await self.orchestrator.peer_review_and_revision(
+            {"prompt": prompt, "responses": responses, "successful_models": list(responses)},
+            [model],
+            options,
+        )
+        if model in (output.get("models_with_revisions") or []):
+            return {"generated_text": output["revised_responses"][model]}
+        return {"error": output.get("error") or "Revision failed"}
+
+    @staticmethod
+    def _task_output(task: asyncio.Task) -> Tuple[Dict[str, Any], float]:
+        try:
+            return task.result()
+        except asyncio.CancelledError:
+            return {"error": "cancelled"}, 0.0
+        except Exception as e:
+            return {"error": str(e)}, 0.0
+
+    @staticmethod
+    def _initial_output(prompt: str, models: List[str], initial: Dict[str, str]) -> Dict[str, Any]:
+        return {
+            "stage": "initial_response",
+            "responses": dict(initial),
+            "prompt": prompt,
+            "models_attempted": list(models),
+            "successful_models": list(initial.keys()),
+            "response_count": len(initial),
+            "input": prompt,
+        }
+
+    @staticmethod
+    def _peer_output(
+        initial_output: Dict[str, Any],
+        initial: Dict[str, str],
+        revised: Dict[str, str],
+        revision_ok: List[str],
+    ) -> Dict[str, Any]:
+        if len(initial) < 2:
+            return {
+                "stage": "peer_review_and_revision",
+                "skipped": True,
+                "reason": "Insufficient models for peer review",
+                "original_responses": dict(initial),
+                "revised_responses": dict(initial),
+                "models_with_revisions": [],
+                "models_attempted": list(initial.keys()),
+                "successful_models": list(initial.keys()),
+                "revision_count": 0,
+                "late_revisions": {},
+                "input": initial_output,
+            }
+        return {
+            "stage": "peer_review_and_revision",
+            "original_responses": dict(initial),
+            "revised_responses": dict(revised),
+            "models_with_revisions": list(revision_ok),
+            "models_attempted": list(initial.keys()),
+            "successful_models": list(revised.keys()),
+            "revision_count": len(revised),
+            "late_revisions": {},
+            "input": initial_output,
+        }
+
+    async def _synthesize(
+        self,
+        peer_output: Dict[str, Any],
+        initial: Dict[str, str],
+        revision_ok: List[str],
+        models: List[str],
+        options: Optional[Dict[str, Any]],
+    ) -> PipelineResult:
+        # Same preference as the barrier pipeline (models that revised, then the
+        # rest); ultra_synthesis picks among them and falls back on failure
+        candidates = list(dict.fromkeys([*revision_ok, *initial, *models]))
+        started = time.monotonic()
+        output, error = None, None
+        try:
+            output = await asyncio.wait_for(
+                self.orchestrator.ultra_synthesis(peer_output, candidates, options),
+                timeout=Config.ULTRA_SYNTHESIS_TIMEOUT,
+            )
+        except asyncio.TimeoutError:
+            error = f"Ultra synthesis timed out after {Config.ULTRA_SYNTHESIS_TIMEOUT}s"
+        except Exception as e:
+            error = str(e)
+        if isinstance(output, dict):
+            output.setdefault("stage", "ultra_synthesis")
+            output.setdefault("input", peer_output)
+        return PipelineResult(
+            stage_name="ultra_synthesis",
+            output=output,
+            error=error,
+            performance_metrics={
+                "duration_seconds": time.monotonic() - started,
+                "success": error is None,
+                "synthesis_candidates": candidates,
+                "execution_mode": "dataflow",
+            },
+        )
@@ -23,6 +23,13 @@ from typing import Any, Dict, List, Optional, Set, Tuple, Union
 from datetime import datetime, timedelta
 
 from app.config import Config
+from app.services.circuit_breaker_engine import (
+    STATE_HALF_OPEN,
+    STATE_OPEN,
+    BreakerDecision,
+    CircuitBreakerEngine,
+    get_circuit_breaker_engine,
+)
 from app.utils.logging import get_logger, CorrelationContext
 
 logger = get_logger("enhanced_error_handler")
@@ -80,7 +87,10 @@ class CircuitBreakerState:
 class EnhancedErrorHandler:
     """Enhanced error handler with circuit breaker patterns and graceful degradation."""
     
-    def __init__(self):
+    def __init__(self, breaker_engine: Optional[CircuitBreakerEngine] = None):
+        # Open/closed decisions come from the (possibly Redis-shared) breaker
+        # engine; circuit_breakers mirrors them for monitoring
+        self.breaker_engine = breaker_engine or get_circuit_breaker_engine()
         self.circuit_breakers: Dict[str, CircuitBreakerState] = {}
         self.error_history: List[ErrorContext] = []
         self.active_timeouts: Set[str] = set()
@@ -225,35 +235,52 @@ class EnhancedErrorHandler:
     async def should_attempt_provider(self, provider: str) -> Tuple[bool, Optional[str]]:
         """Check if provider should be attempted based on circuit breaker state."""
         circuit_state = self.get_provider_circuit_state(provider)
-        current_time = datetime.utcnow()
-        
-        if circuit_state.state == ProviderState.HEALTHY:
-            return True, None
-            
-        elif circuit_state.state == ProviderState.DEGRADED:
-            # Allow attempts but with degraded expectations
-            return True, f"Provider {provider} in degraded state - may have slower response times"
-            
-        elif circuit_state.state == ProviderState.CIRCUIT_OPEN:
-            # Check if recovery timeout has passed
-            if (circuit_state.next_retry_time and 
-                current_time >= circuit_state.next_retry_time):
-                # Try recovery - move to degraded state
-                circuit_state.state = ProviderState.DEGRADED
-                circuit_state.next_retry_time = None
+        if circuit_state.state == ProviderState.CIRCUIT_CLOSED:
+            return False, f"Provider {provider} permanently disabled due to repeated failures"
+
+        previous_state = circuit_state.state
+        decision = await self.breaker_engine.allow(provider)
+        self._sync_circuit_state(circuit_state, decision)
+
+        if decision.state == STATE_OPEN or not decision.allowed:
+            retry_in = int(decision.retry_after)
+            return False, f"Provider {provider} circuit breaker open - retry in {retry_in}s"
+
+        if decision.state == STATE_HALF_OPEN:
+            if previous_state == ProviderState.CIRCUIT_OPEN:
                 logger.info(
                     f"Circuit breaker recovery attempt for {provider}",
                     extra={"provider": provider, "previous_failures": circuit_state.consecutive_failures}
                 )
-                return True, f"Provider {provider} attempting recovery from circuit breaker"
-            else:
-                # Still in timeout period
-                retry_in = int((circuit_state.next_retry_time - current_time).total_seconds())
-                return False, f"Provider {provider} circuit breaker open - retry in {retry_in}s"
-                
-        else:  # CIRCUIT_CLOSED
-            return False, f"Provider {provider} permanently disabled due to repeated failures"
-    
+            return True, f"Provider {provider} attempting recovery from circuit breaker"
+
+        if circuit_state.state == ProviderState.DEGRADED:
+            # Allow attempts but with degraded expectations
+            return True, f"Provider {provider} in degraded state - may have slower response times"
+        return True, None
+
+    def _sync_circuit_state(self, circuit_state: CircuitBreakerState, decision: BreakerDecision):
+        """Mirror a breaker engine decision into the monitoring state."""
+        if decision.state == STATE_OPEN:
+            circuit_state.state = ProviderState.CIRCUIT_OPEN
+            circuit_state.next_retry_time = datetime.utcnow() + timedelta(seconds=decision.retry_after)
+            return
+        circuit_state.next_retry_time = None
+        if decision.state == STATE_HALF_OPEN:
+            circuit_state.state = ProviderState.DEGRADED
+        elif circuit_state.consecutive_failures >= circuit_state.degraded_threshold:
+            circuit_state.state = ProviderState.DEGRADED
+        else:
+            circuit_state.state = ProviderState.HEALTHY
+
+    async def reset_provider_circuit(self, provider: str):
+        """Close the circuit for a provider and clear its failure counters."""
+        await self.breaker_engine.reset(provider)
+        circuit_state = self.get_provider_circuit_state(provider)
+        circuit_state.state = ProviderState.HEALTHY
+        circuit_state.consecutive_failures = 0
+        circuit_state.next_retry_time = None
+
     async def record_provider_success(self, provider: str, response_time: float):
         """Record successful provider response and update circuit breaker."""
         circuit_state = self.get_provider_circuit_state(provider)
@@ -267,10 +294,11 @@ class EnhancedErrorHandler:
             )
             circuit_state.consecutive_failures = 0
             circuit_state.failure_count = max(0, circuit_state.failure_count - 1)
-            
-        # Return to healthy state if previously degraded
-        if circuit_state.state in [ProviderState.DEGRADED, ProviderState.CIRCUIT_OPEN]:
-            circuit_state.state = ProviderState.HEALTHY
+
+        previous_state = circuit_state.state
+        decision = await self.breaker_engine.record(provider, success=True)
+        self._sync_circuit_state(circuit_state, decision)
+        if previous_state != ProviderState.HEALTHY and circuit_state.state == ProviderState.HEALTHY:
             logger.info(f"Provider {provider} returned to healthy state")
     
     def generate_fallback_response(
@@ -428,26 +456,25 @@ class EnhancedErrorHandler:
     async def _update_circuit_breaker(self, provider: str, error_context: ErrorContext):
         """Update circuit breaker state based on error."""
         circuit_state = self.get_provider_circuit_state(provider)
-        current_time = datetime.utcnow()
         
-        circuit_state.last_failure_time = current_time
+        circuit_state.last_failure_time = datetime.utcnow()
         circuit_state.failure_count += 1
         circuit_state.consecutive_failures += 1
-        
-        # Update state based on failure thresholds
-        if circuit_state.consecutive_failures >= circuit_state.failure_threshold:
-            if circuit_state.state != ProviderState.CIRCUIT_OPEN:
-                circuit_state.state = ProviderState.CIRCUIT_OPEN
-                circuit_state.next_retry_time = current_time + timedelta(seconds=circuit_state.recovery_timeout)
-                logger.warning(
-                    f"Circuit breaker opened for {provider} after {circuit_state.consecutive_failures} failures",
-                    extra={"provider": provider, "next_retry": circuit_state.next_retry_time.isoformat()}
-                )
-        elif circuit_state.consecutive_failures >= circuit_state.degraded_threshold:
-            if circuit_state.state == ProviderState.HEALTHY:
-                circuit_state.state = ProviderState.DEGRADED
-                logger.info(f"Provider {provider} marked as degraded after {circuit_state.consecutive_failures} failures")
-    
+        if circuit_state.state == ProviderState.CIRCUIT_CLOSED:
+            return
+
+        previous_state = circuit_state.state
+        decision = await self.breaker_engine.record(provider, success=False)
+        self._sync_circuit_state(circuit_state, decision)
+        if circuit_state.state == ProviderState.CIRCUIT_OPEN and previous_state != ProviderState.CIRCUIT_OPEN:
+            logger.warning(
+                f"Circuit breaker opened for {provider} at {decision.failure_rate:.0%} failure rate "
+                f"({decision.failures}/{decision.calls} calls)",
+                extra={"provider": provider, "next_retry": circuit_state.next_retry_time.isoformat()}
+            )
+        elif circuit_state.state == ProviderState.DEGRADED and previous_state == ProviderState.HEALTHY:
+            logger.info(f"Provider {provider} marked as degraded after {circuit_state.consecutive_failures} failures")
+
     def _generate_initial_response_fallback(self, prompt: str, context: Dict[str, Any]) -> str:
         """Generate fallback for initial response stage."""
         return f"""I apologize, but I'm currently experiencing technical difficulties connecting to the AI models. 
@@ -0,0 +1,343 @@
+"""
+Background provider health prober.
+
+Probes every configured model on the event loop, on its own jittered
+schedule, and publishes the results as an immutable `HealthSnapshot`.
+Request handlers read the snapshot in O(1) and never wait for a probe.
+
+With a Redis store, workers take a short lease before probing a model, so the
+whole deployment spends one probe per model per interval; workers that lose
+the lease adopt the result the lease holder published.
+"""
+
+import asyncio
+import json
+import random
+import time
+from dataclasses import asdict, dataclass
+from types import MappingProxyType
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Optional, Set
+
+from app.config import Config
+from app.utils.logging import get_logger
+
+logger = get_logger("health_prober")
+
+
+@dataclass(frozen=True)
+class ProbeResult:
+    """Outcome of one probe of one model."""
+
+    model: str
+    healthy: bool
+    checked_at: float  # wall clock, comparable across workers
+    latency_ms: float = 0.0
+    error: Optional[str] = None
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self))
+
+    @classmethod
+    def from_json(cls, raw: Any) -> "ProbeResult":
+        if isinstance(raw, bytes):
+            raw = raw.decode("utf-8")
+        return cls(**json.loads(raw))
+
+
+class HealthSnapshot:
+    """Immutable view of the latest probe result per model."""
+
+    __slots__ = ("results", "healthy_models")
+
+    def __init__(self, results: Mapping[str, ProbeResult]):
+        self.results = MappingProxyType(dict(results))
+        self.healthy_models = frozenset(m for m, r in self.results.items() if r.healthy)
+
+    def is_healthy(self, model: str, max_age: Optional[float] = None, now: Optional[float] = None) -> Optional[bool]:
+        """True/False from the latest probe, or None if never probed or older than `max_age`."""
+        result = self.results.get(model)
+        if result is None:
+            return None
+        if max_age is not None and (now or time.time()) - result.checked_at > max_age:
+            return None
+        return result.healthy
+
+
+class InMemoryProbeStore:
+    """Per-process store: every worker probes on its own."""
+
+    async def claim(self, model: str, ttl: float) -> bool:
+        return True
+
+    async def publish(self, result: ProbeResult, ttl: float) -> None:
+        return None
+
+    async def fetch(self, model: str) -> Optional[ProbeResult]:
+        return None
+
+
+class RedisProbeStore:
+    """Shares the probe budget and probe results across workers through Redis."""
+
+    def __init__(self, client: Any, prefix: str = "ultrai:health"):
+        self.client = client
+        self.prefix = prefix
+
+    async def claim(self, model: str, ttl: float) -> bool:
+        key = f"{self.prefix}:lease:{model}"
+        return bool(await self.client.set(key, "1", nx=True, px=max(1, int(ttl * 1000))))
+
+    async def publish(self, result: ProbeResult, ttl: float) -> None:
+        key = f"{self.prefix}:result:{result.model}"
+        await self.client.set(key, result.to_json(), px=max(1, int(ttl * 1000)))
+
+    async def fetch(self, model: str) -> Optional[ProbeResult]:
+        raw = await self.client.get(f"{self.prefix}:result:{model}")
+        return ProbeResult.from_json(raw) if raw else None
+
+
+class HealthProber:
+    """Runs jittered background probes and publishes a shared snapshot."""
+
+    def __init__(
+        self,
+        probe: Callable[[str, str], Awaitable[bool]],
+        targets: Callable[[], Dict[str, str]],
+        interval: float = 300.0,
+        jitter: float = 0.2,
+        concurrency: int = 2,
+        stale_seconds: float = 900.0,
+        timeout: float = 10.0,
+        store: Optional[Any] = None,
+        clock: Callable[[], float] = time.time,
+        rng: Optional[random.Random] = None,
+    ):
+        """
+        Args:
+            probe: Async callable (model, api_key) -> healthy
+            targets: Callable returning {model: api_key} for the models to probe;
+                re-read every cycle so key changes are picked up
+            interval: Mean seconds between probes of one model
+            jitter: Fraction of `interval` each schedule is randomly moved by
+            concurrency: Probes allowed in flight at once
+            stale_seconds: Age after which a result no longer counts
+            timeout: Seconds before a probe counts as failed
+            store: InMemoryProbeStore or RedisProbeStore
+        """
+        self.probe = probe
+        self.targets = targets
+        self.interval = interval
+        self.jitter = jitter
+        self.stale_seconds = stale_seconds
+        self.timeout = timeout
+        self.store = store or InMemoryProbeStore()
+        self.clock = clock
+        self.rng = rng or random.Random()
+        self.stats = {"probes": 0, "failures": 0, "shared": 0, "store_errors": 0}
+        # Bumped on every new snapshot, so readers can tell fresh results from stale ones
+        self.version = 0
+        self._snapshot = HealthSnapshot({})
+        self._listeners: List[Callable[[HealthSnapshot], None]] = []
+        self._due: Dict[str, float] = {}
+        self._requested: Set[str] = set()
+        self._semaphore = asyncio.Semaphore(max(1, concurrency))
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def snapshot(self) -> HealthSnapshot:
+        """Latest published results; replaced atomically, never mutated."""
+        return self._snapshot
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def is_healthy(self, model: str) -> Optional[bool]:
+        """O(1) health lookup; None when the model has no fresh probe result."""
+        return self._snapshot.is_healthy(model, self.stale_seconds, self.clock())
+
+    def add_listener(self, callback: Callable[[HealthSnapshot], None]) -> None:
+        """Call `callback(snapshot)` whenever the set of healthy models changes."""
+        self._listeners.append(callback)
+
+    def request_probe(self, model: str) -> None:
+        """Ask for `model` to be probed on the next cycle instead of at its scheduled time."""
+        self._requested.add(model)
+        if self._wake is not None:
+            self._wake.set()
+
+    def start(self) -> None:
+        """Start the background probe loop on the running event loop."""
+        if self.running:
+            return
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="health-prober")
+        logger.info(
+            f"Health prober started (interval {self.interval:.0f}s, jitter {self.jitter:.0%})"
+        )
+
+    async def stop(self) -> None:
+        """Stop the probe loop."""
+        task, self._task = self._task, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    async def run_due(self) -> int:
+        """Probe every model that is due now. Returns the number of models handled."""
+        now = self.clock()
+        targets = self.targets()
+        self._schedule(targets, now)
+        due = [m for m, at in self._due.items() if at <= now or m in self._requested]
+        self._requested.difference_update(due)
+        if due:
+            await asyncio.gather(*(self._probe_one(m, targets[m]) for m in due))
+            for model in due:
+                self._due[model] = now + self._next_delay()
+        return len(due)
+
+    def _schedule(self, targets: Dict[str, str], now: float) -> None:
+        """Add new targets with a random first probe time; forget removed ones."""
+        for model in targets:
+            if model not in self._due:
+                # Spread the first round so a restart does not probe everything at once
+                self._due[model] = now + self.rng.uniform(0, self.interval * self.jitter)
+        removed = [m for m in self._due if m not in targets]
+        for model in removed:
+            del self._due[model]
+        self._requested.intersection_update(targets)
+        if removed:
+            results = {m: r for m, r in self._snapshot.results.items() if m in targets}
+            self._swap(HealthSnapshot(results))
+
+    def _next_delay(self) -> float:
+        return self.interval * (1 + self.rng.uniform(-self.jitter, self.jitter))
+
+    async def _probe_one(self, model: str, api_key: str) -> None:
+        async with self._semaphore:
+            lease = self.interval * (1 - self.jitter)
+            try:
+                claimed = await self.store.claim(model, lease)
+            except Exception as e:
+                self.stats["store_errors"] += 1
+                logger.debug(f"Health probe store unavailable, probing locally: {e}")
+                claimed = True
+
+            if not claimed:
+                # Another worker owns this probe; adopt its latest result
+                try:
+                    shared = await self.store.fetch(model)
+                except Exception:
+                    self.stats["store_errors"] += 1
+                    shared = None
+                if shared is not None:
+                    self.stats["shared"] += 1
+                    self._publish(shared)
+                return
+
+            started = time.perf_counter()
+            error = None
+            try:
+                healthy = bool(await asyncio.wait_for(self.probe(model, api_key), self.timeout))
+            except Exception as e:
+                healthy, error = False, str(e) or type(e).__name__
+            self.stats["probes"] += 1
+            if not healthy:
+                self.stats["failures"] += 1
+
+            result = ProbeResult(
+                model=model,
+                healthy=healthy,
+                checked_at=self.clock(),
+                latency_ms=round((time.perf_counter() - started) * 1000, 1),
+                error=error,
+            )
+            self._publish(result)
+            try:
+                await self.store.publish(result, self.stale_seconds)
+            except Exception:
+                self.stats["store_errors"] += 1
+
+    def _publish(self, result: ProbeResult) -> None:
+        previous = self._snapshot.results.get(result.model)
+        if previous is not None and previous.checked_at > result.checked_at:
+            return
+        if previous is None or previous.healthy != result.healthy:
+            state = "healthy" if result.healthy else f"unhealthy ({result.error or 'probe failed'})"
+            logger.info(f"Health probe: {result.model} is {state}")
+        # Copy-on-write so readers always see a complete snapshot
+        results = dict(self._snapshot.results)
+        results[result.model] = result
+        self._swap(HealthSnapshot(results))
+
+    def _swap(self, snapshot: HealthSnapshot) -> None:
+        previous, self._snapshot = self._snapshot, snapshot
+        self.version += 1
+        if previous.healthy_models == snapshot.healthy_models and set(previous.results) == set(snapshot.results):
+            return
+        for callback in self._listeners:
+            try:
+                callback(snapshot)
+            except Exception as e:
+                logger.warning(f"Health snapshot listener failed: {e}")
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_due()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Health probe cycle failed: {e}")
+            now = self.clock()
+            wait = min(self._due.values(), default=now + self.interval) - now
+            # Sleep until the next model is due or a probe is requested. A timer
+            # on the wake event (rather than wait_for) keeps stop()'s cancel from
+            # being swallowed when both fire together.
+            self._wake.clear()
+            timer = asyncio.get_running_loop().call_later(max(0.05, wait), self._wake.set)
+            try:
+                await self._wake.wait()
+            finally:
+                timer.cancel()
+
+
+def _store_from_config() -> Any:
+    if Config.HEALTH_PROBE_STORE != "redis":
+        return InMemoryProbeStore()
+    redis_url = Config.HEALTH_PROBE_REDIS_URL or Config.REDIS_URL
+    try:
+        import redis.asyncio as redis
+
+        client = redis.from_url(redis_url, socket_connect_timeout=1, socket_timeout=1)
+        return RedisProbeStore(client)
+    except Exception as e:
+        logger.error(f"Failed to initialize Redis health probe store: {e}")
+        return InMemoryProbeStore()
+
+
+# Global prober so every request reads the same snapshot
+_health_prober: Optional[HealthProber] = None
+
+
+def get_health_prober() -> HealthProber:
+    """Get the process-wide health prober."""
+    global _health_prober
+    if _health_prober is None:
+        from app.services.model_health_cache import configured_models, model_health_cache
+
+        _health_prober = HealthProber(
+            probe=model_health_cache._do_probe,
+            targets=configured_models,
+            interval=Config.HEALTH_PROBE_INTERVAL_SECONDS,
+            jitter=Config.HEALTH_PROBE_JITTER,
+            concurrency=Config.HEALTH_PROBE_CONCURRENCY,
+            stale_seconds=Config.HEALTH_PROBE_STALE_SECONDS,
+            store=_store_from_config(),
+        )
+    return _health_prober
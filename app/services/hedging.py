@@ -0,0 +1,264 @@
+"""
+Hedged requests for slow providers.
+
+If a model has not answered by its rolling p95 latency, one backup request
+is sent, either to an alternative model/provider or as a duplicate of the
+same model. Whichever succeeds first wins and the other request is
+cancelled. If the primary fails early, the backup is sent immediately as a
+speculative fallback.
+
+Hedges are limited by a budget: within a sliding window, hedges may not
+exceed ``ratio`` x primary requests (plus a small burst) or an absolute
+per-minute cap. Tail latency is cut without multiplying provider spend.
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from app.config import Config
+from app.utils.logging import get_logger
+
+try:
+    from prometheus_client import Counter
+
+    ULTRA_HEDGE_REQUESTS = Counter(
+        "ultra_hedge_requests_total", "Hedged (backup) model requests", ["outcome"]
+    )
+except Exception:  # pragma: no cover - metrics are optional
+    ULTRA_HEDGE_REQUESTS = None
+
+logger = get_logger("hedging")
+
+# (model_name, output_dict) - the shape returned by per-model executors
+ModelCall = Callable[[str], Awaitable[Tuple[str, Dict[str, Any]]]]
+
+
+def _succeeded(output: Any) -> bool:
+    return isinstance(output, dict) and "generated_text" in output and "error" not in output
+
+
+class LatencyTracker:
+    """Rolling per-model latency window with percentile lookups."""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.window = window
+        self.min_samples = min_samples
+        self._samples: Dict[str, Deque[float]] = {}
+
+    def record(self, model: str, seconds: float) -> None:
+        samples = self._samples.get(model)
+        if samples is None:
+            samples = self._samples[model] = deque(maxlen=self.window)
+        samples.append(seconds)
+
+    def percentile(self, model: str, pct: float = 95.0) -> Optional[float]:
+        """Latency percentile, or None until ``min_samples`` have been seen."""
+        samples = self._samples.get(model)
+        if not samples or len(samples) < self.min_samples:
+            return None
+        # Linear interpolation between closest ranks; the window is a few hundred floats
+        ordered = sorted(samples)
+        rank = (len(ordered) - 1) * pct / 100.0
+        lo = int(rank)
+        hi = min(lo + 1, len(ordered) - 1)
+        return float(ordered[lo] + (ordered[hi] - ordered[lo]) * (rank - lo))
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        return {
+            model: {"samples": len(s), "p95": self.percentile(model) or 0.0}
+            for model, s in self._samples.items()
+        }
+
+
+class HedgeBudget:
+    """Sliding-window budget: hedges <= ratio * primaries + burst, and <= max_per_minute."""
+
+    def __init__(
+        self,
+        ratio: float = 0.1,
+        burst: int = 2,
+        max_per_minute: int = 30,
+        window_seconds: float = 60.0,
+    ):
+        self.ratio = ratio
+        self.burst = burst
+        self.max_per_minute = max_per_minute
+        self.window_seconds = window_seconds
+        self._primaries: Deque[float] = deque()
+        self._hedges: Deque[float] = deque()
+
+    def _trim(self, now: float) -> None:
+        cutoff = now - self.window_seconds
+        while self._primaries and self._primaries[0] < cutoff:
+            self._primaries.popleft()
+        while self._hedges and self._hedges[0] < cutoff:
+            self._hedges.popleft()
+
+    def record_primary(self) -> None:
+        self._primaries.append(time.monotonic())
+
+    def try_acquire(self) -> bool:
+        now = time.monotonic()
+        self._trim(now)
+        allowed = min(
+            self.ratio * len(self._primaries) + self.burst,
+            self.max_per_minute * self.window_seconds / 60.0,
+        )
+        if len(self._hedges) >= allowed:
+            return False
+        self._hedges.append(now)
+        return True
+
+    def snapshot(self) -> Dict[str, int]:
+        self._trim(time.monotonic())
+        return {"primaries": len(self._primaries), "hedges": len(self._hedges)}
+
+
+class HedgedRequestManager:
+    """Runs a model call with at most one budgeted backup request."""
+
+    def __init__(
+        self,
+        tracker: Optional[LatencyTracker] = None,
+        budget: Optional[HedgeBudget] = None,
+        percentile: float = 95.0,
+        min_delay: float = 0.5,
+    ):
+        self.tracker = tracker or LatencyTracker(
+            window=Config.HEDGE_LATENCY_WINDOW, min_samples=Config.HEDGE_MIN_SAMPLES
+        )
+        self.budget = budget or HedgeBudget(
+            ratio=Config.HEDGE_BUDGET_RATIO,
+            burst=Config.HEDGE_BUDGET_BURST,
+            max_per_minute=Config.HEDGE_MAX_PER_MINUTE,
+        )
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.stats = {"hedges_fired": 0, "hedge_wins": 0, "budget_denied": 0}
+
+    def hedge_delay(self, model: str) -> Optional[float]:
+        p = self.tracker.percentile(model, self.percentile)
+        return None if p is None else max(self.min_delay, p)
+
+    async def run(
+        self, model: str, call: ModelCall, alternatives: List[str]
+    ) -> Tuple[str, Dict[str, Any]]:
+        """Call ``model``; hedge to ``alternatives[0]`` when it is slow or fails.
+
+        Returns ``(answering_model, output)``: when a backup on another model
+        wins, results are keyed by that model so its output is never labelled
+        as the requested one, and ``output["hedged_for"]`` names the request.
+        """
+        self.budget.record_primary()
+        started = time.monotonic()
+        primary = asyncio.create_task(call(model))
+        spawned = [primary]
+        delay = self.hedge_delay(model)
+        backup_model = alternatives[0] if alternatives else None
+
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+            if done:
+                output = self._output(primary)
+                if _succeeded(output):
+                    self.tracker.record(model, time.monotonic() - started)
+                    return model, output
+                # Primary failed fast - speculative fallback if budget allows
+                if backup_model is None or not self._acquire():
+                    return model, output
+                return await self._run_backup_only(model, backup_model, call, output)
+
+            if backup_model is None or not self._acquire():
+                await asyncio.wait({primary})
+                output = self._output(primary)
+                if _succeeded(output):
+                    self.tracker.record(model, time.monotonic() - started)
+                return model, output
+
+            logger.info(f"⏩ Hedging {model} after {delay:.2f}s with {backup_model}")
+            backup_started = time.monotonic()
+            backup = asyncio.create_task(call(backup_model))
+            spawned.append(backup)
+            racing = {primary: model, backup: backup_model}
+            first_failure: Optional[Dict[str, Any]] = None
+            while racing:
+                done, _ = await asyncio.wait(racing, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    served_by = racing.pop(task)
+                    output = self._output(task)
+                    if _succeeded(output):
+                        if task is primary:
+                            self.tracker.record(model, time.monotonic() - started)
+                            return model, output
+                        self.tracker.record(served_by, time.monotonic() - backup_started)
+                        return served_by, self._mark_backup_win(model, served_by, output)
+                    first_failure = first_failure or output
+            return model, first_failure or {"error": "Hedged requests failed"}
+        finally:
+            # Cancel the losing request (or everything, if we were cancelled)
+            for task in spawned:
+                if not task.done():
+                    task.cancel()
+
+    async def _run_backup_only(
+        self, model: str, backup_model: str, call: ModelCall, primary_output: Dict[str, Any]
+    ) -> Tuple[str, Dict[str, Any]]:
+        logger.info(f"⏩ {model} failed fast; speculative fallback to {backup_model}")
+        backup_started = time.monotonic()
+        try:
+            _, output = await call(backup_model)
+        except Exception as e:
+            output = {"error": str(e)}
+        if _succeeded(output):
+            self.tracker.record(backup_model, time.monotonic() - backup_started)
+            return backup_model, self._mark_backup_win(model, backup_model, output)
+        return model, primary_output
+
+    @staticmethod
+    def _output(task: asyncio.Task) -> Dict[str, Any]:
+        try:
+            return task.result()[1]
+        except Exception as e:
+            return {"error": str(e)}
+
+    def _acquire(self) -> bool:
+        if self.budget.try_acquire():
+            self.stats["hedges_fired"] += 1
+            if ULTRA_HEDGE_REQUESTS:
+                ULTRA_HEDGE_REQUESTS.labels(outcome="fired").inc()
+            return True
+        self.stats["budget_denied"] += 1
+        if ULTRA_HEDGE_REQUESTS:
+            ULTRA_HEDGE_REQUESTS.labels(outcome="budget_denied").inc()
+        return False
+
+    def _mark_backup_win(
+        self, model: str, served_by: str, output: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        self.stats["hedge_wins"] += 1
+        if ULTRA_HEDGE_REQUESTS:
+            ULTRA_HEDGE_REQUESTS.labels(outcome="won").inc()
+        return {**output, "served_by": served_by, "hedged_for": model, "hedged": True}
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "budget": self.budget.snapshot(),
+            "latency": self.tracker.snapshot(),
+        }
+
+
+# Global hedge manager so latency history is shared across orchestrator instances
+_hedge_manager: Optional[HedgedRequestManager] = None
+
+
+def get_hedge_manager() -> Optional[HedgedRequestManager]:
+    """Get the shared hedge manager, or None if ENABLE_HEDGED_REQUESTS is off."""
+    global _hedge_manager
+    if not Config.ENABLE_HEDGED_REQUESTS:
+        return None
+    if _hedge_manager is None:
+        _hedge_manager = HedgedRequestManager(percentile=Config.HEDGE_PERCENTILE)
+    return _hedge_manager
@@ -7,8 +7,16 @@ requests and robust network timeouts.
 """
 
 import httpx
+import json
 import logging
-from typing import Dict, Any
+from typing import AsyncGenerator, Dict, Any, List, Optional, Tuple
+from app.config import Config
+from app.services.provider_quota import (
+    QuotaExhausted,
+    QuotaReservation,
+    estimate_tokens,
+    get_quota_manager,
+)
 from app.utils.logging import CorrelationContext
 
 
@@ -43,11 +51,41 @@ except Exception:
     pass
 
 
+async def iter_sse_data(response: httpx.Response) -> AsyncGenerator[str, None]:
+    """Yield the `data` payload of each Server-Sent Event in a streamed response."""
+    data_lines: List[str] = []
+    async for line in response.aiter_lines():
+        if not line:
+            # Blank line terminates an event
+            if data_lines:
+                yield "\n".join(data_lines)
+                data_lines = []
+            continue
+        if line.startswith(":"):
+            continue  # comment / keep-alive
+        field, _, value = line.partition(":")
+        if field == "data":
+            data_lines.append(value[1:] if value.startswith(" ") else value)
+    if data_lines:
+        yield "\n".join(data_lines)
+
+
+def _usage_tokens(data: Any, usage_key: str, *fields: str) -> Optional[int]:
+    """Total tokens reported in a response body's usage block, if any."""
+    usage = data.get(usage_key) if isinstance(data, dict) else None
+    if not isinstance(usage, dict):
+        return None
+    counts = [usage[f] for f in fields if isinstance(usage.get(f), (int, float))]
+    return int(sum(counts)) if counts else None
+
+
 class BaseAdapter:
     """A simplified base adapter for all LLM providers."""
 
     # Class-level client so wrappers can override per-adapter class
     CLIENT = CLIENT
+    # Provider name used for quota tracking
+    PROVIDER = "unknown"
 
     def __init__(self, api_key: str, model: str):
         if not api_key:
@@ -67,14 +105,80 @@ class BaseAdapter:
         # Expectation: 'ver***ers'
         return f"{api_key[:3]}***{api_key[-3:]}"
 
+    def _reserve_quota(
+        self, prompt: str
+    ) -> Tuple[Optional[QuotaReservation], Optional[Dict[str, Any]]]:
+        """Reserve provider quota before dispatch.
+
+        Returns ``(reservation, None)``, or ``(None, error_result)`` when the
+        known quota cannot cover the request and it would only come back 429.
+        """
+        if not Config.PROVIDER_QUOTA_ENABLED:
+            return None, None
+        input_tokens, output_tokens = estimate_tokens(
+            prompt, Config.PROVIDER_QUOTA_OUTPUT_TOKENS
+        )
+        try:
+            reservation = get_quota_manager().reserve(
+                self.PROVIDER, self.api_key, self.model, input_tokens, output_tokens
+            )
+        except QuotaExhausted as e:
+            logger.warning(
+                f"Skipping {self.PROVIDER} request for model {self.model}: {e}",
+                extra={"requestId": CorrelationContext.get_correlation_id()},
+            )
+            return None, {
+                "generated_text": f"Error: Rate limit exceeded. Retry in {e.retry_after:.0f}s.",
+                "error_details": {
+                    "error": "QUOTA_EXHAUSTED",
+                    "provider": self.PROVIDER,
+                    "model": self.model,
+                    "bucket": e.bucket,
+                    "retry_after": e.retry_after,
+                    "message": str(e),
+                },
+            }
+        return reservation, None
+
+    def _settle_quota(
+        self,
+        reservation: Optional[QuotaReservation],
+        response: Optional[httpx.Response] = None,
+        used_tokens: Optional[int] = None,
+    ) -> None:
+        """Release a reservation and sync quotas from the response headers."""
+        if reservation is None:
+            return
+        get_quota_manager().settle(
+            reservation,
+            headers=getattr(response, "headers", None),
+            status_code=getattr(response, "status_code", None),
+            used_tokens=used_tokens,
+        )
+
     async def generate(self, prompt: str) -> Dict[str, Any]:
         """Placeholder for the generate method."""
         raise NotImplementedError
 
+    async def stream(self, prompt: str) -> AsyncGenerator[str, None]:
+        """
+        Yield the completion incrementally as text deltas.
+
+        Providers override this with their native streaming wire format. The
+        default falls back to a single chunk carrying the full `generate()`
+        result, so every adapter can be consumed the same way. Errors are
+        reported in-band as a chunk starting with "Error:", mirroring
+        `generate()`.
+        """
+        result = await self.generate(prompt)
+        yield result.get("generated_text", "")
+
 
 class OpenAIAdapter(BaseAdapter):
     """Adapter for OpenAI models using httpx."""
 
+    PROVIDER = "openai"
+
     async def generate(self, prompt: str) -> Dict[str, Any]:
         headers = {
             "Authorization": f"Bearer {self.api_key}",
@@ -84,6 +188,10 @@ class OpenAIAdapter(BaseAdapter):
             "model": self.model,
             "messages": [{"role": "user", "content": prompt}],
         }
+        reservation, rejected = self._reserve_quota(prompt)
+        if rejected:
+            return rejected
+        response, used_tokens = None, None
         try:
             request_id = CorrelationContext.get_correlation_id()
             logger.info(
@@ -97,6 +205,7 @@ class OpenAIAdapter(BaseAdapter):
             )
             response.raise_for_status()
             data = response.json()
+            used_tokens = _usage_tokens(data, "usage", "total_tokens")
             return {"generated_text": data["choices"][0]["message"]["content"]}
         except httpx.ReadTimeout:
             logger.warning(
@@ -105,46 +214,7 @@ class OpenAIAdapter(BaseAdapter):
             )
             return {"generated_text": "Error: OpenAI request timed out."}
         except httpx.HTTPStatusError as e:
-            if e.response.status_code == 401:
-                masked_key = self._mask_api_key(self.api_key)
-                logger.error(
-                    f"OpenAI API authentication failed for model {self.model}: Invalid API key ({masked_key})",
-                    extra={"requestId": CorrelationContext.get_correlation_id()},
-                )
-                return {
-                    "generated_text": "Error: OpenAI API authentication failed. Check API key."
-                }
-            elif e.response.status_code == 404:
-                logger.error(
-                    f"OpenAI API 404 for model {self.model}: Model not found",
-                    extra={"requestId": CorrelationContext.get_correlation_id()},
-                )
-                return {
-                    "generated_text": f"Error: Model {self.model} not found in OpenAI API"
-                }
-            elif e.response.status_code == 429:
-                logger.warning(
-                    f"OpenAI API rate-limited for model {self.model}. Returning standard retry message.",
-                    extra={"requestId": CorrelationContext.get_correlation_id()},
-                )
-                # Tests expect standardized text containing 'Rate limit exceeded' and guidance
-                return {
-                    "generated_text": "Error: Rate limit exceeded. Please try again later.",
-                    "error_details": {
-                        "error": "RATE_LIMITED",
-                        "provider": "openai",
-                        "model": self.model,
-                        "message": "OpenAI API rate limit reached. Consider using a different provider or waiting before retrying."
-                    }
-                }
-            else:
-                logger.error(
-                    f"OpenAI API HTTP error for model {self.model}: {e.response.status_code} - {e}",
-                    extra={"requestId": CorrelationContext.get_correlation_id()},
-                )
-                return {
-                    "generated_text": f"Error: OpenAI API HTTP {e.response.status_code}: {e}"
-                }
+            return self._http_error_result(e)
         except Exception as e:
             logger.error(
                 f"OpenAI API error for model {self.model}: {e}",
@@ -153,11 +223,113 @@ class OpenAIAdapter(BaseAdapter):
             return {
                 "generated_text": f"Error: An issue occurred with the OpenAI API: {e}"
             }
+        finally:
+            self._settle_quota(reservation, response, used_tokens)
+
+    async def stream(self, prompt: str) -> AsyncGenerator[str, None]:
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+        }
+        payload = {
+            "model": self.model,
+            "messages": [{"role": "user", "content": prompt}],
+            "stream": True,
+        }
+        reservation, rejected = self._reserve_quota(prompt)
+        if rejected:
+            yield rejected["generated_text"]
+            return
+        response = None
+        try:
+            logger.info(
+                "OpenAI stream request",
+                extra={
+                    "requestId": CorrelationContext.get_correlation_id(),
+                    "model": self.model,
+                },
+            )
+            async with self.__class__.CLIENT.stream(
+                "POST",
+                "https://api.openai.com/v1/chat/completions",
+                headers=headers,
+                json=payload,
+            ) as response:
+                response.raise_for_status()
+                async for data in iter_sse_data(response):
+                    if data == "[DONE]":
+                        break
+                    choices = json.loads(data).get("choices") or []
+                    if choices:
+                        text = (choices[0].get("delta") or {}).get("content")
+                        if text:
+                            yield text
+        except httpx.ReadTimeout:
+            logger.warning(
+                f"OpenAI stream timed out for model {self.model}.",
+                extra={"requestId": CorrelationContext.get_correlation_id()},
+            )
+            yield "Error: OpenAI request timed out."
+        except httpx.HTTPStatusError as e:
+            yield self._http_error_result(e)["generated_text"]
+        except Exception as e:
+            logger.error(
+                f"OpenAI API stream error for model {self.model}: {e}",
+                extra={"requestId": CorrelationContext.get_correlation_id()},
+            )
+            yield f"Error: An issue occurred with the OpenAI API: {e}"
+        finally:
+            self._settle_quota(reservation, response)
+
+    def _http_error_result(self, e: httpx.HTTPStatusError) -> Dict[str, Any]:
+        """Map a provider HTTP error to the standard error payload."""
+        if e.response.status_code == 401:
+            masked_key = self._mask_api_key(self.api_key)
+            logger.error(
+                f"OpenAI API authentication failed for model {self.model}: Invalid API key ({masked_key})",
+                extra={"requestId": CorrelationContext.get_correlation_id()},
+            )
+            return {
+                "generated_text": "Error: OpenAI API authentication failed. Check API key."
+            }
+        elif e.response.status_code == 404:
+            logger.error(
+                f"OpenAI API 404 for model {self.model}: Model not found",
+                extra={"requestId": CorrelationContext.get_correlation_id()},
+            )
+            return {
+                "generated_text": f"Error: Model {self.model} not found in OpenAI API"
+            }
+        elif e.response.status_code == 429:
+            logger.warning(
+                f"OpenAI API rate-limited for model {self.model}. Returning standard retry message.",
+                extra={"requestId": CorrelationContext.get_correlation_id()},
+            )
+            # Tests expect standardized text containing 'Rate limit exceeded' and guidance
+            return {
+                "generated_text": "Error: Rate limit exceeded. Please try again later.",
+                "error_details": {
+                    "error": "RATE_LIMITED",
+                    "provider": "openai",
+                    "model": self.model,
+                    "message": "OpenAI API rate limit reached. Consider using a different provider or waiting before retrying."
+                }
+            }
+        else:
+            logger.error(
+                f"OpenAI API HTTP error for model {self.model}: {e.response.status_code} - {e}",
+                extra={"requestId": CorrelationContext.get_correlation_id()},
+            )
+            return {
+                "generated_text": f"Error: OpenAI API HTTP {e.response.status_code}: {e}"
+            }
 
 
 class AnthropicAdapter(BaseAdapter):
     """Adapter for Anthropic models using httpx."""
 
+    PROVIDER = "anthropic"
+
     async def generate(self, prompt: str) -> Dict[str, Any]:
         headers = {
             "x-api-key": self.api_key,
@@ -169,6 +341,10 @@ class AnthropicAdapter(BaseAdapter):
             "max_tokens": 4096,
             "messages": [{"role": "user", "content": prompt}],
         }
+        reservation, rejected = self._reserve_quota(prompt)
+        if rejected:
+            return rejected
+        response, used_tokens = None, None
         try:
             logger.info(
                 "Anthropic request",
@@ -182,6 +358,7 @@ class AnthropicAdapter(BaseAdapter):
             )
             response.raise_for_status()
             data = response.json()
+            used_tokens = _usage_tokens(data, "usage", "input_tokens", "output_tokens")
             # Some stubs return {'content': [{'text': '...'}]} or {'content': [{'type':'text','text':'...'}]}
             content = data.get("content")
             if isinstance(content, list) and content:
@@ -196,44 +373,7 @@ class AnthropicAdapter(BaseAdapter):
             )
             return {"generated_text": "Error: Anthropic request timed out."}
         except httpx.HTTPStatusError as e:
-            if e.response.status_code == 401:
-                logger.error(
-                    f"Anthropic API authentication failed for model {self.model}: Invalid API key",
-                    extra={"requestId": CorrelationContext.get_correlation_id()},
-                )
-                return {
-                    "generated_text": "Error: Anthropic API authentication failed. Check API key."
-                }
-            elif e.response.status_code == 429:
-                logger.warning(
-                    f"Anthropic API rate-limited for model {self.model}. Returning standard retry message.",
-                    extra={"requestId": CorrelationContext.get_correlation_id()},
-                )
-                return {
-                    "generated_text": "Error: Rate limit exceeded",
-                    "error_details": {
-                        "error": "RATE_LIMITED",
-                        "provider": "anthropic",
-                        "model": self.model,
-                        "message": "Anthropic API rate limit reached. Consider using a different provider or waiting before retrying."
-                    }
-                }
-            elif e.response.status_code == 404:
-                logger.error(
-                    f"Anthropic API 404 for model {self.model}: Model not found or invalid endpoint",
-                    extra={"requestId": CorrelationContext.get_correlation_id()},
-                )
-                return {
-                    "generated_text": f"Error: Model {self.model} not found in Anthropic API"
-                }
-            else:
-                logger.error(
-                    f"Anthropic API HTTP error for model {self.model}: {e.response.status_code} - {e}",
-                    extra={"requestId": CorrelationContext.get_correlation_id()},
-                )
-                return {
-                    "generated_text": f"Error: Anthropic API HTTP {e.response.status_code}: {e}"
-                }
+            return self._http_error_result(e)
         except Exception as e:
             logger.error(
                 f"Anthropic API error for model {self.model}: {e}",
@@ -242,16 +382,125 @@ class AnthropicAdapter(BaseAdapter):
             return {
                 "generated_text": f"Error: An issue occurred with the Anthropic API: {e}"
             }
+        finally:
+            self._settle_quota(reservation, response, used_tokens)
+
+    async def stream(self, prompt: str) -> AsyncGenerator[str, None]:
+        headers = {
+            "x-api-key": self.api_key,
+            "anthropic-version": "2023-06-01",
+            "Content-Type": "application/json",
+        }
+        payload = {
+            "model": self.model,
+            "max_tokens": 4096,
+            "messages": [{"role": "user", "content": prompt}],
+            "stream": True,
+        }
+        reservation, rejected = self._reserve_quota(prompt)
+        if rejected:
+            yield rejected["generated_text"]
+            return
+        response = None
+        try:
+            logger.info(
+                "Anthropic stream request",
+                extra={
+                    "requestId": CorrelationContext.get_correlation_id(),
+                    "model": self.model,
+                },
+            )
+            async with self.__class__.CLIENT.stream(
+                "POST", "https://api.anthropic.com/v1/messages", headers=headers, json=payload
+            ) as response:
+                response.raise_for_status()
+                async for data in iter_sse_data(response):
+                    event = json.loads(data)
+                    event_type = event.get("type")
+                    if event_type == "content_block_delta":
+                        text = (event.get("delta") or {}).get("text")
+                        if text:
+                            yield text
+                    elif event_type == "message_stop":
+                        break
+                    elif event_type == "error":
+                        # Errors can arrive mid-stream (e.g. overloaded_error) with a 200 status
+                        error = event.get("error") or {}
+                        yield f"Error: Anthropic API stream error: {error.get('message', error)}"
+                        break
+        except httpx.ReadTimeout:
+            logger.warning(
+                f"Anthropic stream timed out for model {self.model}.",
+                extra={"requestId": CorrelationContext.get_correlation_id()},
+            )
+            yield "Error: Anthropic request timed out."
+        except httpx.HTTPStatusError as e:
+            yield self._http_error_result(e)["generated_text"]
+        except Exception as e:
+            logger.error(
+                f"Anthropic API stream error for model {self.model}: {e}",
+                extra={"requestId": CorrelationContext.get_correlation_id()},
+            )
+            yield f"Error: An issue occurred with the Anthropic API: {e}"
+        finally:
+            self._settle_quota(reservation, response)
+
+    def _http_error_result(self, e: httpx.HTTPStatusError) -> Dict[str, Any]:
+        """Map a provider HTTP error to the standard error payload."""
+        if e.response.status_code == 401:
+            logger.error(
+                f"Anthropic API authentication failed for model {self.model}: Invalid API key",
+                extra={"requestId": CorrelationContext.get_correlation_id()},
+            )
+            return {
+                "generated_text": "Error: Anthropic API authentication failed. Check API key."
+            }
+        elif e.response.status_code == 429:
+            logger.warning(
+                f"Anthropic API rate-limited for model {self.model}. Returning standard retry message.",
+                extra={"requestId": CorrelationContext.get_correlation_id()},
+            )
+            return {
+                "generated_text": "Error: Rate limit exceeded",
+                "error_details": {
+                    "error": "RATE_LIMITED",
+                    "provider": "anthropic",
+                    "model": self.model,
+                    "message": "Anthropic API rate limit reached. Consider using a different provider or waiting before retrying."
+                }
+            }
+        elif e.response.status_code == 404:
+            logger.error(
+                f"Anthropic API 404 for model {self.model}: Model not found or invalid endpoint",
+                extra={"requestId": CorrelationContext.get_correlation_id()},
+            )
+            return {
+                "generated_text": f"Error: Model {self.model} not found in Anthropic API"
+            }
+        else:
+            logger.error(
+                f"Anthropic API HTTP error for model {self.model}: {e.response.status_code} - {e}",
+                extra={"requestId": CorrelationContext.get_correlation_id()},
+            )
+            return {
+                "generated_text": f"Error: Anthropic API HTTP {e.response.status_code}: {e}"
+            }
 
 
 class GeminiAdapter(BaseAdapter):
     """Adapter for Google Gemini models using httpx."""
 
+    PROVIDER = "google"
+
     async def generate(self, prompt: str) -> Dict[str, Any]:
         # SECURITY FIX: Move API key from URL to secure header
         url = f"https://generativelanguage.googleapis.com/v1beta/models/{self.model}:generateContent"
         headers = {"Content-Type": "application/json", "x-goog-api-key": self.api_key}
         payload = {"contents": [{"parts": [{"text": prompt}]}]}
+        reservation, rejected = self._reserve_quota(prompt)
+        if rejected:
+            return rejected
+        response, used_tokens = None, None
         try:
             logger.info(
                 "Google Gemini request",
@@ -265,6 +514,7 @@ class GeminiAdapter(BaseAdapter):
             )
             response.raise_for_status()
             data = response.json()
+            used_tokens = _usage_tokens(data, "usageMetadata", "totalTokenCount")
             try:
                 return {
                     "generated_text": data["candidates"][0]["content"]["parts"][0]["text"]
@@ -278,53 +528,7 @@ class GeminiAdapter(BaseAdapter):
             )
             return {"generated_text": "Error: Google Gemini request timed out."}
         except httpx.HTTPStatusError as e:
-            if e.response.status_code == 400:
-                logger.error(
-                    f"Google Gemini API 400 for model {self.model}: Bad request or invalid model",
-                    extra={"requestId": CorrelationContext.get_correlation_id()},
-                )
-                return {
-                    "generated_text": f"Error: Invalid request or model {self.model} not available in Gemini API"
-                }
-            elif e.response.status_code == 401:
-                logger.error(
-                    f"Google Gemini API authentication failed for model {self.model}: Invalid API key",
-                    extra={"requestId": CorrelationContext.get_correlation_id()},
-                )
-                return {
-                    "generated_text": "Error: Google Gemini API authentication failed. Check API key."
-                }
-            elif e.response.status_code == 404:
-                logger.error(
-                    f"Google Gemini API 404 for model {self.model}: Model not found",
-                    extra={"requestId": CorrelationContext.get_correlation_id()},
-                )
-                return {
-                    "generated_text": f"Error: Model {self.model} not found in Google Gemini API"
-                }
-            elif e.response.status_code == 429:
-                logger.warning(
-                    f"Google API rate-limited for model {self.model}. Returning standard retry message.",
-                    extra={"requestId": CorrelationContext.get_correlation_id()},
-                )
-                # Tests expect standardized text
-                return {
-                    "generated_text": "Error: Quota exceeded (rate limit)",
-                    "error_details": {
-                        "error": "RATE_LIMITED",
-                        "provider": "google",
-                        "model": self.model,
-                        "message": "Google API rate limit reached. Consider using a different provider or waiting before retrying."
-                    }
-                }
-            else:
-                logger.error(
-                    f"Google Gemini API HTTP error for model {self.model}: {e.response.status_code} - {e}",
-                    extra={"requestId": CorrelationContext.get_correlation_id()},
-                )
-                return {
-                    "generated_text": f"Error: Google Gemini API HTTP {e.response.status_code}: {e}"
-                }
+            return self._http_error_result(e)
         except Exception as e:
             logger.error(
                 f"Google Gemini API error for model {self.model}: {e}",
@@ -333,6 +537,106 @@ class GeminiAdapter(BaseAdapter):
             return {
                 "generated_text": f"Error: An issue occurred with the Google Gemini API: {e}"
             }
+        finally:
+            self._settle_quota(reservation, response, used_tokens)
+
+    async def stream(self, prompt: str) -> AsyncGenerator[str, None]:
+        # alt=sse switches streamGenerateContent from a JSON array to SSE framing
+        url = f"https://generativelanguage.googleapis.com/v1beta/models/{self.model}:streamGenerateContent"
+        headers = {"Content-Type": "application/json", "x-goog-api-key": self.api_key}
+        payload = {"contents": [{"parts": [{"text": prompt}]}]}
+        reservation, rejected = self._reserve_quota(prompt)
+        if rejected:
+            yield rejected["generated_text"]
+            return
+        response = None
+        try:
+            logger.info(
+                "Google Gemini stream request",
+                extra={
+                    "requestId": CorrelationContext.get_correlation_id(),
+                    "model": self.model,
+                },
+            )
+            async with self.__class__.CLIENT.stream(
+                "POST", url, params={"alt": "sse"}, headers=headers, json=payload
+            ) as response:
+                response.raise_for_status()
+                async for data in iter_sse_data(response):
+                    candidates = json.loads(data).get("candidates") or []
+                    if not candidates:
+                        continue
+                    parts = (candidates[0].get("content") or {}).get("parts") or []
+                    for part in parts:
+                        text = part.get("text")
+                        if text:
+                            yield text
+        except httpx.ReadTimeout:
+            logger.warning(
+                f"Google Gemini stream timed out for model {self.model}.",
+                extra={"requestId": CorrelationContext.get_correlation_id()},
+            )
+            yield "Error: Google Gemini request timed out."
+        except httpx.HTTPStatusError as e:
+            yield self._http_error_result(e)["generated_text"]
+        except Exception as e:
+            logger.error(
+                f"Google Gemini API stream error for model {self.model}: {e}",
+                extra={"requestId": CorrelationContext.get_correlation_id()},
+            )
+            yield f"Error: An issue occurred with the Google Gemini API: {e}"
+        finally:
+            self._settle_quota(reservation, response)
+
+    def _http_error_result(self, e: httpx.HTTPStatusError) -> Dict[str, Any]:
+        """Map a provider HTTP error to the standard error payload."""
+        if e.response.status_code == 400:
+            logger.error(
+                f"Google Gemini API 400 for model {self.model}: Bad request or invalid model",
+                extra={"requestId": CorrelationContext.get_correlation_id()},
+            )
+            return {
+                "generated_text": f"Error: Invalid request or model {self.model} not available in Gemini API"
+            }
+        elif e.response.status_code == 401:
+            logger.error(
+                f"Google Gemini API authentication failed for model {self.model}: Invalid API key",
+                extra={"requestId": CorrelationContext.get_correlation_id()},
+            )
+            return {
+                "generated_text": "Error: Google Gemini API authentication failed. Check API key."
+            }
+        elif e.response.status_code == 404:
+            logger.error(
+                f"Google Gemini API 404 for model {self.model}: Model not found",
+                extra={"requestId": CorrelationContext.get_correlation_id()},
+            )
+            return {
+                "generated_text": f"Error: Model {self.model} not found in Google Gemini API"
+            }
+        elif e.response.status_code == 429:
+            logger.warning(
+                f"Google API rate-limited for model {self.model}. Returning standard retry message.",
+                extra={"requestId": CorrelationContext.get_correlation_id()},
+            )
+            # Tests expect standardized text
+            return {
+                "generated_text": "Error: Quota exceeded (rate limit)",
+                "error_details": {
+                    "error": "RATE_LIMITED",
+                    "provider": "google",
+                    "model": self.model,
+                    "message": "Google API rate limit reached. Consider using a different provider or waiting before retrying."
+                }
+            }
+        else:
+            logger.error(
+                f"Google Gemini API HTTP error for model {self.model}: {e.response.status_code} - {e}",
+                extra={"requestId": CorrelationContext.get_correlation_id()},
+            )
+            return {
+                "generated_text": f"Error: Google Gemini API HTTP {e.response.status_code}: {e}"
+            }
 
 
 class HuggingFaceAdapter(BaseAdapter):
@@ -343,13 +647,8 @@ class HuggingFaceAdapter(BaseAdapter):
         # Hugging Face model ID format: "meta-llama/Llama-2-7b-chat-hf"
         self.model_id = model
 
-    async def generate(self, prompt: str) -> Dict[str, Any]:
-        url = f"https://api-inference.huggingface.co/models/{self.model_id}"
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-        }
-
+    def _build_payload(self, prompt: str) -> Dict[str, Any]:
+        """Build the Inference API payload for this model."""
         # Different payload format for different model types
         if "llama" in self.model_id.lower() or "mistral" in self.model_id.lower():
             # Chat models
@@ -373,6 +672,16 @@ class HuggingFaceAdapter(BaseAdapter):
                     "return_full_text": False,
                 },
             }
+        return payload
+
+    async def generate(self, prompt: str) -> Dict[str, Any]:
+        url = f"https://api-inference.huggingface.co/models/{self.model_id}"
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+        }
+
+        payload = self._build_payload(prompt)
 
         try:
             response = await self.__class__.CLIENT.post(
@@ -396,18 +705,56 @@ class HuggingFaceAdapter(BaseAdapter):
             logger.warning(f"HuggingFace request timed out for model {self.model_id}.")
             return {"generated_text": "Error: HuggingFace request timed out."}
         except httpx.HTTPStatusError as e:
-            if e.response.status_code == 503:
-                logger.warning(
-                    f"HuggingFace model {self.model_id} is loading. Try again in a moment."
-                )
-                return {
-                    "generated_text": "Model is loading on HuggingFace. Please try again in 30 seconds."
-                }
-            else:
-                logger.error(f"HuggingFace API error for model {self.model_id}: {e}")
-                return {"generated_text": f"Error: HuggingFace API error: {e}"}
+            return self._http_error_result(e)
         except Exception as e:
             logger.error(f"HuggingFace API error for model {self.model_id}: {e}")
             return {
                 "generated_text": f"Error: An issue occurred with the HuggingFace API: {e}"
             }
+
+    async def stream(self, prompt: str) -> AsyncGenerator[str, None]:
+        url = f"https://api-inference.huggingface.co/models/{self.model_id}"
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+        }
+        payload = self._build_payload(prompt)
+        payload["stream"] = True
+
+        try:
+            async with self.__class__.CLIENT.stream(
+                "POST", url, headers=headers, json=payload
+            ) as response:
+                response.raise_for_status()
+                async for data in iter_sse_data(response):
+                    event = json.loads(data)
+                    if "error" in event:
+                        yield f"Error: HuggingFace API error: {event['error']}"
+                        break
+                    token = event.get("token") or {}
+                    if token.get("special"):
+                        continue
+                    text = token.get("text")
+                    if text:
+                        yield text
+        except httpx.ReadTimeout:
+            logger.warning(f"HuggingFace stream timed out for model {self.model_id}.")
+            yield "Error: HuggingFace request timed out."
+        except httpx.HTTPStatusError as e:
+            yield self._http_error_result(e)["generated_text"]
+        except Exception as e:
+            logger.error(f"HuggingFace API stream error for model {self.model_id}: {e}")
+            yield f"Error: An issue occurred with the HuggingFace API: {e}"
+
+    def _http_error_result(self, e: httpx.HTTPStatusError) -> Dict[str, Any]:
+        """Map a provider HTTP error to the standard error payload."""
+        if e.response.status_code == 503:
+            logger.warning(
+                f"HuggingFace model {self.model_id} is loading. Try again in a moment."
+            )
+            return {
+                "generated_text": "Model is loading on HuggingFace. Please try again in 30 seconds."
+            }
+        else:
+            logger.error(f"HuggingFace API error for model {self.model_id}: {e}")
+            return {"generated_text": f"Error: HuggingFace API error: {e}"}
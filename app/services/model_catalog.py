@@ -0,0 +1,318 @@
+"""
+Precomputed model catalog.
+
+Everything request-time model selection needs - model -> provider, token
+limits, capabilities and price, provider -> models, and the diversified
+default set - is computed once into an immutable `ModelCatalog`. Handlers read
+the current catalog with plain dict lookups; a new catalog is built and swapped
+in whole when provider health, pricing or configured credentials change, so a
+reader never sees a half-updated view. Health changes are detected from the
+prober's version counter and from the age of the probe results that made a
+model unhealthy, so no listener has to be registered for them to apply.
+"""
+
+import math
+import os
+import re
+import time
+from dataclasses import dataclass, field, replace
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+from app.config import Config
+from app.services.health_prober import HealthSnapshot, get_health_prober
+from app.services.model_health_cache import MODEL_API_KEY_ENV
+from app.utils.logging import get_logger
+
+logger = get_logger("model_catalog")
+
+PROVIDER_API_KEY_ENV: Mapping[str, str] = MappingProxyType(
+    {
+        "openai": "OPENAI_API_KEY",
+        "anthropic": "ANTHROPIC_API_KEY",
+        "google": "GOOGLE_API_KEY",
+        "huggingface": "HUGGINGFACE_API_KEY",
+    }
+)
+
+# Provider order used when picking a diversified default set
+PREFERRED_PROVIDER_ORDER = ("openai", "anthropic", "google", "huggingface", "unknown")
+
+# Security: model names accepted from callers
+ALLOWED_MODEL_PATTERNS = tuple(
+    re.compile(pattern)
+    for pattern in (
+        # OpenAI models
+        r"^gpt-[34](\.[0-9])?(-turbo)?(-instruct)?$",
+        r"^gpt-4o(-mini)?$",
+        r"^o1(-preview|-mini)?$",
+        # Anthropic models
+        r"^claude-3(-5)?-(sonnet|haiku|opus)(-\d{8})?$",
+        # Google models
+        r"^gemini-(1\.5-)?(pro|flash)(-exp)?$",
+        r"^gemini-2\.0-flash-exp$",
+        # HuggingFace models (org/model format)
+        r"^[a-zA-Z0-9_-]+/[a-zA-Z0-9_.-]+$",
+    )
+)
+
+
+def is_allowed_model_name(model: str) -> bool:
+    """Whether `model` matches one of the allowed model name patterns."""
+    return any(pattern.match(model) for pattern in ALLOWED_MODEL_PATTERNS)
+
+
+def provider_for_model(model: str) -> str:
+    """Determine provider from model name."""
+    if model.startswith("gpt") or model.startswith("o1"):
+        return "openai"
+    elif model.startswith("claude"):
+        return "anthropic"
+    elif model.startswith("gemini"):
+        return "google"
+    elif "/" in model:  # HuggingFace format
+        return "huggingface"
+    else:
+        return "unknown"
+
+
+@dataclass(frozen=True)
+class ModelSpec:
+    """Static facts about one model."""
+
+    name: str
+    provider: str
+    max_tokens: int
+    cost_per_1k_tokens: float = 0.0
+    capabilities: Tuple[str, ...] = field(default_factory=tuple)
+
+
+def _spec(name: str, max_tokens: int, cost_per_1k_tokens: float, *capabilities: str) -> ModelSpec:
+    provider = provider_for_model(name)
+    derived = ["chat"]
+    if max_tokens >= 200000:
+        derived.append("long_context")
+    if provider == "huggingface":
+        derived.append("open_weights")
+    return ModelSpec(name, provider, max_tokens, cost_per_1k_tokens, tuple(derived) + capabilities)
+
+
+# Known models, in display order within each provider
+MODEL_SPECS: Tuple[ModelSpec, ...] = (
+    # OpenAI
+    _spec("gpt-4o", 128000, 0.005, "multimodal"),
+    _spec("gpt-4o-mini", 128000, 0.00015, "fast"),
+    _spec("gpt-4-turbo-preview", 128000, 0.01),
+    _spec("gpt-4", 8192, 0.03),
+    _spec("o1-preview", 128000, 0.015, "reasoning"),
+    _spec("o1-mini", 65536, 0.003, "reasoning"),
+    _spec("gpt-3.5-turbo", 16385, 0.0005, "fast"),
+    _spec("gpt-3.5-turbo-16k", 16385, 0.003),
+    # Anthropic
+    _spec("claude-3-5-sonnet-20241022", 200000, 0.003),
+    _spec("claude-3-5-haiku-20241022", 200000, 0.0008, "fast"),
+    _spec("claude-3-opus-20240229", 200000, 0.015),
+    _spec("claude-3-sonnet-20240229", 200000, 0.003),
+    _spec("claude-3-haiku-20240307", 200000, 0.00025, "fast"),
+    _spec("claude-3-sonnet", 200000, 0.003),  # legacy alias
+    # Google
+    _spec("gemini-1.5-pro", 1000000, 0.0035, "multimodal"),
+    _spec("gemini-1.5-pro-latest", 2000000, 0.0035, "multimodal"),
+    _spec("gemini-1.5-flash", 1000000, 0.00035, "fast"),
+    _spec("gemini-1.5-flash-latest", 1000000, 0.00035, "fast"),
+    _spec("gemini-2.0-flash-exp", 1000000, 0.0, "fast", "experimental"),
+    _spec("gemini-pro", 1000000, 0.0035),  # legacy name
+    # HuggingFace
+    _spec("meta-llama/Meta-Llama-3-8B-Instruct", 8192, 0.0),
+    _spec("meta-llama/Meta-Llama-3-70B-Instruct", 8192, 0.0),
+    _spec("mistralai/Mistral-7B-Instruct-v0.1", 32768, 0.0),
+    _spec("mistralai/Mixtral-8x7B-Instruct-v0.1", 32768, 0.0),
+    _spec("google/gemma-7b-it", 8192, 0.0),
+    _spec("microsoft/phi-2", 2048, 0.0),
+)
+
+
+def config_fingerprint() -> Tuple:
+    """The configuration a catalog depends on: minimum model count and which provider keys are set."""
+    return (Config.MINIMUM_MODELS_REQUIRED,) + tuple(
+        bool(os.environ.get(var)) for var in PROVIDER_API_KEY_ENV.values()
+    )
+
+
+def diversify(models: List[str], minimum: int, limit: int = 3) -> List[str]:
+    """Reorder `models` so the first picks cover distinct providers in preferred order."""
+    if len(models) < limit:
+        return list(models)
+    by_provider: Dict[str, List[str]] = {}
+    for model in models:
+        by_provider.setdefault(provider_for_model(model), []).append(model)
+
+    diversified: List[str] = []
+    # First pass: pick at most one per provider in preferred order
+    for provider in PREFERRED_PROVIDER_ORDER:
+        if by_provider.get(provider):
+            diversified.append(by_provider[provider][0])
+            if len(diversified) >= minimum:
+                break
+    # Second pass: fill remaining up to `limit` preserving original order
+    for model in models:
+        if len(diversified) >= limit:
+            break
+        if model not in diversified:
+            diversified.append(model)
+    return diversified + [m for m in models if m not in diversified]
+
+
+class ModelCatalog:
+    """Immutable, precomputed view of the models this process can use."""
+
+    __slots__ = (
+        "version",
+        "built_at",
+        "fingerprint",
+        "specs",
+        "providers",
+        "models_by_provider",
+        "configured_providers",
+        "listing",
+        "allowed_names",
+        "unhealthy",
+        "defaults",
+        "health_version",
+        "health_expires_at",
+    )
+
+    def __init__(
+        self,
+        version: int,
+        fingerprint: Tuple,
+        specs: Iterable[ModelSpec],
+        configured_providers: Iterable[str],
+        defaults: Iterable[str],
+        unhealthy: Iterable[str] = (),
+        health_version: int = 0,
+        health_expires_at: float = math.inf,
+    ):
+        self.version = version
+        self.built_at = time.time()
+        self.fingerprint = fingerprint
+        specs = tuple(specs)
+        self.specs: Mapping[str, ModelSpec] = MappingProxyType({s.name: s for s in specs})
+        self.providers: Mapping[str, str] = MappingProxyType({s.name: s.provider for s in specs})
+        self.configured_providers = frozenset(configured_providers)
+        by_provider: Dict[str, List[str]] = {}
+        for spec in specs:
+            by_provider.setdefault(spec.provider, []).append(spec.name)
+        self.models_by_provider: Mapping[str, Tuple[str, ...]] = MappingProxyType(
+            {provider: tuple(names) for provider, names in by_provider.items()}
+        )
+        # Models that can be offered right now (provider key configured)
+        self.listing: Tuple[ModelSpec, ...] = tuple(
+            s for s in specs if s.provider in self.configured_providers
+        )
+        self.allowed_names = frozenset(s.name for s in specs if is_allowed_model_name(s.name))
+        self.unhealthy = frozenset(unhealthy)
+        self.defaults: Tuple[str, ...] = tuple(defaults)
+        # Prober version this was built from, and when the first "unhealthy" result goes stale
+        self.health_version = health_version
+        self.health_expires_at = health_expires_at
+
+    def is_current(self, health_version: int, now: float) -> bool:
+        """Whether credentials, model policy and health still match this catalog."""
+        return (
+            self.fingerprint == config_fingerprint()
+            and self.health_version == health_version
+            and now < self.health_expires_at
+        )
+
+    def provider_of(self, model: str) -> str:
+        provider = self.providers.get(model)
+        return provider if provider is not None else provider_for_model(model)
+
+    def price_of(self, model: str) -> Optional[float]:
+        spec = self.specs.get(model)
+        return spec.cost_per_1k_tokens if spec else None
+
+    def is_allowed(self, model: str) -> bool:
+        return model in self.allowed_names or is_allowed_model_name(model)
+
+
+def build_model_catalog(
+    version: int = 1,
+    health: Optional[HealthSnapshot] = None,
+    prices: Optional[Mapping[str, float]] = None,
+    stale_seconds: Optional[float] = None,
+    health_version: int = 0,
+) -> ModelCatalog:
+    """Build a catalog from the current credentials, health snapshot and price overrides."""
+    fingerprint = config_fingerprint()
+    configured = {
+        provider for provider, present in zip(PROVIDER_API_KEY_ENV, fingerprint[1:]) if present
+    }
+    specs = MODEL_SPECS
+    if prices:
+        specs = tuple(
+            replace(s, cost_per_1k_tokens=prices[s.name]) if s.name in prices else s for s in specs
+        )
+
+    now = time.time()
+    unhealthy = set()
+    health_expires_at = math.inf
+    candidates: List[str] = []
+    for model, env_var in MODEL_API_KEY_ENV:
+        if not os.environ.get(env_var):
+            continue
+        if health is not None and health.is_healthy(model, stale_seconds, now) is False:
+            unhealthy.add(model)
+            if stale_seconds is not None:
+                checked_at = health.results[model].checked_at
+                health_expires_at = min(health_expires_at, checked_at + stale_seconds)
+            continue
+        candidates.append(model)
+
+    defaults = diversify(candidates, Config.MINIMUM_MODELS_REQUIRED)
+    return ModelCatalog(
+        version,
+        fingerprint,
+        specs,
+        configured,
+        defaults,
+        unhealthy,
+        health_version=health_version,
+        health_expires_at=health_expires_at,
+    )
+
+
+# Current catalog; replaced wholesale, never mutated
+_catalog: Optional[ModelCatalog] = None
+_price_overrides: Dict[str, float] = {}
+
+
+def refresh_model_catalog(reason: str = "refresh", prices: Optional[Mapping[str, float]] = None) -> ModelCatalog:
+    """Rebuild the catalog and swap it in. `prices` updates per-model cost overrides."""
+    global _catalog
+    if prices:
+        _price_overrides.update(prices)
+    prober = get_health_prober()
+    version = (_catalog.version + 1) if _catalog is not None else 1
+    catalog = build_model_catalog(
+        version, prober.snapshot, _price_overrides, prober.stale_seconds, prober.version
+    )
+    _catalog = catalog
+    logger.info(
+        f"Model catalog v{catalog.version} built ({reason}): defaults={list(catalog.defaults)}"
+    )
+    return catalog
+
+
+def get_model_catalog() -> ModelCatalog:
+    """Get the current catalog, rebuilding it if provider keys, model policy or health changed."""
+    catalog = _catalog
+    if catalog is None:
+        return refresh_model_catalog("initial build")
+    if not catalog.is_current(get_health_prober().version, time.time()):
+        reason = (
+            "config changed" if catalog.fingerprint != config_fingerprint() else "health changed"
+        )
+        catalog = refresh_model_catalog(reason)
+    return catalog
@@ -5,15 +5,43 @@ This module provides a centralized cache for model health checks to avoid
 repeated probing of LLM endpoints across different services.
 """
 
+import os
 import time
 from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime, timedelta
 
+from app.services.health_prober import get_health_prober
 from app.services.llm_adapters import CLIENT
 from app.utils.logging import get_logger
 
 logger = get_logger("model_health_cache")
 
+# Default model candidates and the env var holding each provider's API key
+MODEL_API_KEY_ENV: Tuple[Tuple[str, str], ...] = (
+    ("gpt-4o", "OPENAI_API_KEY"),
+    ("gpt-3.5-turbo", "OPENAI_API_KEY"),
+    ("claude-3-5-sonnet-20241022", "ANTHROPIC_API_KEY"),
+    ("claude-3-5-haiku-20241022", "ANTHROPIC_API_KEY"),
+    ("gemini-1.5-pro", "GOOGLE_API_KEY"),
+    ("gemini-1.5-flash", "GOOGLE_API_KEY"),
+    ("meta-llama/Meta-Llama-3-8B-Instruct", "HUGGINGFACE_API_KEY"),
+    ("mistralai/Mixtral-8x7B-Instruct-v0.1", "HUGGINGFACE_API_KEY"),
+)
+
+
+# Rate limited / overloaded: the provider is up, just throttling this key right now
+THROTTLED_STATUS_CODES = frozenset({429, 529})
+
+
+def configured_models() -> Dict[str, str]:
+    """Return {model: api_key} for the default candidates whose key is set, in preference order."""
+    models: Dict[str, str] = {}
+    for model, env_var in MODEL_API_KEY_ENV:
+        key = os.getenv(env_var)
+        if key:
+            models[model] = key
+    return models
+
 
 class ModelHealthCache:
     """Centralized cache for model health status."""
@@ -100,6 +128,10 @@ class ModelHealthCache:
         """
         Probe a model with a minimal request to check health.
         Results are automatically cached.
+
+        When the background health prober is running this never blocks on the
+        network: it answers from the prober's snapshot and, for a model with no
+        fresh result, queues a probe and reports the model as usable meanwhile.
         
         Args:
             model: Model identifier
@@ -108,12 +140,22 @@ class ModelHealthCache:
         Returns:
             True if healthy, False otherwise
         """
+        prober = get_health_prober()
+        if prober.running:
+            probed = prober.is_healthy(model)
+            if probed is not None:
+                return probed
+            prober.request_probe(model)
+
         # Check cache first
         cached = self.get_cached_health(model)
         if cached is not None:
             logger.debug(f"Using cached health status for {model}: {cached}")
             return cached
-        
+
+        if prober.running:
+            return True
+
         # Perform health check
         is_healthy = await self._do_probe(model, api_key)
         
@@ -131,7 +173,8 @@ class ModelHealthCache:
             api_key: API key for the model
             
         Returns:
-            True if healthy (HTTP 200/503 for HF), False otherwise
+            True if healthy (HTTP 200, 503 for HF, or a throttling status),
+            False otherwise
         """
         try:
             if model.startswith("gpt"):
@@ -149,7 +192,7 @@ class ModelHealthCache:
                     headers=headers,
                     json=payload,
                 )
-                return r.status_code == 200
+                return self._status_is_up(model, r.status_code)
             
             elif "/" in model:  # Hugging Face style
                 headers = {
@@ -159,7 +202,7 @@ class ModelHealthCache:
                 url = f"https://api-inference.huggingface.co/models/{model}"
                 r = await CLIENT.post(url, headers=headers, json={"inputs": "ping"})
                 # HF returns 503 while model is loading which is acceptable
-                return r.status_code in (200, 503)
+                return self._status_is_up(model, r.status_code, ok=(200, 503))
             
             elif model.startswith("claude"):
                 headers = {
@@ -177,7 +220,7 @@ class ModelHealthCache:
                     headers=headers,
                     json=payload,
                 )
-                return r.status_code == 200
+                return self._status_is_up(model, r.status_code)
             
             elif model.startswith("gemini"):
                 url = (
@@ -189,7 +232,7 @@ class ModelHealthCache:
                     "generationConfig": {"maxOutputTokens": 1},
                 }
                 r = await CLIENT.post(url, headers={"Content-Type": "application/json"}, json=payload)
-                return r.status_code == 200
+                return self._status_is_up(model, r.status_code)
                 
         except Exception as e:
             logger.warning(f"Health probe failed for {model}: {e}")
@@ -197,6 +240,14 @@ class ModelHealthCache:
         
         return False
 
+    @staticmethod
+    def _status_is_up(model: str, status_code: int, ok: Tuple[int, ...] = (200,)) -> bool:
+        """A throttled model is healthy-but-throttled, not down."""
+        if status_code in THROTTLED_STATUS_CODES:
+            logger.info(f"Health probe for {model} throttled (HTTP {status_code}); treating as up")
+            return True
+        return status_code in ok
+
 
 # Global singleton instance
 model_health_cache = ModelHealthCache()
\ No newline at end of file
@@ -10,12 +10,15 @@ from datetime import datetime
 import inspect
 import asyncio
 import os
-import json
-from pathlib import Path
 import time
 
-from app.services.quality_evaluation import QualityEvaluationService, ResponseQuality
-from app.services.rate_limiter import RateLimiter
+from app.services.quality_evaluation import (
+    QualityDimension,
+    QualityEvaluationService,
+    QualityScore,
+    ResponseQuality,
+)
+from app.services.rate_limiter import RateLimiter, get_shared_rate_limiter
 from app.services.token_management_service import TokenManagementService
 
 # Enhanced synthesis components
@@ -53,7 +56,16 @@ from app.services.synthesis_prompts import SynthesisPromptManager
 from app.services.model_selection import SmartModelSelector
 from app.services.synthesis_output import StructuredSynthesisOutput
 from app.services.cache_service import get_cache_service, cache_key
+from app.services.cache_codec import register_cache_type
+from app.services.hedging import get_hedge_manager
+from app.services.pipeline_output_writer import (
+    build_output_record,
+    get_pipeline_output_writer,
+)
+from app.services.semantic_cache import get_semantic_cache
+from app.services.single_flight import RedisSingleFlight, SingleFlight
 from app.services.orchestration_retry_handler import OrchestrationRetryHandler
+from app.services.model_catalog import get_model_catalog
 from app.services.model_health_cache import model_health_cache
 from app.services.provider_health_manager import provider_health_manager
 from app.services.provider_fallback_manager import provider_fallback_manager
@@ -70,6 +82,44 @@ STUB_RESPONSE = (
     "meaningful words in the synthesis output."
 )
 
+PEER_REVIEW_PROMPT_TEMPLATE = """Please review the responses from other LLMs given the same query you just completed. Do not assume anything is factual, but would you like to edit your initial response after seeing the work of your peers?
+
+Original Query: {original_prompt}
+
+Your Initial Response:
+{own_response}
+
+Responses from Other LLMs:
+{peer_responses_text}
+
+After critically reviewing these peer responses, please provide your revised answer to the original query. You may keep your original response if you believe it's already optimal, or incorporate insights from the peer responses where they improve accuracy, completeness, or clarity."""  # noqa: E501
+
+
+def build_peer_review_prompt(
+    original_prompt: str, model: str, responses: Dict[str, str]
+) -> str:
+    """Peer-review prompt for ``model`` using every other response in ``responses``."""
+    # Don't include the model's own response as a "peer"
+    peer_responses_text = "".join(
+        f"\n{peer}: {text}\n" for peer, text in responses.items() if peer != model
+    )
+    return PEER_REVIEW_PROMPT_TEMPLATE.format(
+        original_prompt=original_prompt,
+        own_response=responses[model],
+        peer_responses_text=peer_responses_text,
+    )
+
+
+# Options that only change how one request is handled, not what the pipeline returns
+PER_REQUEST_OPTIONS = frozenset(
+    {"correlation_id", "save_outputs", "enable_cache", "semantic_cache", "cache_ttl"}
+)
+
+
+def result_options(options: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """The subset of ``options`` that cache and coalescing keys are built from."""
+    return {k: v for k, v in (options or {}).items() if k not in PER_REQUEST_OPTIONS}
+
 
 @dataclass
 class PipelineStage:
@@ -81,6 +131,7 @@ class PipelineStage:
     timeout_seconds: int = 30
 
 
+@register_cache_type
 @dataclass
 class PipelineResult:
     """Result from a pipeline stage."""
@@ -93,6 +144,11 @@ class PipelineResult:
     token_usage: Optional[Dict[str, int]] = None
 
 
+# Pipeline results are cached in Redis; let the codec rebuild nested quality objects
+for _cached_type in (ResponseQuality, QualityScore, QualityDimension):
+    register_cache_type(_cached_type)
+
+
 class OrchestrationService:
     """
     Service for orchestrating multi-stage analysis pipelines.
@@ -118,7 +174,7 @@ class OrchestrationService:
         """
         self.model_registry = model_registry
         self.quality_evaluator = quality_evaluator or QualityEvaluationService()
-        self.rate_limiter = rate_limiter or RateLimiter()
+        self.rate_limiter = rate_limiter or get_shared_rate_limiter()
         self.token_manager = token_manager or TokenManagementService()
         # Only initialize transaction service if billing is enabled
         if Config.ENABLE_BILLING and TransactionService:
@@ -154,6 +210,9 @@ class OrchestrationService:
         # Initialize retry handler
         self.retry_handler = OrchestrationRetryHandler()
 
+        # Coalesce identical concurrent pipeline runs (keyed on the cache key)
+        self.pipeline_flight = self._build_pipeline_flight()
+
         # Define pipeline stages - OPTIMIZED 3-STAGE Ultra Synthesis™ architecture (meta-analysis removed)
         self.pipeline_stages = [
             PipelineStage(
@@ -193,22 +252,7 @@ class OrchestrationService:
         Raises:
             ValueError: If invalid model names are detected
         """
-        ALLOWED_MODEL_PATTERNS = [
-            # OpenAI models
-            r"^gpt-[34](\.[0-9])?(-turbo)?(-instruct)?$",
-            r"^gpt-4o(-mini)?$",
-            r"^o1(-preview|-mini)?$",
-            # Anthropic models
-            r"^claude-3(-5)?-(sonnet|haiku|opus)(-\d{8})?$",
-            # Google models
-            r"^gemini-(1\.5-)?(pro|flash)(-exp)?$",
-            r"^gemini-2\.0-flash-exp$",
-            # HuggingFace models (org/model format)
-            r"^[a-zA-Z0-9_-]+/[a-zA-Z0-9_.-]+$",
-        ]
-
-        import re
-
+        catalog = get_model_catalog()
         validated_models = []
 
         for model in models:
@@ -221,14 +265,8 @@ class OrchestrationService:
                 logger.warning(f"⚠️ Model name too long: {model[:50]}..., skipping")
                 continue
 
-            # Check against allowed patterns
-            is_valid = False
-            for pattern in ALLOWED_MODEL_PATTERNS:
-                if re.match(pattern, model):
-                    is_valid = True
-                    break
-
-            if is_valid:
+            # Check against allowed patterns (precomputed for catalog models)
+            if catalog.is_allowed(model):
                 validated_models.append(model)
                 logger.debug(f"✅ Validated model: {model}")
             else:
@@ -339,35 +377,17 @@ class OrchestrationService:
         return await model_health_cache.probe_model(model, api_key)
 
     async def _default_models_from_env(self) -> List[str]:
-        """Return list of healthy models, probing once every 5 minutes."""
-        candidates = [
-            ("gpt-4o", os.getenv("OPENAI_API_KEY")),
-            ("gpt-3.5-turbo", os.getenv("OPENAI_API_KEY")),
-            ("claude-3-5-sonnet-20241022", os.getenv("ANTHROPIC_API_KEY")),
-            ("claude-3-5-haiku-20241022", os.getenv("ANTHROPIC_API_KEY")),
-            ("gemini-1.5-pro", os.getenv("GOOGLE_API_KEY")),
-            ("gemini-1.5-flash", os.getenv("GOOGLE_API_KEY")),
-            ("meta-llama/Meta-Llama-3-8B-Instruct", os.getenv("HUGGINGFACE_API_KEY")),
-            ("mistralai/Mixtral-8x7B-Instruct-v0.1", os.getenv("HUGGINGFACE_API_KEY")),
-        ]
-
-        healthy: List[str] = []
-
-        logger.info("🔑 Checking API keys availability (SKIP HEALTH CHECKS)...")
-
-        for model, key in candidates:
-            if not key:
-                continue
-            healthy.append(model)
-            logger.info(f"  ✅ {model}: API key found, assuming healthy")
+        """Return the catalog's default models: keyed, not reported down, provider-diversified."""
+        catalog = get_model_catalog()
+        healthy: List[str] = list(catalog.defaults)
 
         if not healthy:
             logger.warning("⚠️ No healthy models found during probe")
             # TEMPORARY: Force working models for testing
             # Check if we have any API keys available
-            has_google = bool(os.getenv("GOOGLE_API_KEY"))
-            has_anthropic = bool(os.getenv("ANTHROPIC_API_KEY"))
-            has_openai = bool(os.getenv("OPENAI_API_KEY"))
+            has_google = "google" in catalog.configured_providers
+            has_anthropic = "anthropic" in catalog.configured_providers
+            has_openai = "openai" in catalog.configured_providers
 
             logger.info(
                 f"  📊 API Key Status: Google={has_google}, Anthropic={has_anthropic}, OpenAI={has_openai}"
@@ -409,43 +429,7 @@ class OrchestrationService:
             else:
                 healthy.append("gpt-4o")
 
-        logger.info(f"✨ Healthy models available: {healthy}")
-
-        # Prefer diversity across providers when selecting defaults
-        try:
-            if len(healthy) >= 3:
-                by_provider: Dict[str, List[str]] = {}
-                for m in healthy:
-                    provider = self._get_provider_from_model(m)
-                    by_provider.setdefault(provider or "unknown", []).append(m)
-
-                preferred_order = [
-                    "openai",
-                    "anthropic",
-                    "google",
-                    "huggingface",
-                    "unknown",
-                ]
-                diversified: List[str] = []
-                # First pass: pick at most one per provider in preferred order
-                for prov in preferred_order:
-                    if prov in by_provider and by_provider[prov]:
-                        diversified.append(by_provider[prov][0])
-                        if len(diversified) >= Config.MINIMUM_MODELS_REQUIRED:
-                            break
-                # Second pass: fill remaining up to 3 from remaining models preserving original order
-                if len(diversified) < 3:
-                    for m in healthy:
-                        if m not in diversified:
-                            diversified.append(m)
-                            if len(diversified) >= 3:
-                                break
-                # Replace healthy ordering with diversified ordering (up to 3)
-                if diversified and diversified != healthy[: len(diversified)]:
-                    logger.info(f"🔀 Diversified default models: {diversified}")
-                    healthy = diversified + [m for m in healthy if m not in diversified]
-        except Exception as _e:
-            logger.warning(f"Default model diversification failed: {_e}")
+        logger.debug(f"✨ Healthy models available: {healthy}")
 
         # Only ensure multiple models if required by configuration
         if (
@@ -510,7 +494,7 @@ class OrchestrationService:
                 "input_hash": input_hash,
                 "input_preview": str(input_data)[:100],  # Keep preview for debugging
                 "models": sorted(selected_models) if selected_models else [],
-                "options": options or {},
+                "options": result_options(options),
             }
             cache_key_str = f"pipeline:{cache_key(cache_key_data)}"
 
@@ -531,6 +515,72 @@ class OrchestrationService:
                         )
                 return cached_result
 
+            # Near-duplicate queries with the same models/options
+            semantic_cache = get_semantic_cache()
+            use_semantic = semantic_cache is not None and (
+                options.get("semantic_cache", True) if options else True
+            )
+            if use_semantic:
+                semantic_ns = cache_key(
+                    "pipeline",
+                    {"models": cache_key_data["models"], "options": cache_key_data["options"]},
+                )
+                semantic_result = semantic_cache.lookup(semantic_ns, str(input_data))
+                if semantic_result is not None:
+                    return dict(semantic_result)
+
+            flight = getattr(self, "pipeline_flight", None)
+            if flight is not None:
+                results = await flight.do(
+                    cache_key_str,
+                    lambda: self._execute_pipeline(
+                        input_data, options, user_id, selected_models, cache_key_str
+                    ),
+                )
+            else:
+                results = await self._execute_pipeline(
+                    input_data, options, user_id, selected_models, cache_key_str
+                )
+
+            if use_semantic and "error" not in results and not any(
+                getattr(r, "error", None) for r in results.values()
+            ):
+                semantic_cache.store(
+                    semantic_ns,
+                    str(input_data),
+                    results,
+                    ttl=options.get("cache_ttl") if options else None,
+                )
+            return results
+
+        return await self._execute_pipeline(input_data, options, user_id, selected_models)
+
+    def _build_pipeline_flight(self) -> Optional[SingleFlight]:
+        """Create the single-flight layer selected by PIPELINE_SINGLE_FLIGHT."""
+        mode = Config.PIPELINE_SINGLE_FLIGHT
+        if mode == "off":
+            return None
+        if mode == "redis":
+            return RedisSingleFlight(
+                redis_getter=lambda: get_cache_service().redis,
+                result_lookup=lambda key: get_cache_service().aget(key),
+                lock_ttl=Config.PIPELINE_SINGLE_FLIGHT_LOCK_TTL,
+                wait_timeout=Config.PIPELINE_SINGLE_FLIGHT_WAIT_TIMEOUT,
+            )
+        return SingleFlight()
+
+    async def _execute_pipeline(
+        self,
+        input_data: Any,
+        options: Optional[Dict[str, Any]],
+        user_id: Optional[str],
+        selected_models: Optional[List[str]],
+        cache_key_str: Optional[str] = None,
+    ) -> Dict[str, PipelineResult]:
+        """Run the pipeline stages; results are cached under ``cache_key_str`` if given."""
+        cache_service = get_cache_service()
+        cache_enabled = cache_key_str is not None
+
         # Default model selection for test environment when none provided
         if not selected_models:
             selected_models = await self._default_models_from_env()
@@ -539,7 +589,7 @@ class OrchestrationService:
         final_models = []
         for model in selected_models:
             provider = self._get_provider_from_model(model)
-            if provider in provider_fallback_manager._rate_limited_providers:
+            if provider_fallback_manager.is_rate_limited(provider, model):
                 logger.info(
                     f"Model {model} from rate-limited provider {provider}, getting fallback"
                 )
@@ -614,7 +664,21 @@ class OrchestrationService:
         current_data = input_data
         total_cost = 0.0
 
-        for i, stage in enumerate(self.pipeline_stages):
+        execution_mode = (options or {}).get("execution_mode", Config.PIPELINE_EXECUTION_MODE)
+        if execution_mode == "dataflow":
+            from app.services.dataflow_pipeline import DataflowPipelineRunner
+
+            runner = DataflowPipelineRunner(
+                self,
+                quorum=(options or {}).get("dataflow_quorum"),
+                cancel_slow_tail=(options or {}).get("cancel_slow_tail"),
+            )
+            results = await runner.run(input_data, selected_models, options)
+            barrier_stages = []
+        else:
+            barrier_stages = self.pipeline_stages
+
+        for i, stage in enumerate(barrier_stages):
             prev_data = current_data  # snapshot input for this stage
             try:
                 # Log progress for user tracking
@@ -1112,6 +1176,14 @@ class OrchestrationService:
                 return {"generated_text": STUB_RESPONSE}
             return {"error": "Missing API key", "error_details": error_msg}
 
+        semantic_cache = get_semantic_cache()
+        if semantic_cache is not None:
+            cached_text = semantic_cache.lookup(
+                f"model:{model}", prompt, threshold=Config.SEMANTIC_CACHE_MODEL_THRESHOLD
+            )
+            if cached_text is not None:
+                return {"generated_text": cached_text, "cached": True}
+
         # Determine provider from model name
         provider = self._get_provider_from_model(model)
 
@@ -1143,6 +1215,8 @@ class OrchestrationService:
                     "request rate-limited"
                 ):
                     gen_text = STUB_RESPONSE
+                elif semantic_cache is not None:
+                    semantic_cache.store(f"model:{model}", prompt, gen_text)
 
                 return {"generated_text": gen_text}
             else:
@@ -1178,16 +1252,7 @@ class OrchestrationService:
 
     def _get_provider_from_model(self, model: str) -> str:
         """Determine provider from model name."""
-        if model.startswith("gpt") or model.startswith("o1"):
-            return "openai"
-        elif model.startswith("claude"):
-            return "anthropic"
-        elif model.startswith("gemini"):
-            return "google"
-        elif "/" in model:  # HuggingFace forma
-            return "huggingface"
-        else:
-            return "unknown"
+        return get_model_catalog().provider_of(model)
 
     def _validate_api_key(self, model: str) -> Tuple[bool, Optional[str]]:
         """Validate if API key exists for the given model.
@@ -1777,10 +1842,19 @@ class OrchestrationService:
         max_concurrent = min(len(executable_models), 4)
         semaphore = asyncio.Semaphore(max_concurrent)
         
+        hedger = get_hedge_manager()
+
         async def execute_model_with_semaphore(model: str) -> tuple[str, dict]:
             """Execute model with semaphore to limit concurrency"""
             async with semaphore:
-                return await execute_model(model)
+                if hedger is None:
+                    return await execute_model(model)
+                backups = provider_fallback_manager.get_hedge_models(
+                    self._get_provider_from_model(model), exclude=executable_models
+                )
+                if not backups and Config.HEDGE_SAME_MODEL:
+                    backups = [model]
+                return await hedger.run(model, execute_model, backups)
         
         # Create asyncio tasks for proper timeout handling
         async_tasks = []
@@ -1860,20 +1934,31 @@ class OrchestrationService:
 
         # Process results and collect successful responses
         failed_models = {}
+        hedged_models: Dict[str, str] = {}
         for result in results:
             if isinstance(result, BaseException):
                 logger.error(f"Task execution failed: {str(result)}")
                 continue
 
             model, output = result
+            requested = output.get("hedged_for", model)
+            if "generated_text" in output and model != requested and model in responses:
+                # Two slow models hedged to the same backup; keep one answer per model
+                output = {"error": f"Hedge backup {model} already answered for another model"}
+                model = requested
             if "generated_text" in output:
                 gen_text = output["generated_text"]
                 if os.getenv("TESTING") == "true" and gen_text.lower().startswith(
                     "request rate-limited"
                 ):
                     gen_text = STUB_RESPONSE
+                # A cross-provider hedge is recorded under the model that answered
                 responses[model] = gen_text
-                logger.info(f"✅ Model {model} succeeded")
+                if output.get("hedged"):
+                    hedged_models[requested] = model
+                    logger.info(f"✅ Model {requested} succeeded via hedge ({model})")
+                else:
+                    logger.info(f"✅ Model {model} succeeded")
             else:
                 # Provide fallback text in test mode so pipeline can proceed
                 error_msg = output.get("error", "Unknown error")
@@ -1885,8 +1970,9 @@ class OrchestrationService:
                     failed_models[model] = error_msg
                     logger.error(f"❌ Model {model} failed: {error_msg}")
 
-        # Check if we have enough models for full pipeline
-        if len(responses) < Config.MINIMUM_MODELS_REQUIRED:
+        # Check if we have enough models for full pipeline; single-model calls
+        # (dataflow mode) are judged by the caller once every model has answered
+        if len(models) > 1 and len(responses) < Config.MINIMUM_MODELS_REQUIRED:
             if Config.ENABLE_SINGLE_MODEL_FALLBACK and len(responses) >= 1:
                 warning_msg = (
                     f"Only {len(responses)} model(s) produced a response (minimum required: {Config.MINIMUM_MODELS_REQUIRED}). "
@@ -1955,6 +2041,8 @@ class OrchestrationService:
             "models_attempted": executable_models,
             "successful_models": list(responses.keys()),
             "response_count": len(responses),
+            "hedged_models": hedged_models,
+            "failed_models": failed_models,
         }
 
     async def peer_review_and_revision(
@@ -1995,7 +2083,7 @@ class OrchestrationService:
             }
 
         initial_responses = data["responses"]
-        # original_prompt was previously captured for logs, but it is unused here; removing assignmen
+        original_prompt = str(data.get("prompt") or data.get("input") or "")
         successful_models = data.get("successful_models", [])
 
         logger.info(f"Initial responses from: {list(initial_responses.keys())}")
@@ -2011,10 +2099,11 @@ class OrchestrationService:
                 "original_responses": initial_responses,
             }
 
-        # Check if we have enough models for peer review
-        if len(working_models) < 2:
+        # Check if we have enough responses for peer review; a subset of the
+        # models may review (dataflow mode reviews one model at a time)
+        if len(initial_responses) < 2:
             logger.warning(
-                f"⚠️ Only {len(working_models)} model available - peer review requires multiple models"
+                f"⚠️ Only {len(initial_responses)} response available - peer review requires multiple models"
             )
             # Return the original responses without peer review
             return {
@@ -2038,26 +2127,10 @@ class OrchestrationService:
                 # Get the model's original response
                 own_response = initial_responses[model]
 
-                # Create peer responses section (excluding the model's own response)
-                peer_responses_text = ""
-                for peer_model, peer_response in initial_responses.items():
-                    if (
-                        peer_model != model
-                    ):  # Don't include the model's own response as a "peer"
-                        peer_responses_text += f"\n{peer_model}: {peer_response}\n"
-
                 # Create the peer review prompt - more critical and less assumptive
-                peer_review_prompt = """Please review the responses from other LLMs given the same query you just completed. Do not assume anything is factual, but would you like to edit your initial response after seeing the work of your peers?  # noqa: E501
-
-Original Query: {original_prompt}
-
-Your Initial Response:
-{own_response}
-
-Responses from Other LLMs:
-{peer_responses_text}
-
-After critically reviewing these peer responses, please provide your revised answer to the original query. You may keep your original response if you believe it's already optimal, or incorporate insights from the peer responses where they improve accuracy, completeness, or clarity."""  # noqa: E501
+                peer_review_prompt = build_peer_review_prompt(
+                    original_prompt, model, initial_responses
+                )
 
                 # Execute the peer review using the same model adapters as initial_response
                 if model.startswith("gpt") or model.startswith("o1"):
@@ -2854,121 +2927,24 @@ Begin with the ultra synthesis document."""
         user_id: Optional[str] = None,
     ) -> Dict[str, str]:
         """
-        Save pipeline outputs as JSON and TXT files.
+        Queue pipeline outputs for write-behind persistence as JSONL.
 
         Args:
             results: Pipeline results to save
             input_data: Original input data
             selected_models: Models used in the pipeline
-            user_id: Optional user ID for file naming
+            user_id: Optional user ID stored with the record
 
         Returns:
-            Dict[str, str]: Paths to the saved files (json_file, txt_file)
+            Dict[str, str]: Record id and output directory, or {} if the
+            record was dropped under backpressure
         """
         try:
-            # Create outputs directory if it doesn't exis
-            outputs_dir = Path("pipeline_outputs")
-            outputs_dir.mkdir(exist_ok=True)
-
-            # Generate timestamp for unique filenames
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            user_prefix = f"{user_id}_" if user_id else ""
-            base_filename = f"{user_prefix}pipeline_{timestamp}"
-
-            # Prepare data for saving
-            save_data = {
-                "timestamp": datetime.now().isoformat(),
-                "input_query": str(input_data),
-                "selected_models": selected_models or [],
-                "pipeline_results": {},
-            }
-
-            # Extract readable results from each stage
-            for stage_name, stage_result in results.items():
-                if hasattr(stage_result, "output") and stage_result.output:
-                    save_data["pipeline_results"][stage_name] = {
-                        "stage": stage_name,
-                        "output": stage_result.output,
-                        "success": stage_result.error is None,
-                        "error": stage_result.error,
-                        "performance": stage_result.performance_metrics,
-                    }
-                else:
-                    save_data["pipeline_results"][stage_name] = {
-                        "stage": stage_name,
-                        "output": stage_result,
-                        "success": True,
-                        "error": None,
-                    }
-
-            # Save as JSON
-            json_file = outputs_dir / f"{base_filename}.json"
-            with open(json_file, "w", encoding="utf-8") as f:
-                json.dump(save_data, f, indent=2, ensure_ascii=False, default=str)
-
-            # Save as readable TXT
-            txt_file = outputs_dir / f"{base_filename}.txt"
-            with open(txt_file, "w", encoding="utf-8") as f:
-                f.write("=" * 80 + "\n")
-                f.write("ULTRA SYNTHESIS™ PIPELINE RESULTS\n")
-                f.write("=" * 80 + "\n\n")
-
-                f.write(f"Timestamp: {save_data['timestamp']}\n")
-                f.write(f"Input Query: {save_data['input_query']}\n")
-                f.write(
-                    f"Selected Models: {', '.join(save_data['selected_models'])}\n\n"
-                )
-
-                # Write each stage output
-                for stage_name, stage_data in save_data["pipeline_results"].items():
-                    f.write("-" * 60 + "\n")
-                    f.write(f"STAGE: {stage_name.upper()}\n")
-                    f.write("-" * 60 + "\n")
-
-                    if stage_data.get("error"):
-                        f.write(f"ERROR: {stage_data['error']}\n\n")
-                    else:
-                        output = stage_data.get("output", {})
-
-                        # Handle different output formats
-                        if isinstance(output, dict):
-                            if (
-                                stage_name == "initial_response"
-                                and "responses" in output
-                            ):
-                                f.write("INITIAL RESPONSES:\n")
-                                for model, response in output["responses"].items():
-                                    f.write(f"\n{model}:\n{response}\n")
-                            elif (
-                                stage_name == "peer_review_and_revision"
-                                and "revised_responses" in output
-                            ):
-                                f.write("PEER-REVISED RESPONSES:\n")
-                                for model, response in output[
-                                    "revised_responses"
-                                ].items():
-                                    f.write(f"\n{model} (Revised):\n{response}\n")
-                            elif (
-                                stage_name == "ultra_synthesis"
-                                and "synthesis" in output
-                            ):
-                                f.write("ULTRA SYNTHESIS™:\n")
-                                f.write(f"{output['synthesis']}\n")
-                            else:
-                                f.write(
-                                    f"OUTPUT:\n{json.dumps(output, indent=2, default=str)}\n"
-                                )
-                        else:
-                            f.write(f"OUTPUT:\n{str(output)}\n")
-
-                    f.write("\n")
-
-            logger.info("✅ Pipeline outputs saved:")
-            logger.info(f"   JSON: {json_file}")
-            logger.info(f"   TXT:  {txt_file}")
-
-            return {"json_file": str(json_file), "txt_file": str(txt_file)}
-
+            writer = get_pipeline_output_writer()
+            record = build_output_record(results, input_data, selected_models, user_id)
+            if not await writer.submit(record):
+                return {}
+            return {"record_id": record["record_id"], "output_dir": str(writer.directory)}
         except Exception as e:
             logger.error(f"Failed to save pipeline outputs: {str(e)}")
             # Don't raise the exception - saving is optional
@@ -0,0 +1,254 @@
+"""
+Write-behind persistence for saved pipeline outputs.
+
+Requests never touch the disk. ``submit`` serializes a record to one compact
+JSON line and puts it on a bounded queue. A background task drains the queue
+in batches and appends each batch to the current segment file from a worker
+thread.
+
+Segments are laid out by day and rotated by size:
+
+    pipeline_outputs/2025/01/31/segment-143015-1234-0001.jsonl[.gz]
+
+With gzip enabled, every batch is appended as its own gzip member, so a
+segment stays readable with ``gzip -dc`` or ``zcat`` even while it is being
+written.
+
+Backpressure: when the queue is full, ``submit`` waits up to
+``enqueue_timeout`` for space and then drops the record (counted in
+``stats["dropped"]``). A slow disk therefore never stalls request handling
+for more than that bound.
+"""
+
+import asyncio
+import gzip
+import json
+import os
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from app.config import Config
+from app.utils.logging import get_logger
+
+try:
+    from prometheus_client import Counter, Gauge
+
+    ULTRA_PIPELINE_OUTPUT_RECORDS = Counter(
+        "ultra_pipeline_output_records_total", "Saved pipeline output records", ["outcome"]
+    )
+    ULTRA_PIPELINE_OUTPUT_QUEUE_DEPTH = Gauge(
+        "ultra_pipeline_output_queue_depth", "Pipeline output records waiting to be written"
+    )
+except Exception:  # pragma: no cover - metrics are optional
+    ULTRA_PIPELINE_OUTPUT_RECORDS = None
+    ULTRA_PIPELINE_OUTPUT_QUEUE_DEPTH = None
+
+logger = get_logger("pipeline_output_writer")
+
+
+def build_output_record(
+    results: Dict[str, Any],
+    input_data: Any,
+    selected_models: Optional[List[str]] = None,
+    user_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Flatten pipeline stage results into a JSON-ready record."""
+    pipeline_results = {}
+    for stage_name, stage_result in results.items():
+        if hasattr(stage_result, "output") and stage_result.output:
+            pipeline_results[stage_name] = {
+                "stage": stage_name,
+                "output": stage_result.output,
+                "success": stage_result.error is None,
+                "error": stage_result.error,
+                "performance": stage_result.performance_metrics,
+            }
+        else:
+            pipeline_results[stage_name] = {
+                "stage": stage_name,
+                "output": stage_result,
+                "success": True,
+                "error": None,
+            }
+    return {
+        "record_id": uuid.uuid4().hex,
+        "timestamp": datetime.now().isoformat(),
+        "user_id": user_id,
+        "input_query": str(input_data),
+        "selected_models": selected_models or [],
+        "pipeline_results": pipeline_results,
+    }
+
+
+class PipelineOutputWriter:
+    """Bounded queue + background batch writer for JSONL output segments."""
+
+    def __init__(
+        self,
+        directory: str = "pipeline_outputs",
+        compression: str = "none",
+        segment_max_bytes: int = 64 * 1024 * 1024,
+        queue_size: int = 1000,
+        batch_size: int = 100,
+        flush_interval: float = 1.0,
+        enqueue_timeout: float = 0.1,
+    ):
+        self.directory = Path(directory)
+        self.compression = "gzip" if compression == "gzip" else "none"
+        self.segment_max_bytes = segment_max_bytes
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # Segment state is only touched from the writer thread
+        self._segment: Optional[Path] = None
+        self._segment_day: Optional[str] = None
+        self._segment_bytes = 0
+        self._segment_seq = 0
+        self.stats = {"queued": 0, "written": 0, "dropped": 0, "failed": 0, "batches": 0}
+
+    @property
+    def current_segment(self) -> Optional[str]:
+        return str(self._segment) if self._segment else None
+
+    def start(self) -> None:
+        """Start the background writer on the running loop (idempotent)."""
+        loop = asyncio.get_running_loop()
+        if self._task is not None and not self._task.done() and self._loop is loop:
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._task = asyncio.create_task(self._run(), name="pipeline_output_writer")
+
+    async def submit(self, record: Dict[str, Any]) -> bool:
+        """Queue a record for writing; False if it was dropped under backpressure."""
+        self.start()
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":"), default=str)
+        try:
+            self._queue.put_nowait(line)
+        except asyncio.QueueFull:
+            try:
+                await asyncio.wait_for(self._queue.put(line), self.enqueue_timeout)
+            except asyncio.TimeoutError:
+                self._count("dropped")
+                logger.warning("Pipeline output queue full; dropping record")
+                return False
+        self._count("queued")
+        self._publish_depth()
+        return True
+
+    async def _run(self) -> None:
+        queue = self._queue
+        while True:
+            batch = [await queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(queue.get(), remaining))
+                    except asyncio.TimeoutError:
+                        break
+            await self._flush(batch)
+            for _ in batch:
+                queue.task_done()
+            self._publish_depth()
+
+    async def _flush(self, batch: List[str]) -> None:
+        try:
+            await asyncio.to_thread(self._write_batch, batch)
+            self._count("written", len(batch))
+            self.stats["batches"] += 1
+        except Exception as e:
+            self._count("failed", len(batch))
+            logger.error(f"Failed to write {len(batch)} pipeline output records: {e}")
+
+    def _write_batch(self, batch: List[str]) -> None:
+        payload = ("\n".join(batch) + "\n").encode("utf-8")
+        if self.compression == "gzip":
+            payload = gzip.compress(payload, compresslevel=6)
+        path = self._segment_for(len(payload))
+        with open(path, "ab") as f:
+            f.write(payload)
+        self._segment_bytes += len(payload)
+
+    def _segment_for(self, incoming: int) -> Path:
+        now = datetime.now()
+        day = now.strftime("%Y/%m/%d")
+        if (
+            self._segment is None
+            or day != self._segment_day
+            or (self._segment_bytes and self._segment_bytes + incoming > self.segment_max_bytes)
+        ):
+            directory = self.directory / day
+            directory.mkdir(parents=True, exist_ok=True)
+            self._segment_seq += 1
+            suffix = ".jsonl.gz" if self.compression == "gzip" else ".jsonl"
+            self._segment = directory / (
+                f"segment-{now.strftime('%H%M%S')}-{os.getpid()}-{self._segment_seq:04d}{suffix}"
+            )
+            self._segment_day = day
+            self._segment_bytes = 0
+        return self._segment
+
+    async def flush(self) -> None:
+        """Wait until everything queued so far has been written."""
+        if self._queue is not None and self._task is not None and not self._task.done():
+            await self._queue.join()
+
+    async def aclose(self) -> None:
+        """Drain the queue and stop the writer (call on shutdown)."""
+        await self.flush()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _count(self, outcome: str, n: int = 1) -> None:
+        self.stats[outcome] += n
+        if ULTRA_PIPELINE_OUTPUT_RECORDS:
+            ULTRA_PIPELINE_OUTPUT_RECORDS.labels(outcome=outcome).inc(n)
+
+    def _publish_depth(self) -> None:
+        if ULTRA_PIPELINE_OUTPUT_QUEUE_DEPTH and self._queue is not None:
+            ULTRA_PIPELINE_OUTPUT_QUEUE_DEPTH.set(self._queue.qsize())
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "current_segment": self.current_segment,
+        }
+
+
+# Global writer so all orchestrator instances share one queue and segment
+_pipeline_output_writer: Optional[PipelineOutputWriter] = None
+
+
+def get_pipeline_output_writer() -> PipelineOutputWriter:
+    """Get the process-wide pipeline output writer."""
+    global _pipeline_output_writer
+    if _pipeline_output_writer is None:
+        _pipeline_output_writer = PipelineOutputWriter(
+            directory=Config.PIPELINE_OUTPUT_DIR,
+            compression=Config.PIPELINE_OUTPUT_COMPRESSION,
+            segment_max_bytes=Config.PIPELINE_OUTPUT_SEGMENT_MAX_BYTES,
+            queue_size=Config.PIPELINE_OUTPUT_QUEUE_SIZE,
+            batch_size=Config.PIPELINE_OUTPUT_BATCH_SIZE,
+            flush_interval=Config.PIPELINE_OUTPUT_FLUSH_INTERVAL,
+            enqueue_timeout=Config.PIPELINE_OUTPUT_ENQUEUE_TIMEOUT,
+        )
+    return _pipeline_output_writer
@@ -7,7 +7,10 @@ from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
-from pricing_simulator import PricingSimulator
+try:
+    from app.services.pricing_simulator import PricingSimulator
+except ImportError:  # run as a script from app/services
+    from pricing_simulator import PricingSimulator
 
 # Configure logging
 logging.basicConfig(
@@ -97,11 +100,7 @@ class PricingIntegration:
         tier = self.get_user_tier(user_id)
 
         # Calculate features based on request type
-        features = []
-        if request_type == "document_processing":
-            features.append("document_processing")
-        elif request_type == "priority":
-            features.append("priority_processing")
+        features = self._features_for_request(request_type)
 
         # Calculate cost using the pricing simulator
         cost_info = self.pricing_simulator.calculate_token_cost(
@@ -126,25 +125,9 @@ class PricingIntegration:
 
         # Update session token usage
         if session_id:
-            if session_id not in self.session_token_usage:
-                self.session_token_usage[session_id] = {
-                    "start_time": datetime.now().isoformat(),
-                    "user_id": user_id,
-                    "total_tokens": 0,
-                    "total_cost": 0,
-                    "models": {},
-                }
-
-            # Update session statistics
-            session_data = self.session_token_usage[session_id]
-            session_data["total_tokens"] += token_count
-            session_data["total_cost"] += cost_info["total_cost"]
-
-            if model not in session_data["models"]:
-                session_data["models"][model] = {"tokens": 0, "cost": 0}
-
-            session_data["models"][model]["tokens"] += token_count
-            session_data["models"][model]["cost"] += cost_info["total_cost"]
+            self._record_session_usage(
+                session_id, user_id, model, token_count, cost_info["total_cost"]
+            )
 
         # Update user account if pricing is enabled
         if self.pricing_enabled:
@@ -152,6 +135,98 @@ class PricingIntegration:
 
         return usage_record
 
+    def track_token_usage_batch(
+        self, records: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Track many usage records at once, pricing them in one vectorized pass
+
+        Args:
+            records: Dicts with user_id, model, input_tokens, output_tokens and
+                optionally request_type and session_id
+
+        Returns:
+            list: Usage information including cost, one per record
+        """
+        if not records:
+            return []
+
+        user_ids = [r.get("user_id") or "anonymous" for r in records]
+        tier_by_user = {u: self.get_user_tier(u) for u in set(user_ids)}
+        tiers = [tier_by_user[u] for u in user_ids]
+        features = [
+            self._features_for_request(r.get("request_type", "completion"))
+            for r in records
+        ]
+        costs = self.pricing_simulator.calculate_costs_batch(
+            [r["model"] for r in records],
+            [r.get("input_tokens", 0) for r in records],
+            [r.get("output_tokens", 0) for r in records],
+            tiers=tiers,
+            features=features,
+        )
+        totals = costs["total_cost"].tolist()
+        token_counts = (costs["input_tokens"] + costs["output_tokens"]).tolist()
+
+        timestamp = datetime.now().isoformat()
+        usage_records = []
+        for record, user_id, tier, token_count, total in zip(
+            records, user_ids, tiers, token_counts, totals
+        ):
+            usage_records.append(
+                {
+                    "timestamp": timestamp,
+                    "user_id": user_id,
+                    "model": record["model"],
+                    "token_count": token_count,
+                    "request_type": record.get("request_type", "completion"),
+                    "session_id": record.get("session_id"),
+                    "tier": tier,
+                    "cost": total,
+                }
+            )
+            if record.get("session_id"):
+                self._record_session_usage(
+                    record["session_id"], user_id, record["model"], token_count, total
+                )
+            if self.pricing_enabled:
+                self._update_user_account(user_id, total)
+
+        self._log_usage_batch(usage_records)
+        return usage_records
+
+    @staticmethod
+    def _features_for_request(request_type: str) -> List[str]:
+        """Add-on features implied by a request type"""
+        if request_type == "document_processing":
+            return ["document_processing"]
+        if request_type == "priority":
+            return ["priority_processing"]
+        return []
+
+    def _record_session_usage(
+        self, session_id: str, user_id: str, model: str, token_count: int, cost: float
+    ) -> None:
+        """Add one request's tokens and cost to its session statistics"""
+        if session_id not in self.session_token_usage:
+            self.session_token_usage[session_id] = {
+                "start_time": datetime.now().isoformat(),
+                "user_id": user_id,
+                "total_tokens": 0,
+                "total_cost": 0,
+                "models": {},
+            }
+
+        session_data = self.session_token_usage[session_id]
+        session_data["total_tokens"] += token_count
+        session_data["total_cost"] += cost
+
+        if model not in session_data["models"]:
+            session_data["models"][model] = {"tokens": 0, "cost": 0}
+
+        session_data["models"][model]["tokens"] += token_count
+        session_data["models"][model]["cost"] += cost
+
     def get_user_tier(self, user_id: str) -> str:
         """Get the pricing tier for a user"""
         if user_id in self.user_accounts:
@@ -362,11 +437,7 @@ class PricingIntegration:
         tier = self.get_user_tier(user_id)
 
         # Calculate features based on request type
-        features = []
-        if request_type == "document_processing":
-            features.append("document_processing")
-        elif request_type == "priority":
-            features.append("priority_processing")
+        features = self._features_for_request(request_type)
 
         # Calculate cost using the pricing simulator
         cost_info = self.pricing_simulator.calculate_token_cost(
@@ -430,6 +501,14 @@ class PricingIntegration:
         except Exception as e:
             logger.error(f"Error logging usage: {e}")
 
+    def _log_usage_batch(self, usage_records: List[Dict[str, Any]]) -> None:
+        """Log many usage records to file with a single write"""
+        try:
+            with open(self.usage_log_file, "a") as f:
+                f.write("".join(json.dumps(r) + "\n" for r in usage_records))
+        except Exception as e:
+            logger.error(f"Error logging usage: {e}")
+
     def _calculate_duration(self, start_time: str) -> str:
         """Calculate duration between start time and now"""
         try:
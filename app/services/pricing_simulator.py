@@ -4,7 +4,7 @@ import logging
 import os
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
 
 import matplotlib.pyplot as plt
 import numpy as np
@@ -43,6 +43,47 @@ BASELINE_MODEL_PRICING = {
 }
 
 
+class PriceMatrix(NamedTuple):
+    """Model and tier prices laid out as arrays for vectorized costing."""
+
+    models: Tuple[str, ...]
+    model_index: Dict[str, int]
+    input_cost_per_1k: np.ndarray
+    output_cost_per_1k: np.ndarray
+    is_thinking_model: np.ndarray
+    tiers: Tuple[str, ...]
+    tier_index: Dict[str, int]
+    # One entry per tier plus a final "no markup" row used for unknown tiers
+    # and apply_markup=False
+    markup_percentage: np.ndarray
+    minimum_charge: np.ndarray
+    thinking_model_surcharge: np.ndarray
+
+
+def _encode(values: Any, index: Dict[str, int], kind: str, missing: Optional[int] = None) -> np.ndarray:
+    """
+    Map names (or integer codes) to row indexes of a PriceMatrix.
+
+    Strings are looked up once per distinct value, so encoding millions of rows
+    costs one sort rather than a dict lookup per row. Unknown names raise
+    ValueError unless `missing` gives a row to use for them.
+    """
+    arr = np.asarray(values)
+    if np.issubdtype(arr.dtype, np.integer):
+        codes = arr.astype(np.intp)
+        if codes.size and (codes.min() < 0 or codes.max() >= len(index)):
+            raise ValueError(f"{kind} code out of range")
+        return codes
+    uniques, inverse = np.unique(arr, return_inverse=True)
+    lookup = np.array([index.get(name, -1) for name in uniques.tolist()], dtype=np.intp)
+    unknown = lookup < 0
+    if unknown.any():
+        if missing is None:
+            raise ValueError(f"Unknown {kind}: {uniques[unknown][0]}")
+        lookup[unknown] = missing
+    return lookup[inverse].reshape(arr.shape)
+
+
 class PricingSimulator:
     def __init__(self, config_path=None):
         # Default model pricing based on 2025 pricing data
@@ -168,6 +209,9 @@ class PricingSimulator:
         # Usage tracking
         self.usage_history = []
 
+        # Array view of model_pricing/pricing_tiers, built on first batch call
+        self._price_matrix: Optional[PriceMatrix] = None
+
         # Load configuration from file if provided
         if config_path:
             self.load_config(config_path)
@@ -185,6 +229,7 @@ class PricingSimulator:
                     for key, value in config.items():
                         if key in self.model_pricing:
                             self.model_pricing[key] = value
+                self.invalidate_price_matrix()
                 logger.info(f"Loaded pricing configuration from {config_path}")
             except Exception as e:
                 logger.error(f"Error loading pricing configuration: {e}")
@@ -215,6 +260,7 @@ class PricingSimulator:
             for key, value in pricing_data.items():
                 if key in self.model_pricing:
                     self.model_pricing[key] = value
+            self.invalidate_price_matrix()
             self.save_config()
             return True
         except Exception as e:
@@ -303,11 +349,232 @@ class PricingSimulator:
 
         # Track usage for reporting
         self._track_usage(
-            model_id, input_tokens, output_tokens, cost_breakdown["total_cost"]
+            model_id,
+            input_tokens,
+            output_tokens,
+            cost_breakdown["total_cost"],
+            features,
         )
 
         return cost_breakdown
 
+    def _track_usage(
+        self, model_id, input_tokens, output_tokens, total_cost, features=None
+    ) -> None:
+        """Record a priced request for generate_usage_report"""
+        self.usage_history.append(
+            {
+                "timestamp": datetime.now().isoformat(),
+                "model": model_id,
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "token_count": input_tokens + output_tokens,
+                "total_cost": total_cost,
+                "features": list(features or []),
+            }
+        )
+
+    @property
+    def price_matrix(self) -> PriceMatrix:
+        """Current prices as arrays; rebuilt after the pricing data changes."""
+        if self._price_matrix is None:
+            self._price_matrix = self._build_price_matrix()
+        return self._price_matrix
+
+    def invalidate_price_matrix(self) -> None:
+        """Drop the cached price matrix after editing model_pricing or pricing_tiers directly."""
+        self._price_matrix = None
+
+    def _build_price_matrix(self) -> PriceMatrix:
+        models = tuple(
+            model_id
+            for model_id, pricing in self.model_pricing.items()
+            if isinstance(pricing, dict) and "input_cost_per_1k" in pricing
+        )
+        tiers = tuple(self.pricing_tiers)
+        no_markup = {"markup_percentage": 0, "minimum_charge": 0, "thinking_model_surcharge": 0}
+        tier_rows = [self.pricing_tiers[t] for t in tiers] + [no_markup]
+        return PriceMatrix(
+            models=models,
+            model_index={m: i for i, m in enumerate(models)},
+            input_cost_per_1k=np.array(
+                [self.model_pricing[m]["input_cost_per_1k"] for m in models], dtype=np.float64
+            ),
+            output_cost_per_1k=np.array(
+                [self.model_pricing[m]["output_cost_per_1k"] for m in models], dtype=np.float64
+            ),
+            is_thinking_model=np.array(
+                [bool(self.model_pricing[m].get("is_thinking_model", False)) for m in models]
+            ),
+            tiers=tiers,
+            tier_index={t: i for i, t in enumerate(tiers)},
+            markup_percentage=np.array([r["markup_percentage"] for r in tier_rows], dtype=np.float64),
+            minimum_charge=np.array([r["minimum_charge"] for r in tier_rows], dtype=np.float64),
+            thinking_model_surcharge=np.array(
+                [r["thinking_model_surcharge"] for r in tier_rows], dtype=np.float64
+            ),
+        )
+
+    def _features_cost(self, features: Sequence[str]) -> float:
+        feature_cost = 0
+        for feature in features:
+            if feature in self.feature_costs:
+                feature_cost += self.feature_costs[feature]
+        return feature_cost
+
+    def _raw_costs(
+        self, matrix: PriceMatrix, model_ids, input_tokens, output_tokens
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        codes = _encode(model_ids, matrix.model_index, "model")
+        input_tokens = np.asarray(input_tokens)
+        output_tokens = np.asarray(output_tokens)
+        input_cost = (input_tokens / 1000) * matrix.input_cost_per_1k[codes]
+        output_cost = (output_tokens / 1000) * matrix.output_cost_per_1k[codes]
+        return codes, input_tokens, output_tokens, input_cost, output_cost
+
+    def calculate_costs_batch(
+        self,
+        model_ids,
+        input_tokens,
+        output_tokens,
+        tiers="basic",
+        features=None,
+        apply_markup=True,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Price many requests in one vectorized pass.
+
+        Produces exactly the numbers calculate_token_cost would for each row, but
+        without per-row Python work and without recording usage history.
+
+        Args:
+            model_ids: Model identifiers, or integer codes into price_matrix.models
+            input_tokens: Input token counts
+            output_tokens: Output token counts
+            tiers: One tier for every row, or a tier (or price_matrix.tiers code) per row;
+                unknown tier names are priced without markup
+            features: One list of add-on features for every row, or a list per row
+            apply_markup: Whether to apply markup percentage
+
+        Returns:
+            dict: Arrays keyed like calculate_token_cost's cost breakdown
+        """
+        matrix = self.price_matrix
+        codes, input_tokens, output_tokens, input_cost, output_cost = self._raw_costs(
+            matrix, model_ids, input_tokens, output_tokens
+        )
+        raw_cost = input_cost + output_cost
+        shape = raw_cost.shape
+
+        no_markup = len(matrix.tiers)
+        if not apply_markup:
+            tier_codes = np.full(shape, no_markup, dtype=np.intp)
+        elif isinstance(tiers, str):
+            tier_codes = np.full(shape, matrix.tier_index.get(tiers, no_markup), dtype=np.intp)
+        else:
+            tier_codes = _encode(tiers, matrix.tier_index, "tier", missing=no_markup)
+
+        if not features:
+            features_cost = np.zeros(shape)
+        elif isinstance(features[0], str):
+            features_cost = np.full(shape, float(self._features_cost(features)))
+        else:
+            per_combination: Dict[Tuple[str, ...], float] = {}
+            features_cost = np.array(
+                [
+                    per_combination.setdefault(tuple(f or ()), self._features_cost(f or ()))
+                    for f in features
+                ],
+                dtype=np.float64,
+            ).reshape(shape)
+
+        markup_cost = (raw_cost * matrix.markup_percentage[tier_codes]) / 100
+        surcharge_pct = np.where(
+            matrix.is_thinking_model[codes], matrix.thinking_model_surcharge[tier_codes], 0.0
+        )
+        thinking_surcharge = (raw_cost * surcharge_pct) / 100
+        total_cost = raw_cost + features_cost + markup_cost + thinking_surcharge
+
+        minimum = matrix.minimum_charge[tier_codes]
+        total_cost = np.where((total_cost < minimum) & (raw_cost > 0), minimum, total_cost)
+
+        return {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "input_cost": input_cost,
+            "output_cost": output_cost,
+            "raw_cost": raw_cost,
+            "features_cost": features_cost,
+            "thinking_model_surcharge": thinking_surcharge,
+            "markup_cost": markup_cost,
+            "total_cost": total_cost,
+        }
+
+    def sweep_costs(
+        self,
+        model_ids,
+        input_tokens,
+        output_tokens,
+        tiers: Optional[Sequence[str]] = None,
+        markups: Optional[Sequence[float]] = None,
+        chunk_size: int = 1 << 20,
+    ) -> Dict[str, Any]:
+        """
+        Total the token cost of a usage log under many pricing scenarios at once.
+
+        Raw costs are computed once; each scenario then only re-applies markup,
+        thinking-model surcharge and minimum charge. Rows are processed in chunks
+        so memory stays bounded however many scenarios are swept.
+
+        Args:
+            model_ids: Model identifiers, or integer codes into price_matrix.models
+            input_tokens: Input token counts
+            output_tokens: Output token counts
+            tiers: Tiers to price under (default: every tier)
+            markups: Markup percentages to try with each tier instead of the
+                tier's own markup
+            chunk_size: Maximum row x markup cells evaluated at a time
+
+        Returns:
+            dict: total_cost[tier, markup] plus the scenario axes
+        """
+        matrix = self.price_matrix
+        codes, _, _, input_cost, output_cost = self._raw_costs(
+            matrix, model_ids, input_tokens, output_tokens
+        )
+        raw_cost = np.ravel(input_cost + output_cost)
+        thinking = np.ravel(matrix.is_thinking_model[codes])
+
+        tier_names = list(matrix.tiers if tiers is None else tiers)
+        tier_codes = _encode(np.array(tier_names, dtype=object), matrix.tier_index, "tier")
+        if markups is None:
+            markup_grid = matrix.markup_percentage[tier_codes][:, None]
+        else:
+            markup_values = np.asarray(markups, dtype=np.float64)
+            markup_grid = np.broadcast_to(markup_values, (len(tier_names), markup_values.size))
+
+        totals = np.zeros(markup_grid.shape)
+        rows = max(1, chunk_size // markup_grid.shape[1])
+        for start in range(0, raw_cost.size, rows):
+            raw = raw_cost[start : start + rows, None]
+            is_thinking = thinking[start : start + rows, None]
+            for i, tier in enumerate(tier_codes):
+                surcharge = np.where(
+                    is_thinking, (raw * matrix.thinking_model_surcharge[tier]) / 100, 0.0
+                )
+                cost = raw + (raw * markup_grid[i]) / 100 + surcharge
+                minimum = matrix.minimum_charge[tier]
+                cost = np.where((cost < minimum) & (raw > 0), minimum, cost)
+                totals[i] += cost.sum(axis=0)
+
+        return {
+            "tiers": tier_names,
+            "markups": np.array(markup_grid),
+            "rows": int(raw_cost.size),
+            "raw_cost": float(raw_cost.sum()),
+            "total_cost": totals,
+        }
+
     def estimate_monthly_cost(
         self,
         daily_queries: int,
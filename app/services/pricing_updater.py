@@ -12,21 +12,24 @@ It can be run:
 """
 
 import argparse
+import csv
+import hashlib
 import importlib
 import json
 import logging
+import math
 import os
 import re
 import smtplib
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-import pandas as pd
 import requests
 from bs4 import BeautifulSoup
 
@@ -48,9 +51,25 @@ models_path = project_root / "ultra_models.py"
 simulator_path = script_dir / "pricing_simulator.py"
 current_pricing_path = script_dir / "current_pricing.json"
 history_path = script_dir / "pricing_history"
-
-# Ensure history directory exists
-history_path.mkdir(exist_ok=True)
+# ETag / Last-Modified / content hash and parsed rows per provider page
+fetch_cache_path = script_dir / "pricing_fetch_cache.json"
+
+# Provider pricing pages
+OPENAI_PRICING_URL = "https://openai.com/pricing"
+ANTHROPIC_PRICING_URL = "https://www.anthropic.com/api/pricing"
+GOOGLE_PRICING_URL = "https://cloud.google.com/vertex-ai/pricing"
+
+# A price as written to the models/simulator files (may use exponent notation)
+NUMBER = r"[\d.]+(?:[eE][-+]?\d+)?"
+
+SCRAPED_COLUMNS = [
+    "Model",
+    "Input Cost per 1K",
+    "Output Cost per 1K",
+    "Total Cost per 1K",
+    "Context Window",
+    "Is Thinking Model",
+]
 
 # Alert settings
 PRICE_CHANGE_THRESHOLD = 0.1  # 10% price change triggers alert
@@ -67,25 +86,75 @@ SMTP_USER = os.environ.get("ULTRAI_SMTP_USER", "")
 SMTP_PASSWORD = os.environ.get("ULTRAI_SMTP_PASSWORD", "")
 
 
+def _is_missing(value: Any) -> bool:
+    """True for empty scraped cells (None, NaN or "N/A")"""
+    return (
+        value is None
+        or value == "N/A"
+        or (isinstance(value, float) and math.isnan(value))
+    )
+
+
 class PricingUpdater:
-    def __init__(self, dry_run: bool = False, force_update: bool = False):
+    def __init__(
+        self,
+        dry_run: bool = False,
+        force_update: bool = False,
+        session: Optional[requests.Session] = None,
+        data_dir: Optional[Path] = None,
+        models_file: Optional[Path] = None,
+        simulator_file: Optional[Path] = None,
+    ):
+        """
+        Args:
+            dry_run: Detect and report changes without writing any file
+            force_update: Write every scraped model even if nothing changed
+            session: HTTP session used for provider pages (injectable for tests)
+            data_dir: Directory holding current pricing, history and the fetch cache
+            models_file: Models file to patch (defaults to ultra_models.py)
+            simulator_file: Pricing simulator to patch
+        """
         self.dry_run = dry_run
         self.force_update = force_update
+        self.session = session or requests.Session()
+        data_dir = Path(data_dir) if data_dir else None
+        self.current_pricing_path = data_dir / "current_pricing.json" if data_dir else current_pricing_path
+        self.history_path = data_dir / "pricing_history" if data_dir else history_path
+        self.fetch_cache_path = data_dir / "pricing_fetch_cache.json" if data_dir else fetch_cache_path
+        self.models_path = Path(models_file) if models_file else models_path
+        self.simulator_path = Path(simulator_file) if simulator_file else simulator_path
         self.current_pricing = self._load_current_pricing()
+        self.fetch_cache = self._load_fetch_cache()
+        self.unchanged_providers = set()  # providers answered 304 or with identical content
         self.updated_pricing = {}
         self.changes = []
         self.anomalies = []  # Track pricing anomalies
 
     def _load_current_pricing(self) -> Dict[str, Any]:
         """Load the current pricing data from file"""
-        if current_pricing_path.exists():
+        if self.current_pricing_path.exists():
             try:
-                with open(current_pricing_path, "r") as f:
+                with open(self.current_pricing_path, "r") as f:
                     return json.load(f)
             except Exception as e:
                 logger.error(f"Error loading current pricing: {e}")
         return {}
 
+    def _load_fetch_cache(self) -> Dict[str, Any]:
+        """Load validators and parsed rows from the previous run"""
+        if self.fetch_cache_path.exists():
+            try:
+                with open(self.fetch_cache_path, "r") as f:
+                    return json.load(f)
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable fetch cache: {e}")
+        return {}
+
+    def _save_fetch_cache(self) -> None:
+        self.fetch_cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.fetch_cache_path, "w") as f:
+            json.dump(self.fetch_cache, f, indent=2)
+
     def run(self) -> bool:
         """Execute the full pricing update workflow"""
         logger.info("Starting pricing update process")
@@ -102,15 +171,12 @@ class PricingUpdater:
 
             # If there are changes or force update is set
             if self.changes or self.force_update:
+                update = self._diff_update()
                 if not self.dry_run:
-                    # Update the models file
-                    self._update_models_file()
-
-                    # Update the pricing simulator
-                    self._update_pricing_simulator()
-
-                    # Save the new pricing data
-                    self._save_pricing_data()
+                    # Patch only the changed models in each file
+                    self._update_models_file(update)
+                    self._update_pricing_simulator(update)
+                    self._save_pricing_data(update)
 
                 # Send alerts for significant changes
                 if self.changes:
@@ -127,51 +193,102 @@ class PricingUpdater:
         except Exception as e:
             logger.error(f"Error during pricing update: {e}", exc_info=True)
             return False
+        finally:
+            if not self.dry_run:
+                try:
+                    self._save_fetch_cache()
+                except Exception as e:
+                    logger.warning(f"Could not save fetch cache: {e}")
 
-    def _scrape_all_providers(self) -> pd.DataFrame:
-        """Scrape pricing data from all providers and return a combined DataFrame"""
+    def _scrape_all_providers(self) -> List[List[Any]]:
+        """Fetch every provider concurrently and return the combined rows in a stable order"""
         logger.info("Scraping pricing from providers")
 
-        pricing_data = []
-        pricing_data.extend(self._fetch_openai_pricing())
-        pricing_data.extend(self._fetch_anthropic_pricing())
-        pricing_data.extend(self._fetch_google_pricing())
-        pricing_data.extend(self._fetch_cohere_pricing())
-        pricing_data.extend(self._fetch_ai21_pricing())
-        pricing_data.extend(self._fetch_aws_bedrock_pricing())
-
-        df = pd.DataFrame(
-            pricing_data,
-            columns=[
-                "Model",
-                "Input Cost per 1K",
-                "Output Cost per 1K",
-                "Total Cost per 1K",
-                "Context Window",
-                "Is Thinking Model",
-            ],
-        )
-
-        # Save raw scraped data for reference
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        df.to_csv(history_path / f"scraped_pricing_{timestamp}.csv", index=False)
+        fetchers: List[Callable[[], List[List[Any]]]] = [
+            self._fetch_openai_pricing,
+            self._fetch_anthropic_pricing,
+            self._fetch_google_pricing,
+            self._fetch_cohere_pricing,
+            self._fetch_ai21_pricing,
+            self._fetch_aws_bedrock_pricing,
+        ]
+        with ThreadPoolExecutor(max_workers=len(fetchers)) as pool:
+            results = list(pool.map(lambda fetch: fetch(), fetchers))
+
+        pricing_data = [row for rows in results for row in rows]
+        if self.unchanged_providers:
+            logger.info(
+                f"Unchanged provider pages (skipped parsing): {sorted(self.unchanged_providers)}"
+            )
+
+        # Save raw scraped data for reference when a page actually changed
+        fetched = {"openai", "anthropic", "google"} - self.unchanged_providers
+        if fetched and not self.dry_run:
+            self.history_path.mkdir(parents=True, exist_ok=True)
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            with open(self.history_path / f"scraped_pricing_{timestamp}.csv", "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(SCRAPED_COLUMNS)
+                writer.writerows(pricing_data)
+
+        return pricing_data
 
-        return df
+    def _conditional_get(
+        self, provider: str, url: str, parse: Callable[[str], List[List[Any]]]
+    ) -> List[List[Any]]:
+        """
+        Fetch a provider page with If-None-Match / If-Modified-Since and parse it.
 
-    def _convert_scraped_data(self, df: pd.DataFrame) -> Dict[str, Dict[str, Any]]:
-        """Convert scraped DataFrame to our internal pricing format"""
+        Returns the rows parsed last time when the server answers 304 or the body
+        hashes to the same content, without parsing again; otherwise parses the
+        new body. An empty list means the page yielded nothing usable.
+        """
+        cached = self.fetch_cache.get(provider) or {}
+        if cached.get("url") != url:
+            cached = {}
+        headers = {}
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+        response = self.session.get(url, headers=headers, timeout=10)
+        if response.status_code == 304 and "rows" in cached:
+            self.unchanged_providers.add(provider)
+            return cached["rows"]
+        response.raise_for_status()
+
+        content_hash = hashlib.sha256(response.content).hexdigest()
+        entry = {
+            "url": url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "content_hash": content_hash,
+        }
+        if content_hash == cached.get("content_hash") and "rows" in cached:
+            self.unchanged_providers.add(provider)
+            self.fetch_cache[provider] = {**entry, "rows": cached["rows"]}
+            return cached["rows"]
+
+        rows = parse(response.text)
+        self.fetch_cache[provider] = {**entry, "rows": rows}
+        return rows
+
+    def _convert_scraped_data(self, rows: List[List[Any]]) -> Dict[str, Dict[str, Any]]:
+        """Convert scraped rows to our internal pricing format"""
         logger.info("Converting scraped data to internal format")
 
         def extract_numeric(value: str) -> float:
             """Extract numeric value from string like '$0.003 per 1K tokens'"""
-            if pd.isna(value) or value == "N/A":
+            if _is_missing(value):
                 return 0.0
-            matches = re.findall(r"[\d.]+", value)
+            # Accept exponent notation too: stored prices round-trip as e.g. "$7.5e-05"
+            matches = re.findall(r"\d*\.?\d+(?:[eE][-+]?\d+)?", str(value))
             return float(matches[0]) if matches else 0.0
 
         def extract_context_window(value: str) -> int:
             """Extract context window size in tokens from string like '8K tokens' or '128k'"""
-            if pd.isna(value) or value == "N/A":
+            if _is_missing(value):
                 return 0
             matches = re.findall(r"(\d+)", value.lower().replace("tokens", "").strip())
             size = int(matches[0]) if matches else 0
@@ -186,7 +303,8 @@ class PricingUpdater:
 
         pricing = {}
 
-        for _, row in df.iterrows():
+        for values in rows:
+            row = dict(zip(SCRAPED_COLUMNS, values))
             model_full_name = row["Model"]
             provider, *model_parts = model_full_name.split(" ", 1)
             model_name = model_parts[0] if model_parts else "Unknown"
@@ -206,8 +324,8 @@ class PricingUpdater:
 
             context_window = extract_context_window(row["Context Window"])
             is_thinking_model = (
-                row["Is Thinking Model"]
-                if not pd.isna(row["Is Thinking Model"])
+                row.get("Is Thinking Model")
+                if not _is_missing(row.get("Is Thinking Model"))
                 else False
             )
 
@@ -486,17 +604,38 @@ class PricingUpdater:
             )
             logger.warning(message)
 
-    def _update_models_file(self) -> None:
-        """Update the ultra_models.py file with new pricing"""
-        logger.info(f"Updating models file at {models_path}")
+    def _diff_update(self) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Build the per-model update to apply: new data for models with a reported
+        change, None for removed models. With force_update every scraped model is
+        included.
+        """
+        update: Dict[str, Optional[Dict[str, Any]]] = {}
+        if self.force_update:
+            update.update(self.updated_pricing)
+        for change in self.changes:
+            model_id = change["model_id"]
+            if change["field"] == "removed_model":
+                update[model_id] = None
+            else:
+                update[model_id] = self.updated_pricing[model_id]
+        return update
+
+    def _update_models_file(self, update: Dict[str, Optional[Dict[str, Any]]]) -> None:
+        """Patch the changed models in the ultra_models.py file"""
+        logger.info(f"Updating models file at {self.models_path}")
 
-        if not models_path.exists():
-            raise FileNotFoundError(f"Models file not found at {models_path}")
+        if not self.models_path.exists():
+            raise FileNotFoundError(f"Models file not found at {self.models_path}")
 
-        with open(models_path, "r") as f:
-            content = f.read()
+        with open(self.models_path, "r") as f:
+            original = f.read()
 
-        for model_id, pricing in self.updated_pricing.items():
+        content = original
+        for model_id, pricing in update.items():
+            # Removed models are left for a human to retire
+            if pricing is None:
+                continue
             # Skip if we don't have complete data
             if not all(
                 k in pricing
@@ -514,17 +653,23 @@ class PricingUpdater:
             # Check if the model exists in the file
             if re.search(pattern, content):
                 # Update existing model
-                self._update_existing_model(model_id, pricing, content)
+                content = self._update_existing_model(model_id, pricing, content)
             else:
                 # TODO: Add code to insert new model configurations
                 logger.warning(
                     f"Model {model_id} not found in models file - would need to add it manually"
                 )
 
+        # Write back once, and only if something changed
+        if content != original and not self.dry_run:
+            with open(self.models_path, "w") as f:
+                f.write(content)
+            logger.info(f"Updated {len(update)} model(s) in models file")
+
     def _update_existing_model(
         self, model_id: str, pricing: Dict[str, Any], content: str
-    ) -> None:
-        """Update an existing model in the models file"""
+    ) -> str:
+        """Return `content` with the ModelConfig block for `model_id` updated"""
 
         # Find the ModelConfig block for this model
         pattern = rf'"{model_id}"\s*:\s*ModelConfig\([^)]+\)'
@@ -535,21 +680,21 @@ class PricingUpdater:
 
             # Update input cost
             model_config = re.sub(
-                r"input_cost_per_1k_tokens\s*=\s*[\d.]+",
+                rf"input_cost_per_1k_tokens\s*=\s*{NUMBER}",
                 f'input_cost_per_1k_tokens={pricing["input_cost_per_1k"]}',
                 model_config,
             )
 
             # Update output cost
             model_config = re.sub(
-                r"output_cost_per_1k_tokens\s*=\s*[\d.]+",
+                rf"output_cost_per_1k_tokens\s*=\s*{NUMBER}",
                 f'output_cost_per_1k_tokens={pricing["output_cost_per_1k"]}',
                 model_config,
             )
 
             # Update total cost
             model_config = re.sub(
-                r"cost_per_1k_tokens\s*=\s*[\d.]+",
+                rf"(?<!\w)cost_per_1k_tokens\s*=\s*{NUMBER}",
                 f'cost_per_1k_tokens={pricing["total_cost_per_1k"]}',
                 model_config,
             )
@@ -572,22 +717,18 @@ class PricingUpdater:
                 )
 
             # Replace in full content
-            updated_content = content.replace(match.group(0), model_config)
+            return content.replace(match.group(0), model_config)
 
-            # Write back to file if not in dry run mode
-            if not self.dry_run:
-                with open(models_path, "w") as f:
-                    f.write(updated_content)
-                logger.info(f"Updated model {model_id} in models file")
+        return content
 
-    def _update_pricing_simulator(self) -> None:
-        """Update the pricing simulator with new pricing data"""
-        logger.info(f"Updating pricing simulator at {simulator_path}")
+    def _update_pricing_simulator(self, update: Dict[str, Optional[Dict[str, Any]]]) -> None:
+        """Patch the changed models in the pricing simulator"""
+        logger.info(f"Updating pricing simulator at {self.simulator_path}")
 
-        if not simulator_path.exists():
-            raise FileNotFoundError(f"Pricing simulator not found at {simulator_path}")
+        if not self.simulator_path.exists():
+            raise FileNotFoundError(f"Pricing simulator not found at {self.simulator_path}")
 
-        with open(simulator_path, "r") as f:
+        with open(self.simulator_path, "r") as f:
             content = f.read()
 
         # Find the model_pricing dictionary in the file
@@ -598,8 +739,10 @@ class PricingUpdater:
             # Extract the model pricing block
             pricing_block = match.group(0)
 
-            # Loop through updated models and update each one
-            for model_id, pricing in self.updated_pricing.items():
+            # Loop through changed models and update each one
+            for model_id, pricing in update.items():
+                if pricing is None:
+                    continue
                 # Skip if we don't have complete data
                 if not all(
                     k in pricing
@@ -621,21 +764,21 @@ class PricingUpdater:
 
                     # Update input cost
                     model_block = re.sub(
-                        r'"input_cost_per_1k"\s*:\s*[\d.]+',
+                        rf'"input_cost_per_1k"\s*:\s*{NUMBER}',
                         f'"input_cost_per_1k": {pricing["input_cost_per_1k"]}',
                         model_block,
                     )
 
                     # Update output cost
                     model_block = re.sub(
-                        r'"output_cost_per_1k"\s*:\s*[\d.]+',
+                        rf'"output_cost_per_1k"\s*:\s*{NUMBER}',
                         f'"output_cost_per_1k": {pricing["output_cost_per_1k"]}',
                         model_block,
                     )
 
                     # Update total cost
                     model_block = re.sub(
-                        r'"total_cost_per_1k"\s*:\s*[\d.]+',
+                        rf'"total_cost_per_1k"\s*:\s*{NUMBER}',
                         f'"total_cost_per_1k": {pricing["total_cost_per_1k"]}',
                         model_block,
                     )
@@ -670,31 +813,42 @@ class PricingUpdater:
             # Replace entire pricing block in the content
             updated_content = content.replace(match.group(0), pricing_block)
 
-            # Write back to file if not in dry run mode
-            if not self.dry_run:
-                with open(simulator_path, "w") as f:
+            # Write back to file only if something changed
+            if updated_content != content and not self.dry_run:
+                with open(self.simulator_path, "w") as f:
                     f.write(updated_content)
                 logger.info(f"Updated pricing in simulator file")
 
-    def _save_pricing_data(self) -> None:
-        """Save the updated pricing data to file"""
+    def _save_pricing_data(self, update: Dict[str, Optional[Dict[str, Any]]]) -> None:
+        """Apply the per-model update to the saved pricing data"""
+        if not update:
+            return
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.history_path.mkdir(parents=True, exist_ok=True)
 
         # Save the current pricing as historical data
         if self.current_pricing:
-            history_file = history_path / f"pricing_{timestamp}.json"
+            history_file = self.history_path / f"pricing_{timestamp}.json"
             with open(history_file, "w") as f:
                 json.dump(self.current_pricing, f, indent=2)
 
+        pricing = dict(self.current_pricing)
+        for model_id, data in update.items():
+            if data is None:
+                pricing.pop(model_id, None)
+            else:
+                pricing[model_id] = data
+
         # Save the updated pricing as current
-        with open(current_pricing_path, "w") as f:
-            json.dump(self.updated_pricing, f, indent=2)
+        with open(self.current_pricing_path, "w") as f:
+            json.dump(pricing, f, indent=2)
+        self.current_pricing = pricing
 
-        logger.info(f"Saved updated pricing data to {current_pricing_path}")
+        logger.info(f"Saved {len(update)} pricing update(s) to {self.current_pricing_path}")
 
         # Save changes log
         if self.changes:
-            changes_file = history_path / f"changes_{timestamp}.json"
+            changes_file = self.history_path / f"changes_{timestamp}.json"
             with open(changes_file, "w") as f:
                 json.dump(self.changes, f, indent=2)
             logger.info(f"Saved changes log to {changes_file}")
@@ -878,57 +1032,9 @@ class PricingUpdater:
     def _fetch_openai_pricing(self) -> List[List[Any]]:
         """Scrape OpenAI pricing from the official pricing page"""
         try:
-            url = "https://openai.com/pricing"
-            response = requests.get(url, timeout=10)
-            soup = BeautifulSoup(response.text, "html.parser")
-
-            pricing_data = []
-
-            # Example implementation - needs to be tailored to the actual HTML structure
-            pricing_sections = soup.find_all("div", class_="pricing-table")
-            for section in pricing_sections:
-                model_rows = section.find_all("tr")
-                for row in model_rows:
-                    try:
-                        cells = row.find_all("td")
-                        if not cells or len(cells) < 3:
-                            continue
-
-                        model_name = cells[0].get_text(strip=True)
-                        if not model_name:
-                            continue
-
-                        # Try to extract pricing data
-                        input_price = (
-                            cells[1].get_text(strip=True) if len(cells) > 1 else "N/A"
-                        )
-                        output_price = (
-                            cells[2].get_text(strip=True) if len(cells) > 2 else "N/A"
-                        )
-                        total_price = "N/A"  # Calculate later
-                        context = (
-                            cells[3].get_text(strip=True) if len(cells) > 3 else "N/A"
-                        )
-
-                        # Determine if it's a thinking model
-                        is_thinking = (
-                            "gpt-4" in model_name.lower()
-                            and not "mini" in model_name.lower()
-                            or "o1" in model_name.lower()
-                        )
-
-                        pricing_data.append(
-                            [
-                                f"OpenAI {model_name}",
-                                input_price,
-                                output_price,
-                                total_price,
-                                context,
-                                is_thinking,
-                            ]
-                        )
-                    except Exception as e:
-                        logger.warning(f"Error parsing OpenAI row: {e}")
+            pricing_data = self._conditional_get(
+                "openai", OPENAI_PRICING_URL, self._parse_openai_pricing
+            )
 
             if not pricing_data:
                 logger.warning(
@@ -1007,57 +1113,9 @@ class PricingUpdater:
     def _fetch_anthropic_pricing(self) -> List[List[Any]]:
         """Scrape Anthropic pricing from the official pricing page"""
         try:
-            url = "https://www.anthropic.com/api/pricing"
-            response = requests.get(url, timeout=10)
-            soup = BeautifulSoup(response.text, "html.parser")
-
-            pricing_data = []
-
-            # Example implementation - needs to be tailored to the actual HTML structure
-            pricing_tables = soup.find_all("table")
-            for table in pricing_tables:
-                rows = table.find_all("tr")
-                for row in rows:
-                    try:
-                        cells = row.find_all("td")
-                        if not cells or len(cells) < 3:
-                            continue
-
-                        model_name = cells[0].get_text(strip=True)
-                        if not model_name or model_name == "Model":
-                            continue
-
-                        # Try to extract pricing data
-                        input_price = (
-                            cells[1].get_text(strip=True) if len(cells) > 1 else "N/A"
-                        )
-                        output_price = (
-                            cells[2].get_text(strip=True) if len(cells) > 2 else "N/A"
-                        )
-                        total_price = "N/A"  # Calculate later
-                        context = (
-                            cells[3].get_text(strip=True) if len(cells) > 3 else "N/A"
-                        )
-
-                        # Determine if it's a thinking model
-                        is_thinking = (
-                            "opus" in model_name.lower()
-                            or "sonnet" in model_name.lower()
-                            and "3.7" in model_name
-                        )
-
-                        pricing_data.append(
-                            [
-                                "Anthropic " + model_name,
-                                input_price,
-                                output_price,
-                                total_price,
-                                context,
-                                is_thinking,
-                            ]
-                        )
-                    except Exception as e:
-                        logger.warning(f"Error parsing Anthropic row: {e}")
+            pricing_data = self._conditional_get(
+                "anthropic", ANTHROPIC_PRICING_URL, self._parse_anthropic_pricing
+            )
 
             if not pricing_data:
                 logger.warning(
@@ -1075,14 +1133,9 @@ class PricingUpdater:
     def _fetch_google_pricing(self) -> List[List[Any]]:
         """Scrape Google pricing from the official pricing page"""
         try:
-            url = "https://cloud.google.com/vertex-ai/pricing"
-            response = requests.get(url, timeout=10)
-            soup = BeautifulSoup(response.text, "html.parser")
-
-            pricing_data = []
-
-            # Example implementation - similar to other implementations
-            # ... (code to scrape Google's pricing page)
+            pricing_data = self._conditional_get(
+                "google", GOOGLE_PRICING_URL, self._parse_google_pricing
+            )
 
             # If scraping fails, use current pricing
             if not pricing_data:
@@ -1097,6 +1150,118 @@ class PricingUpdater:
             # Default to current pricing
             return self._get_current_provider_pricing("google")
 
+    def _parse_openai_pricing(self, html: str) -> List[List[Any]]:
+        """Extract pricing rows from the OpenAI pricing page"""
+        soup = BeautifulSoup(html, "html.parser")
+        pricing_data = []
+
+        # Example implementation - needs to be tailored to the actual HTML structure
+        pricing_sections = soup.find_all("div", class_="pricing-table")
+        for section in pricing_sections:
+            model_rows = section.find_all("tr")
+            for row in model_rows:
+                try:
+                    cells = row.find_all("td")
+                    if not cells or len(cells) < 3:
+                        continue
+
+                    model_name = cells[0].get_text(strip=True)
+                    if not model_name:
+                        continue
+
+                    # Try to extract pricing data
+                    input_price = (
+                        cells[1].get_text(strip=True) if len(cells) > 1 else "N/A"
+                    )
+                    output_price = (
+                        cells[2].get_text(strip=True) if len(cells) > 2 else "N/A"
+                    )
+                    total_price = "N/A"  # Calculate later
+                    context = (
+                        cells[3].get_text(strip=True) if len(cells) > 3 else "N/A"
+                    )
+
+                    # Determine if it's a thinking model
+                    is_thinking = (
+                        "gpt-4" in model_name.lower()
+                        and not "mini" in model_name.lower()
+                        or "o1" in model_name.lower()
+                    )
+
+                    pricing_data.append(
+                        [
+                            f"OpenAI {model_name}",
+                            input_price,
+                            output_price,
+                            total_price,
+                            context,
+                            is_thinking,
+                        ]
+                    )
+                except Exception as e:
+                    logger.warning(f"Error parsing OpenAI row: {e}")
+
+        return pricing_data
+
+    def _parse_anthropic_pricing(self, html: str) -> List[List[Any]]:
+        """Extract pricing rows from the Anthropic pricing page"""
+        soup = BeautifulSoup(html, "html.parser")
+        pricing_data = []
+
+        # Example implementation - needs to be tailored to the actual HTML structure
+        pricing_tables = soup.find_all("table")
+        for table in pricing_tables:
+            rows = table.find_all("tr")
+            for row in rows:
+                try:
+                    cells = row.find_all("td")
+                    if not cells or len(cells) < 3:
+                        continue
+
+                    model_name = cells[0].get_text(strip=True)
+                    if not model_name or model_name == "Model":
+                        continue
+
+                    # Try to extract pricing data
+                    input_price = (
+                        cells[1].get_text(strip=True) if len(cells) > 1 else "N/A"
+                    )
+                    output_price = (
+                        cells[2].get_text(strip=True) if len(cells) > 2 else "N/A"
+                    )
+                    total_price = "N/A"  # Calculate later
+                    context = (
+                        cells[3].get_text(strip=True) if len(cells) > 3 else "N/A"
+                    )
+
+                    # Determine if it's a thinking model
+                    is_thinking = (
+                        "opus" in model_name.lower()
+                        or "sonnet" in model_name.lower()
+                        and "3.7" in model_name
+                    )
+
+                    pricing_data.append(
+                        [
+                            "Anthropic " + model_name,
+                            input_price,
+                            output_price,
+                            total_price,
+                            context,
+                            is_thinking,
+                        ]
+                    )
+                except Exception as e:
+                    logger.warning(f"Error parsing Anthropic row: {e}")
+
+        return pricing_data
+
+    def _parse_google_pricing(self, html: str) -> List[List[Any]]:
+        """Extract pricing rows from the Vertex AI pricing page"""
+        # Example implementation - similar to other implementations
+        # ... (code to scrape Google's pricing page)
+        return []
+
     def _fetch_cohere_pricing(self) -> List[List[Any]]:
         """Scrape Cohere pricing information"""
         try:
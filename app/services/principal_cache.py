@@ -0,0 +1,198 @@
+"""
+Authenticated-principal cache.
+
+CombinedAuthMiddleware resolves a bearer token or API key to a user once and
+keeps the result here, keyed by a hash of the credential, so repeat requests
+skip JWT verification and the database round-trip. An entry never outlives
+the token's own `exp`, and is dropped explicitly when a token is revoked or
+the user's credentials change.
+
+Invalidation is per process: other workers stop serving a revoked credential
+when their entry's TTL runs out, so keep AUTH_PRINCIPAL_CACHE_TTL short.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Set
+
+from app.config import Config
+from app.utils.logging import get_logger
+
+logger = get_logger("principal_cache")
+
+
+def credential_key(kind: str, credential: str) -> str:
+    """Cache key for a raw credential; the credential itself is never stored."""
+    return f"{kind}:{hashlib.sha256(credential.encode('utf-8')).hexdigest()}"
+
+
+class Principal:
+    """An authenticated user as resolved from one credential."""
+
+    __slots__ = ("user", "user_id", "jti", "expires_at")
+
+    def __init__(self, user: Any, user_id: str, jti: Optional[str], expires_at: float):
+        self.user = user
+        self.user_id = user_id
+        self.jti = jti
+        self.expires_at = expires_at
+
+
+class PrincipalCache:
+    """LRU + TTL cache of principals with per-token and per-user invalidation."""
+
+    def __init__(
+        self,
+        ttl: float = 60.0,
+        max_entries: int = 10000,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Args:
+            ttl: Longest time (seconds) a principal is served without re-checking;
+                0 disables the cache
+            max_entries: Least recently used entries are evicted past this size
+            clock: Wall clock, comparable with JWT `exp` claims
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+        self._entries: "OrderedDict[str, Principal]" = OrderedDict()
+        self._keys_by_user: Dict[str, Set[str]] = {}
+        self._keys_by_jti: Dict[str, str] = {}
+        # Revoked token ids, kept until the token would have expired anyway
+        self._revoked: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def get(self, key: str) -> Optional[Principal]:
+        """The cached principal for `key`, or None if absent, expired or revoked."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            principal = self._entries.get(key)
+            if principal is None:
+                self.stats["misses"] += 1
+                return None
+            if principal.expires_at <= self.clock():
+                self._remove(key)
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return principal
+
+    def put(
+        self,
+        key: str,
+        user: Any,
+        user_id: str,
+        jti: Optional[str] = None,
+        token_expires_at: Optional[float] = None,
+    ) -> None:
+        """Cache a principal until the TTL or the token's expiry, whichever is sooner."""
+        if not self.enabled:
+            return
+        now = self.clock()
+        expires_at = now + self.ttl
+        if token_expires_at is not None:
+            expires_at = min(expires_at, token_expires_at)
+        if expires_at <= now:
+            return
+        with self._lock:
+            if jti is not None and jti in self._revoked:
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = Principal(user, str(user_id), jti, expires_at)
+            self._keys_by_user.setdefault(str(user_id), set()).add(key)
+            if jti is not None:
+                self._keys_by_jti[jti] = key
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.stats["evictions"] += 1
+
+    def is_revoked(self, jti: Optional[str]) -> bool:
+        if jti is None or not self._revoked:
+            return False
+        with self._lock:
+            expires_at = self._revoked.get(jti)
+            if expires_at is None:
+                return False
+            if expires_at <= self.clock():
+                del self._revoked[jti]
+                return False
+            return True
+
+    def revoke_token(self, jti: str, expires_at: Optional[float] = None) -> None:
+        """Stop accepting the token with this `jti` (logout); remembered until `expires_at`."""
+        with self._lock:
+            self._revoked[jti] = expires_at if expires_at is not None else self.clock() + self.ttl
+            key = self._keys_by_jti.get(jti)
+            if key is not None:
+                self._remove(key)
+                self.stats["invalidations"] += 1
+            self._prune_revoked()
+
+    def invalidate(self, key: str) -> None:
+        """Drop one credential's entry."""
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+                self.stats["invalidations"] += 1
+
+    def invalidate_user(self, user_id: Any) -> None:
+        """Drop every cached credential of a user, e.g. after a key revocation or password change."""
+        with self._lock:
+            keys = self._keys_by_user.get(str(user_id), set()).copy()
+            for key in keys:
+                self._remove(key)
+            self.stats["invalidations"] += len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+            self._keys_by_jti.clear()
+            self._revoked.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, key: str) -> None:
+        principal = self._entries.pop(key)
+        keys = self._keys_by_user.get(principal.user_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[principal.user_id]
+        if principal.jti is not None and self._keys_by_jti.get(principal.jti) == key:
+            del self._keys_by_jti[principal.jti]
+
+    def _prune_revoked(self) -> None:
+        now = self.clock()
+        expired = [jti for jti, at in self._revoked.items() if at <= now]
+        for jti in expired:
+            del self._revoked[jti]
+
+
+# Global cache shared by the auth middleware and the places that revoke credentials
+_principal_cache: Optional[PrincipalCache] = None
+
+
+def get_principal_cache() -> PrincipalCache:
+    """Get the process-wide principal cache."""
+    global _principal_cache
+    if _principal_cache is None:
+        _principal_cache = PrincipalCache(
+            ttl=Config.AUTH_PRINCIPAL_CACHE_TTL,
+            max_entries=Config.AUTH_PRINCIPAL_CACHE_MAX_ENTRIES,
+        )
+    return _principal_cache
@@ -6,10 +6,11 @@ ensuring smooth failover to alternative providers.
 """
 
 import os
-from typing import List, Dict, Optional, Set
+from typing import List, Dict, Optional
 from dataclasses import dataclass
 from enum import Enum
 
+from app.services.provider_quota import ProviderQuotaManager, get_quota_manager
 from app.utils.logging import get_logger
 
 logger = get_logger("provider_fallback_manager")
@@ -29,7 +30,6 @@ class ProviderConfig:
     name: str
     priority: ProviderPriority
     models: List[str]
-    rate_limited: bool = False
     api_key_configured: bool = False
 
 
@@ -44,10 +44,11 @@ class ProviderFallbackManager:
         "huggingface": ProviderPriority.BACKUP
     }
 
-    def __init__(self):
+    def __init__(self, quota_manager: Optional[ProviderQuotaManager] = None):
         """Initialize the provider fallback manager."""
         self._providers = self._initialize_providers()
-        self._rate_limited_providers: Set[str] = set()
+        # Rate-limit state lives in the shared quota manager so it expires on its own
+        self._quota = quota_manager or get_quota_manager()
         
     def _initialize_providers(self) -> Dict[str, ProviderConfig]:
         """Initialize provider configurations based on environment."""
@@ -105,19 +106,21 @@ class ProviderFallbackManager:
         
         return self.DEFAULT_PRIORITIES.get(provider, ProviderPriority.BACKUP)
     
-    def mark_rate_limited(self, provider: str) -> None:
-        """Mark a provider as rate limited."""
-        self._rate_limited_providers.add(provider)
+    def mark_rate_limited(self, provider: str, retry_after: Optional[float] = None) -> None:
+        """Mark a provider as rate limited for ``retry_after`` seconds (default block otherwise)."""
+        self._quota.block_provider(provider, retry_after)
         if provider in self._providers:
-            self._providers[provider].rate_limited = True
             logger.warning(f"Provider {provider} marked as rate limited")
     
     def clear_rate_limit(self, provider: str) -> None:
         """Clear rate limit status for a provider."""
-        self._rate_limited_providers.discard(provider)
+        self._quota.unblock_provider(provider)
         if provider in self._providers:
-            self._providers[provider].rate_limited = False
             logger.info(f"Rate limit cleared for provider {provider}")
+
+    def is_rate_limited(self, provider: str, model: Optional[str] = None) -> bool:
+        """Whether the provider (or its quota for ``model``) is currently exhausted."""
+        return not self._quota.available(provider, model)
     
     def get_available_providers(self, exclude_rate_limited: bool = True) -> List[str]:
         """Get list of available providers sorted by priority."""
@@ -125,7 +128,7 @@ class ProviderFallbackManager:
         
         for provider, config in self._providers.items():
             if config.api_key_configured:
-                if not exclude_rate_limited or not config.rate_limited:
+                if not exclude_rate_limited or not self.is_rate_limited(provider):
                     available.append((provider, config.priority.value))
         
         # Sort by priority (lower value = higher priority)
@@ -161,6 +164,19 @@ class ProviderFallbackManager:
         logger.info(f"Fallback models for {original_provider}: {fallback_models[:model_count]}")
         return fallback_models[:model_count]
     
+    def get_hedge_models(self, original_provider: str, exclude: Optional[List[str]] = None) -> List[str]:
+        """Get backup models on other healthy providers, without marking anything rate limited."""
+        excluded = set(exclude or [])
+        candidates = []
+        for provider in self.get_available_providers(exclude_rate_limited=True):
+            if provider == original_provider:
+                continue
+            for model in self._providers[provider].models:
+                if model not in excluded:
+                    candidates.append(model)
+                    break
+        return candidates
+
     def get_provider_for_model(self, model: str) -> Optional[str]:
         """Get the provider for a specific model."""
         for provider, config in self._providers.items():
@@ -195,7 +211,7 @@ class ProviderFallbackManager:
                 name: config.priority.name 
                 for name, config in self._providers.items()
             },
-            "rate_limited_providers": list(self._rate_limited_providers),
+            "rate_limited_providers": self._quota.blocked_providers(),
             "recommendations": []
         }
         
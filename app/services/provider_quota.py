@@ -0,0 +1,383 @@
+"""
+Provider quota tracking from rate-limit response headers.
+
+Providers report their remaining quota on every response:
+
+    OpenAI     x-ratelimit-{limit,remaining,reset}-{requests,tokens}
+    Anthropic  anthropic-ratelimit-{requests,tokens,input-tokens,output-tokens}-{limit,remaining,reset}
+    all        retry-after (on 429)
+
+``ProviderQuotaManager`` mirrors those quotas as token buckets per
+(provider, API key, model). Before dispatch, adapters reserve one request
+and an estimate of the tokens; when a bucket cannot cover the reservation
+the call fails fast with ``QuotaExhausted`` instead of being sent only to
+come back as a 429. After the response, the reservation is settled against
+the actual usage and the buckets are re-synced to the provider's figures.
+
+Provider-wide blocks (set by the fallback manager when it detects a 429)
+steer model routing and expire on their own, so a provider is not excluded
+forever after one burst.
+"""
+
+import hashlib
+import re
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import Config
+from app.utils.logging import get_logger
+
+try:
+    from prometheus_client import Counter
+
+    ULTRA_QUOTA_REJECTIONS = Counter(
+        "ultra_provider_quota_rejections_total",
+        "Requests failed fast because a provider quota bucket was empty",
+        ["provider", "bucket"],
+    )
+except Exception:  # pragma: no cover - metrics are optional
+    ULTRA_QUOTA_REJECTIONS = None
+
+logger = get_logger("provider_quota")
+
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+# (header prefix, bucket) pairs per provider; fields are limit/remaining/reset
+_OPENAI_BUCKETS = {"requests": "requests", "tokens": "tokens"}
+_ANTHROPIC_BUCKETS = {
+    "requests": "requests",
+    "tokens": "tokens",
+    "input-tokens": "input_tokens",
+    "output-tokens": "output_tokens",
+}
+
+
+class QuotaExhausted(Exception):
+    """Raised when a reservation cannot be covered by the known quota."""
+
+    def __init__(self, provider: str, model: str, bucket: str, retry_after: float):
+        super().__init__(
+            f"{provider} quota for {model} exhausted ({bucket}); retry in {retry_after:.1f}s"
+        )
+        self.provider = provider
+        self.model = model
+        self.bucket = bucket
+        self.retry_after = retry_after
+
+
+def parse_reset(value: str, now: Optional[float] = None) -> Optional[float]:
+    """Seconds until reset from ``"6m0s"``/``"20ms"``, plain seconds, or an RFC 3339/HTTP date."""
+    value = value.strip()
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    matches = _DURATION_RE.findall(value)
+    if matches and "".join(n + u for n, u in matches) == value:
+        return sum(float(n) * _DURATION_UNITS[u] for n, u in matches)
+    now = time.time() if now is None else now
+    try:
+        reset_at = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        try:
+            reset_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+    if reset_at.tzinfo is None:
+        reset_at = reset_at.replace(tzinfo=timezone.utc)
+    return max(0.0, reset_at.timestamp() - now)
+
+
+def _header(headers: Any, name: str) -> Optional[str]:
+    try:
+        value = headers.get(name)
+    except Exception:
+        return None
+    return value if isinstance(value, str) else None
+
+
+def parse_rate_limit_headers(
+    provider: str, headers: Any
+) -> Dict[str, Tuple[Optional[int], Optional[int], Optional[float]]]:
+    """Map bucket name -> (limit, remaining, reset_seconds) from response headers."""
+    if provider == "openai":
+        names = {
+            bucket: (
+                f"x-ratelimit-limit-{suffix}",
+                f"x-ratelimit-remaining-{suffix}",
+                f"x-ratelimit-reset-{suffix}",
+            )
+            for suffix, bucket in _OPENAI_BUCKETS.items()
+        }
+    elif provider == "anthropic":
+        names = {
+            bucket: (
+                f"anthropic-ratelimit-{prefix}-limit",
+                f"anthropic-ratelimit-{prefix}-remaining",
+                f"anthropic-ratelimit-{prefix}-reset",
+            )
+            for prefix, bucket in _ANTHROPIC_BUCKETS.items()
+        }
+    else:
+        return {}
+
+    buckets = {}
+    for bucket, (limit_h, remaining_h, reset_h) in names.items():
+        remaining = _header(headers, remaining_h)
+        if remaining is None:
+            continue
+        limit = _header(headers, limit_h)
+        reset = _header(headers, reset_h)
+        try:
+            buckets[bucket] = (
+                int(float(limit)) if limit is not None else None,
+                int(float(remaining)),
+                parse_reset(reset) if reset is not None else None,
+            )
+        except ValueError:
+            continue
+    return buckets
+
+
+def estimate_tokens(prompt: str, max_output_tokens: int) -> Tuple[int, int]:
+    """Rough (input, output) token estimate: ~4 characters per token."""
+    return len(prompt) // 4 + 1, max_output_tokens
+
+
+@dataclass
+class TokenBucket:
+    """Continuously refilling bucket mirroring one provider quota."""
+
+    capacity: float
+    tokens: float
+    refill_per_second: float
+    updated: float = field(default_factory=time.monotonic)
+    # Reserved but not yet settled; the provider's "remaining" does not include them yet
+    outstanding: float = 0.0
+
+    def refill(self, now: float) -> None:
+        if now > self.updated:
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self.updated) * self.refill_per_second
+            )
+            self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        if self.tokens >= amount:
+            return 0.0
+        if self.refill_per_second <= 0:
+            return float("inf")
+        return (amount - self.tokens) / self.refill_per_second
+
+    def sync(self, limit: Optional[int], remaining: int, reset: Optional[float], now: float) -> None:
+        if limit:
+            self.capacity = float(limit)
+        self.tokens = max(0.0, remaining - self.outstanding)
+        deficit = self.capacity - remaining
+        if reset:
+            self.refill_per_second = max(deficit, 0.0) / reset
+        elif deficit <= 0:
+            self.refill_per_second = self.capacity / 60.0
+        self.updated = now
+
+
+@dataclass
+class QuotaReservation:
+    """Amounts taken from each bucket for one in-flight request."""
+
+    provider: str
+    key_id: str
+    model: str
+    amounts: Dict[str, float]
+
+
+class ProviderQuotaManager:
+    """Header-driven request/token buckets per (provider, API key, model)."""
+
+    def __init__(self, default_block_seconds: float = 60.0):
+        self.default_block_seconds = default_block_seconds
+        self._buckets: Dict[Tuple[str, str, str], Dict[str, TokenBucket]] = {}
+        self._blocked_until: Dict[Tuple[str, str, str], float] = {}
+        self._provider_blocked_until: Dict[str, float] = {}
+        self.stats = {"reservations": 0, "rejections": 0, "syncs": 0, "rate_limited": 0}
+
+    @staticmethod
+    def key_id(api_key: Optional[str]) -> str:
+        """Stable, non-reversible identifier so raw API keys are never held here."""
+        if not api_key:
+            return "default"
+        return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:12]
+
+    # Provider-wide blocks -------------------------------------------------
+
+    def block_provider(self, provider: str, seconds: Optional[float] = None) -> None:
+        seconds = self.default_block_seconds if seconds is None else seconds
+        self._provider_blocked_until[provider] = time.monotonic() + seconds
+
+    def unblock_provider(self, provider: str) -> None:
+        self._provider_blocked_until.pop(provider, None)
+        for key in [k for k in self._blocked_until if k[0] == provider]:
+            del self._blocked_until[key]
+
+    def provider_retry_after(self, provider: str) -> float:
+        until = self._provider_blocked_until.get(provider)
+        if until is None:
+            return 0.0
+        remaining = until - time.monotonic()
+        if remaining <= 0:
+            del self._provider_blocked_until[provider]
+            return 0.0
+        return remaining
+
+    def blocked_providers(self) -> List[str]:
+        return [p for p in list(self._provider_blocked_until) if self.provider_retry_after(p) > 0]
+
+    def available(self, provider: str, model: Optional[str] = None) -> bool:
+        """False while the provider (or every known key for ``model``) is blocked or empty."""
+        if self.provider_retry_after(provider) > 0:
+            return False
+        if model is None:
+            return True
+        now = time.monotonic()
+        states = [
+            k
+            for k in self._buckets.keys() | self._blocked_until.keys()
+            if k[0] == provider and k[2] == model
+        ]
+        if not states:
+            return True
+        return any(self._retry_after(k, {"requests": 1.0}, now)[1] == 0.0 for k in states)
+
+    # Reservations ---------------------------------------------------------
+
+    def reserve(
+        self,
+        provider: str,
+        api_key: Optional[str],
+        model: str,
+        input_tokens: int = 0,
+        output_tokens: int = 0,
+    ) -> QuotaReservation:
+        """Take one request plus the estimated tokens, or raise ``QuotaExhausted``."""
+        key = (provider, self.key_id(api_key), model)
+        amounts = {
+            "requests": 1.0,
+            "tokens": float(input_tokens + output_tokens),
+            "input_tokens": float(input_tokens),
+            "output_tokens": float(output_tokens),
+        }
+        now = time.monotonic()
+        # Provider-wide blocks only steer routing; dispatch is gated by this key's buckets
+        bucket_name, wait = self._retry_after(key, amounts, now)
+        if wait > 0:
+            self.stats["rejections"] += 1
+            if ULTRA_QUOTA_REJECTIONS:
+                ULTRA_QUOTA_REJECTIONS.labels(provider=provider, bucket=bucket_name).inc()
+            raise QuotaExhausted(provider, model, bucket_name, wait)
+
+        buckets = self._buckets.get(key, {})
+        taken = {}
+        for name, bucket in buckets.items():
+            amount = min(amounts.get(name, 0.0), bucket.capacity)
+            bucket.tokens -= amount
+            bucket.outstanding += amount
+            taken[name] = amount
+        self.stats["reservations"] += 1
+        return QuotaReservation(provider, key[1], model, taken)
+
+    def _retry_after(
+        self, key: Tuple[str, str, str], amounts: Dict[str, float], now: float
+    ) -> Tuple[str, float]:
+        blocked_until = self._blocked_until.get(key)
+        if blocked_until is not None:
+            if blocked_until > now:
+                return "retry_after", blocked_until - now
+            del self._blocked_until[key]
+        for name, bucket in self._buckets.get(key, {}).items():
+            bucket.refill(now)
+            # A single oversized request may still go out on a full bucket
+            wait = bucket.wait_time(min(amounts.get(name, 0.0), bucket.capacity))
+            if wait > 0:
+                return name, wait
+        return "", 0.0
+
+    def settle(
+        self,
+        reservation: Optional[QuotaReservation],
+        headers: Any = None,
+        status_code: Optional[int] = None,
+        used_tokens: Optional[int] = None,
+    ) -> None:
+        """Finish a reservation and re-sync the buckets from the response."""
+        if reservation is None:
+            return
+        key = (reservation.provider, reservation.key_id, reservation.model)
+        buckets = self._buckets.get(key, {})
+        for name, amount in reservation.amounts.items():
+            bucket = buckets.get(name)
+            if bucket is None:
+                continue
+            bucket.outstanding = max(0.0, bucket.outstanding - amount)
+            if name == "tokens" and used_tokens is not None:
+                # Refund (or charge) the difference between estimate and actual usage
+                bucket.tokens = min(bucket.capacity, bucket.tokens + amount - used_tokens)
+        if headers is not None:
+            self.observe_headers(reservation.provider, key[1], reservation.model, headers)
+            if status_code == 429:
+                self.stats["rate_limited"] += 1
+                retry_after = _header(headers, "retry-after")
+                seconds = parse_reset(retry_after) if retry_after else None
+                if seconds:
+                    self._blocked_until[key] = time.monotonic() + seconds
+
+    def observe_headers(self, provider: str, key_id: str, model: str, headers: Any) -> None:
+        parsed = parse_rate_limit_headers(provider, headers)
+        if not parsed:
+            return
+        now = time.monotonic()
+        buckets = self._buckets.setdefault((provider, key_id, model), {})
+        for name, (limit, remaining, reset) in parsed.items():
+            bucket = buckets.get(name)
+            if bucket is None:
+                capacity = float(limit or remaining or 1)
+                bucket = buckets[name] = TokenBucket(
+                    capacity, float(remaining), capacity / 60.0, now
+                )
+            bucket.sync(limit, remaining, reset, now)
+        self.stats["syncs"] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        buckets = {}
+        for (provider, key_id, model), state in self._buckets.items():
+            for bucket in state.values():
+                bucket.refill(now)
+            buckets[f"{provider}:{key_id}:{model}"] = {
+                name: {
+                    "capacity": b.capacity,
+                    "tokens": round(b.tokens, 1),
+                    "outstanding": b.outstanding,
+                }
+                for name, b in state.items()
+            }
+        return {**self.stats, "blocked_providers": self.blocked_providers(), "buckets": buckets}
+
+
+# Global quota manager shared by adapters and the fallback manager
+_quota_manager: Optional[ProviderQuotaManager] = None
+
+
+def get_quota_manager() -> ProviderQuotaManager:
+    """Get the process-wide ProviderQuotaManager."""
+    global _quota_manager
+    if _quota_manager is None:
+        _quota_manager = ProviderQuotaManager(
+            default_block_seconds=Config.PROVIDER_RATE_LIMIT_BLOCK_SECONDS
+        )
+    return _quota_manager
@@ -2,18 +2,24 @@
 Rate limiting service for the Ultra backend.
 
 This module provides rate limiting functionality using Redis as the storage backend.
-It implements different rate limits based on user subscription tier.
+It implements different rate limits based on user subscription tier. Checks use
+the sliding-window RedisRateLimiter: one atomic Lua round-trip per request, on
+the async Redis client, with a local pre-check for clients well under their limit.
 """
 
+import math
 import os
 import time
 from enum import Enum
 from typing import Dict, Optional, Tuple
 
 import redis
+import redis.asyncio
 from fastapi import Request
 
+from app.config import Config
 from app.database.models.user import SubscriptionTier, User
+from app.services.redis_rate_limiter import RedisRateLimiter
 from app.utils.logging import get_logger
 
 # Set up logger
@@ -155,6 +161,7 @@ class RateLimitResult:
         remaining: int,
         reset_at: int,
         retry_after: Optional[int] = None,
+        enforced: bool = True,
     ):
         """
         Initialize rate limit result
@@ -165,12 +172,14 @@ class RateLimitResult:
             remaining: The number of requests remaining
             reset_at: The time when the rate limit window resets (Unix timestamp)
             retry_after: Seconds to wait before retrying (if rate limited)
+            enforced: False when the limit could not be checked (Redis error)
         """
         self.is_allowed = is_allowed
         self.limit = limit
         self.remaining = remaining
         self.reset_at = reset_at
         self.retry_after = retry_after
+        self.enforced = enforced
 
 
 class RateLimitService:
@@ -178,21 +187,48 @@ class RateLimitService:
 
     def __init__(self):
         """Initialize rate limit service with Redis connection"""
+        self.redis = None
+        self.limiter: Optional[RedisRateLimiter] = None
         try:
-            self.redis = redis.Redis(
+            # Probe synchronously once at startup; checks use the async client
+            redis.Redis(
                 host=REDIS_HOST,
                 port=REDIS_PORT,
                 db=REDIS_DB,
                 password=REDIS_PASSWORD,
-                decode_responses=True,
+            ).ping()
+            self.set_redis(
+                redis.asyncio.Redis(
+                    host=REDIS_HOST,
+                    port=REDIS_PORT,
+                    db=REDIS_DB,
+                    password=REDIS_PASSWORD,
+                    socket_connect_timeout=1,
+                    socket_timeout=1,
+                )
             )
-            # Test connection
-            self.redis.ping()
             logger.info("Connected to Redis for rate limiting")
         except redis.RedisError as e:
             logger.error(f"Error connecting to Redis: {str(e)}")
             logger.warning("Rate limiting will be disabled")
-            self.redis = None
+
+    def set_redis(self, client) -> None:
+        """
+        Use an async Redis client for rate limiting (None disables it)
+
+        Args:
+            client: redis.asyncio client, or None
+        """
+        self.redis = client
+        self.limiter = (
+            RedisRateLimiter(
+                client,
+                local_fraction=Config.RATE_LIMIT_LOCAL_FRACTION,
+                sync_interval=Config.RATE_LIMIT_LOCAL_SYNC_INTERVAL,
+            )
+            if client is not None
+            else None
+        )
 
     def is_enabled(self) -> bool:
         """
@@ -201,7 +237,7 @@ class RateLimitService:
         Returns:
             True if rate limiting is enabled, False otherwise
         """
-        return self.redis is not None
+        return self.limiter is not None
 
     def categorize_request(self, request: Request) -> RateLimitCategory:
         """
@@ -271,23 +307,20 @@ class RateLimitService:
 
         return f"ip:{ip}"
 
-    def build_key(
-        self, identifier: str, category: RateLimitCategory, window_timestamp: int
-    ) -> str:
+    def build_key(self, identifier: str, category: RateLimitCategory) -> str:
         """
         Build a Redis key for rate limiting
 
         Args:
             identifier: Client identifier
             category: Rate limit category
-            window_timestamp: Current window timestamp
 
         Returns:
             Redis key string
         """
-        return f"ratelimit:{identifier}:{category}:{window_timestamp}"
+        return f"ratelimit:{identifier}:{category}"
 
-    def check_rate_limit(
+    async def check_rate_limit(
         self,
         request: Request,
         user: Optional[User] = None,
@@ -330,46 +363,26 @@ class RateLimitService:
 
         window_seconds = TIER_LIMITS[tier].get_window_seconds(interval)
 
-        # Calculate the current window timestamp
-        current_time = int(time.time())
-        window_timestamp = current_time - (current_time % window_seconds)
-        reset_at = window_timestamp + window_seconds
-
         # Get a unique identifier for the client
         identifier = self.get_client_identifier(request, user)
 
         # Build the Redis key
-        key = self.build_key(identifier, category, window_timestamp)
-
-        try:
-            # Increment the counter and get the current count
-            current_count = self.redis.incr(key)
-
-            # Set the expiry if this is a new key
-            if current_count == 1:
-                self.redis.expire(key, window_seconds * 2)  # 2x window to be safe
-
-            # Check if the limit is exceeded
-            is_allowed = current_count <= limit
-            remaining = max(0, limit - current_count)
-
-            # Calculate retry after time if rate limited
-            retry_after = reset_at - current_time if not is_allowed else None
-
-            return RateLimitResult(
-                is_allowed=is_allowed,
-                limit=limit,
-                remaining=remaining,
-                reset_at=reset_at,
-                retry_after=retry_after,
-            )
-
-        except redis.RedisError as e:
-            # Log error and allow the request in case of Redis failure
-            logger.error(f"Redis error during rate limiting: {str(e)}")
-            return RateLimitResult(
-                is_allowed=True, limit=limit, remaining=limit, reset_at=reset_at
-            )
+        key = self.build_key(identifier, category)
+
+        # One round-trip (or none, for clients well under their limit);
+        # Redis errors are logged and the request is allowed, unenforced
+        decision = await self.limiter.hit(key, limit, window_seconds)
+
+        return RateLimitResult(
+            is_allowed=decision.allowed,
+            limit=limit,
+            remaining=decision.remaining,
+            reset_at=decision.reset_at,
+            retry_after=(
+                None if decision.allowed else max(1, math.ceil(decision.retry_after))
+            ),
+            enforced=decision.enforced,
+        )
 
     def add_rate_limit_headers(self, response: Dict, result: RateLimitResult) -> Dict:
         """
@@ -1,25 +1,276 @@
 """
 Rate Limiter Service
 
-This service manages API rate limits with exponential backoff and dynamic adjustment.
+This service manages API rate limits with continuously refilling token
+buckets. Acquiring a token is O(1) and never holds a lock across an await:
+callers that find the bucket empty join a FIFO waiter queue, and a single
+timer per endpoint wakes the head of the queue when the next token is due.
+Waiters may give up at a deadline or be cancelled without losing anyone's
+place. Failures slow the refill rate (bounded exponential backoff) and
+successes restore it.
+
+It also holds process-wide adaptive concurrency limiters, one per provider
+or model, shared by every request. Each limiter adjusts its concurrency
+limit AIMD-style: it grows additively while calls succeed at full
+utilisation and shrinks multiplicatively on 429s or when latency degrades.
+Callers over the limit wait in a FIFO queue with a deadline.
 """
 
 import asyncio
 import time
-from typing import Dict, Any, Optional
-from dataclasses import dataclass
-from datetime import datetime, timedelta
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, Any, Optional
+from dataclasses import dataclass, field
+
+from app.config import Config
+from app.utils.logging import get_logger
+
+try:
+    from prometheus_client import Counter, Gauge
+
+    ULTRA_CONCURRENCY_LIMIT = Gauge(
+        "ultra_provider_concurrency_limit", "Adaptive concurrency limit", ["key"]
+    )
+    ULTRA_CONCURRENCY_IN_FLIGHT = Gauge(
+        "ultra_provider_concurrency_in_flight", "Calls holding a concurrency slot", ["key"]
+    )
+    ULTRA_CONCURRENCY_QUEUE_DEPTH = Gauge(
+        "ultra_provider_concurrency_queue_depth", "Calls waiting for a concurrency slot", ["key"]
+    )
+    ULTRA_CONCURRENCY_EVENTS = Counter(
+        "ultra_provider_concurrency_events_total",
+        "Adaptive concurrency adjustments and queue timeouts",
+        ["key", "event"],
+    )
+except Exception:  # pragma: no cover - metrics are optional
+    ULTRA_CONCURRENCY_LIMIT = None
+    ULTRA_CONCURRENCY_IN_FLIGHT = None
+    ULTRA_CONCURRENCY_QUEUE_DEPTH = None
+    ULTRA_CONCURRENCY_EVENTS = None
+
+logger = get_logger("rate_limiter")
+
+OUTCOME_SUCCESS = "success"
+OUTCOME_RATE_LIMITED = "rate_limited"
+OUTCOME_ERROR = "error"
+
+
+# Failures halve the refill rate at most this many times over
+MAX_BACKOFF_FACTOR = 32.0
 
 
 @dataclass
 class RateLimit:
-    """Rate limit configuration for an API endpoint."""
+    """Token bucket state for an API endpoint."""
 
     requests_per_minute: int
     burst_limit: int
-    current_requests: int = 0
-    last_reset: datetime = datetime.now()
+    tokens: float = 0.0
+    updated: float = field(default_factory=time.monotonic)
     backoff_factor: float = 1.0
+    # Requests granted in the current one-minute reporting window
+    current_requests: int = 0
+    window_start: float = field(default_factory=time.monotonic)
+    waiters: Deque[asyncio.Future] = field(default_factory=deque)
+    wake_handle: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def refill_per_second(self) -> float:
+        return self.requests_per_minute / 60.0 / self.backoff_factor
+
+    def refill(self, now: float) -> None:
+        if now > self.updated:
+            self.tokens = min(
+                float(self.burst_limit),
+                self.tokens + (now - self.updated) * self.refill_per_second,
+            )
+            self.updated = now
+
+    def take(self, now: float) -> None:
+        self.tokens -= 1.0
+        if now - self.window_start >= 60.0:
+            self.window_start = now
+            self.current_requests = 0
+        self.current_requests += 1
+
+
+class RateLimitTimeout(asyncio.TimeoutError):
+    """Raised when a caller's deadline passes while waiting for a token."""
+
+    def __init__(self, endpoint: str, timeout: Optional[float]):
+        super().__init__(f"Timed out after {timeout}s waiting for a {endpoint} rate limit token")
+        self.endpoint = endpoint
+        self.timeout = timeout
+
+
+class ConcurrencyLimitTimeout(asyncio.TimeoutError):
+    """Raised when a caller's deadline passes while queued for a slot."""
+
+    def __init__(self, key: str, timeout: Optional[float], limit: int = 0, queued: int = 0):
+        super().__init__(
+            f"Timed out after {timeout}s waiting for a {key} concurrency slot "
+            f"(limit={limit}, queued={queued})"
+        )
+        self.key = key
+        self.timeout = timeout
+
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD concurrency limit with a FIFO deadline queue for one key."""
+
+    def __init__(
+        self,
+        key: str,
+        initial_limit: float = 8,
+        min_limit: float = 1,
+        max_limit: float = 64,
+        decrease_factor: float = 0.5,
+        latency_decrease_factor: float = 0.9,
+        latency_tolerance: float = 2.0,
+        latency_window: int = 100,
+        min_latency_samples: int = 20,
+        cooldown: float = 2.0,
+    ):
+        self.key = key
+        self.min_limit = float(min_limit)
+        self.max_limit = float(max_limit)
+        self.limit = min(max(float(initial_limit), self.min_limit), self.max_limit)
+        self.decrease_factor = decrease_factor
+        self.latency_decrease_factor = latency_decrease_factor
+        self.latency_tolerance = latency_tolerance
+        self.min_latency_samples = min_latency_samples
+        self.cooldown = cooldown
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._latencies: Deque[float] = deque(maxlen=latency_window)
+        self._recent_latency: Optional[float] = None
+        self._last_decrease = 0.0
+        self.stats = {
+            "acquired": 0,
+            "queued": 0,
+            "queue_timeouts": 0,
+            "rate_limited": 0,
+            "latency_backoffs": 0,
+        }
+        self._publish()
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for w in self._waiters if not w.done())
+
+    def _has_capacity(self) -> bool:
+        return self.in_flight < max(1, int(self.limit))
+
+    async def acquire(self, timeout: Optional[float] = None) -> None:
+        """Take a slot, waiting in FIFO order for at most ``timeout`` seconds."""
+        if self._has_capacity() and not self.queue_depth:
+            self.in_flight += 1
+            self.stats["acquired"] += 1
+            self._publish()
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.stats["queued"] += 1
+        self._publish()
+        try:
+            await asyncio.wait_for(waiter, timeout)
+        except BaseException as e:
+            if waiter.done() and not waiter.cancelled():
+                # Granted a slot just as we gave up: pass it on
+                self._release_slot()
+            else:
+                waiter.cancel()
+                self._publish()
+            if isinstance(e, asyncio.TimeoutError):
+                self.stats["queue_timeouts"] += 1
+                self._event("queue_timeout")
+                raise ConcurrencyLimitTimeout(
+                    self.key, timeout, int(self.limit), self.queue_depth
+                ) from None
+            raise
+        self.stats["acquired"] += 1
+
+    def release(self, latency: Optional[float] = None, outcome: str = OUTCOME_SUCCESS) -> None:
+        """Free a slot and adapt the limit from the call's outcome and latency."""
+        saturated = self.in_flight >= int(self.limit)
+        now = time.monotonic()
+        if outcome == OUTCOME_RATE_LIMITED:
+            self.stats["rate_limited"] += 1
+            self._decrease(now, self.decrease_factor, "rate_limited")
+        elif outcome == OUTCOME_SUCCESS:
+            if latency is not None and self._latency_degraded(latency):
+                self.stats["latency_backoffs"] += 1
+                self._decrease(now, self.latency_decrease_factor, "latency_backoff")
+            elif saturated:
+                # Additive increase: about +1 per limit's worth of successes
+                self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+        self._release_slot()
+
+    def _latency_degraded(self, latency: float) -> bool:
+        """Compare a short EWMA against the median of the longer window."""
+        self._recent_latency = (
+            latency
+            if self._recent_latency is None
+            else 0.8 * self._recent_latency + 0.2 * latency
+        )
+        self._latencies.append(latency)
+        if len(self._latencies) < self.min_latency_samples:
+            return False
+        ordered = sorted(self._latencies)
+        baseline = ordered[len(ordered) // 2]
+        return baseline > 0 and self._recent_latency > baseline * self.latency_tolerance
+
+    def _decrease(self, now: float, factor: float, event: str) -> None:
+        # One decrease per cooldown: a burst of 429s from the same overload counts once
+        if now - self._last_decrease < self.cooldown:
+            return
+        self._last_decrease = now
+        previous = self.limit
+        self.limit = max(self.min_limit, self.limit * factor)
+        self._event(event)
+        logger.info(
+            f"Concurrency limit for {self.key} reduced {previous:.1f} -> {self.limit:.1f} ({event})"
+        )
+
+    def _release_slot(self) -> None:
+        self.in_flight = max(0, self.in_flight - 1)
+        while self._waiters and self._has_capacity():
+            waiter = self._waiters.popleft()
+            if waiter.done():
+                continue  # timed out or cancelled while queued
+            self.in_flight += 1
+            waiter.set_result(None)
+        self._publish()
+
+    def _event(self, event: str) -> None:
+        if ULTRA_CONCURRENCY_EVENTS:
+            ULTRA_CONCURRENCY_EVENTS.labels(key=self.key, event=event).inc()
+
+    def _publish(self) -> None:
+        if ULTRA_CONCURRENCY_LIMIT:
+            ULTRA_CONCURRENCY_LIMIT.labels(key=self.key).set(int(self.limit))
+            ULTRA_CONCURRENCY_IN_FLIGHT.labels(key=self.key).set(self.in_flight)
+            ULTRA_CONCURRENCY_QUEUE_DEPTH.labels(key=self.key).set(self.queue_depth)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            **self.stats,
+        }
+
+
+class ConcurrencySlot:
+    """Handle yielded by ``RateLimiter.concurrency_slot`` to report the outcome."""
+
+    def __init__(self):
+        self.outcome = OUTCOME_SUCCESS
+
+    def mark(self, outcome: str) -> None:
+        self.outcome = outcome
 
 
 class RateLimiter:
@@ -29,8 +280,53 @@ class RateLimiter:
 
     def __init__(self):
         self._limits: Dict[str, RateLimit] = {}
-        self._locks: Dict[str, asyncio.Lock] = {}
-        self._backoff_times: Dict[str, float] = {}
+        self._concurrency: Dict[str, AdaptiveConcurrencyLimiter] = {}
+
+    def concurrency_limiter(self, key: str) -> AdaptiveConcurrencyLimiter:
+        """Get (creating on first use) the adaptive limiter for a provider/model key."""
+        limiter = self._concurrency.get(key)
+        if limiter is None:
+            limiter = AdaptiveConcurrencyLimiter(
+                key,
+                initial_limit=Config.ADAPTIVE_CONCURRENCY_INITIAL,
+                min_limit=Config.ADAPTIVE_CONCURRENCY_MIN,
+                max_limit=Config.ADAPTIVE_CONCURRENCY_MAX,
+                latency_tolerance=Config.ADAPTIVE_CONCURRENCY_LATENCY_TOLERANCE,
+                cooldown=Config.ADAPTIVE_CONCURRENCY_COOLDOWN,
+            )
+            self._concurrency[key] = limiter
+        return limiter
+
+    @asynccontextmanager
+    async def concurrency_slot(
+        self, key: str, timeout: Optional[float] = None
+    ) -> AsyncIterator[ConcurrencySlot]:
+        """
+        Hold a concurrency slot for ``key`` for the duration of the block.
+
+        Args:
+            key: Provider or provider:model identifier
+            timeout: Maximum seconds to wait in the queue
+
+        Raises:
+            ConcurrencyLimitTimeout: If no slot frees up before the deadline
+        """
+        limiter = self.concurrency_limiter(key)
+        await limiter.acquire(timeout)
+        slot = ConcurrencySlot()
+        started = time.monotonic()
+        try:
+            yield slot
+        except BaseException:
+            if slot.outcome == OUTCOME_SUCCESS:
+                slot.mark(OUTCOME_ERROR)
+            raise
+        finally:
+            latency = time.monotonic() - started if slot.outcome == OUTCOME_SUCCESS else None
+            limiter.release(latency, slot.outcome)
+
+    def get_concurrency_stats(self) -> Dict[str, Dict[str, Any]]:
+        return {key: limiter.snapshot() for key, limiter in self._concurrency.items()}
 
     def register_endpoint(
         self, endpoint: str, requests_per_minute: int, burst_limit: Optional[int] = None
@@ -38,70 +334,113 @@ class RateLimiter:
         """
         Register a new endpoint with its rate limits.
 
+        Re-registering an endpoint updates its limits in place; callers
+        already waiting keep their place in the queue.
+
         Args:
             endpoint: The API endpoint identifier
             requests_per_minute: Maximum requests per minute
             burst_limit: Optional burst limit for short periods
         """
-        self._limits[endpoint] = RateLimit(
-            requests_per_minute=requests_per_minute,
-            burst_limit=burst_limit or requests_per_minute,
-        )
-        self._locks[endpoint] = asyncio.Lock()
-        self._backoff_times[endpoint] = 0.0
+        burst = max(1, burst_limit or requests_per_minute)
+        limit = self._limits.get(endpoint)
+        if limit is None:
+            self._limits[endpoint] = RateLimit(
+                requests_per_minute=requests_per_minute,
+                burst_limit=burst,
+                tokens=float(burst),
+            )
+            return
+        limit.refill(time.monotonic())
+        limit.requests_per_minute = requests_per_minute
+        limit.burst_limit = burst
+        limit.tokens = min(limit.tokens, float(burst))
+        self._reschedule(limit)
 
-    async def acquire(self, endpoint: str) -> None:
+    async def acquire(self, endpoint: str, timeout: Optional[float] = None) -> None:
         """
         Acquire a rate limit token for the endpoint.
 
         Args:
             endpoint: The API endpoint identifier
+            timeout: Maximum seconds to wait for a token (None waits indefinitely)
 
         Raises:
             ValueError: If endpoint is not registered
+            RateLimitTimeout: If no token becomes available before the deadline
         """
-        if endpoint not in self._limits:
+        limit = self._limits.get(endpoint)
+        if limit is None:
             raise ValueError(f"Endpoint {endpoint} not registered")
 
-        async with self._locks[endpoint]:
-            limit = self._limits[endpoint]
+        now = time.monotonic()
+        limit.refill(now)
+        # Fast path: never jump ahead of callers already waiting
+        if not limit.waiters and limit.tokens >= 1.0:
+            limit.take(now)
+            return
 
-            # Reset counter if minute has passed
-            if datetime.now() - limit.last_reset > timedelta(minutes=1):
-                limit.current_requests = 0
-                limit.last_reset = datetime.now()
-                limit.backoff_factor = 1.0
+        waiter = asyncio.get_running_loop().create_future()
+        limit.waiters.append(waiter)
+        self._reschedule(limit)
+        try:
+            await asyncio.wait_for(waiter, timeout)
+        except BaseException as e:
+            if waiter.done() and not waiter.cancelled():
+                # Granted a token just as we gave up: give it back to the queue
+                limit.tokens += 1.0
+                limit.current_requests = max(0, limit.current_requests - 1)
+                self._grant(limit)
+            if isinstance(e, asyncio.TimeoutError):
+                raise RateLimitTimeout(endpoint, timeout) from None
+            raise
 
-            # Check if we're over the limit
-            if limit.current_requests >= limit.requests_per_minute:
-                # Calculate backoff time
-                backoff_time = limit.backoff_factor * 60 / limit.requests_per_minute
-                limit.backoff_factor *= 2  # Exponential backoff
-                await asyncio.sleep(backoff_time)
-                return await self.acquire(endpoint)
+    def _grant(self, limit: RateLimit) -> None:
+        """Hand available tokens to waiters in FIFO order, then re-arm the timer."""
+        now = time.monotonic()
+        limit.refill(now)
+        while limit.waiters and limit.tokens >= 1.0:
+            waiter = limit.waiters.popleft()
+            if waiter.done():
+                continue  # timed out or cancelled while queued
+            limit.take(now)
+            waiter.set_result(None)
+        self._reschedule(limit)
 
-            # Increment request counter
-            limit.current_requests += 1
+    def _reschedule(self, limit: RateLimit) -> None:
+        if limit.wake_handle is not None:
+            limit.wake_handle.cancel()
+            limit.wake_handle = None
+        while limit.waiters and limit.waiters[0].done():
+            limit.waiters.popleft()
+        if not limit.waiters or limit.refill_per_second <= 0:
+            return
+        delay = max(0.0, (1.0 - limit.tokens) / limit.refill_per_second)
+        limit.wake_handle = asyncio.get_running_loop().call_later(delay, self._grant, limit)
 
     async def release(self, endpoint: str, success: bool = True) -> None:
         """
         Release a rate limit token and adjust backoff based on success.
 
+        Failures halve the refill rate (down to 1/MAX_BACKOFF_FACTOR of the
+        configured rate); successes double it back towards the configured rate.
+
         Args:
             endpoint: The API endpoint identifier
             success: Whether the request was successful
         """
-        if endpoint not in self._limits:
+        limit = self._limits.get(endpoint)
+        if limit is None:
             return
 
-        async with self._locks[endpoint]:
-            limit = self._limits[endpoint]
-            if success:
-                # Reduce backoff on success
-                limit.backoff_factor = max(1.0, limit.backoff_factor * 0.5)
-            else:
-                # Increase backoff on failure
-                limit.backoff_factor *= 2
+        # Account for refill at the old rate before changing it
+        limit.refill(time.monotonic())
+        if success:
+            limit.backoff_factor = max(1.0, limit.backoff_factor * 0.5)
+        else:
+            limit.backoff_factor = min(MAX_BACKOFF_FACTOR, limit.backoff_factor * 2)
+        if limit.waiters:
+            self._reschedule(limit)
 
     def get_endpoint_stats(self, endpoint: str) -> Dict[str, Any]:
         """
@@ -113,15 +452,32 @@ class RateLimiter:
         Returns:
             Dict[str, Any]: Current rate limit statistics
         """
-        if endpoint not in self._limits:
-            return {}
+        stats: Dict[str, Any] = {}
+        if endpoint in self._limits:
+            limit = self._limits[endpoint]
+            now = time.monotonic()
+            limit.refill(now)
+            stats = {
+                "requests_per_minute": limit.requests_per_minute,
+                "burst_limit": limit.burst_limit,
+                "current_requests": limit.current_requests,
+                "backoff_factor": limit.backoff_factor,
+                "tokens_available": round(limit.tokens, 3),
+                "waiters": sum(1 for w in limit.waiters if not w.done()),
+                "time_until_reset": max(0.0, 60.0 - (now - limit.window_start)),
+            }
+        if endpoint in self._concurrency:
+            stats["concurrency"] = self._concurrency[endpoint].snapshot()
+        return stats
 
-        limit = self._limits[endpoint]
-        return {
-            "requests_per_minute": limit.requests_per_minute,
-            "current_requests": limit.current_requests,
-            "backoff_factor": limit.backoff_factor,
-            "time_until_reset": (
-                timedelta(minutes=1) - (datetime.now() - limit.last_reset)
-            ).total_seconds(),
-        }
+
+# Process-wide limiter so concurrency limits are shared by every request
+_shared_rate_limiter: Optional[RateLimiter] = None
+
+
+def get_shared_rate_limiter() -> RateLimiter:
+    """Get the process-wide RateLimiter instance."""
+    global _shared_rate_limiter
+    if _shared_rate_limiter is None:
+        _shared_rate_limiter = RateLimiter()
+    return _shared_rate_limiter
@@ -0,0 +1,235 @@
+"""
+Redis sliding-window rate limiter.
+
+Every check is one atomic Lua script, so a request costs a single round-trip:
+the script trims the client's window, counts it, records the hit only if it
+fits, refreshes the key's expiry and, optionally, bumps a per-path counter.
+Hits are sorted-set members with unique names, so requests arriving in the
+same millisecond (or second) are all counted.
+
+RedisRateLimiter wraps the script for asyncio callers and adds a local
+pre-check. A client whose last known count is well under its limit is
+admitted from memory for a small share of its limit (`local_fraction`) for
+at most `sync_interval` seconds; those hits are sent with the next Redis
+call, which records them before deciding on the new request. Across N
+workers the shared count can therefore run ahead of Redis by at most
+N × local_fraction × limit, and only while a client is below half of its
+limit. A `local_fraction` of 0 makes every check go to Redis.
+
+Redis failures fail open, like the fixed-window limiter this replaces. Such
+decisions are marked ``enforced=False`` so callers do not report limits that
+were never checked.
+"""
+
+import math
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from redis.exceptions import RedisError
+
+from app.utils.logging import get_logger
+
+logger = get_logger("redis_rate_limiter")
+
+# KEYS[1]: the client's window (sorted set of hits scored by time in ms)
+# KEYS[2]: optional counter incremented once per admitted or denied check
+# ARGV: now_ms, window_ms, limit, cost, prior, member prefix, counter ttl (s)
+SLIDING_WINDOW_SCRIPT = """
+local key = KEYS[1]
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+local prior = tonumber(ARGV[5])
+local prefix = ARGV[6]
+
+redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+-- Hits already admitted by a local pre-check count whether or not this one fits
+for i = 1, prior do
+    redis.call('ZADD', key, now, prefix .. 'p' .. i)
+end
+local count = redis.call('ZCARD', key)
+
+local allowed = 0
+local retry_after = 0
+if count + cost <= limit then
+    for i = 1, cost do
+        redis.call('ZADD', key, now, prefix .. i)
+    end
+    count = count + cost
+    allowed = 1
+else
+    -- Wait until enough of the oldest hits leave the window for this one to fit
+    local index = math.max(0, math.min(count + cost - limit, count) - 1)
+    local oldest = redis.call('ZRANGE', key, index, index, 'WITHSCORES')
+    if oldest[2] then
+        retry_after = math.max(1, tonumber(oldest[2]) + window - now)
+    else
+        retry_after = window
+    end
+end
+if count > 0 then
+    redis.call('PEXPIRE', key, window)
+end
+
+if KEYS[2] then
+    redis.call('INCR', KEYS[2])
+    redis.call('EXPIRE', KEYS[2], tonumber(ARGV[7]))
+end
+return {allowed, count, retry_after}
+"""
+
+
+class WindowResult(NamedTuple):
+    """Outcome of one sliding-window check."""
+
+    allowed: bool
+    count: int  # hits in the window, including this one if it was admitted
+    retry_after: float  # seconds until the request would fit; 0 when allowed
+
+
+def window_args(
+    now: float,
+    window: float,
+    limit: int,
+    cost: int = 1,
+    prior: int = 0,
+    counter_ttl: int = 86400,
+) -> List[Any]:
+    """ARGV for SLIDING_WINDOW_SCRIPT; `now` and `window` are in seconds."""
+    return [
+        int(now * 1000),
+        int(window * 1000),
+        limit,
+        cost,
+        prior,
+        f"{int(now * 1000)}-{uuid.uuid4().hex[:12]}-",
+        counter_ttl,
+    ]
+
+
+def parse_window_reply(reply: List[Any]) -> WindowResult:
+    allowed, count, retry_after_ms = reply
+    return WindowResult(bool(int(allowed)), int(count), int(retry_after_ms) / 1000.0)
+
+
+class RateDecision(NamedTuple):
+    """A rate limit decision as reported to the client."""
+
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: float
+    reset_at: int  # Unix time by which the current window has fully drained
+    local: bool  # decided by the local pre-check, without a Redis round-trip
+    enforced: bool = True  # False when Redis failed and the request was let through unchecked
+
+
+class _LocalWindow:
+    __slots__ = ("count", "synced_at", "unsynced")
+
+    def __init__(self, count: int, synced_at: float):
+        self.count = count
+        self.synced_at = synced_at
+        self.unsynced = 0
+
+
+class RedisRateLimiter:
+    """Async sliding-window limiter: one Lua round-trip per check, with a local pre-check."""
+
+    def __init__(
+        self,
+        redis: Any,
+        local_fraction: float = 0.1,
+        sync_interval: float = 1.0,
+        max_local_keys: int = 10000,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Args:
+            redis: redis.asyncio client
+            local_fraction: Share of a client's limit that may be admitted locally
+                between Redis checks; 0 disables the pre-check
+            sync_interval: Longest time (seconds) a Redis count is trusted locally
+            max_local_keys: Least recently used local entries are evicted past this size
+            clock: Wall clock shared by every worker using the same Redis
+        """
+        self.redis = redis
+        self.local_fraction = local_fraction
+        self.sync_interval = sync_interval
+        self.max_local_keys = max_local_keys
+        self.clock = clock
+        self.stats = {"checks": 0, "local": 0, "redis": 0, "denied": 0, "errors": 0}
+        self._script = redis.register_script(SLIDING_WINDOW_SCRIPT)
+        self._local: "OrderedDict[str, _LocalWindow]" = OrderedDict()
+
+    async def hit(self, key: str, limit: int, window: float, cost: int = 1) -> RateDecision:
+        """Count `cost` hits against `key` (at most `limit` per `window` seconds)."""
+        now = self.clock()
+        self.stats["checks"] += 1
+
+        entry = self._local.get(key)
+        if entry is not None and self._admit_locally(entry, limit, cost, now):
+            entry.unsynced += cost
+            self._local.move_to_end(key)
+            self.stats["local"] += 1
+            used = entry.count + entry.unsynced
+            return RateDecision(True, limit, limit - used, 0.0, math.ceil(now + window), True)
+
+        prior = entry.unsynced if entry is not None else 0
+        try:
+            reply = await self._script(
+                keys=[key], args=window_args(now, window, limit, cost, prior)
+            )
+        except (RedisError, OSError) as e:
+            self.stats["errors"] += 1
+            logger.error(f"Redis error during rate limiting: {str(e)}")
+            return RateDecision(
+                True, limit, limit, 0.0, math.ceil(now + window), False, enforced=False
+            )
+        self.stats["redis"] += 1
+
+        result = parse_window_reply(reply)
+        self._remember(key, result.count, now)
+        if not result.allowed:
+            self.stats["denied"] += 1
+            return RateDecision(
+                False,
+                limit,
+                max(0, limit - result.count),
+                result.retry_after,
+                math.ceil(now + result.retry_after),
+                False,
+            )
+        return RateDecision(
+            True, limit, max(0, limit - result.count), 0.0, math.ceil(now + window), False
+        )
+
+    def forget(self, key: Optional[str] = None) -> None:
+        """Drop local state for `key`, or for every key."""
+        if key is None:
+            self._local.clear()
+        else:
+            self._local.pop(key, None)
+
+    def _admit_locally(self, entry: _LocalWindow, limit: int, cost: int, now: float) -> bool:
+        if now - entry.synced_at >= self.sync_interval:
+            return False
+        budget = int(limit * self.local_fraction)
+        return (
+            entry.unsynced + cost <= budget
+            and entry.count + entry.unsynced + cost <= limit // 2
+        )
+
+    def _remember(self, key: str, count: int, now: float) -> None:
+        if self.local_fraction <= 0:
+            return
+        self._local[key] = _LocalWindow(count, now)
+        self._local.move_to_end(key)
+        while len(self._local) > self.max_local_keys:
+            self._local.popitem(last=False)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "local_keys": len(self._local)}
@@ -5,18 +5,30 @@ This module provides resilience patterns for LLM API calls:
 - Circuit breakers to prevent cascading failures
 - Bounded retries with exponential backoff and jitter
 - Provider-specific timeout configuration
+- Process-wide adaptive concurrency limits per provider/model
 - Metrics and monitoring hooks
 """
 
 import asyncio
 import random
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
 from enum import Enum
-from typing import Any, Callable, Dict, Optional
+from typing import Any, AsyncGenerator, AsyncIterator, Callable, Dict, Optional
 from dataclasses import dataclass, field
 import httpx
 
+from app.config import Config
 from app.services.llm_adapters import BaseAdapter
+from app.services.rate_limiter import (
+    OUTCOME_ERROR,
+    OUTCOME_RATE_LIMITED,
+    OUTCOME_SUCCESS,
+    ConcurrencyLimitTimeout,
+    ConcurrencySlot,
+    RateLimiter,
+    get_shared_rate_limiter,
+)
 from app.utils.logging import get_logger, CorrelationContext
 
 logger = get_logger(__name__)
@@ -244,6 +256,7 @@ class ResilientLLMAdapter:
         retry_config: Optional[RetryConfig] = None,
         circuit_breaker_config: Optional[CircuitBreakerConfig] = None,
         timeout: Optional[float] = None,
+        rate_limiter: Optional[RateLimiter] = None,
     ):
         self.adapter = adapter
         detected_provider = provider_name or self._detect_provider_from_adapter(adapter)
@@ -268,6 +281,12 @@ class ResilientLLMAdapter:
 
         self.circuit_breaker = CircuitBreaker(self.config.circuit_breaker)
 
+        # Adapters are created per call, so the concurrency limiter must be shared
+        if rate_limiter is None and Config.ADAPTIVE_CONCURRENCY_ENABLED:
+            rate_limiter = get_shared_rate_limiter()
+        self.rate_limiter = rate_limiter
+        self.concurrency_key = self._concurrency_key(adapter, self.provider_name)
+
         # Create provider-specific HTTP client with timeout
         self.client = httpx.AsyncClient(timeout=self.config.timeout)
 
@@ -278,6 +297,7 @@ class ResilientLLMAdapter:
             "failed_requests": 0,
             "retries": 0,
             "circuit_opens": 0,
+            "queue_timeouts": 0,
         }
 
     async def generate(self, prompt: str) -> Dict[str, Any]:
@@ -308,10 +328,23 @@ class ResilientLLMAdapter:
                     # Fallback: call adapter directly (supports mocks without CLIENT)
                     return await self.adapter.generate(prompt)
 
-                result = await self.circuit_breaker.async_call(_generate)
+                async with self._concurrency_slot() as slot:
+                    result = await self.circuit_breaker.async_call(_generate)
+                    slot.mark(self._result_outcome(result))
                 self.metrics["successful_requests"] += 1
                 return result
 
+            except ConcurrencyLimitTimeout as e:
+                # Queuing again would only lengthen the wait; fail fast instead
+                last_error = e
+                self.metrics["failed_requests"] += 1
+                self.metrics["queue_timeouts"] += 1
+                logger.warning(
+                    f"Concurrency queue timeout for {self.concurrency_key}: {e}",
+                    extra={"requestId": request_id, "provider": self.provider_name}
+                )
+                break
+
             except Exception as e:
                 last_error = e
                 self.metrics["failed_requests"] += 1
@@ -363,11 +396,116 @@ class ResilientLLMAdapter:
         logger.error(error_msg)
         return {"generated_text": f"Error: {error_msg}"}
 
+    async def stream(self, prompt: str) -> AsyncGenerator[str, None]:
+        """Stream response text with circuit breaker protection.
+
+        Streams are not retried: once deltas have reached the caller a replay
+        would duplicate output. An in-band "Error:" chunk from the adapter
+        counts as a failure for the circuit breaker.
+        """
+        self.metrics["total_requests"] += 1
+        request_id = CorrelationContext.get_correlation_id()
+
+        if self.circuit_breaker.state == CircuitState.OPEN:
+            if self.circuit_breaker._should_attempt_reset():
+                self.circuit_breaker.state = CircuitState.HALF_OPEN
+                logger.info("Circuit breaker entering HALF_OPEN state")
+            else:
+                self.metrics["failed_requests"] += 1
+                self.metrics["circuit_opens"] += 1
+                logger.error(
+                    f"Circuit breaker open for {self.provider_name}",
+                    extra={"requestId": request_id, "provider": self.provider_name}
+                )
+                yield f"Error: Circuit breaker is OPEN for {self.provider_name}"
+                return
+
+        failed = False
+        try:
+            async with self._concurrency_slot() as slot:
+                async for chunk in self.adapter.stream(prompt):
+                    if chunk.startswith("Error:"):
+                        failed = True
+                        slot.mark(self._text_outcome(chunk))
+                    yield chunk
+        except ConcurrencyLimitTimeout as e:
+            # The provider never saw the request, so leave the circuit breaker alone
+            self.metrics["failed_requests"] += 1
+            self.metrics["queue_timeouts"] += 1
+            yield f"Error: {e}"
+            return
+        except Exception as e:
+            failed = True
+            logger.error(
+                f"Stream failed for {self.provider_name}: {e}",
+                extra={"requestId": request_id, "provider": self.provider_name}
+            )
+            yield f"Error: Stream failed for {self.provider_name}: {e}"
+
+        if failed:
+            self.metrics["failed_requests"] += 1
+            self.circuit_breaker._on_failure()
+        else:
+            self.metrics["successful_requests"] += 1
+            self.circuit_breaker._on_success()
+
+    @asynccontextmanager
+    async def _concurrency_slot(self) -> AsyncIterator[ConcurrencySlot]:
+        """Hold a shared provider/model concurrency slot, if limiting is enabled."""
+        if self.rate_limiter is None:
+            yield ConcurrencySlot()
+            return
+        async with self.rate_limiter.concurrency_slot(
+            self.concurrency_key, timeout=Config.ADAPTIVE_CONCURRENCY_QUEUE_TIMEOUT
+        ) as slot:
+            try:
+                yield slot
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code == 429:
+                    slot.mark(OUTCOME_RATE_LIMITED)
+                raise
+
+    @staticmethod
+    def _text_outcome(text: str) -> str:
+        if not text.startswith("Error:"):
+            return OUTCOME_SUCCESS
+        lowered = text.lower()
+        if "rate limit" in lowered or "429" in lowered or "quota exceeded" in lowered:
+            return OUTCOME_RATE_LIMITED
+        return OUTCOME_ERROR
+
+    @classmethod
+    def _result_outcome(cls, result: Any) -> str:
+        """Classify an adapter result; adapters report 429s as in-band error text."""
+        if not isinstance(result, dict):
+            return OUTCOME_SUCCESS
+        details = result.get("error_details")
+        if isinstance(details, dict):
+            if details.get("error") == "RATE_LIMITED":
+                return OUTCOME_RATE_LIMITED
+            if details.get("error") == "QUOTA_EXHAUSTED":
+                # Rejected locally before dispatch; says nothing about provider load
+                return OUTCOME_ERROR
+        return cls._text_outcome(str(result.get("generated_text", "")))
+
+    @staticmethod
+    def _concurrency_key(adapter: BaseAdapter, provider_name: str) -> str:
+        model = getattr(adapter, "model", None)
+        if Config.ADAPTIVE_CONCURRENCY_SCOPE == "model" and isinstance(model, str):
+            return f"{provider_name}:{model}"
+        return provider_name
+
     def get_metrics(self) -> Dict[str, Any]:
         """Get adapter metrics"""
+        concurrency = (
+            self.rate_limiter.concurrency_limiter(self.concurrency_key).snapshot()
+            if self.rate_limiter is not None
+            else None
+        )
         return {
             "provider": self.provider_name,
             "metrics": self.metrics,
+            "concurrency": concurrency,
             "circuit_breaker": self.circuit_breaker.get_state(),
             "config": {
                 "timeout": self.config.timeout,
@@ -0,0 +1,379 @@
+"""
+Semantic (embedding-similarity) cache for pipeline and per-model responses.
+
+The exact cache keys on a hash of the input, so rephrased queries always
+miss. This layer embeds the query and returns a stored response when a
+previous query in the same namespace is similar enough (cosine similarity
+>= threshold).
+
+Embeddings come from a dependency-free hashing vectorizer (word unigrams +
+bigrams, signed feature hashing). When ``sentence-transformers`` is
+installed, a local CPU model can be used instead. Each namespace, e.g. the
+pipeline models/options or a single model name, has its own NumPy matrix that
+grows on demand up to ``max_entries`` rows. Lookups are a single
+matrix-vector product over that matrix. At most ``max_namespaces`` indexes
+are kept; the least recently used one is dropped beyond that. NumPy is only
+required when the cache is enabled.
+
+Bag-of-words similarity cannot tell "...in California" from "...in Texas",
+so a candidate is only served when both prompts mention the same numbers and
+proper nouns (see ``anchor_terms``).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - only needed when SEMANTIC_CACHE_ENABLED
+    np = None
+
+from app.config import Config
+from app.utils.logging import get_logger
+
+try:
+    from prometheus_client import Counter, Gauge
+
+    ULTRA_SEMANTIC_CACHE_HITS = Counter(
+        "ultra_semantic_cache_hits_total", "Semantic cache hits", ["namespace"]
+    )
+    ULTRA_SEMANTIC_CACHE_MISSES = Counter(
+        "ultra_semantic_cache_misses_total", "Semantic cache misses", ["namespace"]
+    )
+    ULTRA_SEMANTIC_CACHE_EVICTIONS = Counter(
+        "ultra_semantic_cache_evictions_total", "Semantic cache evictions"
+    )
+    ULTRA_SEMANTIC_CACHE_ENTRIES = Gauge(
+        "ultra_semantic_cache_entries", "Entries held by the semantic cache"
+    )
+except Exception:  # pragma: no cover - metrics are optional
+    ULTRA_SEMANTIC_CACHE_HITS = None
+    ULTRA_SEMANTIC_CACHE_MISSES = None
+    ULTRA_SEMANTIC_CACHE_EVICTIONS = None
+    ULTRA_SEMANTIC_CACHE_ENTRIES = None
+
+logger = get_logger("semantic_cache")
+
+_TOKEN_RE = re.compile(r"\w+")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+|\n+")
+
+
+def anchor_terms(text: str) -> frozenset:
+    """Numbers and capitalised words that do not start a sentence, lowercased."""
+    anchors = set()
+    for sentence in _SENTENCE_RE.split(text):
+        for i, token in enumerate(_TOKEN_RE.findall(sentence)):
+            if token[0].isdigit() or (i > 0 and token[0].isupper()):
+                anchors.add(token.lower())
+    return frozenset(anchors)
+
+
+def _anchors_agree(a: Tuple[frozenset, frozenset], b: Tuple[frozenset, frozenset]) -> bool:
+    """Each prompt's anchors must appear among the other prompt's words."""
+    return a[0] <= b[1] and b[0] <= a[1]
+
+
+class HashingEmbedder:
+    """Stateless signed feature-hashing embedder (unigrams + bigrams)."""
+
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+
+    def embed(self, text: str) -> np.ndarray:
+        tokens = _TOKEN_RE.findall(text.lower())
+        features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        vec = np.zeros(self.dim, dtype=np.float32)
+        if not features:
+            return vec
+        hashes = np.fromiter(
+            (zlib.crc32(f.encode("utf-8")) for f in features),
+            dtype=np.uint32,
+            count=len(features),
+        )
+        signs = np.where(hashes & 0x80000000, -1.0, 1.0).astype(np.float32)
+        np.add.at(vec, (hashes % self.dim).astype(np.intp), signs)
+        # Sublinear term frequency keeps long prompts from being dominated by repeats
+        vec = np.sign(vec) * np.log1p(np.abs(vec))
+        norm = float(np.linalg.norm(vec))
+        return vec / norm if norm else vec
+
+
+class SentenceTransformerEmbedder:
+    """Local CPU sentence-transformers model (optional dependency)."""
+
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+
+        self._model = SentenceTransformer(model_name, device="cpu")
+        self.dim = int(self._model.get_sentence_embedding_dimension())
+
+    def embed(self, text: str) -> np.ndarray:
+        vec = self._model.encode(text, normalize_embeddings=True)
+        return np.asarray(vec, dtype=np.float32)
+
+
+def build_embedder(spec: str, dim: int):
+    """``"hashing"`` or ``"sentence-transformers:<model>"``; falls back to hashing."""
+    if spec.startswith("sentence-transformers:"):
+        model_name = spec.split(":", 1)[1]
+        try:
+            return SentenceTransformerEmbedder(model_name)
+        except Exception as e:
+            logger.warning(f"Semantic cache embedder {spec} unavailable, using hashing: {e}")
+    return HashingEmbedder(dim)
+
+
+class SemanticIndex:
+    """Bounded vector index for one namespace with TTL + LRU eviction."""
+
+    # Rows allocated up front; storage doubles from here up to ``capacity``
+    INITIAL_ROWS = 64
+
+    def __init__(self, dim: int, capacity: int):
+        self.capacity = capacity
+        rows = min(capacity, self.INITIAL_ROWS)
+        self._vectors = np.zeros((rows, dim), dtype=np.float32)
+        self._expires = np.zeros(rows, dtype=np.float64)
+        self._last_used = np.zeros(rows, dtype=np.float64)
+        self._keys: List[str] = []
+        self._values: List[Any] = []
+        self._rows: Dict[str, int] = {}
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def candidates(self, query: np.ndarray, now: float, threshold: float) -> List[Tuple[int, float]]:
+        """Unexpired rows with similarity >= threshold, most similar first."""
+        n = len(self._keys)
+        if n == 0:
+            return []
+        sims = self._vectors[:n] @ query
+        sims[self._expires[:n] <= now] = -1.0
+        rows = np.flatnonzero(sims >= threshold)
+        rows = rows[np.argsort(-sims[rows], kind="stable")]
+        return [(int(row), float(sims[row])) for row in rows]
+
+    def peek(self, row: int) -> Any:
+        return self._values[row]
+
+    def get(self, row: int, now: float) -> Any:
+        self._last_used[row] = now
+        return self._values[row]
+
+    def put(self, key: str, vector: np.ndarray, value: Any, expires_at: float, now: float) -> None:
+        row = self._rows.get(key)
+        if row is None:
+            if len(self._keys) >= self.capacity:
+                self._evict(now)
+            elif len(self._keys) == len(self._vectors):
+                self._grow()
+            row = len(self._keys)
+            self._keys.append(key)
+            self._values.append(value)
+            self._rows[key] = row
+        else:
+            self._values[row] = value
+        self._vectors[row] = vector
+        self._expires[row] = expires_at
+        self._last_used[row] = now
+
+    def purge_expired(self, now: float) -> int:
+        n = len(self._keys)
+        expired = np.flatnonzero(self._expires[:n] <= now)
+        # Remove from the end so swap-removal never moves a pending row
+        for row in sorted(expired.tolist(), reverse=True):
+            self._remove(int(row))
+        return len(expired)
+
+    def _grow(self) -> None:
+        rows = min(self.capacity, 2 * len(self._vectors))
+        n = len(self._keys)
+        vectors = np.zeros((rows, self._vectors.shape[1]), dtype=np.float32)
+        vectors[:n] = self._vectors[:n]
+        self._vectors = vectors
+        self._expires = np.resize(self._expires, rows)
+        self._last_used = np.resize(self._last_used, rows)
+
+    def _evict(self, now: float) -> None:
+        n = len(self._keys)
+        expired = np.flatnonzero(self._expires[:n] <= now)
+        row = int(expired[0]) if len(expired) else int(np.argmin(self._last_used[:n]))
+        self._remove(row)
+        self.evictions += 1
+        if ULTRA_SEMANTIC_CACHE_EVICTIONS:
+            ULTRA_SEMANTIC_CACHE_EVICTIONS.inc()
+
+    def _remove(self, row: int) -> None:
+        """O(dim) swap-remove: move the last row into the freed slot."""
+        last = len(self._keys) - 1
+        del self._rows[self._keys[row]]
+        if row != last:
+            self._vectors[row] = self._vectors[last]
+            self._expires[row] = self._expires[last]
+            self._last_used[row] = self._last_used[last]
+            self._keys[row] = self._keys[last]
+            self._values[row] = self._values[last]
+            self._rows[self._keys[row]] = row
+        self._keys.pop()
+        self._values.pop()
+
+
+class SemanticCache:
+    """Namespaced embedding-similarity cache."""
+
+    def __init__(
+        self,
+        threshold: float = 0.92,
+        max_entries: int = 5000,
+        ttl: float = 3600,
+        embedder: Any = None,
+        dim: int = 512,
+        max_namespaces: int = 128,
+    ):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.max_namespaces = max_namespaces
+        self.ttl = ttl
+        self.embedder = embedder or HashingEmbedder(dim)
+        self._indexes: OrderedDict[str, SemanticIndex] = OrderedDict()
+        # Per-namespace counters exist only while the namespace has an index
+        self.stats: Dict[str, Dict[str, int]] = {}
+        self._totals = {"hits": 0, "misses": 0}
+        self._evictions = 0
+        self.namespace_evictions = 0
+
+    @staticmethod
+    def _text_key(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _anchors(text: str) -> Tuple[frozenset, frozenset]:
+        return anchor_terms(text), frozenset(_TOKEN_RE.findall(text.lower()))
+
+    def _index(self, namespace: str) -> SemanticIndex:
+        index = self._indexes.get(namespace)
+        if index is None:
+            while len(self._indexes) >= self.max_namespaces:
+                oldest = next(iter(self._indexes))
+                self._drop(oldest)
+                self.namespace_evictions += 1
+            index = SemanticIndex(self.embedder.dim, self.max_entries)
+            self._indexes[namespace] = index
+        else:
+            self._indexes.move_to_end(namespace)
+        return index
+
+    def _drop(self, namespace: str) -> None:
+        index = self._indexes.pop(namespace)
+        self._evictions += index.evictions
+        self.stats.pop(namespace, None)
+
+    def _count(self, namespace: str, outcome: str) -> None:
+        self._totals[outcome] += 1
+        if namespace in self._indexes:
+            ns = self.stats.setdefault(namespace, {"hits": 0, "misses": 0})
+            ns[outcome] += 1
+        metric = ULTRA_SEMANTIC_CACHE_HITS if outcome == "hits" else ULTRA_SEMANTIC_CACHE_MISSES
+        if metric:
+            metric.labels(namespace=namespace.split(":", 1)[0]).inc()
+
+    def lookup(
+        self, namespace: str, text: str, threshold: Optional[float] = None
+    ) -> Optional[Any]:
+        """Return the cached value for the most similar stored query, if close enough."""
+        index = self._indexes.get(namespace)
+        if index is None or not len(index):
+            self._count(namespace, "misses")
+            return None
+        now = time.time()
+        anchors = self._anchors(text)
+        for row, similarity in index.candidates(
+            self.embedder.embed(text), now, threshold or self.threshold
+        ):
+            if _anchors_agree(anchors, index.peek(row)[0]):
+                self._count(namespace, "hits")
+                logger.info(f"Semantic cache hit in {namespace} (similarity={similarity:.3f})")
+                self._indexes.move_to_end(namespace)
+                return index.get(row, now)[1]
+        self._count(namespace, "misses")
+        return None
+
+    def store(self, namespace: str, text: str, value: Any, ttl: Optional[float] = None) -> None:
+        now = time.time()
+        self._index(namespace).put(
+            self._text_key(text),
+            self.embedder.embed(text),
+            (self._anchors(text), value),
+            now + (ttl or self.ttl),
+            now,
+        )
+        self._update_entries_gauge()
+
+    def purge_expired(self) -> int:
+        """Drop expired entries, and namespaces left empty; returns entries removed."""
+        now = time.time()
+        removed = 0
+        for namespace, index in list(self._indexes.items()):
+            removed += index.purge_expired(now)
+            if not len(index):
+                self._drop(namespace)
+        self._update_entries_gauge()
+        return removed
+
+    def clear(self, namespace: Optional[str] = None) -> None:
+        if namespace is None:
+            self._indexes.clear()
+            self.stats.clear()
+        elif namespace in self._indexes:
+            self._drop(namespace)
+        self._update_entries_gauge()
+
+    def _update_entries_gauge(self) -> None:
+        if ULTRA_SEMANTIC_CACHE_ENTRIES:
+            ULTRA_SEMANTIC_CACHE_ENTRIES.set(sum(len(i) for i in self._indexes.values()))
+
+    def get_stats(self) -> Dict[str, Any]:
+        hits, misses = self._totals["hits"], self._totals["misses"]
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / total, 2) if total else 0,
+            "entries": sum(len(i) for i in self._indexes.values()),
+            "evictions": self._evictions + sum(i.evictions for i in self._indexes.values()),
+            "namespace_evictions": self.namespace_evictions,
+            "namespaces": {k: dict(v) for k, v in self.stats.items()},
+        }
+
+
+# Global semantic cache instance (None when disabled)
+_semantic_cache: Optional[SemanticCache] = None
+_numpy_missing_logged = False
+
+
+def get_semantic_cache() -> Optional[SemanticCache]:
+    """Get the semantic cache, or None if SEMANTIC_CACHE_ENABLED is off."""
+    global _semantic_cache, _numpy_missing_logged
+    if not Config.SEMANTIC_CACHE_ENABLED:
+        return None
+    if np is None:
+        if not _numpy_missing_logged:
+            logger.warning("SEMANTIC_CACHE_ENABLED is set but numpy is not installed; disabled")
+            _numpy_missing_logged = True
+        return None
+    if _semantic_cache is None:
+        _semantic_cache = SemanticCache(
+            threshold=Config.SEMANTIC_CACHE_THRESHOLD,
+            max_entries=Config.SEMANTIC_CACHE_MAX_ENTRIES,
+            ttl=Config.SEMANTIC_CACHE_TTL,
+            max_namespaces=Config.SEMANTIC_CACHE_MAX_NAMESPACES,
+            embedder=build_embedder(Config.SEMANTIC_CACHE_EMBEDDER, Config.SEMANTIC_CACHE_DIM),
+        )
+    return _semantic_cache
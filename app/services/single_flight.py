@@ -0,0 +1,180 @@
+"""
+Single-flight request coalescing.
+
+When several identical requests arrive together, only one of them (the
+leader) does the expensive work; the others (followers) wait for and share
+its result.
+
+``SingleFlight`` coalesces within one event loop. ``RedisSingleFlight`` adds
+a Redis lock so that only one worker or node runs a given key. Followers in
+other processes poll the shared cache, where the leader stores its result.
+"""
+
+import asyncio
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.utils.logging import get_logger
+
+logger = get_logger("single_flight")
+
+# Delete/extend the lock only if we still own it
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+_EXTEND_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+
+class SingleFlight:
+    """Coalesce concurrent calls for the same key within this process."""
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.stats = {"leaders": 0, "followers": 0}
+
+    def in_flight(self, key: str) -> bool:
+        return key in self._inflight
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run ``fn`` once per key; concurrent callers await the same result.
+
+        The work runs in its own task so a cancelled leader (e.g. a client
+        disconnect) does not cancel the followers waiting on it.
+        """
+        task = self._inflight.get(key)
+        if task is not None:
+            self.stats["followers"] += 1
+            result = await asyncio.shield(task)
+            # Followers get their own top-level dict so callers can annotate it
+            return dict(result) if isinstance(result, dict) else result
+
+        self.stats["leaders"] += 1
+        task = asyncio.ensure_future(self._lead(key, fn))
+        self._inflight[key] = task
+        task.add_done_callback(lambda t: self._finish(key, t))
+        return await asyncio.shield(task)
+
+    async def _lead(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        return await fn()
+
+    def _finish(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the exception retrieved if every waiter went away
+        if not task.cancelled():
+            task.exception()
+
+
+class RedisSingleFlight(SingleFlight):
+    """Single-flight across workers using a Redis lock plus cache polling.
+
+    The leader holds ``singleflight:<key>`` (SET NX PX) while it runs and
+    refreshes the lock periodically. Followers poll ``result_lookup(key)``
+    until the result appears. If the lock disappears without a result (the
+    leader failed or died), they compete for it again. Any Redis error
+    degrades to running the work locally.
+    """
+
+    def __init__(
+        self,
+        redis_getter: Callable[[], Any],
+        result_lookup: Callable[[str], Awaitable[Any]],
+        lock_ttl: float = 180.0,
+        wait_timeout: float = 240.0,
+        poll_interval: float = 0.1,
+        max_poll_interval: float = 1.0,
+        max_attempts: int = 2,
+    ):
+        super().__init__()
+        self._redis_getter = redis_getter
+        self._result_lookup = result_lookup
+        self.lock_ttl = lock_ttl
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.max_attempts = max_attempts
+        self.stats.update({"remote_followers": 0, "lock_errors": 0})
+
+    async def _lead(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        backend = self._redis_getter()
+        if backend is None:
+            return await fn()
+
+        lock_key = f"singleflight:{key}"
+        token = uuid.uuid4().hex
+        ttl_ms = int(self.lock_ttl * 1000)
+
+        for _ in range(self.max_attempts):
+            try:
+                acquired = await backend.set(lock_key, token, nx=True, px=ttl_ms)
+            except Exception as e:
+                logger.warning(f"Single-flight lock unavailable, running locally: {e}")
+                self.stats["lock_errors"] += 1
+                return await fn()
+
+            if acquired:
+                return await self._run_with_lock(backend, lock_key, token, ttl_ms, fn)
+
+            self.stats["remote_followers"] += 1
+            result = await self._wait_for_remote(backend, key, lock_key)
+            if result is not None:
+                return result
+
+        # Remote leaders kept failing or timing out; do the work ourselves
+        return await fn()
+
+    async def _run_with_lock(
+        self,
+        backend: Any,
+        lock_key: str,
+        token: str,
+        ttl_ms: int,
+        fn: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        async def _keepalive():
+            while True:
+                await asyncio.sleep(self.lock_ttl / 3)
+                try:
+                    await backend.eval(_EXTEND_SCRIPT, 1, lock_key, token, ttl_ms)
+                except Exception as e:
+                    logger.debug(f"Single-flight lock refresh failed: {e}")
+
+        keepalive = asyncio.create_task(_keepalive())
+        try:
+            return await fn()
+        finally:
+            keepalive.cancel()
+            try:
+                await backend.eval(_RELEASE_SCRIPT, 1, lock_key, token)
+            except Exception as e:
+                logger.debug(f"Single-flight lock release failed: {e}")
+
+    async def _wait_for_remote(self, backend: Any, key: str, lock_key: str) -> Optional[Any]:
+        deadline = time.monotonic() + self.wait_timeout
+        delay = self.poll_interval
+        while time.monotonic() < deadline:
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_poll_interval)
+            try:
+                result = await self._result_lookup(key)
+                if result is not None:
+                    return result
+                if not await backend.exists(lock_key):
+                    # One last look: the leader caches before releasing the lock
+                    return await self._result_lookup(key)
+            except Exception as e:
+                logger.warning(f"Single-flight wait failed: {e}")
+                self.stats["lock_errors"] += 1
+                return None
+        logger.warning(f"Timed out waiting for remote leader of {key}")
+        return None
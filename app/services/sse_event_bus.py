@@ -1,80 +1,491 @@
+"""
+Server-Sent Events bus keyed by correlation_id.
+
+Every published event gets an ``id:`` line, so a browser that reconnects
+sends ``Last-Event-ID`` and resumes from the replay buffer instead of losing
+the events it missed.
+
+Channel lifetimes are bounded:
+
+- ``complete(correlation_id)`` ends every subscriber once it has drained the
+  channel. The channel's replay buffer is kept for ``completed_ttl`` so late
+  reconnects can still catch up, then the channel is collected.
+- Channels with no subscribers and no events for ``idle_ttl`` are collected,
+  and subscribers give up after ``idle_ttl`` without events.
+- ``max_connection_seconds`` (when set) closes each connection after that
+  long; the client reconnects with ``Last-Event-ID`` and loses nothing.
+- ``max_channels`` caps live channels and ``max_buffered_bytes`` caps the
+  replay buffers of all channels together. Idle channels are evicted first
+  (least recently active first). Slow subscribers lose their oldest frames
+  rather than growing without bound.
+
+``SSEEventBus`` is process-local. ``RedisSSEEventBus`` keeps each channel in a
+Redis Stream, so a subscriber on any worker sees events published on any
+other. The stream doubles as the replay buffer (``MAXLEN``) and expires with
+the channel.
+"""
+
 import asyncio
 import json
-from typing import AsyncGenerator, Dict, Optional
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Any, AsyncGenerator, Deque, Dict, Optional, Set, Tuple
 
+from app.config import Config
+from app.utils.logging import get_logger
 
-class SSEEventBus:
-    """Simple in-process event bus for Server-Sent Events keyed by correlation_id.
+try:
+    from prometheus_client import Counter, Gauge
 
-    This is intentionally minimal and does not persist events across process restarts.
-    """
+    ULTRA_SSE_CHANNELS = Gauge("ultra_sse_channels", "Live SSE channels in this process")
+    ULTRA_SSE_SUBSCRIBERS = Gauge("ultra_sse_subscribers", "Connected SSE subscribers in this process")
+    ULTRA_SSE_BUFFERED_BYTES = Gauge(
+        "ultra_sse_buffered_bytes", "Bytes held in SSE replay buffers in this process"
+    )
+    ULTRA_SSE_DROPPED_FRAMES = Counter(
+        "ultra_sse_dropped_frames_total", "SSE frames dropped before delivery", ["reason"]
+    )
+except Exception:  # pragma: no cover - metrics are optional
+    ULTRA_SSE_CHANNELS = None
+    ULTRA_SSE_SUBSCRIBERS = None
+    ULTRA_SSE_BUFFERED_BYTES = None
+    ULTRA_SSE_DROPPED_FRAMES = None
+
+logger = get_logger("sse_event_bus")
+
+CONNECTED_FRAME = "event: connected\n" "data: {\"event\": \"connected\"}\n\n"
+HEARTBEAT_FRAME = "data: {\"event\": \"heartbeat\"}\n\n"
+# Stream entry that marks a completed channel in Redis
+_END_EVENT = "__end__"
+
+
+class SSECapacityError(Exception):
+    """Raised when a new channel is needed but every channel slot is in use."""
 
-    def __init__(self) -> None:
-        self._queues: Dict[str, asyncio.Queue[str]] = {}
-        self._lock = asyncio.Lock()
+    def __init__(self, max_channels: int):
+        self.max_channels = max_channels
+        super().__init__(f"SSE channel limit reached ({max_channels} live channels)")
 
-    async def _get_queue(self, correlation_id: str) -> asyncio.Queue[str]:
-        async with self._lock:
-            if correlation_id not in self._queues:
-                self._queues[correlation_id] = asyncio.Queue(maxsize=1000)
-            return self._queues[correlation_id]
+
+def encode_frame(event_id: Any, event_name: str, data: dict) -> str:
+    """Encode one SSE frame; the data line carries ``{"event", "data"}`` JSON."""
+    payload = json.dumps({"event": event_name, "data": data})
+    return f"id: {event_id}\n" f"event: {event_name}\n" f"data: {payload}\n\n"
+
+
+@dataclass
+class _Channel:
+    replay: Deque[Tuple[int, str]] = field(default_factory=deque)
+    replay_bytes: int = 0
+    subscribers: Set[asyncio.Queue] = field(default_factory=set)
+    next_id: int = 1
+    last_activity: float = field(default_factory=time.monotonic)
+    completed_at: Optional[float] = None
+
+
+class SSEEventBus:
+    """In-process event bus for Server-Sent Events keyed by correlation_id."""
+
+    def __init__(
+        self,
+        queue_size: int = 1000,
+        replay_size: int = 256,
+        idle_ttl: float = 300.0,
+        completed_ttl: float = 60.0,
+        max_channels: int = 10000,
+        max_buffered_bytes: int = 64 * 1024 * 1024,
+        heartbeat_seconds: float = 15.0,
+        max_connection_seconds: float = 0.0,
+        gc_interval: float = 5.0,
+    ) -> None:
+        self.queue_size = queue_size
+        self.replay_size = replay_size
+        self.idle_ttl = idle_ttl
+        self.completed_ttl = completed_ttl
+        self.max_channels = max_channels
+        self.max_buffered_bytes = max_buffered_bytes
+        self.heartbeat_seconds = heartbeat_seconds
+        self.max_connection_seconds = max_connection_seconds
+        self.gc_interval = gc_interval
+        # Least recently active first
+        self._channels: "OrderedDict[str, _Channel]" = OrderedDict()
+        self._buffered_bytes = 0
+        self._subscriber_count = 0
+        self._last_gc = time.monotonic()
+        self.stats = {"published": 0, "dropped": 0, "collected": 0, "evicted": 0}
 
     async def publish(self, correlation_id: str, event_name: str, data: dict) -> None:
         """Publish an event for a given correlation_id.
 
         Encodes as an SSE frame:
+          id: <n>\n
           event: <event_name>\n
           data: <json>\n\n
         """
         if not correlation_id:
             return
-        queue = await self._get_queue(correlation_id)
-        payload = {
-            "event": event_name,
-            "data": data,
-        }
-        frame = f"event: {event_name}\n" f"data: {json.dumps(payload)}\n\n"
+        now = time.monotonic()
+        self._maybe_collect(now)
         try:
-            queue.put_nowait(frame)
-        except asyncio.QueueFull:
-            # Drop oldest by getting one and retry once
-            try:
-                _ = queue.get_nowait()
-            except Exception:
-                pass
-            try:
-                queue.put_nowait(frame)
-            except Exception:
-                pass
-
-    async def subscribe(self, correlation_id: str, heartbeat_seconds: int = 15) -> AsyncGenerator[str, None]:
-        """Yield SSE frames for a correlation_id, with periodic heartbeats."""
-        queue = await self._get_queue(correlation_id)
-
-        async def heartbeat() -> None:
+            channel = self._channel(correlation_id, now)
+        except SSECapacityError:
+            self._dropped("channel_limit")
+            return
+        if channel.completed_at is not None:
+            self._dropped("completed")
+            return
+
+        event_id = channel.next_id
+        channel.next_id += 1
+        frame = encode_frame(event_id, event_name, data)
+        channel.replay.append((event_id, frame))
+        channel.replay_bytes += len(frame)
+        self._buffered_bytes += len(frame)
+        if len(channel.replay) > self.replay_size:
+            self._trim(channel)
+        for queue in channel.subscribers:
+            self._offer(queue, frame)
+        self.stats["published"] += 1
+        self._enforce_memory_cap()
+
+    async def complete(self, correlation_id: str) -> None:
+        """Mark a channel finished; subscribers end after draining it."""
+        channel = self._channels.get(correlation_id) if correlation_id else None
+        if channel is None or channel.completed_at is not None:
+            return
+        channel.completed_at = time.monotonic()
+        for queue in channel.subscribers:
+            self._offer(queue, None)
+
+    def subscribe(
+        self,
+        correlation_id: str,
+        heartbeat_seconds: Optional[float] = None,
+        last_event_id: Optional[str] = None,
+    ) -> AsyncGenerator[str, None]:
+        """Return a generator of SSE frames for a correlation_id, with periodic heartbeats.
+
+        Frames after ``last_event_id`` that are still in the replay buffer are
+        sent first. Raises ``SSECapacityError`` right away (before any frame is
+        produced) if the channel cannot be opened.
+        """
+        self._reserve(correlation_id)
+        return self._subscription(
+            correlation_id, heartbeat_seconds or self.heartbeat_seconds, last_event_id
+        )
+
+    async def _subscription(
+        self, correlation_id: str, heartbeat: float, last_event_id: Optional[str]
+    ) -> AsyncGenerator[str, None]:
+        deadline = (
+            time.monotonic() + self.max_connection_seconds if self.max_connection_seconds else None
+        )
+        # _frames yields the connected event once the subscriber is registered
+        frames = self._frames(correlation_id, last_event_id, heartbeat, deadline)
+        try:
+            async for frame in frames:
+                yield frame
+        finally:
+            await frames.aclose()
+
+    def _reserve(self, correlation_id: str) -> None:
+        now = time.monotonic()
+        self._maybe_collect(now)
+        self._channel(correlation_id, now)
+
+    async def _frames(
+        self,
+        correlation_id: str,
+        last_event_id: Optional[str],
+        heartbeat: float,
+        deadline: Optional[float],
+    ) -> AsyncGenerator[str, None]:
+        channel = self._channel(correlation_id, time.monotonic())
+        after = _parse_event_id(last_event_id)
+        backlog = [frame for event_id, frame in channel.replay if event_id > after]
+        if channel.completed_at is not None:
+            yield CONNECTED_FRAME
+            for frame in backlog:
+                yield frame
+            return
+
+        # Registered in the same step as the backlog snapshot, so nothing is missed
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        channel.subscribers.add(queue)
+        self._publish_subscribers(1)
+        try:
+            # Initial connected event
+            yield CONNECTED_FRAME
+            for frame in backlog:
+                yield frame
             while True:
-                await asyncio.sleep(heartbeat_seconds)
+                timeout = _wait_timeout(heartbeat, deadline)
+                if timeout <= 0:
+                    return
                 try:
-                    queue.put_nowait("data: {\"event\": \"heartbeat\"}\n\n")
-                except Exception:
-                    # Ignore heartbeat enqueue failures
-                    pass
+                    frame = await asyncio.wait_for(queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    if _wait_timeout(heartbeat, deadline) <= 0:
+                        return
+                    if time.monotonic() - channel.last_activity > self.idle_ttl:
+                        return
+                    yield HEARTBEAT_FRAME
+                    continue
+                if frame is None:
+                    return
+                yield frame
+        finally:
+            channel.subscribers.discard(queue)
+            channel.last_activity = time.monotonic()
+            self._publish_subscribers(-1)
 
-        # Start heartbeat task
-        hb_task: Optional[asyncio.Task] = asyncio.create_task(heartbeat())
+    def _channel(self, correlation_id: str, now: float) -> _Channel:
+        channel = self._channels.get(correlation_id)
+        if channel is None:
+            if len(self._channels) >= self.max_channels and not self._evict_idle_channel():
+                raise SSECapacityError(self.max_channels)
+            channel = self._channels[correlation_id] = _Channel(last_activity=now)
+            self._publish_gauges()
+        else:
+            self._channels.move_to_end(correlation_id)
+            channel.last_activity = now
+        return channel
 
+    def _offer(self, queue: asyncio.Queue, frame: Optional[str]) -> None:
         try:
-            # Initial connected event
-            yield "event: connected\n" "data: {\"event\": \"connected\"}\n\n"
+            queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            # Slow subscriber: drop its oldest frame to make room
+            queue.get_nowait()
+            queue.put_nowait(frame)
+            self._dropped("slow_subscriber")
+
+    def _trim(self, channel: _Channel) -> None:
+        _, frame = channel.replay.popleft()
+        channel.replay_bytes -= len(frame)
+        self._buffered_bytes -= len(frame)
+
+    def _remove(self, correlation_id: str) -> None:
+        channel = self._channels.pop(correlation_id)
+        self._buffered_bytes -= channel.replay_bytes
+        self._publish_gauges()
+
+    def _evict_idle_channel(self) -> bool:
+        for correlation_id, channel in self._channels.items():
+            if not channel.subscribers:
+                self._remove(correlation_id)
+                self.stats["evicted"] += 1
+                return True
+        return False
+
+    def _enforce_memory_cap(self) -> None:
+        if self._buffered_bytes <= self.max_buffered_bytes:
+            return
+        for correlation_id in list(self._channels):
+            channel = self._channels[correlation_id]
+            if not channel.subscribers:
+                self._remove(correlation_id)
+                self.stats["evicted"] += 1
+            else:
+                # Live subscribers already hold their frames; only replay is lost
+                while channel.replay and self._buffered_bytes > self.max_buffered_bytes:
+                    self._trim(channel)
+            if self._buffered_bytes <= self.max_buffered_bytes:
+                break
+        self._publish_gauges()
+
+    def _maybe_collect(self, now: float) -> None:
+        if now - self._last_gc < self.gc_interval:
+            return
+        self._last_gc = now
+        for correlation_id, channel in list(self._channels.items()):
+            if channel.subscribers:
+                continue
+            if (
+                channel.completed_at is not None and now - channel.completed_at > self.completed_ttl
+            ) or now - channel.last_activity > self.idle_ttl:
+                self._remove(correlation_id)
+                self.stats["collected"] += 1
+
+    def _dropped(self, reason: str) -> None:
+        self.stats["dropped"] += 1
+        if ULTRA_SSE_DROPPED_FRAMES:
+            ULTRA_SSE_DROPPED_FRAMES.labels(reason=reason).inc()
+
+    def _publish_subscribers(self, delta: int) -> None:
+        self._subscriber_count += delta
+        if ULTRA_SSE_SUBSCRIBERS:
+            ULTRA_SSE_SUBSCRIBERS.set(self._subscriber_count)
+
+    def _publish_gauges(self) -> None:
+        if ULTRA_SSE_CHANNELS:
+            ULTRA_SSE_CHANNELS.set(len(self._channels))
+        if ULTRA_SSE_BUFFERED_BYTES:
+            ULTRA_SSE_BUFFERED_BYTES.set(self._buffered_bytes)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "backend": "memory",
+            "channels": len(self._channels),
+            "subscribers": self._subscriber_count,
+            "buffered_bytes": self._buffered_bytes,
+        }
+
+
+def _wait_timeout(heartbeat: float, deadline: Optional[float]) -> float:
+    """Seconds to wait for the next frame: until the heartbeat or the connection deadline."""
+    if deadline is None:
+        return heartbeat
+    return min(heartbeat, deadline - time.monotonic())
+
+
+def _parse_event_id(last_event_id: Optional[str]) -> int:
+    try:
+        return int(last_event_id) if last_event_id else 0
+    except ValueError:
+        return 0
+
+
+def _text(value: Any) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+class RedisSSEEventBus(SSEEventBus):
+    """Event bus backed by one Redis Stream per channel, shared by all workers.
+
+    Each subscriber reads the stream with a blocking ``XREAD`` from its own
+    position, so replay after ``Last-Event-ID`` (a stream entry id) and live
+    delivery are the same code path.
+    """
+
+    def __init__(self, redis_client: Any, prefix: str = "ultra:sse", **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.redis = redis_client
+        self.prefix = prefix
+        self._live_channels: Dict[str, int] = {}
+
+    def _key(self, correlation_id: str) -> str:
+        return f"{self.prefix}:{correlation_id}"
+
+    async def _append(self, correlation_id: str, fields: Dict[str, str], ttl: float) -> bool:
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.xadd(
+                    self._key(correlation_id), fields, maxlen=self.replay_size, approximate=True
+                )
+                pipe.expire(self._key(correlation_id), max(int(ttl), 1))
+                await pipe.execute()
+            return True
+        except Exception as e:
+            logger.warning(f"Failed to publish SSE event for {correlation_id}: {e}")
+            self._dropped("backend_error")
+            return False
+
+    async def publish(self, correlation_id: str, event_name: str, data: dict) -> None:
+        if not correlation_id:
+            return
+        if await self._append(
+            correlation_id, {"event": event_name, "data": json.dumps(data)}, self.idle_ttl
+        ):
+            self.stats["published"] += 1
+
+    async def complete(self, correlation_id: str) -> None:
+        if correlation_id:
+            await self._append(correlation_id, {"event": _END_EVENT}, self.completed_ttl)
+
+    def _reserve(self, correlation_id: str) -> None:
+        if correlation_id not in self._live_channels and len(self._live_channels) >= self.max_channels:
+            raise SSECapacityError(self.max_channels)
+
+    async def _frames(
+        self,
+        correlation_id: str,
+        last_event_id: Optional[str],
+        heartbeat: float,
+        deadline: Optional[float],
+    ) -> AsyncGenerator[str, None]:
+        self._live_channels[correlation_id] = self._live_channels.get(correlation_id, 0) + 1
+        self._publish_subscribers(1)
+        self._publish_gauges()
+        key = self._key(correlation_id)
+        # Without Last-Event-ID, start from the oldest retained event
+        position = last_event_id or "0"
+        last_activity = time.monotonic()
+        try:
+            yield CONNECTED_FRAME
             while True:
-                item = await queue.get()
-                yield item
+                timeout = _wait_timeout(heartbeat, deadline)
+                if timeout <= 0:
+                    return
+                try:
+                    response = await self.redis.xread(
+                        {key: position}, count=100, block=max(int(timeout * 1000), 1)
+                    )
+                except Exception as e:
+                    # The client reconnects with Last-Event-ID and resumes
+                    logger.warning(f"SSE stream read failed for {correlation_id}: {e}")
+                    return
+                entries = response[0][1] if response else []
+                if not entries:
+                    if _wait_timeout(heartbeat, deadline) <= 0:
+                        return
+                    if time.monotonic() - last_activity > self.idle_ttl:
+                        return
+                    yield HEARTBEAT_FRAME
+                    continue
+                last_activity = time.monotonic()
+                for entry_id, fields in entries:
+                    position = entry_id
+                    fields = {_text(k): _text(v) for k, v in fields.items()}
+                    if fields.get("event") == _END_EVENT:
+                        return
+                    yield encode_frame(
+                        _text(entry_id), fields["event"], json.loads(fields.get("data", "{}"))
+                    )
         finally:
-            if hb_task:
-                hb_task.cancel()
+            self._live_channels[correlation_id] -= 1
+            if not self._live_channels[correlation_id]:
+                del self._live_channels[correlation_id]
+            self._publish_subscribers(-1)
+            self._publish_gauges()
 
+    def _publish_gauges(self) -> None:
+        if ULTRA_SSE_CHANNELS:
+            ULTRA_SSE_CHANNELS.set(len(self._live_channels))
 
-# Singleton instance
-sse_event_bus = SSEEventBus()
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "backend": "redis",
+            "channels": len(self._live_channels),
+            "subscribers": self._subscriber_count,
+        }
 
 
+def create_event_bus() -> SSEEventBus:
+    """Build the event bus selected by SSE_EVENT_BUS_BACKEND."""
+    options = dict(
+        queue_size=Config.SSE_QUEUE_SIZE,
+        replay_size=Config.SSE_REPLAY_SIZE,
+        idle_ttl=Config.SSE_IDLE_TTL,
+        completed_ttl=Config.SSE_COMPLETED_TTL,
+        max_channels=Config.SSE_MAX_CHANNELS,
+        max_buffered_bytes=Config.SSE_MAX_BUFFERED_BYTES,
+        heartbeat_seconds=Config.SSE_HEARTBEAT_SECONDS,
+        max_connection_seconds=Config.SSE_MAX_CONNECTION_SECONDS,
+    )
+    if Config.SSE_EVENT_BUS_BACKEND == "redis":
+        try:
+            import redis.asyncio as redis
+
+            client = redis.from_url(Config.SSE_REDIS_URL or Config.REDIS_URL, decode_responses=True)
+            return RedisSSEEventBus(client, **options)
+        except Exception as e:
+            logger.error(f"Failed to initialize Redis SSE event bus, using in-process bus: {e}")
+    return SSEEventBus(**options)
+
+
+# Singleton instance
+sse_event_bus = create_event_bus()
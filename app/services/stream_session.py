@@ -0,0 +1,169 @@
+"""
+Per-stream state for streaming pipeline responses.
+
+A `StreamSession` belongs to exactly one SSE connection. It owns the event
+sequence counter, a bounded buffer between the pipeline and the client, and
+the provider tasks started on the stream's behalf, so that a client that goes
+away stops the pipeline instead of leaving it to run to completion.
+"""
+
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Callable, Coroutine, Dict, Optional, Set
+
+from app.models.streaming_response import StreamEvent
+from app.utils.logging import get_logger
+
+logger = get_logger("stream_session")
+
+_DONE = object()
+
+
+class StreamSession:
+    """Sequence numbering, buffering and cancellation for one stream."""
+
+    def __init__(
+        self,
+        buffer_size: int = 10,
+        is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None,
+        poll_interval: float = 0.5,
+        stall_timeout: float = 60.0,
+    ):
+        """
+        Args:
+            buffer_size: Frames held between the pipeline and the client before
+                the pipeline is paused
+            is_disconnected: Async callable reporting client disconnects, e.g.
+                `Request.is_disconnected`
+            poll_interval: Seconds between disconnect checks
+            stall_timeout: Seconds a full buffer may go undrained before the
+                client is treated as gone
+        """
+        self.buffer_size = max(1, buffer_size)
+        self.is_disconnected = is_disconnected
+        self.poll_interval = poll_interval
+        self.stall_timeout = stall_timeout
+        self.close_reason: Optional[str] = None
+        self.stats = {"frames": 0, "stalls": 0, "cancelled_tasks": 0}
+        self._sequence = 0
+        self._tasks: Set[asyncio.Task] = set()
+        self._queue: Optional[asyncio.Queue] = None
+        self._producer: Optional[asyncio.Task] = None
+        self._error: Optional[BaseException] = None
+
+    @property
+    def sequence(self) -> int:
+        """Sequence number of the last event created."""
+        return self._sequence
+
+    @property
+    def closed(self) -> bool:
+        """Whether the session has been closed."""
+        return self.close_reason is not None
+
+    def next_sequence(self) -> int:
+        """Get next event sequence number."""
+        self._sequence += 1
+        return self._sequence
+
+    def event(self, event_type: Any, data: Dict[str, Any]) -> StreamEvent:
+        """Create a streaming event numbered within this session."""
+        return StreamEvent(event=event_type, sequence=self.next_sequence(), data=data)
+
+    def spawn(self, coro: Coroutine, name: Optional[str] = None) -> asyncio.Task:
+        """Start a task that is cancelled when the session closes."""
+        task = asyncio.create_task(coro, name=name)
+        if self.closed:
+            task.cancel()
+            return task
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def close(self, reason: str = "closed") -> None:
+        """Stop the pipeline and cancel every in-flight task. Idempotent."""
+        if self.closed:
+            return
+        self.close_reason = reason
+        pending = [task for task in self._tasks if not task.done()]
+        for task in pending:
+            task.cancel()
+        self.stats["cancelled_tasks"] += len(pending)
+        producer = self._producer
+        if producer is not None and not producer.done() and producer is not asyncio.current_task():
+            producer.cancel()
+        if reason != "completed":
+            logger.info(
+                f"Stream closed ({reason}) after {self.stats['frames']} frames; "
+                f"cancelled {len(pending)} in-flight tasks"
+            )
+
+    async def run(self, frames: AsyncIterator[str]) -> AsyncIterator[str]:
+        """
+        Relay `frames` to the client through the session buffer.
+
+        The pipeline runs in its own task and blocks once `buffer_size` frames
+        are waiting, so a slow client slows the pipeline rather than growing
+        memory. A disconnect, a stall longer than `stall_timeout`, or the
+        consumer abandoning this generator closes the session.
+        """
+        self._queue = asyncio.Queue(maxsize=self.buffer_size)
+        self._producer = asyncio.create_task(self._pump(frames))
+        self._producer.add_done_callback(self._producer_done)
+        watcher = None
+        if self.is_disconnected is not None:
+            watcher = asyncio.create_task(self._watch_disconnect())
+        try:
+            while not (self._queue.empty() and self._producer.done()):
+                frame = await self._queue.get()
+                if frame is _DONE:
+                    break
+                self.stats["frames"] += 1
+                yield frame
+            if self._error is not None:
+                raise self._error
+        finally:
+            if watcher is not None:
+                watcher.cancel()
+            self.close("completed" if self._producer.done() else "consumer_closed")
+
+    async def _pump(self, frames: AsyncIterator[str]) -> None:
+        """Move frames from the pipeline into the buffer."""
+        try:
+            async for frame in frames:
+                if not self._queue.full():
+                    self._queue.put_nowait(frame)
+                    continue
+                self.stats["stalls"] += 1
+                try:
+                    await asyncio.wait_for(self._queue.put(frame), self.stall_timeout)
+                except asyncio.TimeoutError:
+                    self.close("stalled")
+                    return
+        finally:
+            aclose = getattr(frames, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+    def _producer_done(self, task: asyncio.Task) -> None:
+        """Record the pipeline outcome and wake the consumer."""
+        if not task.cancelled() and task.exception() is not None:
+            self._error = task.exception()
+        # Frames still buffered are useless once the session is closed
+        if self.closed:
+            while not self._queue.empty():
+                self._queue.get_nowait()
+        # A full buffer is drained by the consumer, which then sees the task is done
+        if not self._queue.full():
+            self._queue.put_nowait(_DONE)
+
+    async def _watch_disconnect(self) -> None:
+        """Close the session as soon as the client disconnects."""
+        while not self.closed:
+            try:
+                if await self.is_disconnected():
+                    self.close("client_disconnected")
+                    return
+            except Exception as e:
+                logger.debug(f"Disconnect check failed: {e}")
+                return
+            await asyncio.sleep(self.poll_interval)
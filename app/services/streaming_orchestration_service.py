@@ -8,17 +8,21 @@ processes through its stages.
 
 import asyncio
 import json
+import os
+import time
 from typing import AsyncGenerator, Dict, Any, List, Optional
 
-from app.services.orchestration_service import OrchestrationService
+from app.services.orchestration_service import OrchestrationService, STUB_RESPONSE
 from app.models.streaming_response import (
     StreamEvent,
     StreamEventType,
     PipelineStartEvent,
+    StageStartEvent,
     ModelResponseEvent,
     SynthesisChunkEvent,
     StreamingConfig
 )
+from app.services.stream_session import StreamSession
 from app.utils.logging import get_logger
 
 logger = get_logger("streaming_orchestration")
@@ -31,24 +35,6 @@ class StreamingOrchestrationService(OrchestrationService):
         """Initialize streaming orchestration service."""
         super().__init__(*args, **kwargs)
         self.streaming_config = StreamingConfig()
-        self._event_sequence = 0
-
-    def _next_sequence(self) -> int:
-        """Get next event sequence number."""
-        self._event_sequence += 1
-        return self._event_sequence
-
-    def _create_event(
-        self,
-        event_type: str,
-        data: Dict[str, Any]
-    ) -> StreamEvent:
-        """Create a streaming event."""
-        return StreamEvent(
-            event=event_type,
-            sequence=self._next_sequence(),
-            data=data
-        )
 
     async def stream_pipeline(
         self,
@@ -56,19 +42,24 @@ class StreamingOrchestrationService(OrchestrationService):
         options: Optional[Dict[str, Any]] = None,
         user_id: Optional[str] = None,
         selected_models: Optional[List[str]] = None,
-        stream_config: Optional[StreamingConfig] = None
+        stream_config: Optional[StreamingConfig] = None,
+        session: Optional[StreamSession] = None
     ) -> AsyncGenerator[str, None]:
         """
         Run pipeline with streaming events.
 
+        Sequence numbers and in-flight model tasks belong to `session`, so
+        concurrent streams on this shared service never see each other's state.
+        A fresh session is used when none is given.
+
         Yields:
             Server-Sent Event formatted strings
         """
-        self._event_sequence = 0  # Reset sequence for new stream
+        session = session or StreamSession()
 
         # Send pipeline start event
         start_event = PipelineStartEvent(
-            sequence=self._next_sequence(),
+            sequence=session.next_sequence(),
             data={
                 "query": str(input_data)[:200],
                 "selected_models": selected_models or [],
@@ -103,7 +94,7 @@ class StreamingOrchestrationService(OrchestrationService):
                 f"{len(selected_models or [])} models provided; "
                 f"missing providers: {sorted(missing_providers)}"
             )
-            error_event = self._create_event(
+            error_event = session.event(
                 StreamEventType.PIPELINE_ERROR.value,
                 {
                     "error": error_text,
@@ -117,73 +108,232 @@ class StreamingOrchestrationService(OrchestrationService):
 
         selected_models = self._validate_model_names(selected_models)
         if not selected_models:
-            error_event = self._create_event(
+            error_event = session.event(
                 StreamEventType.PIPELINE_ERROR.value,
                 {"error": "No valid models provided after validation"}
             )
             yield self._format_sse(error_event)
             return
 
+        config = stream_config or self.streaming_config
+        prompt = str(input_data)
+        stages = self.pipeline_stages
+
+        # Stage 1: initial responses, forwarded as each model finishes (or token by token)
+        yield self._format_sse(self._stage_start_event(0, session))
+        responses: Dict[str, str] = {}
+        async for event in self._stream_initial_response(
+            prompt, selected_models, options, config, session=session
+        ):
+            if event.event == StreamEventType.MODEL_RESPONSE.value:
+                responses[event.data["model"]] = event.data["response_text"]
+            yield self._format_sse(event)
+        yield self._format_sse(session.event(
+            StreamEventType.STAGE_COMPLETE.value,
+            {"stage_name": stages[0].name, "successful_models": list(responses.keys())}
+        ))
+
+        if not responses:
+            yield self._format_sse(session.event(
+                StreamEventType.PIPELINE_ERROR.value,
+                {"error": "No models produced an initial response"}
+            ))
+            return
+
+        initial_data = {
+            "stage": stages[0].name,
+            "responses": responses,
+            "prompt": prompt,
+            "models_attempted": selected_models,
+            "successful_models": list(responses.keys()),
+            "response_count": len(responses),
+        }
+
+        # Stage 2: peer review needs every peer's full answer, so it is not token-streamed
+        yield self._format_sse(self._stage_start_event(1, session))
+        peer_data = await self.peer_review_and_revision(initial_data, selected_models, options)
+        if not isinstance(peer_data, dict) or peer_data.get("error"):
+            error = peer_data.get("error") if isinstance(peer_data, dict) else "Invalid peer review output"
+            yield self._format_sse(session.event(
+                StreamEventType.STAGE_ERROR.value,
+                {"stage_name": stages[1].name, "error": error}
+            ))
+            # Synthesis can still proceed from the initial responses
+            peer_data = initial_data
+        else:
+            yield self._format_sse(session.event(
+                StreamEventType.STAGE_COMPLETE.value,
+                {
+                    "stage_name": stages[1].name,
+                    "successful_models": peer_data.get("successful_models", []),
+                }
+            ))
+
+        # Stage 3: ultra synthesis, streamed straight from the provider
+        yield self._format_sse(self._stage_start_event(2, session))
+        synthesis_parts: List[str] = []
+        synthesis_model = None
+        synthesis_failed = False
+        async for event in self._stream_ultra_synthesis(
+            {**peer_data, "prompt": prompt}, selected_models, options, config, session=session
+        ):
+            if event.event == StreamEventType.SYNTHESIS_CHUNK.value:
+                synthesis_parts.append(event.data["chunk_text"])
+                synthesis_model = event.data["model_used"]
+            elif event.event == StreamEventType.STAGE_ERROR.value:
+                synthesis_failed = True
+            yield self._format_sse(event)
+
+        if synthesis_failed:
+            yield self._format_sse(session.event(
+                StreamEventType.PIPELINE_ERROR.value,
+                {"error": "Ultra synthesis failed"}
+            ))
+            return
+
+        yield self._format_sse(session.event(
+            StreamEventType.STAGE_COMPLETE.value,
+            {"stage_name": stages[2].name, "model_used": synthesis_model}
+        ))
+        yield self._format_sse(session.event(
+            StreamEventType.PIPELINE_COMPLETE.value,
+            {
+                "synthesis": "".join(synthesis_parts),
+                "model_used": synthesis_model,
+                "successful_models": list(responses.keys()),
+            }
+        ))
+
+    def _stage_start_event(self, index: int, session: StreamSession) -> StageStartEvent:
+        """Create the start event for the pipeline stage at `index`."""
+        stage = self.pipeline_stages[index]
+        return StageStartEvent(
+            sequence=session.next_sequence(),
+            data={
+                "stage_name": stage.name,
+                "stage_index": index,
+                "total_stages": len(self.pipeline_stages),
+                "description": stage.description,
+            }
+        )
+
+    async def _stream_model(self, model: str, prompt: str) -> AsyncGenerator[str, None]:
+        """
+        Yield text deltas for one model directly from its adapter.
+
+        Errors are reported in-band as a single chunk starting with "Error:",
+        the same convention the adapters use.
+        """
+        is_valid, error_msg = self._validate_api_key(model)
+        if not is_valid:
+            if os.getenv("TESTING") == "true":
+                yield STUB_RESPONSE
+                return
+            yield f"Error: {error_msg}"
+            return
+
+        adapter, _ = self._create_adapter(model)
+        if adapter is None:
+            yield f"Error: Failed to create adapter for {model}"
+            return
+
+        async for chunk in adapter.stream(prompt):
+            yield chunk
+
     async def _stream_initial_response(
         self,
         prompt: str,
         models: List[str],
-        options: Optional[Dict[str, Any]] = None
+        options: Optional[Dict[str, Any]] = None,
+        config: Optional[StreamingConfig] = None,
+        session: Optional[StreamSession] = None
     ) -> AsyncGenerator[StreamEvent, None]:
-        """Stream initial response generation from multiple models."""
-        # Create tasks for concurrent model execution
-        async def execute_and_stream(model: str):
-            """Execute model and return result."""
+        """
+        Stream initial response generation from multiple models.
+
+        Models run concurrently and each result is yielded as soon as that model
+        finishes, rather than after the slowest one. With
+        `config.include_partial_responses`, provider deltas are also forwarded
+        as MODEL_CHUNK events while the model is still generating; the chunk
+        queue is bounded by `config.buffer_size`, so a slow consumer pauses the
+        provider streams. Model tasks are owned by `session` and are cancelled
+        when it closes.
+        """
+        session = session or StreamSession()
+        partial = bool(config and config.include_partial_responses)
+        queue: asyncio.Queue = asyncio.Queue(
+            maxsize=max(config.buffer_size if config else 0, len(models))
+        )
+
+        async def run_model(model: str) -> None:
+            start_time = time.time()
             try:
-                # Send model start event
-                _ = self._create_event(
-                    StreamEventType.MODEL_START.value,
-                    {"model": model, "stage": "initial_response"}
-                )
+                if partial:
+                    parts: List[str] = []
+                    error = None
+                    async for chunk in self._stream_model(model, prompt):
+                        if chunk.startswith("Error:"):
+                            error = chunk
+                            continue
+                        parts.append(chunk)
+                        await queue.put((model, "chunk", chunk))
+                    result = {"error": error} if error else {"generated_text": "".join(parts)}
+                else:
+                    result = await self._execute_model_with_retry(model, prompt)
+            except Exception as e:
+                result = {"error": str(e)}
+            await queue.put((model, "done", (result, time.time() - start_time)))
 
-                # Execute model
-                result = await self._execute_model_with_retry(model, prompt)
+        tasks = [session.spawn(run_model(model), name=f"stream:{model}") for model in models]
+        try:
+            remaining = len(tasks)
+            while remaining:
+                model, kind, payload = await queue.get()
+                if kind == "chunk":
+                    yield session.event(
+                        StreamEventType.MODEL_CHUNK.value,
+                        {"model": model, "stage": "initial_response", "chunk_text": payload}
+                    )
+                    continue
 
+                remaining -= 1
+                result, elapsed = payload
                 if "generated_text" in result:
-                    # Send model response event
-                    response_event = ModelResponseEvent(
-                        sequence=self._next_sequence(),
+                    yield ModelResponseEvent(
+                        sequence=session.next_sequence(),
                         data={
                             "model": model,
                             "response_text": result["generated_text"],
                             "tokens_used": result.get("usage", {}),
-                            "response_time": 0
+                            "response_time": round(elapsed, 3)
                         }
                     )
-                    return (model, result, response_event)
                 else:
-                    # Send model error event
-                    error_event = self._create_event(
+                    yield session.event(
                         StreamEventType.MODEL_ERROR.value,
                         {
                             "model": model,
                             "error": result.get("error", "Unknown error")
                         }
                     )
-                    return (model, result, error_event)
-
-            except Exception as e:
-                error_event = self._create_event(
-                    StreamEventType.MODEL_ERROR.value,
-                    {"model": model, "error": str(e)}
-                )
-                return (model, {"error": str(e)}, error_event)
+        finally:
+            # Consumer went away or failed: do not leave provider calls running
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
 
     async def _stream_ultra_synthesis(
         self,
         data: Dict[str, Any],
         models: List[str],
         options: Optional[Dict[str, Any]],
-        config: StreamingConfig
+        config: StreamingConfig,
+        session: Optional[StreamSession] = None
     ) -> AsyncGenerator[StreamEvent, None]:
         """Stream ultra synthesis generation."""
+        session = session or StreamSession()
         # Send synthesis start event
-        yield self._create_event(
+        yield session.event(
             StreamEventType.SYNTHESIS_START.value,
             {"models_available": models}
         )
@@ -194,7 +344,7 @@ class StreamingOrchestrationService(OrchestrationService):
         elif "responses" in data and data["responses"]:
             responses_to_synthesize = data["responses"]
         else:
-            yield self._create_event(
+            yield session.event(
                 StreamEventType.STAGE_ERROR.value,
                 {"error": "No responses available for synthesis"}
             )
@@ -210,20 +360,48 @@ class StreamingOrchestrationService(OrchestrationService):
         # Select best model for synthesis
         synthesis_model = self._select_synthesis_model(models, responses_to_synthesize)
 
-        # For now, generate full synthesis then chunk it
-        # TODO: Implement true streaming from LLM adapters
+        if config.synthesis_streaming:
+            # Forward provider deltas as they arrive
+            chunk_index = 0
+            total_length = 0
+            async for delta in self._stream_model(synthesis_model, synthesis_prompt):
+                if delta.startswith("Error:"):
+                    yield session.event(
+                        StreamEventType.STAGE_ERROR.value,
+                        {"error": delta}
+                    )
+                    return
+                yield SynthesisChunkEvent(
+                    sequence=session.next_sequence(),
+                    data={
+                        "chunk_text": delta,
+                        "chunk_index": chunk_index,
+                        "model_used": synthesis_model
+                    }
+                )
+                chunk_index += 1
+                total_length += len(delta)
+
+            yield session.event(
+                StreamEventType.SYNTHESIS_COMPLETE.value,
+                {
+                    "model_used": synthesis_model,
+                    "total_length": total_length,
+                    "total_chunks": chunk_index
+                }
+            )
+            return
+
+        # Synthesis streaming disabled: generate in full, then deliver in word chunks
         result = await self._execute_model_with_retry(synthesis_model, synthesis_prompt)
 
         if "generated_text" in result:
             synthesis_text = result["generated_text"]
-
-            # Chunk the synthesis text
             chunks = self._chunk_text(synthesis_text, config.chunk_size)
 
-            # Stream chunks
             for i, chunk in enumerate(chunks):
-                chunk_event = SynthesisChunkEvent(
-                    sequence=self._next_sequence(),
+                yield SynthesisChunkEvent(
+                    sequence=session.next_sequence(),
                     data={
                         "chunk_text": chunk,
                         "chunk_index": i,
@@ -231,22 +409,17 @@ class StreamingOrchestrationService(OrchestrationService):
                         "total_chunks": len(chunks)
                     }
                 )
-                yield chunk_event
-
-                # Small delay between chunks for demonstration
-                await asyncio.sleep(0.05)
 
-            # Send synthesis complete
-            yield self._create_event(
+            yield session.event(
                 StreamEventType.SYNTHESIS_COMPLETE.value,
                 {
                     "model_used": synthesis_model,
-                    "total_length": len(synthesis_text)
+                    "total_length": len(synthesis_text),
+                    "total_chunks": len(chunks)
                 }
             )
         else:
-            # Send error
-            yield self._create_event(
+            yield session.event(
                 StreamEventType.STAGE_ERROR.value,
                 {"error": result.get("error", "Synthesis generation failed")}
             )
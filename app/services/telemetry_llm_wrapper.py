@@ -9,7 +9,7 @@ This wrapper:
 """
 
 import time
-from typing import Dict, Any, Optional
+from typing import AsyncGenerator, Dict, Any, Optional
 import tiktoken
 
 from app.services.telemetry_service import telemetry
@@ -205,6 +205,96 @@ class TelemetryLLMWrapper:
                 
                 raise
     
+    async def stream(self, prompt: str) -> AsyncGenerator[str, None]:
+        """
+        Stream response deltas with telemetry tracking.
+
+        Metrics are recorded once the stream is exhausted, using the
+        accumulated text, so cost accounting matches `generate()`.
+
+        Args:
+            prompt: Input prompt
+
+        Yields:
+            Text deltas from the underlying adapter
+        """
+        start_time = time.time()
+        input_tokens = self._estimate_tokens(prompt)
+        first_token_ms: Optional[float] = None
+        parts = []
+
+        span_attributes = {
+            "llm.provider": self.provider,
+            "llm.model": self.model,
+            "llm.prompt_length": len(prompt),
+            "llm.input_tokens": input_tokens,
+            "llm.streaming": True,
+        }
+
+        with telemetry.trace_span(f"llm.{self.provider}.stream", span_attributes) as span:
+            try:
+                async for chunk in self.adapter.stream(prompt):
+                    if first_token_ms is None:
+                        first_token_ms = (time.time() - start_time) * 1000
+                    parts.append(chunk)
+                    yield chunk
+            except Exception as e:
+                duration_ms = (time.time() - start_time) * 1000
+                telemetry.record_llm_request(
+                    provider=self.provider,
+                    model=self.model,
+                    duration_ms=duration_ms,
+                    success=False
+                )
+                telemetry.record_error("llm_error", provider=self.provider)
+                logger.error(
+                    f"LLM stream failed: {self.provider}/{self.model}",
+                    extra={
+                        "provider": self.provider,
+                        "model": self.model,
+                        "duration_ms": duration_ms,
+                        "error": str(e),
+                    },
+                    exc_info=True
+                )
+                raise
+
+            generated_text = "".join(parts)
+            success = not any(p.startswith("Error:") for p in parts)
+            output_tokens = self._estimate_tokens(generated_text)
+            cost = self._calculate_cost(input_tokens, output_tokens) if success else 0.0
+
+            if span:
+                span.set_attribute("llm.output_tokens", output_tokens)
+                span.set_attribute("llm.total_tokens", input_tokens + output_tokens)
+                span.set_attribute("llm.cost_usd", cost)
+                span.set_attribute("llm.success", success)
+
+            duration_ms = (time.time() - start_time) * 1000
+            telemetry.record_llm_request(
+                provider=self.provider,
+                model=self.model,
+                duration_ms=duration_ms,
+                success=success,
+                input_tokens=input_tokens,
+                output_tokens=output_tokens,
+                cost=cost
+            )
+
+            logger.info(
+                f"LLM stream completed: {self.provider}/{self.model}",
+                extra={
+                    "provider": self.provider,
+                    "model": self.model,
+                    "duration_ms": duration_ms,
+                    "time_to_first_token_ms": first_token_ms,
+                    "input_tokens": input_tokens,
+                    "output_tokens": output_tokens,
+                    "cost_usd": cost,
+                    "success": success,
+                }
+            )
+    
     def get_metrics(self) -> Dict[str, Any]:
         """Get metrics from underlying adapter if available."""
         if hasattr(self.adapter, "get_metrics"):
@@ -11,6 +11,8 @@ import socket
 import ssl
 import threading
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from datetime import datetime
 from enum import Enum
 from typing import Any, Callable, Dict, List, Optional, Tuple, Union
@@ -35,6 +37,11 @@ HEALTH_CHECK_CACHE_TTL = int(os.getenv("HEALTH_CHECK_CACHE_TTL", "60"))
 HEALTH_CHECK_TIMEOUT = int(os.getenv("HEALTH_CHECK_TIMEOUT", "5"))
 # Skip API calls in health checks (useful for staging/high-frequency checks)
 HEALTH_CHECK_SKIP_API_CALLS = os.getenv("HEALTH_CHECK_SKIP_API_CALLS", "false").lower() == "true"
+# Shared worker pool for blocking check functions (replaces a thread per check)
+HEALTH_CHECK_WORKERS = int(os.getenv("HEALTH_CHECK_WORKERS", "4"))
+health_check_executor = ThreadPoolExecutor(
+    max_workers=HEALTH_CHECK_WORKERS, thread_name_prefix="health-check"
+)
 
 
 class HealthStatus(str, Enum):
@@ -98,6 +105,8 @@ class HealthCheck:
         self.dependent_services = dependent_services or []
         self.last_check_time = 0
         self.last_check_result = None
+        self._inflight: Optional[Future] = None
+        self._inflight_lock = threading.Lock()
 
     def check(self, force: bool = False) -> Dict[str, Any]:
         """
@@ -119,27 +128,28 @@ class HealthCheck:
         ):
             return self.last_check_result
 
-        # Run the health check
+        # Run the health check on the shared pool. A run that is still going
+        # (e.g. one that timed out earlier) is joined rather than duplicated, so
+        # a hung dependency holds at most one worker.
         try:
-            # Set timeout using threading.Timer
-            result_container = {"result": None, "exception": None}
-
-            def run_check():
-                try:
-                    result_container["result"] = self.check_fn()
-                except Exception as e:
-                    result_container["exception"] = e
-
-            # Create and start the thread
-            check_thread = threading.Thread(target=run_check)
-            check_thread.daemon = True
+            with self._inflight_lock:
+                future = self._inflight
+                if future is None or future.done():
+                    future = health_check_executor.submit(self.check_fn)
+                    self._inflight = future
+
             start_time = time.time()
-            check_thread.start()
-            check_thread.join(timeout=self.timeout)
+            check_result, check_error, timed_out = None, None, False
+            try:
+                check_result = future.result(timeout=self.timeout)
+            except FutureTimeoutError:
+                timed_out = True
+            except Exception as e:
+                check_error = e
 
             duration = time.time() - start_time
 
-            if check_thread.is_alive():
+            if timed_out:
                 # Timeout occurred
                 result = {
                     "status": HealthStatus.UNAVAILABLE,
@@ -147,24 +157,24 @@ class HealthCheck:
                     "duration_ms": int(duration * 1000),
                     "timestamp": datetime.utcnow().isoformat(),
                 }
-            elif result_container["exception"] is not None:
+            elif check_error is not None:
                 # Exception occurred
                 result = {
                     "status": HealthStatus.UNAVAILABLE,
-                    "message": f"Health check failed: {str(result_container['exception'])}",
-                    "error": str(result_container["exception"]),
+                    "message": f"Health check failed: {str(check_error)}",
+                    "error": str(check_error),
                     "duration_ms": int(duration * 1000),
                     "timestamp": datetime.utcnow().isoformat(),
                 }
             else:
                 # Successfully got result
-                result = result_container["result"]
+                result = check_result
                 if "duration_ms" not in result:
                     result["duration_ms"] = int(duration * 1000)
                 if "timestamp" not in result:
                     result["timestamp"] = datetime.utcnow().isoformat()
         except Exception as e:
-            # This should rarely happen since we catch exceptions in the thread
+            # Pool submission failed (e.g. interpreter shutting down)
             logger.error(f"Error in health check {self.name}: {str(e)}")
             result = {
                 "status": HealthStatus.UNAVAILABLE,
@@ -19,7 +19,7 @@ from prometheus_client import Counter, Gauge, Histogram, Info, start_http_server
 from prometheus_client.core import REGISTRY
 
 from fastapi import FastAPI, Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from app.config import Config
 
@@ -380,61 +380,66 @@ class MetricsCollector:
             ).observe(response_size)
 
 
-class MetricsMiddleware(BaseHTTPMiddleware):
+class MetricsMiddleware:
     """
     Middleware for collecting HTTP metrics for FastAPI requests.
 
     This middleware tracks request counts, latency, and sizes for all HTTP
-    requests going through the FastAPI application.
+    requests going through the FastAPI application. Latency covers the whole
+    response body, including streamed responses.
     """
 
-    def __init__(self, app: FastAPI):
-        super().__init__(app)
+    def __init__(self, app: ASGIApp):
+        self.app = app
         self.metrics = MetricsCollector()
 
-    async def dispatch(self, request: Request, call_next):
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         # Only track metrics if enabled
-        if not Config.METRICS_ENABLED:
-            return await call_next(request)
+        if scope["type"] != "http" or not Config.METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
 
         # Get the route path for metrics labeling
-        route = request.url.path
-        method = request.method
+        route = scope["path"]
+        method = scope["method"]
 
         # Track in-progress requests
         self.metrics.request_in_progress.labels(method=method, endpoint=route).inc()
 
         # Track request size if content length is available
-        content_length = request.headers.get("content-length")
-        request_size = int(content_length) if content_length else None
+        request_size = None
+        for name, value in scope["headers"]:
+            if name == b"content-length":
+                request_size = int(value)
+                break
 
         # Track request latency
         start_time = time.time()
-        response = None
         status_code = 500
+        response_size = None
+
+        async def send_with_metrics(message: Message) -> None:
+            nonlocal status_code, response_size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                for name, value in message.get("headers", ()):
+                    if name.lower() == b"content-length":
+                        response_size = int(value)
+                        break
+            await send(message)
 
         try:
-            response = await call_next(request)
-            status_code = response.status_code
-        except Exception as e:
+            await self.app(scope, receive, send_with_metrics)
+        except Exception:
             status_code = 500
-            raise e
+            raise
         finally:
-            # Record request metrics
-            duration = time.time() - start_time
-
-            # Get response size if available
-            response_size = None
-            if response is not None:
-                resp_size = response.headers.get("content-length")
-                response_size = int(resp_size) if resp_size else None
-
             # Record metrics
             self.metrics.track_request(
                 method=method,
                 endpoint=route,
                 status_code=status_code,
-                duration=duration,
+                duration=time.time() - start_time,
                 request_size=request_size,
                 response_size=response_size,
             )
@@ -442,8 +447,6 @@ class MetricsMiddleware(BaseHTTPMiddleware):
             # Track in-progress requests
             self.metrics.request_in_progress.labels(method=method, endpoint=route).dec()
 
-        return response
-
 
 def setup_metrics(app: FastAPI):
     """
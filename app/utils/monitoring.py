@@ -83,6 +83,8 @@ class MonitoringSystem:
         # Configure structured logging
         log_dir = os.environ.get("LOG_DIR", "logs")
         enable_json = os.environ.get("LOG_JSON", "true").lower() in ("true", "1", "yes")
+        # Format and write logs on a background thread instead of the event loop
+        queue_logging = os.environ.get("LOG_QUEUE", "false").lower() in ("true", "1", "yes")
 
         configure_logging(
             app_name=self.app_name,
@@ -91,6 +93,8 @@ class MonitoringSystem:
             enable_json_logging=enable_json,
             console_output=True,
             log_file_output=True,
+            json_backend=os.environ.get("LOG_JSON_BACKEND", "auto"),
+            queue_logging=queue_logging,
         )
 
         # Set up logging middleware but don't apply it yet (just configure it)
@@ -3,19 +3,33 @@ Rate limiting service for the Ultra backend.
 
 This module provides a service for enforcing rate limits based on IP address,
 user ID, subscription tier, path, and method.
+
+Without Redis, limits are kept in memory with fixed-size state per client: a
+ring of per-second hit counts covering the window, so a check is O(1) however
+busy the client is. Clients idle for a full window are evicted, the number of
+tracked clients, path counters and telemetry samples is capped, and memory
+stays flat however many distinct clients are seen.
 """
 
 import hashlib
 import json
 import os
+import random
 import time
 import uuid
+from array import array
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional, Tuple
 
 import redis
 
 from app.database.models.user import User
+from app.services.redis_rate_limiter import (
+    SLIDING_WINDOW_SCRIPT,
+    parse_window_reply,
+    window_args,
+)
 from app.utils.logging import get_logger
 
 # Configure logging
@@ -71,18 +85,75 @@ METHOD_WEIGHTS = {
 REDIS_URL = os.getenv("REDIS_URL")
 _redis_client = None
 
+# In-memory fallback bounds
+MEMORY_MAX_CLIENTS = int(os.getenv("RATE_LIMIT_MEMORY_MAX_CLIENTS", "100000"))
+MEMORY_MAX_PATHS = int(os.getenv("RATE_LIMIT_MEMORY_MAX_PATHS", "1000"))
+MEMORY_MAX_TELEMETRY = int(os.getenv("RATE_LIMIT_MEMORY_MAX_TELEMETRY", "1000"))
+# Idle clients evicted per check, so eviction never stalls a single request
+MEMORY_EVICTIONS_PER_CHECK = 32
+
+
+class SecondRing:
+    """Hit counts per second for the most recent `slots` seconds of one client."""
+
+    __slots__ = ("counts", "latest", "total")
+
+    def __init__(self, slots: int, now: int = 0):
+        self.counts = array("I", bytes(4 * slots))
+        self.latest = now
+        self.total = 0
+
+    def add(self, second: int, hits: int = 1) -> int:
+        """Count `hits` at `second`; returns hits in the retained seconds."""
+        self._advance(second)
+        self.counts[self.latest % len(self.counts)] += hits
+        self.total += hits
+        return self.total
+
+    def count_between(self, start: int, end: int) -> int:
+        """Hits in seconds [start, end) that are still retained."""
+        first = max(start, self.latest - len(self.counts) + 1)
+        last = min(end, self.latest + 1)
+        return sum(self.counts[s % len(self.counts)] for s in range(first, last))
+
+    def _advance(self, second: int) -> None:
+        # A clock that steps back counts into the latest second
+        if second <= self.latest:
+            return
+        slots = len(self.counts)
+        if second - self.latest >= slots:
+            self.counts = array("I", bytes(4 * slots))
+            self.total = 0
+        else:
+            for s in range(self.latest + 1, second + 1):
+                i = s % slots
+                self.total -= self.counts[i]
+                self.counts[i] = 0
+        self.latest = second
+
+
+def _new_memory_store() -> Dict[str, "OrderedDict[str, Any]"]:
+    return {
+        "ip": OrderedDict(),  # IP-based rate limiting
+        "user": OrderedDict(),  # User-based rate limiting
+        "path": OrderedDict(),  # Path-based rate limiting
+    }
+
 
 class RateLimitService:
     """Service for rate limiting requests based on IP address, user ID, subscription tier, path, and method"""
 
     def __init__(self):
         """Initialize the rate limit service"""
-        self.in_memory_store = {
-            "ip": {},  # IP-based rate limiting
-            "user": {},  # User-based rate limiting
-            "path": {},  # Path-based rate limiting
+        self.in_memory_store = _new_memory_store()
+        self.telemetry_store: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.memory_stats = {
+            "idle_evictions": 0,
+            "capacity_evictions": 0,
+            "paths_dropped": 0,
         }
         self.redis = self._get_redis_client()
+        self._window_script = None
         self.internal_service_tokens = {}  # token -> {service_name, expiry}
         self.bypass_keys = set()  # Special keys that bypass rate limits
         self.telemetry_enabled = True
@@ -356,26 +427,23 @@ class RateLimitService:
         Returns:
             Tuple of (is_limited, rate_limit_info)
         """
-        pipeline = self.redis.pipeline()
-
-        # Add current request to sorted set with score = current timestamp
-        pipeline.zadd(key, {str(current_time): current_time})
-
-        # Remove entries older than the window
-        pipeline.zremrangebyscore(key, 0, current_time - 60)
-
-        # Count remaining entries
-        pipeline.zcard(key)
-
-        # Set key expiration (cleanup)
-        pipeline.expire(key, 90)  # 1.5x window for safety
-
-        # Execute pipeline
-        _, _, count, _ = pipeline.execute()
+        # Trim, count, record and bump the path counter in one atomic round-trip.
+        # Hits are unique members, so same-second requests are all counted.
+        script = self._window_script
+        if script is None or script.registered_client is not self.redis:
+            script = self._window_script = self.redis.register_script(SLIDING_WINDOW_SCRIPT)
+        keys = [key]
+        if path:
+            keys.append(f"path:{path}:{method if method else 'ALL'}")
+        result = parse_window_reply(
+            script(keys=keys, args=window_args(current_time, 60, limit))
+        )
+        # A denied request is not recorded in the window, so report it on top
+        count = result.count if result.allowed else result.count + 1
 
         # Store telemetry if enabled and sampled
         if self.telemetry_enabled and path and method and request_id:
-            if self.redis.random() < self.telemetry_sample_rate:
+            if random.random() < self.telemetry_sample_rate:
                 telemetry_data = {
                     "request_id": request_id,
                     "timestamp": current_time,
@@ -384,7 +452,7 @@ class RateLimitService:
                     "method": method,
                     "count": count,
                     "limit": limit,
-                    "limited": count > limit,
+                    "limited": not result.allowed,
                 }
 
                 # Store telemetry data for a short period
@@ -395,19 +463,8 @@ class RateLimitService:
                     json.dumps(telemetry_data),
                 )
 
-        # Add to path-specific counters if path is provided
-        if path:
-            path_key = f"path:{path}:{method if method else 'ALL'}"
-            try:
-                pipeline = self.redis.pipeline()
-                pipeline.incr(path_key)
-                pipeline.expire(path_key, 86400)  # 24 hours
-                pipeline.execute()
-            except Exception as e:
-                logger.warning(f"Failed to update path counter: {str(e)}")
-
         # Check if limit is exceeded
-        is_limited = count > limit
+        is_limited = not result.allowed
 
         return is_limited, {
             "limit": limit,
@@ -444,40 +501,35 @@ class RateLimitService:
         """
         # Split key into type and identifier
         key_type, key_id = key.split(":", 1)
-
-        # Initialize if not exists
-        if key_id not in self.in_memory_store[key_type]:
-            self.in_memory_store[key_type][key_id] = []
-
-        # Add current request timestamp
-        self.in_memory_store[key_type][key_id].append(current_time)
-
-        # Remove timestamps outside the window
-        self.in_memory_store[key_type][key_id] = [
-            ts for ts in self.in_memory_store[key_type][key_id] if ts >= window_start
-        ]
-
-        # Count requests in window
-        count = len(self.in_memory_store[key_type][key_id])
+        clients = self.in_memory_store[key_type]
+
+        # Count the request in the client's ring of per-second counts
+        ring = clients.get(key_id)
+        if ring is None:
+            ring = clients[key_id] = SecondRing(current_time - window_start + 1, current_time)
+            count = ring.add(current_time)
+            self._evict_clients(clients, window_start)
+        else:
+            clients.move_to_end(key_id)
+            count = ring.add(current_time)
 
         # Track path-specific stats if provided
         if path:
             path_key = f"{path}:{method if method else 'ALL'}"
-            if path_key not in self.in_memory_store["path"]:
-                self.in_memory_store["path"][path_key] = 0
-            self.in_memory_store["path"][path_key] += 1
+            paths = self.in_memory_store["path"]
+            if path_key in paths:
+                paths[path_key] += 1
+            elif len(paths) < MEMORY_MAX_PATHS:
+                paths[path_key] = 1
+            else:
+                self.memory_stats["paths_dropped"] += 1
 
         # Check if limit is exceeded
         is_limited = count > limit
 
         # Store telemetry if enabled and sampled
         if self.telemetry_enabled and path and method and request_id:
-            import random
-
             if random.random() < self.telemetry_sample_rate:
-                if not hasattr(self, "telemetry_store"):
-                    self.telemetry_store = {}
-
                 self.telemetry_store[request_id] = {
                     "request_id": request_id,
                     "timestamp": current_time,
@@ -488,6 +540,9 @@ class RateLimitService:
                     "limit": limit,
                     "limited": is_limited,
                 }
+                # Keep only the most recent samples
+                while len(self.telemetry_store) > MEMORY_MAX_TELEMETRY:
+                    self.telemetry_store.popitem(last=False)
 
         return is_limited, {
             "limit": limit,
@@ -497,6 +552,18 @@ class RateLimitService:
             "count": count,
         }
 
+    def _evict_clients(self, clients: "OrderedDict[str, SecondRing]", window_start: int) -> None:
+        """Drop clients idle for a whole window, then the least recent ones past the cap."""
+        for _ in range(MEMORY_EVICTIONS_PER_CHECK):
+            oldest = next(iter(clients.values()))
+            if oldest.latest >= window_start:
+                break
+            clients.popitem(last=False)
+            self.memory_stats["idle_evictions"] += 1
+        while len(clients) > MEMORY_MAX_CLIENTS:
+            clients.popitem(last=False)
+            self.memory_stats["capacity_evictions"] += 1
+
     def track_request(
         self,
         user_id: Optional[str] = None,
@@ -627,12 +694,10 @@ class RateLimitService:
         else:
             # Use in-memory for report
             if user_id in self.in_memory_store["user"]:
-                timestamps = self.in_memory_store["user"][user_id]
+                ring = self.in_memory_store["user"][user_id]
 
                 for date, (start, end) in ranges.items():
-                    report[date]["count"] = sum(
-                        1 for ts in timestamps if start <= ts < end
-                    )
+                    report[date]["count"] = ring.count_between(start, end)
 
         return report
 
@@ -726,7 +791,7 @@ class RateLimitService:
                 if user_id in self.in_memory_store["user"]:
                     del self.in_memory_store["user"][user_id]
             else:
-                self.in_memory_store = {"ip": {}, "user": {}, "path": {}}
+                self.in_memory_store = _new_memory_store()
             logger.info(
                 f"Cleared rate limits for {'all users' if user_id is None else user_id}"
             )
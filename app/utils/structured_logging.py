@@ -12,18 +12,22 @@ the existing logging infrastructure with additional features:
 6. Standardized log levels and categories
 7. Log sampling for high-volume endpoints
 8. PII redaction for sensitive data
+9. Optional queue-based handlers that format and write off the calling thread
 
 The module is designed to be used across all Ultra components to provide
 consistent, searchable logs that can be easily aggregated and analyzed.
 """
 
 import asyncio
+import atexit
+import copy
 import datetime
 import functools
 import inspect
 import json
 import logging
 import os
+import queue
 import re
 import sys
 import threading
@@ -32,9 +36,19 @@ import traceback
 import uuid
 from contextlib import contextmanager
 from enum import Enum
-from logging.handlers import RotatingFileHandler, TimedRotatingFileHandler
+from logging.handlers import (
+    QueueHandler,
+    QueueListener,
+    RotatingFileHandler,
+    TimedRotatingFileHandler,
+)
 from typing import Any, Callable, Dict, List, Optional, Set, TypeVar, Union, cast
 
+try:  # Optional faster JSON encoder for log records
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
 # Import existing logger if available, otherwise use a placeholder
 try:
     from app.utils.logging import CorrelationContext
@@ -159,6 +173,24 @@ class LogCategory(str, Enum):
     SYSTEM = "SYSTEM"
 
 
+# Request context fields, with where to find them when the record has none
+_CONTEXT_GETTERS = (
+    ("request_id", RequestContext.get_request_id),
+    ("user_id", RequestContext.get_user_id),
+    ("session_id", RequestContext.get_session_id),
+    ("correlation_id", CorrelationContext.get_correlation_id),
+)
+
+# Bounds for the formatter's memo of redacted keys and strings
+_REDACTION_CACHE_SIZE = 1024
+_REDACTION_CACHE_MAX_LENGTH = 2048
+
+# Attributes every LogRecord has; anything else on a record came from `extra`
+_RECORD_ATTRS = frozenset(
+    logging.LogRecord("", logging.INFO, "", 0, "", None, None).__dict__
+) | {"message", "asctime", "taskName"}
+
+
 class EnhancedJSONFormatter(logging.Formatter):
     """Enhanced JSON formatter with support for complex objects and context data"""
 
@@ -185,22 +217,56 @@ class EnhancedJSONFormatter(logging.Formatter):
         re.compile(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b"),
     ]
 
-    def __init__(self, redact_pii: bool = True, include_traceback: bool = True):
+    # The PII patterns as one alternation, so each string is scanned once. The
+    # card and SSN branches begin with a digit (the lookbehind stands in for the
+    # leading \b), which lets the regex engine skip ahead to candidate positions;
+    # strings without an "@" cannot hold an email and use those branches alone.
+    _DIGIT_PII = (
+        r"\d(?<!\w\d)(?:\d{3}[-\s]?(?:\d{4}[-\s]?){2}\d{4}|\d{2}[-\s]?\d{2}[-\s]?\d{4})\b"
+    )
+    PII_PATTERN = re.compile(f"{_DIGIT_PII}|{PII_PATTERNS[2].pattern}")
+    DIGIT_PII_PATTERN = re.compile(_DIGIT_PII)
+    SENSITIVE_KEY_PATTERN = re.compile("|".join(sorted(map(re.escape, SENSITIVE_FIELDS))))
+
+    # Record attributes that are never copied into the output as extras
+    RESERVED_ATTRS = _RECORD_ATTRS | {name for name, _ in _CONTEXT_GETTERS} | {"category", "id"}
+
+    def __init__(
+        self,
+        redact_pii: bool = True,
+        include_traceback: bool = True,
+        json_backend: str = "auto",
+    ):
         """
         Initialize formatter
 
         Args:
             redact_pii: Whether to redact PII from logs
             include_traceback: Whether to include traceback in error logs
+            json_backend: "orjson", "json", or "auto" (orjson when installed)
         """
         super().__init__()
         self.redact_pii = redact_pii
         self.include_traceback = include_traceback
+        if json_backend == "auto":
+            json_backend = "orjson" if orjson is not None else "json"
+        if json_backend == "orjson" and orjson is None:
+            raise ValueError("json_backend 'orjson' requires the orjson package")
+        self.json_backend = json_backend
+        # Reused across records; json.dumps(default=...) builds a new encoder per call
+        self._encoder = json.JSONEncoder(default=self._json_serializer)
+        # (second, formatted date and time) of the last record
+        self._second_prefix = (None, "")
+        # Key -> whether it names a sensitive field; keys repeat across records
+        self._sensitive_keys: Dict[Any, bool] = {}
+        # Recently redacted strings -> their redacted form
+        self._redacted_strings: Dict[str, str] = {}
 
     def format(self, record: logging.LogRecord) -> str:
         """Format log record as JSON"""
         # Base log data
-        timestamp = self.formatTime(record, datefmt="%Y-%m-%dT%H:%M:%S.%fZ")
+        timestamp = self._timestamp(record.created)
+        attrs = record.__dict__
         log_data = {
             "timestamp": timestamp,
             "level": record.levelname,
@@ -213,27 +279,14 @@ class EnhancedJSONFormatter(logging.Formatter):
             "thread": record.thread,
         }
 
-        # Add request context if available
-        request_id = getattr(record, "request_id", RequestContext.get_request_id())
-        if request_id:
-            log_data["request_id"] = request_id
-
-        user_id = getattr(record, "user_id", RequestContext.get_user_id())
-        if user_id:
-            log_data["user_id"] = user_id
-
-        session_id = getattr(record, "session_id", RequestContext.get_session_id())
-        if session_id:
-            log_data["session_id"] = session_id
-
-        correlation_id = getattr(
-            record, "correlation_id", CorrelationContext.get_correlation_id()
-        )
-        if correlation_id:
-            log_data["correlation_id"] = correlation_id
+        # Add request context if available (the record's own values win)
+        for name, getter in _CONTEXT_GETTERS:
+            value = attrs[name] if name in attrs else getter()
+            if value:
+                log_data[name] = value
 
         # Add log category if available
-        category = getattr(record, "category", None)
+        category = attrs.get("category")
         if category:
             log_data["category"] = category
 
@@ -254,51 +307,23 @@ class EnhancedJSONFormatter(logging.Formatter):
             }
 
         # Add any extra attributes from the record
-        for key, value in record.__dict__.items():
-            if key not in {
-                "args",
-                "asctime",
-                "created",
-                "exc_info",
-                "exc_text",
-                "filename",
-                "funcName",
-                "id",
-                "levelname",
-                "levelno",
-                "lineno",
-                "module",
-                "msecs",
-                "message",
-                "msg",
-                "name",
-                "pathname",
-                "process",
-                "processName",
-                "relativeCreated",
-                "stack_info",
-                "thread",
-                "threadName",
-                "request_id",
-                "user_id",
-                "session_id",
-                "correlation_id",
-                "category",
-            }:
-                if key == "extra" and isinstance(value, dict):
-                    # If there's an 'extra' dict, add its contents directly
-                    for extra_key, extra_value in value.items():
-                        log_data[extra_key] = extra_value
-                else:
-                    # Add other custom attributes
-                    log_data[key] = value
+        reserved = self.RESERVED_ATTRS
+        for key, value in attrs.items():
+            if key in reserved:
+                continue
+            if key == "extra" and isinstance(value, dict):
+                # If there's an 'extra' dict, add its contents directly
+                log_data.update(value)
+            else:
+                # Add other custom attributes
+                log_data[key] = value
 
         # Redact PII if enabled
         if self.redact_pii:
             log_data = self._redact_sensitive_data(log_data)
 
         try:
-            return json.dumps(log_data, default=self._json_serializer)
+            return self._dumps(log_data)
         except Exception as e:
             # If serialization fails, create a simpler version that will definitely serialize
             return json.dumps(
@@ -311,13 +336,32 @@ class EnhancedJSONFormatter(logging.Formatter):
                 }
             )
 
+    def _dumps(self, log_data: Dict[str, Any]) -> str:
+        if self.json_backend == "orjson":
+            try:
+                return orjson.dumps(
+                    log_data, default=self._json_serializer, option=orjson.OPT_NON_STR_KEYS
+                ).decode("utf-8")
+            except TypeError:
+                pass  # e.g. integers wider than 64 bits; the stdlib encoder copes
+        return self._encoder.encode(log_data)
+
+    def _timestamp(self, created: float) -> str:
+        """UTC ISO-8601 time with microseconds; the date part is reused within a second."""
+        second = int(created)
+        cached_second, prefix = self._second_prefix
+        if second != cached_second:
+            prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second))
+            self._second_prefix = (second, prefix)
+        return f"{prefix}.{int((created - second) * 1_000_000):06d}Z"
+
     def _json_serializer(self, obj: Any) -> Any:
         """Custom JSON serializer for handling non-serializable objects"""
         if isinstance(obj, (datetime.datetime, datetime.date)):
             return obj.isoformat()
         elif isinstance(obj, Exception):
             return str(obj)
-        elif isinstance(obj, set):
+        elif isinstance(obj, (set, frozenset)):
             return list(obj)
         elif hasattr(obj, "__dict__"):
             return {k: v for k, v in obj.__dict__.items() if not k.startswith("_")}
@@ -325,29 +369,142 @@ class EnhancedJSONFormatter(logging.Formatter):
             return str(obj)
         return repr(obj)
 
+    def _is_sensitive_key(self, key: Any) -> bool:
+        sensitive = self._sensitive_keys.get(key)
+        if sensitive is None:
+            if len(self._sensitive_keys) >= _REDACTION_CACHE_SIZE:
+                self._sensitive_keys.clear()
+            sensitive = (
+                isinstance(key, str)
+                and self.SENSITIVE_KEY_PATTERN.search(key.lower()) is not None
+            )
+            self._sensitive_keys[key] = sensitive
+        return sensitive
+
+    def _redact_string(self, text: str) -> str:
+        # Nothing shorter than "a@b.cd" can match; repeated strings (the same
+        # prompt logged for every model) are only scanned once
+        if len(text) < 6:
+            return text
+        pattern = self.PII_PATTERN if "@" in text else self.DIGIT_PII_PATTERN
+        if len(text) > _REDACTION_CACHE_MAX_LENGTH:
+            return pattern.sub("[REDACTED]", text)
+        redacted = self._redacted_strings.get(text)
+        if redacted is None:
+            if len(self._redacted_strings) >= _REDACTION_CACHE_SIZE:
+                self._redacted_strings.clear()
+            redacted = self._redacted_strings[text] = pattern.sub("[REDACTED]", text)
+        return redacted
+
     def _redact_sensitive_data(self, data: Any) -> Any:
         """Recursively redact sensitive information from log data"""
-        if isinstance(data, dict):
+        if isinstance(data, str):
+            # Check for PII patterns in strings
+            return self._redact_string(data)
+        elif isinstance(data, dict):
             result = {}
             for key, value in data.items():
-                # Check if the key contains sensitive information
-                if any(sensitive in key.lower() for sensitive in self.SENSITIVE_FIELDS):
+                # Keys naming sensitive fields are redacted whatever their value
+                if self._is_sensitive_key(key):
                     result[key] = "[REDACTED]"
-                else:
-                    # Recursively check the value
+                elif isinstance(value, str):
+                    result[key] = self._redact_string(value)
+                elif isinstance(value, (dict, list)):
                     result[key] = self._redact_sensitive_data(value)
+                else:
+                    result[key] = value
             return result
         elif isinstance(data, list):
             return [self._redact_sensitive_data(item) for item in data]
-        elif isinstance(data, str):
-            # Check for PII patterns in strings
-            for pattern in self.PII_PATTERNS:
-                data = pattern.sub("[REDACTED]", data)
-            return data
         else:
             return data
 
 
+class DeferredFormatQueueHandler(QueueHandler):
+    """
+    Queue handler that leaves formatting to the listener thread.
+
+    The stdlib QueueHandler formats each record in prepare(), on the thread
+    that logged it. This one only renders the message and copies the
+    thread-local request context onto the record, so JSON encoding,
+    redaction and file I/O all happen on the QueueListener's thread. A full
+    queue drops the record (counted in `dropped`) rather than blocking.
+    """
+
+    def __init__(self, log_queue: "queue.Queue"):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        attrs = record.__dict__
+        for name, getter in _CONTEXT_GETTERS:
+            if name not in attrs:
+                attrs[name] = getter()
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _DrainingQueueListener(QueueListener):
+    """QueueListener whose stop() waits for room rather than failing on a full queue."""
+
+    def enqueue_sentinel(self) -> None:
+        self.queue.put(self._sentinel)
+
+
+# The running listener, if logging goes through a queue
+_queue_listener: Optional[QueueListener] = None
+_queue_handler: Optional[DeferredFormatQueueHandler] = None
+_queue_logger: Optional[logging.Logger] = None
+
+
+def start_queue_logging(
+    handlers: List[logging.Handler],
+    max_queue_size: int = 10000,
+    logger: Optional[logging.Logger] = None,
+) -> DeferredFormatQueueHandler:
+    """
+    Route `logger` (the root logger by default) through a queue to `handlers`
+
+    Args:
+        handlers: Handlers run on the listener thread, honouring their levels and filters
+        max_queue_size: Records beyond this many waiting are dropped
+        logger: Logger to attach the queue handler to
+
+    Returns:
+        The queue handler attached to the logger
+    """
+    global _queue_listener, _queue_handler, _queue_logger
+    stop_queue_logging()
+    log_queue: "queue.Queue" = queue.Queue(max_queue_size)
+    _queue_handler = DeferredFormatQueueHandler(log_queue)
+    _queue_logger = logger or logging.getLogger()
+    _queue_logger.addHandler(_queue_handler)
+    _queue_listener = _DrainingQueueListener(log_queue, *handlers, respect_handler_level=True)
+    _queue_listener.start()
+    return _queue_handler
+
+
+def stop_queue_logging() -> None:
+    """Detach the queue handler and stop the listener once it has written every queued record."""
+    global _queue_listener, _queue_handler, _queue_logger
+    if _queue_handler is not None and _queue_logger is not None:
+        _queue_logger.removeHandler(_queue_handler)
+    if _queue_listener is not None:
+        _queue_listener.stop()
+    _queue_listener = _queue_handler = _queue_logger = None
+
+
+atexit.register(stop_queue_logging)
+
+
 class EnhancedLogger:
     """
     Enhanced logger that wraps a standard logger with additional functionality
@@ -971,6 +1128,9 @@ def configure_logging(
     max_bytes: int = 10 * 1024 * 1024,  # 10MB
     backup_count: int = 5,
     log_handlers: Optional[List[logging.Handler]] = None,
+    json_backend: str = "auto",
+    queue_logging: bool = False,
+    max_queue_size: int = 10000,
 ) -> None:
     """
     Configure logging for the application
@@ -985,6 +1145,10 @@ def configure_logging(
         max_bytes: Max size per log file before rotation
         backup_count: Number of backup log files to keep
         log_handlers: Optional list of additional log handlers
+        json_backend: JSON encoder for records: "orjson", "json", or "auto"
+        queue_logging: Format and write records on a listener thread, so
+            logging calls only enqueue
+        max_queue_size: Records waiting beyond this are dropped (queue_logging only)
     """
     # Create log directory if it doesn't exist
     if log_file_output:
@@ -997,13 +1161,15 @@ def configure_logging(
     log_level_num = getattr(logging, log_level.upper(), logging.INFO)
     root_logger.setLevel(log_level_num)
 
-    # Remove existing handlers
+    # Remove existing handlers, writing out anything still queued first
+    stop_queue_logging()
     for handler in root_logger.handlers[:]:
         root_logger.removeHandler(handler)
+    handlers: List[logging.Handler] = []
 
     # Create formatter
     if enable_json_logging:
-        formatter = EnhancedJSONFormatter()
+        formatter = EnhancedJSONFormatter(json_backend=json_backend)
     else:
         formatter = logging.Formatter(
             "%(asctime)s - %(name)s - %(levelname)s - [%(filename)s:%(lineno)d] - %(message)s",
@@ -1014,12 +1180,11 @@ def configure_logging(
     if console_output:
         console_handler = logging.StreamHandler(sys.stdout)
         console_handler.setFormatter(formatter)
-        root_logger.addHandler(console_handler)
+        handlers.append(console_handler)
 
     # Add file handlers if enabled
     if log_file_output:
         # Create loggers for different log types
-        handlers = {}
         log_types = [
             ("app", f"{app_name}.log"),
             ("error", f"{app_name}_error.log"),
@@ -1051,12 +1216,16 @@ def configure_logging(
 
                 file_handler.addFilter(category_filter)
 
-            root_logger.addHandler(file_handler)
-            handlers[log_type] = file_handler
+            handlers.append(file_handler)
 
     # Add any additional handlers
     if log_handlers:
-        for handler in log_handlers:
+        handlers.extend(log_handlers)
+
+    if queue_logging:
+        start_queue_logging(handlers, max_queue_size=max_queue_size)
+    else:
+        for handler in handlers:
             root_logger.addHandler(handler)
 
     # Log configuration
@@ -1105,13 +1274,15 @@ class LoggingMiddleware:
             # Just pass through to the app without logging
             return await self.app(scope, receive, send)
 
-        # Generate or extract request ID
+        # Reuse the request ID from RequestContextMiddleware, else extract or generate one
         headers = dict(scope.get("headers", []))
-        request_id = None
-        if b"x-request-id" in headers:
-            request_id = headers[b"x-request-id"].decode("utf-8")
-        else:
-            request_id = str(uuid.uuid4())
+        context_request_id = scope.get("state", {}).get("request_id")
+        request_id = context_request_id
+        if not request_id:
+            if b"x-request-id" in headers:
+                request_id = headers[b"x-request-id"].decode("utf-8")
+            else:
+                request_id = str(uuid.uuid4())
 
         # Set request context
         RequestContext.set_request_id(request_id)
@@ -1141,9 +1312,11 @@ class LoggingMiddleware:
                 response_status = message["status"]
                 response_headers = message.get("headers", [])
 
-                # Add request ID to response headers
-                response_headers.append((b"X-Request-ID", request_id.encode("utf-8")))
-                message["headers"] = response_headers
+                # Add request ID to response headers (the context middleware adds its own)
+                if not context_request_id:
+                    response_headers = list(response_headers)
+                    response_headers.append((b"X-Request-ID", request_id.encode("utf-8")))
+                    message["headers"] = response_headers
 
             return await send(message)
 
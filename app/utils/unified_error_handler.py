@@ -29,8 +29,8 @@ from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel, ValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from app.models.base_models import ErrorDetail, ErrorResponse
 from app.utils.logging import CorrelationContext, get_logger
@@ -768,7 +768,7 @@ class CircuitBreaker:
         return wrapper
 
 
-class GlobalErrorHandlingMiddleware(BaseHTTPMiddleware):
+class GlobalErrorHandlingMiddleware:
     """Middleware for global error handling with consistent responses"""
 
     def __init__(
@@ -785,7 +785,7 @@ class GlobalErrorHandlingMiddleware(BaseHTTPMiddleware):
             include_debug_details: Whether to include debug details in error responses
             exclude_paths: Paths to exclude from detailed error reporting
         """
-        super().__init__(app)
+        self.app = app
         self.include_debug_details = include_debug_details
         self.exclude_paths = exclude_paths or ["/health", "/metrics", "/docs", "/redoc"]
 
@@ -795,37 +795,62 @@ class GlobalErrorHandlingMiddleware(BaseHTTPMiddleware):
             f"exclude_paths={exclude_paths}"
         )
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """
-        Process the request and handle any exceptions
+        Run the request and turn unhandled exceptions into error responses
 
-        Args:
-            request: FastAPI request
-            call_next: Next middleware or route handler
-
-        Returns:
-            Response object
+        Exceptions raised after the response has started (e.g. mid-stream)
+        cannot be turned into a new response and are re-raised.
         """
-        # Set correlation ID for request tracking
-        correlation_id = request.headers.get(
-            "X-Correlation-ID", f"ultra-{uuid.uuid4()}"
-        )
-        CorrelationContext.set_correlation_id(correlation_id)
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # Reuse the correlation ID from RequestContextMiddleware when present
+        state = scope.setdefault("state", {})
+        correlation_id = state.get("correlation_id")
+        if not correlation_id:
+            correlation_id = Headers(scope=scope).get(
+                "X-Correlation-ID", f"ultra-{uuid.uuid4()}"
+            )
+            CorrelationContext.set_correlation_id(correlation_id)
+            # Add correlation ID to request state
+            state["correlation_id"] = correlation_id
+            state.setdefault("request_id", correlation_id)  # For backward compatibility
 
-        # Add correlation ID to request state
-        request.state.correlation_id = correlation_id
-        request.state.request_id = correlation_id  # For backward compatibility
+        response_started = False
+
+        async def send_with_correlation(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+                # Add correlation ID to response headers
+                MutableHeaders(scope=message)["X-Correlation-ID"] = correlation_id
+            await send(message)
 
         try:
-            # Process the request
-            response = await call_next(request)
+            await self.app(scope, receive, send_with_correlation)
+        except Exception as e:
+            if response_started:
+                raise
+            response = self._error_response(Request(scope, receive), e, correlation_id)
+            await response(scope, receive, send)
 
-            # Add correlation ID to response headers
-            response.headers["X-Correlation-ID"] = correlation_id
+    def _error_response(
+        self, request: Request, e: Exception, correlation_id: str
+    ) -> JSONResponse:
+        """
+        Build the error response for an unhandled exception
 
-            return response
+        Args:
+            request: FastAPI request
+            e: Exception raised by the application
+            correlation_id: Correlation ID of the request
 
-        except UltraBaseException as e:
+        Returns:
+            JSON error response
+        """
+        if isinstance(e, UltraBaseException):
             # Log structured exception
             log_exception(request, e, level=str(e.severity))
 
@@ -843,60 +868,59 @@ class GlobalErrorHandlingMiddleware(BaseHTTPMiddleware):
 
             return response
 
-        except Exception as e:
-            # Get error code and status code
-            error_code = ErrorClassification.get_error_code(e)
-            status_code = ErrorClassification.get_status_code(error_code)
-            severity = ErrorClassification.get_severity(error_code)
-            category = ErrorClassification.get_category(error_code)
+        # Get error code and status code
+        error_code = ErrorClassification.get_error_code(e)
+        status_code = ErrorClassification.get_status_code(error_code)
+        severity = ErrorClassification.get_severity(error_code)
+        category = ErrorClassification.get_category(error_code)
 
-            # Log structured exception
-            log_exception(request, e, level=str(severity))
-
-            # Only include detailed error information if allowed
-            include_details = self.include_debug_details
-            if request.url.path in self.exclude_paths:
-                include_details = False
-
-            # Environment-aware error details
-            is_production = os.environ.get("ENVIRONMENT", "development") == "production"
-            if is_production:
-                include_details = False
-
-            # Prepare error details
-            details = None
-            if include_details:
-                details = format_exception(e)
-
-            # Create error response with appropriate message
-            if status_code >= 500:
-                message = "An unexpected server error occurred"
-                # Capture in Sentry if it's a server error
-                sentry_sdk.capture_exception(e)
-            else:
-                # For client errors, provide a more specific message if available
-                message = (
-                    str(e) if str(e) else "An error occurred processing your request"
-                )
+        # Log structured exception
+        log_exception(request, e, level=str(severity))
 
-            # Create error response
-            error_response = create_error_response(
-                error_code=error_code,
-                message=message,
-                details=details,
-                request_id=correlation_id,
-            )
+        # Only include detailed error information if allowed
+        include_details = self.include_debug_details
+        if request.url.path in self.exclude_paths:
+            include_details = False
 
-            # Create JSON response
-            response = JSONResponse(
-                status_code=status_code,
-                content=error_response.dict(exclude_none=True),
+        # Environment-aware error details
+        is_production = os.environ.get("ENVIRONMENT", "development") == "production"
+        if is_production:
+            include_details = False
+
+        # Prepare error details
+        details = None
+        if include_details:
+            details = format_exception(e)
+
+        # Create error response with appropriate message
+        if status_code >= 500:
+            message = "An unexpected server error occurred"
+            # Capture in Sentry if it's a server error
+            sentry_sdk.capture_exception(e)
+        else:
+            # For client errors, provide a more specific message if available
+            message = (
+                str(e) if str(e) else "An error occurred processing your request"
             )
 
-            # Add correlation ID to response headers
-            response.headers["X-Correlation-ID"] = correlation_id
+        # Create error response
+        error_response = create_error_response(
+            error_code=error_code,
+            message=message,
+            details=details,
+            request_id=correlation_id,
+        )
 
-            return response
+        # Create JSON response
+        response = JSONResponse(
+            status_code=status_code,
+            content=error_response.dict(exclude_none=True),
+        )
+
+        # Add correlation ID to response headers
+        response.headers["X-Correlation-ID"] = correlation_id
+
+        return response
 
 
 def with_retry(
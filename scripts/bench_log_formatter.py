@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark for app.utils.structured_logging.EnhancedJSONFormatter.
+
+Formats records shaped like the orchestrator's per-model stage logs (a
+message plus a large `extra` payload) and reports records per second for:
+- the formatter alone, with each available JSON backend
+- logging through a file handler on the calling thread
+- logging through the queue handler, where the calling thread only enqueues
+
+Usage:
+    python scripts/bench_log_formatter.py [--records 20000] [--payload-items 40] [--unique-text]
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add the project root to the Python path for imports
+root_dir = Path(__file__).parent.parent
+sys.path.append(str(root_dir))
+
+os.environ.setdefault("TESTING", "true")
+
+from app.utils import structured_logging  # noqa: E402
+from app.utils.structured_logging import EnhancedJSONFormatter  # noqa: E402
+
+
+def _record(i: int, payload_items: int, unique_text: bool = False) -> logging.LogRecord:
+    record = logging.LogRecord(
+        "orchestration", logging.INFO, __file__, 42, "Model %s finished stage %s",
+        (f"model-{i % 5}", "peer_review"), None,
+    )
+    record.category = "PERFORMANCE"
+    record.extra = {
+        "model": f"model-{i % 5}",
+        "stage": "peer_review",
+        "duration_ms": 1234.5,
+        "token_usage": {"prompt": 1800, "completion": 650, "total": 2450},
+        "responses": [
+            {
+                "model": f"model-{j}",
+                "content": "The analysis compares revenue growth across regions " * 4
+                + (f"(record {i}, response {j})" if unique_text else ""),
+                "quality": {"score": 0.87, "flags": ["coherent", "cited"]},
+            }
+            for j in range(payload_items)
+        ],
+        "contact": "ops@example.com",
+        "api_key": "sk-should-never-be-logged",
+    }
+    return record
+
+
+def _rate(count: int, started: float) -> str:
+    return f"{count / (time.perf_counter() - started):>10,.0f} records/s"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--records", type=int, default=20_000)
+    parser.add_argument("--payload-items", type=int, default=40)
+    parser.add_argument(
+        "--unique-text", action="store_true", help="no response text repeats across records"
+    )
+    args = parser.parse_args()
+
+    records = [_record(i, args.payload_items, args.unique_text) for i in range(args.records)]
+    backends = ["json"]
+    if getattr(structured_logging, "orjson", None) is not None:
+        backends.append("orjson")
+
+    for backend in backends:
+        try:
+            formatter = EnhancedJSONFormatter(json_backend=backend)
+        except TypeError:  # formatter without selectable backends
+            formatter = EnhancedJSONFormatter()
+        started = time.perf_counter()
+        for record in records:
+            formatter.format(record)
+        print(f"format ({backend}):{'':<14}{_rate(len(records), started)}")
+
+    with tempfile.TemporaryDirectory() as log_dir:
+        handler = logging.FileHandler(os.path.join(log_dir, "direct.log"))
+        handler.setFormatter(EnhancedJSONFormatter())
+        logger = logging.getLogger("bench.direct")
+        logger.propagate = False
+        logger.addHandler(handler)
+        started = time.perf_counter()
+        for record in records:
+            logger.handle(record)
+        print(f"file handler, caller thread: {_rate(len(records), started)}")
+        handler.close()
+
+        if hasattr(structured_logging, "start_queue_logging"):
+            handler = logging.FileHandler(os.path.join(log_dir, "queued.log"))
+            handler.setFormatter(EnhancedJSONFormatter())
+            logger = logging.getLogger("bench.queued")
+            logger.propagate = False
+            queue_handler = structured_logging.start_queue_logging(
+                [handler], max_queue_size=len(records) + 1, logger=logger
+            )
+            started = time.perf_counter()
+            for record in records:
+                logger.handle(record)
+            enqueue_rate = _rate(len(records), started)
+            structured_logging.stop_queue_logging()
+            print(f"queue handler, enqueue only: {enqueue_rate}")
+            print(f"queue handler, end to end:   {_rate(len(records), started)}")
+            logger.removeHandler(queue_handler)
+            handler.close()
+
+
+if __name__ == "__main__":
+    main()
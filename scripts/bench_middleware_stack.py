@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Per-request overhead of the HTTP middleware stack, measured in-process.
+
+Requests are sent through httpx's ASGI transport (no sockets), so the numbers
+are the cost of the middleware layers themselves. Three apps serve the same
+routes:
+
+- bare: no middleware
+- basehttp: the pre-rewrite shape of the stack - one BaseHTTPMiddleware
+  layer per middleware that used to subclass it, each doing the same kind of
+  header work through call_next
+- asgi: the stack create_app installs today (pure ASGI, fused request context)
+
+Log output is disabled so log I/O does not dominate the measurement.
+
+Usage:
+    python scripts/bench_middleware_stack.py [--requests 3000] [--chunks 200]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+import uuid
+from pathlib import Path
+
+# Add the project root to the Python path for imports
+root_dir = Path(__file__).parent.parent
+sys.path.append(str(root_dir))
+os.environ.setdefault("TESTING", "true")  # no secrets needed for an in-process run
+
+import httpx  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+from fastapi.responses import StreamingResponse  # noqa: E402
+from starlette.middleware.base import BaseHTTPMiddleware  # noqa: E402
+
+from app.middleware.combined_auth_middleware import setup_combined_auth_middleware  # noqa: E402
+from app.middleware.performance_middleware import setup_performance_middleware  # noqa: E402
+from app.middleware.rate_limit_middleware import setup_rate_limit_middleware  # noqa: E402
+from app.middleware.request_context_middleware import setup_request_context_middleware  # noqa: E402
+from app.middleware.security_headers_middleware import setup_security_headers_middleware  # noqa: E402
+from app.middleware.telemetry_middleware import setup_telemetry_middleware  # noqa: E402
+from app.utils.structured_logging import (  # noqa: E402
+    apply_structured_logging_middleware,
+    setup_structured_logging_middleware,
+)
+from app.utils.unified_error_handler import setup_error_handling  # noqa: E402
+
+# Layers that subclassed BaseHTTPMiddleware before the rewrite, in install order
+LEGACY_LAYERS = (
+    "security_headers",
+    "request_id",
+    "cache_control",
+    "performance_headers",
+    "telemetry",
+    "rate_limit",
+    "combined_auth",
+    "error_handling",
+)
+
+
+def _routes(app: FastAPI, chunks: int) -> FastAPI:
+    @app.get("/api/ping")
+    async def ping():
+        return {"ok": True}
+
+    @app.get("/api/stream")
+    async def stream():
+        async def frames():
+            for i in range(chunks):
+                yield f"data: {i}\n\n"
+
+        return StreamingResponse(frames(), media_type="text/event-stream")
+
+    return app
+
+
+def bare_app(chunks: int) -> FastAPI:
+    return _routes(FastAPI(), chunks)
+
+
+def basehttp_app(chunks: int) -> FastAPI:
+    app = _routes(FastAPI(), chunks)
+    for name in LEGACY_LAYERS:
+
+        class Layer(BaseHTTPMiddleware):
+            header = f"x-bench-{name}"
+
+            async def dispatch(self, request, call_next):
+                request.state.request_id = request.headers.get("x-request-id") or uuid.uuid4().hex
+                started = time.perf_counter()
+                response = await call_next(request)
+                response.headers[self.header] = f"{time.perf_counter() - started:.3f}"
+                return response
+
+        app.add_middleware(Layer)
+    return app
+
+
+def asgi_app(chunks: int) -> FastAPI:
+    """The middleware create_app installs, in the same order and configuration."""
+    app = _routes(FastAPI(), chunks)
+    setup_security_headers_middleware(app)
+    setup_performance_middleware(app, timing_headers=False)
+    setup_structured_logging_middleware(app)
+    apply_structured_logging_middleware(app)
+    setup_telemetry_middleware(app)
+    setup_rate_limit_middleware(app)
+    setup_combined_auth_middleware(app, public_paths=["/api/ping", "/api/stream"])
+    setup_error_handling(app)
+    setup_request_context_middleware(app)
+    return app
+
+
+async def measure(app: FastAPI, path: str, requests: int) -> float:
+    """Return mean microseconds per request."""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(min(200, requests)):  # warm up
+            await client.get(path)
+        started = time.perf_counter()
+        for _ in range(requests):
+            response = await client.get(path)
+            response.read()
+        return (time.perf_counter() - started) / requests * 1e6
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--chunks", type=int, default=200, help="SSE frames per streamed response")
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    for path, requests in (("/api/ping", args.requests), ("/api/stream", max(1, args.requests // 10))):
+        results = {}
+        for name, factory in (("bare", bare_app), ("basehttp", basehttp_app), ("asgi", asgi_app)):
+            results[name] = await measure(factory(args.chunks), path, requests)
+        bare = results["bare"]
+        print(f"{path} ({requests} requests)")
+        for name, micros in results.items():
+            overhead = "" if name == "bare" else f"  overhead {micros - bare:8.1f} us"
+            print(f"  {name:<9} {micros:9.1f} us/request{overhead}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
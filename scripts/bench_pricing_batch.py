@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark for batch pricing in app.services.pricing_simulator.PricingSimulator.
+
+Measures:
+- per-request calculate_token_cost() over a sample of usage rows
+- calculate_costs_batch() over the full set of rows in one pass
+- sweep_costs() across every tier and a range of markups
+
+Usage:
+    python scripts/bench_pricing_batch.py [--rows 1000000] [--markups 21]
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add the project root to the Python path for imports
+root_dir = Path(__file__).parent.parent
+sys.path.append(str(root_dir))
+
+os.environ.setdefault("TESTING", "true")
+
+from app.services.pricing_simulator import PricingSimulator  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--markups", type=int, default=21)
+    parser.add_argument("--sample", type=int, default=20_000)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    simulator = PricingSimulator()
+    matrix = simulator.price_matrix
+    rng = np.random.default_rng(0)
+    models = np.array(matrix.models)[rng.integers(0, len(matrix.models), args.rows)]
+    input_tokens = rng.integers(0, 8000, args.rows)
+    output_tokens = rng.integers(0, 2000, args.rows)
+    tiers = np.array(matrix.tiers)[rng.integers(0, len(matrix.tiers), args.rows)]
+
+    sample = min(args.sample, args.rows)
+    started = time.perf_counter()
+    for i in range(sample):
+        simulator.calculate_token_cost(
+            models[i], int(input_tokens[i]), int(output_tokens[i]), tiers[i]
+        )
+    per_row = (time.perf_counter() - started) / sample
+    print(
+        f"calculate_token_cost: {1 / per_row:,.0f} rows/s "
+        f"(~{per_row * args.rows:.1f}s for {args.rows:,} rows)"
+    )
+
+    started = time.perf_counter()
+    costs = simulator.calculate_costs_batch(models, input_tokens, output_tokens, tiers)
+    elapsed = time.perf_counter() - started
+    print(
+        f"calculate_costs_batch: {args.rows / elapsed:,.0f} rows/s "
+        f"({elapsed:.2f}s, total ${costs['total_cost'].sum():,.2f})"
+    )
+
+    markups = np.linspace(0, 50, args.markups)
+    started = time.perf_counter()
+    sweep = simulator.sweep_costs(models, input_tokens, output_tokens, markups=markups)
+    elapsed = time.perf_counter() - started
+    scenarios = sweep["total_cost"].size
+    print(
+        f"sweep_costs: {scenarios} scenarios x {args.rows:,} rows in {elapsed:.2f}s "
+        f"({scenarios * args.rows / elapsed:,.0f} row-scenarios/s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the in-memory path of app.utils.rate_limit_service.
+
+Replays traffic from a few busy clients plus a steady stream of clients seen
+only once (high-cardinality IPs), one simulated second per --per-second
+requests, and reports CPU per check and traced memory for each phase:
+- the previous implementation: a timestamp list per client, rebuilt per check
+- the current one: per-second rings with idle eviction and capped stores
+
+Usage:
+    python scripts/bench_rate_limiter_memory.py [--requests 300000] [--phases 6]
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+# Add the project root to the Python path for imports
+root_dir = Path(__file__).parent.parent
+sys.path.append(str(root_dir))
+
+os.environ.setdefault("TESTING", "true")
+
+from app.utils.rate_limit_service import RateLimitService  # noqa: E402
+
+T0 = 1_700_000_000
+
+
+class ListLimiter:
+    """The previous per-client timestamp lists, for comparison."""
+
+    def __init__(self):
+        self.store = {"ip": {}, "path": {}}
+        self.telemetry_store = {}
+
+    def check(self, key, limit, current_time, window_start, path, method, request_id):
+        key_type, key_id = key.split(":", 1)
+        if key_id not in self.store[key_type]:
+            self.store[key_type][key_id] = []
+        self.store[key_type][key_id].append(current_time)
+        self.store[key_type][key_id] = [
+            ts for ts in self.store[key_type][key_id] if ts >= window_start
+        ]
+        count = len(self.store[key_type][key_id])
+        path_key = f"{path}:{method}"
+        self.store["path"][path_key] = self.store["path"].get(path_key, 0) + 1
+        if hash(request_id) % 10 == 0:
+            self.telemetry_store[request_id] = {"key": key, "count": count}
+        return count > limit
+
+
+def _traffic(requests: int, per_second: int):
+    for i in range(requests):
+        second = T0 + i // per_second
+        if i % 4:
+            key = f"ip:10.0.0.{i % 16}"  # busy clients
+        else:
+            key = f"ip:198.51.{(i >> 8) & 255}.{i & 255}-{i}"  # seen once
+        yield key, second, f"/api/document/{i % 5000}", f"req-{i}"
+
+
+def _run(name, check, requests, per_second, phases):
+    print(name)
+    phase = requests // phases
+    tracemalloc.start()
+    started = time.perf_counter()
+    for i, (key, second, path, request_id) in enumerate(_traffic(requests, per_second), 1):
+        check(key, 10_000, second, second - 60, path, "GET", request_id)
+        if i % phase == 0:
+            elapsed = time.perf_counter() - started
+            current, _ = tracemalloc.get_traced_memory()
+            print(
+                f"  {i:>9,} checks: {elapsed / phase * 1e6:6.2f} us/check, "
+                f"{current / 1e6:7.1f} MB traced"
+            )
+            started = time.perf_counter()
+    tracemalloc.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=300_000)
+    parser.add_argument("--per-second", type=int, default=2_000)
+    parser.add_argument("--phases", type=int, default=6)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    _run("timestamp lists", ListLimiter().check, args.requests, args.per_second, args.phases)
+
+    service = RateLimitService()
+    service.redis = None
+    _run(
+        "per-second rings",
+        service._check_rate_limit_memory,
+        args.requests,
+        args.per_second,
+        args.phases,
+    )
+    print(f"  tracked clients: {len(service.in_memory_store['ip']):,}, {service.memory_stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,99 @@
+import random
+
+import numpy as np
 import pytest
-from app.services.pricing_simulator import *  # noqa: F401,F403
 
-# TODO: Implement unit tests for pricing_simulator
+from app.services.pricing_integration import PricingIntegration
+from app.services.pricing_simulator import PricingSimulator
+
+
+def _usage(simulator, count=500, seed=3):
+    rng = random.Random(seed)
+    models = list(simulator.price_matrix.models)
+    rows = [
+        (
+            rng.choice(models),
+            rng.choice([0, 1, 40, 2500, 120000]),
+            rng.choice([0, 3, 800, 30000]),
+            rng.choice(["basic", "pro", "enterprise", "no-such-tier"]),
+        )
+        for _ in range(count)
+    ]
+    return [list(column) for column in zip(*rows)]
+
+
+def test_batch_costs_match_per_request_costs():
+    simulator = PricingSimulator()
+    models, inputs, outputs, tiers = _usage(simulator)
+    batch = simulator.calculate_costs_batch(
+        models, inputs, outputs, tiers, features=["private", "citation"]
+    )
+    assert simulator.usage_history == []  # batch pricing does not record history
+
+    for i, row in enumerate(zip(models, inputs, outputs, tiers)):
+        single = simulator.calculate_token_cost(*row, features=["private", "citation"])
+        for key in ("raw_cost", "markup_cost", "thinking_model_surcharge", "total_cost"):
+            assert batch[key][i] == single[key], (key, row)
+
+
+def test_batch_accepts_integer_codes_and_rejects_unknown_models():
+    simulator = PricingSimulator()
+    matrix = simulator.price_matrix
+    codes = np.array([matrix.model_index["gpt4o"], matrix.model_index["llama3"]])
+    by_code = simulator.calculate_costs_batch(codes, [1000, 1000], [500, 500], "pro")
+    by_name = simulator.calculate_costs_batch(["gpt4o", "llama3"], [1000, 1000], [500, 500], "pro")
+    np.testing.assert_array_equal(by_code["total_cost"], by_name["total_cost"])
+
+    with pytest.raises(ValueError, match="Unknown model: gpt-9"):
+        simulator.calculate_costs_batch(["gpt4o", "gpt-9"], [1, 1], [1, 1])
+
+
+def test_price_matrix_is_rebuilt_after_update():
+    simulator = PricingSimulator()
+    before = simulator.calculate_costs_batch(["gpt4o"], [1000], [0], apply_markup=False)
+    repriced = dict(simulator.model_pricing["gpt4o"], input_cost_per_1k=0.005)
+    simulator.save_config = lambda: None
+    assert simulator.update_pricing({"gpt4o": repriced})
+    after = simulator.calculate_costs_batch(["gpt4o"], [1000], [0], apply_markup=False)
+    assert before["total_cost"][0] == 0.0025
+    assert after["total_cost"][0] == 0.005
+
+
+def test_sweep_matches_batch_totals_for_every_tier_and_markup():
+    simulator = PricingSimulator()
+    models, inputs, outputs, _ = _usage(simulator, count=300)
+
+    own = simulator.sweep_costs(models, inputs, outputs, chunk_size=64)
+    assert own["tiers"] == ["basic", "pro", "enterprise"]
+    for i, tier in enumerate(own["tiers"]):
+        expected = simulator.calculate_costs_batch(models, inputs, outputs, tier)["total_cost"].sum()
+        assert own["total_cost"][i, 0] == pytest.approx(expected)
+
+    markups = [0, 12.5, 40]
+    sweep = simulator.sweep_costs(models, inputs, outputs, tiers=["pro"], markups=markups)
+    assert sweep["total_cost"].shape == (1, 3)
+    for j, markup in enumerate(markups):
+        simulator.pricing_tiers["pro"]["markup_percentage"] = markup
+        simulator.invalidate_price_matrix()
+        expected = simulator.calculate_costs_batch(models, inputs, outputs, "pro")["total_cost"].sum()
+        assert sweep["total_cost"][0, j] == pytest.approx(expected)
+
+
+def test_integration_tracks_a_batch_with_one_pricing_pass(tmp_path):
+    simulator = PricingSimulator()
+    integration = PricingIntegration(
+        pricing_simulator=simulator, usage_log_file=str(tmp_path / "usage.jsonl")
+    )
+    integration.user_accounts["u1"] = {"tier": "enterprise", "balance": 10.0}
+    records = [
+        {"user_id": "u1", "model": "gpt4o", "input_tokens": 1000, "output_tokens": 200, "session_id": "s"},
+        {"user_id": None, "model": "claude37", "input_tokens": 10, "output_tokens": 5, "session_id": "s"},
+    ]
+    tracked = integration.track_token_usage_batch(records)
 
+    assert [r["tier"] for r in tracked] == ["enterprise", "basic"]
+    assert tracked[1]["user_id"] == "anonymous"
+    assert tracked[0]["cost"] == simulator.calculate_token_cost("gpt4o", 1000, 200, "enterprise")["total_cost"]
+    assert tracked[1]["cost"] == simulator.pricing_tiers["basic"]["minimum_charge"]
+    assert integration.session_token_usage["s"]["total_tokens"] == 1215
+    assert len((tmp_path / "usage.jsonl").read_text().splitlines()) == 2
@@ -107,19 +107,16 @@ class TestRateLimitKeyGeneration:
         user_key = service.build_key(
             identifier="user:123",
             category=RateLimitCategory.ANALYZE,
-            window_timestamp=1234567890
         )
         
         assert "ratelimit:" in user_key
         assert "user:123" in user_key
         assert "ANALYZE" in user_key
-        assert "1234567890" in user_key
         
         # Test IP-based key
         ip_key = service.build_key(
             identifier="ip:192.168.1.1",
             category=RateLimitCategory.GENERAL,
-            window_timestamp=1234567890
         )
         
         assert "ratelimit:" in ip_key
@@ -127,24 +124,23 @@ class TestRateLimitKeyGeneration:
         assert "GENERAL" in ip_key
 
     def test_rate_limit_key_uniqueness(self):
-        """Test that rate limit keys are unique per user/endpoint/window"""
+        """Test that rate limit keys are unique per user/endpoint"""
         service = RateLimitService()
         from app.services.rate_limit_service import RateLimitCategory
         
         # Different users should have different keys
-        key1 = service.build_key("user:123", RateLimitCategory.ANALYZE, 1234567890)
-        key2 = service.build_key("user:456", RateLimitCategory.ANALYZE, 1234567890)
+        key1 = service.build_key("user:123", RateLimitCategory.ANALYZE)
+        key2 = service.build_key("user:456", RateLimitCategory.ANALYZE)
         assert key1 != key2
         
         # Different categories should have different keys
-        key3 = service.build_key("user:123", RateLimitCategory.ANALYZE, 1234567890)
-        key4 = service.build_key("user:123", RateLimitCategory.DOCUMENT, 1234567890)
+        key3 = service.build_key("user:123", RateLimitCategory.ANALYZE)
+        key4 = service.build_key("user:123", RateLimitCategory.DOCUMENT)
         assert key3 != key4
         
-        # Different windows should have different keys
-        key5 = service.build_key("user:123", RateLimitCategory.ANALYZE, 1234567890)
-        key6 = service.build_key("user:123", RateLimitCategory.ANALYZE, 1234567950)
-        assert key5 != key6
+        # The sliding window keeps one key per user/endpoint
+        key5 = service.build_key("user:123", RateLimitCategory.ANALYZE)
+        assert key5 == key3
 
 
 @pytest.mark.unit
@@ -1,3 +1,5 @@
+import asyncio
+
 import pytest
 from app.services.rate_limiter import RateLimiter
 
@@ -52,3 +54,197 @@ async def test_release_adjusts_backoff():
     await service.release("ep3", success=True)
     stats_success = service.get_endpoint_stats("ep3")
     assert stats_success["backoff_factor"] == 1.0
+
+
+@pytest.mark.asyncio
+async def test_burst_then_continuous_refill():
+    service = RateLimiter()
+    service.register_endpoint("ep4", requests_per_minute=600, burst_limit=3)  # 10/s
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    for _ in range(3):
+        await service.acquire("ep4")
+    assert loop.time() - started < 0.05
+
+    await service.acquire("ep4")
+    assert 0.07 < loop.time() - started < 0.3
+
+
+@pytest.mark.asyncio
+async def test_waiters_are_fifo_and_do_not_block_other_endpoints():
+    service = RateLimiter()
+    service.register_endpoint("slow", requests_per_minute=1200, burst_limit=1)  # 20/s
+    service.register_endpoint("fast", requests_per_minute=60, burst_limit=5)
+    await service.acquire("slow")
+    order = []
+
+    async def worker(i):
+        await service.acquire("slow")
+        order.append(i)
+
+    tasks = [asyncio.create_task(worker(i)) for i in range(4)]
+    await asyncio.sleep(0)
+    assert service.get_endpoint_stats("slow")["waiters"] == 4
+
+    # A throttled endpoint never holds anything another endpoint needs
+    await asyncio.wait_for(service.acquire("fast"), timeout=0.01)
+
+    await asyncio.gather(*tasks)
+    assert order == [0, 1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_acquire_deadline_and_cancellation_keep_queue_intact():
+    from app.services.rate_limiter import RateLimitTimeout
+
+    service = RateLimiter()
+    service.register_endpoint("ep5", requests_per_minute=600, burst_limit=1)  # 10/s
+    await service.acquire("ep5")
+
+    with pytest.raises(RateLimitTimeout):
+        await service.acquire("ep5", timeout=0.01)
+
+    cancelled = asyncio.create_task(service.acquire("ep5"))
+    survivor = asyncio.create_task(service.acquire("ep5"))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+    await asyncio.wait_for(survivor, timeout=0.5)
+    assert cancelled.cancelled()
+    assert service.get_endpoint_stats("ep5")["waiters"] == 0
+
+
+@pytest.mark.asyncio
+async def test_backoff_is_bounded():
+    from app.services.rate_limiter import MAX_BACKOFF_FACTOR
+
+    service = RateLimiter()
+    service.register_endpoint("ep6", requests_per_minute=60)
+    for _ in range(20):
+        await service.release("ep6", success=False)
+    assert service.get_endpoint_stats("ep6")["backoff_factor"] == MAX_BACKOFF_FACTOR
+
+
+# --- Adaptive concurrency ---------------------------------------------------
+
+from app.services.rate_limiter import (
+    OUTCOME_RATE_LIMITED,
+    AdaptiveConcurrencyLimiter,
+    ConcurrencyLimitTimeout,
+)
+
+
+@pytest.mark.asyncio
+async def test_concurrency_queue_is_fifo_and_bounded():
+    limiter = AdaptiveConcurrencyLimiter("p", initial_limit=2, max_limit=2)
+    await limiter.acquire()
+    await limiter.acquire()
+    order = []
+
+    async def waiter(i):
+        await limiter.acquire(timeout=1)
+        order.append(i)
+
+    tasks = [asyncio.create_task(waiter(i)) for i in range(3)]
+    await asyncio.sleep(0)
+    assert limiter.queue_depth == 3
+
+    for _ in range(3):
+        limiter.release()
+        await asyncio.sleep(0)
+    await asyncio.gather(*tasks)
+    assert order == [0, 1, 2]
+    assert limiter.in_flight == 2
+    assert limiter.queue_depth == 0
+
+
+@pytest.mark.asyncio
+async def test_concurrency_queue_deadline():
+    limiter = AdaptiveConcurrencyLimiter("p", initial_limit=1)
+    await limiter.acquire()
+    with pytest.raises(ConcurrencyLimitTimeout):
+        await limiter.acquire(timeout=0.01)
+    assert limiter.stats["queue_timeouts"] == 1
+    # The timed-out waiter must not receive the freed slot
+    limiter.release()
+    assert limiter.in_flight == 0
+
+
+def test_aimd_increase_and_decrease():
+    limiter = AdaptiveConcurrencyLimiter("p", initial_limit=4, max_limit=10, cooldown=0)
+    limiter.in_flight = 4  # saturated
+    limiter.release(latency=0.1)
+    assert limiter.limit == pytest.approx(4.25)
+
+    limiter.in_flight = 1
+    limiter.release(outcome=OUTCOME_RATE_LIMITED)
+    assert limiter.limit == pytest.approx(2.125)
+
+
+def test_unsaturated_success_does_not_grow_limit():
+    limiter = AdaptiveConcurrencyLimiter("p", initial_limit=4)
+    limiter.in_flight = 1
+    limiter.release(latency=0.1)
+    assert limiter.limit == 4
+
+
+def test_rate_limit_burst_decreases_once_per_cooldown():
+    limiter = AdaptiveConcurrencyLimiter("p", initial_limit=16, cooldown=60)
+    for _ in range(5):
+        limiter.in_flight = 1
+        limiter.release(outcome=OUTCOME_RATE_LIMITED)
+    assert limiter.limit == 8
+    assert limiter.stats["rate_limited"] == 5
+
+
+def test_latency_degradation_backs_off():
+    limiter = AdaptiveConcurrencyLimiter(
+        "p", initial_limit=10, min_latency_samples=5, cooldown=0
+    )
+    for _ in range(10):
+        limiter.in_flight = 1
+        limiter.release(latency=1.0)
+    assert limiter.limit == 10
+    for _ in range(5):
+        limiter.in_flight = 1
+        limiter.release(latency=10.0)
+    assert limiter.limit < 10
+    assert limiter.stats["latency_backoffs"] >= 1
+
+
+@pytest.mark.asyncio
+async def test_concurrency_slot_reports_outcome_and_stats():
+    service = RateLimiter()
+    async with service.concurrency_slot("openai:gpt-4o") as slot:
+        assert service.get_endpoint_stats("openai:gpt-4o")["concurrency"]["in_flight"] == 1
+        slot.mark(OUTCOME_RATE_LIMITED)
+    stats = service.get_endpoint_stats("openai:gpt-4o")["concurrency"]
+    assert stats["in_flight"] == 0
+    assert stats["rate_limited"] == 1
+
+    with pytest.raises(RuntimeError):
+        async with service.concurrency_slot("openai:gpt-4o"):
+            raise RuntimeError("boom")
+    assert service.get_concurrency_stats()["openai:gpt-4o"]["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_resilient_adapter_feeds_rate_limits_to_shared_limiter():
+    from app.services.resilient_llm_adapter import ResilientLLMAdapter
+
+    class FakeOpenAIAdapter:
+        model = "gpt-4o"
+
+        async def generate(self, prompt):
+            return {
+                "generated_text": "Error: Rate limit exceeded. Please try again later.",
+                "error_details": {"error": "RATE_LIMITED"},
+            }
+
+    service = RateLimiter()
+    adapter = ResilientLLMAdapter(FakeOpenAIAdapter(), "openai", rate_limiter=service)
+    result = await adapter.generate("hi")
+    assert result["generated_text"].startswith("Error: Rate limit")
+    stats = service.get_endpoint_stats("openai:gpt-4o")["concurrency"]
+    assert stats["rate_limited"] == 1
+    assert stats["in_flight"] == 0
+    await adapter.close()
@@ -0,0 +1,117 @@
+"""Tests for write-behind batching of API key last_used_at."""
+
+import asyncio
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database.models.user import ApiKey
+from app.services.api_key_usage_recorder import ApiKeyUsageRecorder
+
+T0 = datetime(2025, 1, 1, 12, 0, 0)
+
+
+@pytest.fixture
+def database():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    ApiKey.__table__.create(engine)
+    statements = []
+    event.listen(
+        engine,
+        "before_cursor_execute",
+        lambda conn, cursor, sql, params, context, executemany: statements.append(sql),
+    )
+    factory = sessionmaker(bind=engine)
+    with factory() as session:
+        for i, used in enumerate([None, T0, T0 + timedelta(hours=1)]):
+            session.add(ApiKey(id=i + 1, user_id=1, name=f"k{i}", key=f"key-{i}", last_used_at=used))
+        session.commit()
+    statements.clear()
+
+    @contextmanager
+    def session_factory():
+        with factory() as session:
+            yield session
+
+    def last_used():
+        with factory() as session:
+            return {k.key: k.last_used_at for k in session.query(ApiKey).order_by(ApiKey.id)}
+
+    return session_factory, statements, last_used
+
+
+@pytest.mark.asyncio
+async def test_uses_are_coalesced_into_one_bulk_update(database):
+    session_factory, statements, last_used = database
+    recorder = ApiKeyUsageRecorder(flush_interval=60.0, session_factory=session_factory)
+
+    for minute in range(100):
+        recorder.record("key-0", T0 + timedelta(minutes=minute))
+    recorder.record("key-1", T0 + timedelta(minutes=5))
+    recorder.record("key-2", T0)  # older than the stored value
+    assert recorder.pending_count == 3
+    assert recorder.stats["coalesced"] == 99
+
+    assert await recorder.flush() == 3
+    assert sum(sql.lstrip().upper().startswith("UPDATE") for sql in statements) == 1
+    assert last_used() == {
+        "key-0": T0 + timedelta(minutes=99),
+        "key-1": T0 + timedelta(minutes=5),
+        "key-2": T0 + timedelta(hours=1),  # never moved backwards
+    }
+    stats = recorder.get_stats()
+    assert stats["pending"] == 0 and stats["flushes"] == 1 and stats["written"] == 3
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_pending_times_for_the_next_one(database):
+    session_factory, _, last_used = database
+    broken = {"on": True}
+
+    @contextmanager
+    def flaky_factory():
+        if broken["on"]:
+            raise RuntimeError("database unavailable")
+        with session_factory() as session:
+            yield session
+
+    recorder = ApiKeyUsageRecorder(flush_interval=60.0, session_factory=flaky_factory)
+    recorder.record("key-0", T0)
+    assert await recorder.flush() == 0
+    recorder.record("key-0", T0 - timedelta(minutes=1))  # an older use must not win
+    assert recorder.stats["failures"] == 1
+    assert recorder.pending_count == 1
+
+    broken["on"] = False
+    assert await recorder.flush() == 1
+    assert last_used()["key-0"] == T0
+
+
+@pytest.mark.asyncio
+async def test_background_flush_and_graceful_stop(database):
+    session_factory, _, last_used = database
+    recorder = ApiKeyUsageRecorder(
+        flush_interval=0.05, max_pending=2, session_factory=session_factory
+    )
+    recorder.start()
+    assert recorder.running
+
+    recorder.record("key-0", T0 + timedelta(days=1))
+    for _ in range(100):
+        if recorder.stats["flushes"]:
+            break
+        await asyncio.sleep(0.01)
+    assert last_used()["key-0"] == T0 + timedelta(days=1)
+
+    # Pending uses are written on stop, even if the interval has not elapsed
+    recorder.flush_interval = 3600.0
+    recorder.record("key-1", T0 + timedelta(days=2))
+    await recorder.aclose()
+    assert not recorder.running
+    assert last_used()["key-1"] == T0 + timedelta(days=2)
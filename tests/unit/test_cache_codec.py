@@ -0,0 +1,136 @@
+"""
+Unit tests for the Redis cache codec.
+"""
+
+import json
+
+import pytest
+
+from app.services.cache_codec import (
+    COMPRESSION_NONE,
+    COMPRESSION_ZLIB,
+    MAGIC,
+    CacheCodec,
+)
+from app.services.cache_service import CacheService
+from app.services.orchestration_service import PipelineResult
+from app.services.quality_evaluation import (
+    QualityDimension,
+    QualityScore,
+    ResponseQuality,
+)
+
+
+def _pipeline_results():
+    quality = ResponseQuality(
+        dimensions={
+            QualityDimension.COHERENCE: QualityScore(
+                score=8.5, justification="clear", confidence=0.9
+            )
+        },
+        overall_score=8.5,
+        strengths=["structure"],
+        weaknesses=[],
+        recommendations=["cite sources"],
+    )
+    return {
+        "initial_response": PipelineResult(
+            stage_name="initial_response",
+            output={"responses": {"gpt-4o": "answer " * 500}},
+            quality=quality,
+            performance_metrics={"duration": 1.2},
+        ),
+        "ultra_synthesis": PipelineResult(
+            stage_name="ultra_synthesis",
+            output="synthesis",
+            token_usage={"input": 10, "output": 20},
+        ),
+    }
+
+
+class TestCacheCodec:
+    """Test framing, compression and type round-tripping"""
+
+    @pytest.mark.parametrize("serializer", ["msgpack", "json"])
+    def test_pipeline_result_round_trip(self, serializer):
+        """PipelineResult and nested quality objects survive encode/decode"""
+        codec = CacheCodec(serializer=serializer, compression="zlib")
+        results = _pipeline_results()
+
+        decoded = codec.decode(codec.encode(results))
+
+        assert decoded == results
+        assert isinstance(decoded["initial_response"], PipelineResult)
+        dims = decoded["initial_response"].quality.dimensions
+        assert isinstance(dims[QualityDimension.COHERENCE], QualityScore)
+
+    def test_compression_only_above_threshold(self):
+        """Small payloads stay uncompressed; large text is compressed"""
+        codec = CacheCodec(compression="zlib", compression_threshold=256)
+
+        small = codec.encode("short")
+        large = codec.encode("multi-model text " * 200)
+
+        assert small[0] == MAGIC and small[1] & 0x0F == COMPRESSION_NONE
+        assert large[1] & 0x0F == COMPRESSION_ZLIB
+        assert len(large) < len(json.dumps("multi-model text " * 200))
+        assert codec.decode(large) == "multi-model text " * 200
+
+    def test_legacy_values_still_decode(self):
+        """Values written as plain JSON text before framing are readable"""
+        codec = CacheCodec()
+        assert codec.decode(b'{"a": [1, 2]}') == {"a": [1, 2]}
+        assert codec.decode("plain text") == "plain text"
+
+    def test_unknown_dataclass_decodes_to_fields(self):
+        """Unregistered tagged types never instantiate arbitrary classes"""
+        codec = CacheCodec(serializer="json", compression="none")
+        payload = bytes((MAGIC, 0)) + json.dumps(
+            {"__dc__": "os.system", "f": {"cmd": "x"}}
+        ).encode()
+        assert codec.decode(payload) == {"cmd": "x"}
+
+    def test_unavailable_compression_falls_back(self, monkeypatch):
+        """Requesting zstd without the library falls back to zlib"""
+        monkeypatch.setattr("app.services.cache_codec.zstandard", None)
+        codec = CacheCodec(compression="zstd")
+        assert codec.compression == "zlib"
+
+
+class TestCacheServiceRedisCodec:
+    """Test CacheService Redis path with a real (fake) Redis server"""
+
+    @pytest.mark.asyncio
+    async def test_aset_sets_ttl_and_round_trips(self):
+        fakeredis = pytest.importorskip("fakeredis")
+        service = CacheService()
+        service.redis = service.redis_client = fakeredis.FakeAsyncRedis()
+        results = _pipeline_results()
+
+        assert await service.aset("pipeline:abc", results, ttl=900) is True
+
+        ttl = await service.redis.ttl("pipeline:abc")
+        assert 0 < ttl <= 900
+        assert await service.aget("pipeline:abc") == results
+        await service.redis.aclose()
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("ttl", [0, -5])
+    async def test_non_positive_ttl_is_not_cached_in_either_tier(self, ttl):
+        fakeredis = pytest.importorskip("fakeredis")
+        service = CacheService()
+        redis_backend = fakeredis.FakeAsyncRedis()
+
+        # Redis tier: the key is dropped, never stored without expiry
+        service.redis = service.redis_client = redis_backend
+        await service.aset("k", "old")
+        assert await service.aset("k", "new", ttl=ttl) is True
+        assert await redis_backend.exists("k") == 0
+        assert await service.aget("k") is None
+
+        # Memory tier agrees
+        service.redis = service.redis_client = None
+        service.set("k", "old")
+        assert service.set("k", "new", ttl=ttl) is True
+        assert service.get("k") is None
+        await redis_backend.aclose()
@@ -10,7 +10,14 @@ from unittest.mock import AsyncMock, Mock, patch
 import pytest
 import redis.asyncio as redis
 
-from app.services.cache_service import CacheService, cache_key, cached, get_cache_service
+from app.services.cache_service import (
+    BoundedMemoryCache,
+    CacheService,
+    cache_key,
+    cached,
+    get_cache_service,
+    parse_prefix_budgets,
+)
 
 
 class TestCacheKeyGeneration:
@@ -141,9 +148,14 @@ class TestCacheService:
         """Test Redis-backed operations"""
         # Async set
         assert await cache_with_redis.aset("key1", "value1") is True
-        mock_redis.set.assert_called_with("key1", "value1", ex=None)
+        args, kwargs = mock_redis.set.call_args
+        assert args[0] == "key1"
+        assert isinstance(args[1], bytes)
+        assert kwargs == {"ex": 3600}
         
-        # Async get
+        # Async get (framed payload and legacy plain value)
+        mock_redis.get.return_value = args[1]
+        assert await cache_with_redis.aget("key1") == "value1"
         mock_redis.get.return_value = b"value1"
         assert await cache_with_redis.aget("key1") == "value1"
         
@@ -429,4 +441,95 @@ class TestCacheIntegrationScenarios:
         
         # Cleanup should work
         assert cache_service.flush() is True
-        assert len(cache_service._memory_cache) == 0
\ No newline at end of file
+        assert len(cache_service._memory_cache) == 0
+
+
+class TestBoundedMemoryCache:
+    """Test the bounded LRU/TTL in-memory tier"""
+
+    @pytest.fixture
+    def cache_service(self):
+        service = CacheService()
+        service.redis = None
+        service.redis_client = None
+        service.memory_cache = service._memory_cache = BoundedMemoryCache(
+            max_entries=3, max_bytes=1000
+        )
+        return service
+
+    def test_lru_eviction_by_entry_count(self, cache_service):
+        """Least recently used entry is evicted once max_entries is exceeded"""
+        cache_service.set("a", "1")
+        cache_service.set("b", "2")
+        cache_service.set("c", "3")
+        # Touch "a" so "b" becomes the LRU entry
+        assert cache_service.get("a") == "1"
+        cache_service.set("d", "4")
+
+        assert "b" not in cache_service.memory_cache
+        assert set(cache_service.memory_cache) == {"a", "c", "d"}
+        stats = cache_service.get_stats()
+        assert stats["evictions_by_reason"]["capacity"] == 1
+        assert stats["evictions"] == 1
+
+    def test_eviction_by_total_bytes(self, cache_service):
+        """Entries are evicted until the byte budget is respected"""
+        cache_service.set("big1", "x" * 400)
+        cache_service.set("big2", "y" * 400)
+        cache_service.set("big3", "z" * 400)
+
+        assert "big1" not in cache_service.memory_cache
+        assert cache_service.memory_cache.total_bytes <= 1000
+        assert cache_service.get_stats()["evictions_by_reason"]["bytes"] == 1
+
+    def test_per_prefix_budget(self):
+        """A prefix over budget evicts only its own oldest entries"""
+        mem = BoundedMemoryCache(
+            max_entries=100,
+            max_bytes=10_000,
+            prefix_budgets=parse_prefix_budgets("pipeline=250,bad"),
+        )
+        mem["other:1"] = {"value": "o" * 100, "expires_at": time.time() + 60}
+        mem["pipeline:1"] = {"value": "p" * 100, "expires_at": time.time() + 60}
+        mem["pipeline:2"] = {"value": "p" * 100, "expires_at": time.time() + 60}
+        mem["pipeline:3"] = {"value": "p" * 100, "expires_at": time.time() + 60}
+
+        assert "pipeline:1" not in mem
+        assert "other:1" in mem
+        assert mem.prefix_usage()["pipeline"] == 200
+        assert mem.evictions["prefix_budget"] == 1
+
+    def test_overwrite_keeps_byte_accounting(self, cache_service):
+        """Re-setting a key replaces its size instead of accumulating"""
+        cache_service.set("k", "x" * 100)
+        cache_service.set("k", "x" * 10)
+        assert cache_service.memory_cache.total_bytes == 10
+        cache_service.delete("k")
+        assert cache_service.memory_cache.total_bytes == 0
+
+    @pytest.mark.asyncio
+    async def test_purge_expired_skips_stale_heap_nodes(self, cache_service):
+        """Sweeper removes expired entries and ignores superseded TTLs"""
+        cache_service.set("short", "v", ttl=0.01)
+        cache_service.set("renewed", "v", ttl=0.01)
+        cache_service.set("renewed", "v", ttl=60)
+        await asyncio.sleep(0.05)
+
+        removed = await cache_service._cleanup_memory_cache()
+
+        assert removed == 1
+        assert "short" not in cache_service.memory_cache
+        assert cache_service.get("renewed") == "v"
+        assert cache_service.get_stats()["evictions_by_reason"]["expired"] == 1
+
+    @pytest.mark.asyncio
+    async def test_background_sweeper(self, cache_service):
+        """Background sweeper expires entries without any reads"""
+        cache_service.set("gone", "v", ttl=0.01)
+        cache_service.start_sweeper(interval=0.02)
+        try:
+            await asyncio.sleep(0.1)
+            assert len(cache_service.memory_cache) == 0
+        finally:
+            await cache_service.stop_sweeper()
+        assert cache_service._sweeper_task is None
@@ -0,0 +1,145 @@
+"""Tests for failure-rate circuit breakers and their state stores."""
+
+import pytest
+
+from app.services.circuit_breaker_engine import (
+    STATE_CLOSED,
+    STATE_HALF_OPEN,
+    STATE_OPEN,
+    BreakerPolicy,
+    CircuitBreakerEngine,
+    InMemoryBreakerStore,
+    RedisBreakerStore,
+)
+from app.services.enhanced_error_handler import EnhancedErrorHandler, ProviderState
+
+POLICY = BreakerPolicy(
+    window_seconds=10, bucket_seconds=1, min_calls=4, failure_rate=0.5, open_seconds=30
+)
+
+
+class FakeClock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def _redis_store():
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")  # fakeredis needs lupa to run Lua scripts
+    return RedisBreakerStore(fakeredis.FakeAsyncRedis())
+
+
+@pytest.fixture(params=["memory", "redis"])
+def store_factory(request):
+    if request.param == "memory":
+        return InMemoryBreakerStore
+    _redis_store()
+    fakeredis = pytest.importorskip("fakeredis")
+    server = fakeredis.FakeServer()
+    # Every call returns a new client on the same server, like separate workers
+    return lambda: RedisBreakerStore(fakeredis.FakeAsyncRedis(server=server))
+
+
+@pytest.mark.asyncio
+async def test_opens_on_failure_rate_not_consecutive_failures(store_factory):
+    clock = FakeClock()
+    engine = CircuitBreakerEngine(store_factory(), POLICY, clock)
+    for success in (True, False, True, False):
+        assert (await engine.allow("openai")).allowed
+        decision = await engine.record("openai", success)
+    assert decision.state == STATE_OPEN
+    assert decision.failure_rate == 0.5
+    rejected = await engine.allow("openai")
+    assert not rejected.allowed
+    assert rejected.retry_after == pytest.approx(30)
+
+
+@pytest.mark.asyncio
+async def test_old_buckets_slide_out_of_the_window(store_factory):
+    clock = FakeClock()
+    engine = CircuitBreakerEngine(store_factory(), POLICY, clock)
+    for _ in range(3):
+        await engine.record("openai", False)
+    clock.now += 11
+    decision = await engine.record("openai", False)
+    assert decision.state == STATE_CLOSED
+    assert (decision.calls, decision.failures) == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_half_open_probe_closes_or_reopens(store_factory):
+    clock = FakeClock()
+    engine = CircuitBreakerEngine(store_factory(), POLICY, clock)
+    for _ in range(4):
+        await engine.record("openai", False)
+    clock.now += 30
+
+    probe = await engine.allow("openai")
+    assert (probe.state, probe.allowed) == (STATE_HALF_OPEN, True)
+    assert not (await engine.allow("openai")).allowed  # only one probe at a time
+    assert (await engine.record("openai", False)).state == STATE_OPEN
+
+    clock.now += 30
+    assert (await engine.allow("openai")).allowed
+    assert (await engine.record("openai", True)).state == STATE_CLOSED
+    # The failure window starts fresh after recovery
+    assert (await engine.record("openai", False)).calls == 1
+
+
+@pytest.mark.asyncio
+async def test_redis_state_is_shared_across_workers():
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    server = fakeredis.FakeServer()
+    clock = FakeClock()
+    worker_a = CircuitBreakerEngine(
+        RedisBreakerStore(fakeredis.FakeAsyncRedis(server=server)), POLICY, clock
+    )
+    worker_b = CircuitBreakerEngine(
+        RedisBreakerStore(fakeredis.FakeAsyncRedis(server=server)), POLICY, clock
+    )
+    for _ in range(2):
+        await worker_a.record("anthropic", False)
+        await worker_b.record("anthropic", False)
+    assert not (await worker_a.allow("anthropic")).allowed
+    assert not (await worker_b.allow("anthropic")).allowed
+
+    await worker_a.reset("anthropic")
+    assert (await worker_b.allow("anthropic")).allowed
+
+
+@pytest.mark.asyncio
+async def test_store_errors_fall_back_to_local_state():
+    class BrokenStore:
+        async def allow(self, *args):
+            raise ConnectionError("redis down")
+
+        record = allow
+
+    engine = CircuitBreakerEngine(BrokenStore(), POLICY, FakeClock())
+    for _ in range(4):
+        await engine.record("openai", False)
+    assert not (await engine.allow("openai")).allowed
+    assert engine.stats["store_errors"] == 5
+
+
+@pytest.mark.asyncio
+async def test_error_handler_consults_engine():
+    clock = FakeClock()
+    handler = EnhancedErrorHandler(CircuitBreakerEngine(policy=POLICY, clock=clock))
+    for _ in range(4):
+        await handler.handle_provider_error("openai", "gpt-4o", TimeoutError("slow"), "initial_response")
+    assert handler.circuit_breakers["openai"].state == ProviderState.CIRCUIT_OPEN
+    allowed, message = await handler.should_attempt_provider("openai")
+    assert not allowed
+    assert "retry in 30s" in message
+
+    clock.now += 30
+    allowed, message = await handler.should_attempt_provider("openai")
+    assert allowed and "recovery" in message
+    await handler.record_provider_success("openai", 0.5)
+    assert handler.circuit_breakers["openai"].state == ProviderState.HEALTHY
+    assert await handler.should_attempt_provider("openai") == (True, None)
@@ -0,0 +1,120 @@
+"""Tests for the streaming response compression middleware."""
+
+import gzip
+import json
+import zlib
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.testclient import TestClient
+
+from app.middleware.performance_middleware import (
+    CompressionMiddleware,
+    available_encodings,
+    negotiate_encoding,
+)
+
+
+def _app(**options):
+    app = FastAPI()
+
+    @app.get("/big")
+    def big():
+        return JSONResponse({"items": [{"n": i, "text": "lorem ipsum"} for i in range(2000)]})
+
+    @app.get("/small")
+    def small():
+        return PlainTextResponse("pong")
+
+    @app.get("/image")
+    def image():
+        return PlainTextResponse("x" * 5000, media_type="image/png")
+
+    @app.get("/chunks")
+    def chunks():
+        return StreamingResponse(
+            (b"line %d\n" % i for i in range(500)), media_type="text/plain"
+        )
+
+    app.add_middleware(CompressionMiddleware, **options)
+    return app
+
+
+def test_negotiation_honours_q_values_and_server_preference():
+    encoders = {"br": object, "zstd": object, "gzip": object}
+    assert negotiate_encoding("gzip, br", encoders) == "br"
+    assert negotiate_encoding("gzip;q=1.0, br;q=0.5", encoders) == "gzip"
+    assert negotiate_encoding("gzip;q=0", encoders) is None
+    assert negotiate_encoding("*", {"gzip": object}) == "gzip"
+    assert negotiate_encoding("identity", encoders) is None
+
+
+def test_large_json_is_gzipped_without_content_length():
+    client = TestClient(_app())
+    response = client.get("/big", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "accept-encoding" in response.headers["vary"].lower()
+    assert len(response.json()["items"]) == 2000
+
+
+def test_small_and_non_text_bodies_pass_through():
+    client = TestClient(_app())
+    small = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+    assert small.text == "pong"
+    image = client.get("/image", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in image.headers
+    plain = client.get("/big", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+
+
+def test_streaming_responses_are_compressed():
+    client = TestClient(_app())
+    response = client.get("/chunks", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.text.splitlines()[-1] == "line 499"
+
+
+@pytest.mark.asyncio
+async def test_event_stream_flushes_every_frame():
+    frames = [b"id: %d\nevent: tick\ndata: {}\n\n" % i for i in range(3)]
+
+    async def app(scope, receive, send):
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(b"content-type", b"text/event-stream")],
+            }
+        )
+        for frame in frames:
+            await send({"type": "http.response.body", "body": frame, "more_body": True})
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    middleware = CompressionMiddleware(app, minimum_size=0, offload_size=1)
+    scope = {"type": "http", "headers": [(b"accept-encoding", b"gzip")]}
+    await middleware(scope, None, send)
+
+    assert dict(sent[0]["headers"])[b"content-encoding"] == b"gzip"
+    decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    # Each frame is fully decodable as soon as its chunk arrives
+    for frame, message in zip(frames, sent[1:4]):
+        assert decoder.decompress(message["body"]) == frame
+    assert gzip.decompress(b"".join(m["body"] for m in sent[1:])) == b"".join(frames)
+
+
+def test_optional_codecs_are_offered_when_installed():
+    encodings = available_encodings()
+    assert list(encodings)[-1] == "gzip"
+    for name in ("br", "zstd"):
+        if name in encodings:
+            client = TestClient(_app())
+            response = client.get("/big", headers={"Accept-Encoding": name})
+            assert response.headers["content-encoding"] == name
+            assert json.loads(response.content)["items"][0]["n"] == 0
@@ -0,0 +1,174 @@
+"""
+Unit tests for dataflow (stage-overlapping) pipeline execution.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from app.services.dataflow_pipeline import DataflowPipelineRunner
+from app.services.orchestration_service import build_peer_review_prompt
+
+
+class FakeOrchestrator:
+    """Implements the public stage methods; latency per (stage, model) is configurable"""
+
+    def __init__(self, initial_delays, review_delay=0.01, failing=()):
+        self.initial_delays = initial_delays
+        self.review_delay = review_delay
+        self.failing = set(failing)
+        self.calls = []
+        self.review_prompts = {}
+        self.synthesis_input = None
+        self.synthesis_models = None
+
+    async def initial_response(self, data, models, options=None):
+        (model,) = models
+        self.calls.append(("initial", model, time.monotonic()))
+        await asyncio.sleep(self.initial_delays[model])
+        if model in self.failing:
+            return {"responses": {}, "failed_models": {model: "provider down"}}
+        return {"responses": {model: f"answer from {model}"}, "failed_models": {}}
+
+    async def peer_review_and_revision(self, data, models, options=None):
+        (model,) = models
+        self.calls.append(("review", model, time.monotonic()))
+        self.review_prompts[model] = build_peer_review_prompt(
+            data["prompt"], model, data["responses"]
+        )
+        await asyncio.sleep(self.review_delay)
+        return {
+            "revised_responses": {model: f"revised from {model}"},
+            "models_with_revisions": [model],
+        }
+
+    async def ultra_synthesis(self, data, models, options=None):
+        self.synthesis_input = data
+        self.synthesis_models = models
+        return {"stage": "ultra_synthesis", "synthesis": f"synth by {models[0]}"}
+
+
+MODELS = ["fast-a", "fast-b", "slow-c"]
+
+
+class TestDataflowPipeline:
+    """Test quorum gating, overlap and slow-tail handling"""
+
+    @pytest.mark.asyncio
+    async def test_reviews_start_before_slow_model_and_tail_is_cancelled(self):
+        orch = FakeOrchestrator({"fast-a": 0.01, "fast-b": 0.02, "slow-c": 0.5})
+        runner = DataflowPipelineRunner(orch, quorum=2, tail_grace=0, cancel_slow_tail=True)
+
+        started = time.monotonic()
+        results = await runner.run("question", MODELS)
+        elapsed = time.monotonic() - started
+
+        assert elapsed < 0.3
+        reviews = [c for c in orch.calls if c[0] == "review"]
+        assert {c[1] for c in reviews} == {"fast-a", "fast-b"}
+        peer = results["peer_review_and_revision"].output
+        assert peer["revised_responses"] == {
+            "fast-a": "revised from fast-a",
+            "fast-b": "revised from fast-b",
+        }
+        assert results["initial_response"].performance_metrics["cancelled"] == ["initial:slow-c"]
+        # Models that revised are offered to synthesis first, then the rest
+        assert set(orch.synthesis_models[:2]) == {"fast-a", "fast-b"}
+        assert orch.synthesis_models[2] == "slow-c"
+        assert orch.synthesis_input["input"]["prompt"] == "question"
+
+    @pytest.mark.asyncio
+    async def test_late_arrival_reviewed_within_grace(self):
+        orch = FakeOrchestrator({"fast-a": 0.01, "fast-b": 0.01, "slow-c": 0.05})
+        runner = DataflowPipelineRunner(orch, quorum=2, tail_grace=0.3)
+
+        results = await runner.run("question", MODELS)
+
+        peer = results["peer_review_and_revision"].output
+        assert set(peer["models_with_revisions"]) == set(MODELS)
+        # The late model reviews against both earlier answers
+        late_prompt = orch.review_prompts["slow-c"]
+        assert "Original Query: question" in late_prompt
+        assert "fast-a: answer from fast-a" in late_prompt
+        assert "fast-b: answer from fast-b" in late_prompt
+        assert "slow-c: answer from slow-c" not in late_prompt
+        assert not results["initial_response"].performance_metrics["cancelled"]
+
+    @pytest.mark.asyncio
+    async def test_slow_tail_kept_when_cancellation_disabled(self):
+        orch = FakeOrchestrator({"fast-a": 0.01, "fast-b": 0.01, "slow-c": 0.1})
+        runner = DataflowPipelineRunner(orch, quorum=2, tail_grace=0, cancel_slow_tail=False)
+
+        results = await runner.run("question", MODELS)
+
+        initial = results["initial_response"].output
+        assert initial["responses"]["slow-c"] == "answer from slow-c"
+        # Synthesis only saw the quorum
+        assert "slow-c" not in orch.synthesis_input["revised_responses"]
+        assert results["initial_response"].performance_metrics["cancelled"] == []
+
+    @pytest.mark.asyncio
+    async def test_failed_models_lower_the_reachable_quorum(self):
+        orch = FakeOrchestrator(
+            {"fast-a": 0.01, "fast-b": 0.01, "slow-c": 0.01}, failing={"slow-c"}
+        )
+        runner = DataflowPipelineRunner(orch, quorum=3, tail_grace=0)
+
+        results = await runner.run("question", MODELS)
+
+        peer = results["peer_review_and_revision"].output
+        assert set(peer["successful_models"]) == {"fast-a", "fast-b"}
+        assert results["initial_response"].performance_metrics["initial_errors"] == {
+            "slow-c": "provider down"
+        }
+        assert results["ultra_synthesis"].error is None
+
+    @pytest.mark.asyncio
+    async def test_single_answer_skips_peer_review(self):
+        orch = FakeOrchestrator(
+            {"fast-a": 0.01, "fast-b": 0.01, "slow-c": 0.01}, failing={"fast-b", "slow-c"}
+        )
+        runner = DataflowPipelineRunner(orch, quorum=2, tail_grace=0)
+
+        results = await runner.run("question", MODELS)
+
+        peer = results["peer_review_and_revision"].output
+        assert peer["skipped"] is True
+        assert not [c for c in orch.calls if c[0] == "review"]
+        assert orch.synthesis_input["revised_responses"] == {"fast-a": "answer from fast-a"}
+
+
+class TestSharedPeerReviewPrompt:
+    """The barrier pipeline and dataflow mode send the same peer-review prompt"""
+
+    @pytest.mark.asyncio
+    async def test_barrier_peer_review_fills_the_shared_prompt(self, monkeypatch):
+        from unittest.mock import Mock
+
+        from app.services import orchestration_service as orch_module
+
+        prompts = {}
+
+        class RecordingAdapter:
+            def __init__(self, base):
+                self.model = base.model
+
+            async def generate(self, prompt):
+                prompts[self.model] = prompt
+                return {"generated_text": f"revised from {self.model}"}
+
+        monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+        monkeypatch.setattr(orch_module, "create_resilient_adapter", RecordingAdapter)
+        service = orch_module.OrchestrationService(model_registry=Mock())
+        responses = {"gpt-4o": "answer a", "gpt-4o-mini": "answer b"}
+
+        # Reviewing a subset of the models is allowed (dataflow reviews one at a time)
+        output = await service.peer_review_and_revision(
+            {"prompt": "question", "responses": responses, "successful_models": list(responses)},
+            ["gpt-4o"],
+        )
+
+        assert output["models_with_revisions"] == ["gpt-4o"]
+        assert prompts["gpt-4o"] == build_peer_review_prompt("question", "gpt-4o", responses)
+        assert "{" not in prompts["gpt-4o"]
@@ -0,0 +1,219 @@
+"""Tests for the background health prober and its shared snapshot."""
+
+import asyncio
+import random
+import time
+
+import pytest
+
+from app.services.health_prober import (
+    HealthProber,
+    HealthSnapshot,
+    ProbeResult,
+    RedisProbeStore,
+)
+from app.utils.health_check import HealthCheck, HealthStatus, ServiceType
+
+
+class _Clock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _prober(results, targets=None, clock=None, **kwargs):
+    calls = []
+
+    async def probe(model, api_key):
+        calls.append(model)
+        outcome = results[model]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    prober = HealthProber(
+        probe=probe,
+        targets=lambda: targets if targets is not None else {m: "key" for m in results},
+        clock=clock or _Clock(),
+        rng=random.Random(7),
+        **kwargs,
+    )
+    return prober, calls
+
+
+@pytest.mark.asyncio
+async def test_first_round_is_staggered_and_rescheduled_with_jitter():
+    clock = _Clock()
+    models = {f"model-{i}": True for i in range(8)}
+    prober, calls = _prober(models, clock=clock, interval=100.0, jitter=0.2)
+
+    assert await prober.run_due() == 0  # schedules the first round, probes nothing yet
+    clock.now += 20.0  # the whole first round lands within interval * jitter
+    assert await prober.run_due() == 8
+    assert sorted(calls) == sorted(models)
+
+    due = list(prober._due.values())
+    assert all(clock.now + 80.0 <= at <= clock.now + 120.0 for at in due)
+    assert len({round(at, 6) for at in due}) == len(due)  # not synchronised
+
+    calls.clear()
+    clock.now += 79.0
+    assert await prober.run_due() == 0
+    assert calls == []
+
+
+@pytest.mark.asyncio
+async def test_snapshot_records_failures_and_goes_stale():
+    clock = _Clock()
+    prober, _ = _prober(
+        {"good": True, "bad": False, "boom": RuntimeError("401")},
+        clock=clock,
+        stale_seconds=60.0,
+    )
+    prober.request_probe("good")
+    prober.request_probe("bad")
+    prober.request_probe("boom")
+    await prober.run_due()
+
+    snapshot = prober.snapshot
+    assert snapshot.healthy_models == frozenset({"good"})
+    assert snapshot.results["boom"].error == "401"
+    assert prober.is_healthy("bad") is False
+    assert prober.is_healthy("never-probed") is None
+    with pytest.raises(TypeError):
+        snapshot.results["good"] = None  # read-only view
+
+    clock.now += 61.0
+    assert prober.is_healthy("good") is None
+    assert prober.stats["probes"] == 3
+    assert prober.stats["failures"] == 2
+
+
+@pytest.mark.asyncio
+async def test_removed_targets_leave_the_snapshot():
+    targets = {"a": "key", "b": "key"}
+    prober, _ = _prober({"a": True, "b": True}, targets=targets)
+    for model in targets:
+        prober.request_probe(model)
+    await prober.run_due()
+    del targets["b"]
+    await prober.run_due()
+    assert set(prober.snapshot.results) == {"a"}
+
+
+@pytest.mark.asyncio
+async def test_redis_store_shares_one_probe_budget_across_workers():
+    fakeredis = pytest.importorskip("fakeredis")
+    server = fakeredis.FakeServer()
+    clock = _Clock(time.time())
+    probers = []
+    for _ in range(3):
+        client = fakeredis.aioredis.FakeRedis(server=server)
+        prober, calls = _prober(
+            {"gpt-4o": False}, clock=clock, store=RedisProbeStore(client), interval=60.0
+        )
+        probers.append((prober, calls))
+
+    for prober, _ in probers:
+        prober.request_probe("gpt-4o")
+        await prober.run_due()
+
+    assert sum(len(calls) for _, calls in probers) == 1
+    # Workers that lost the lease adopted the published result
+    assert all(prober.is_healthy("gpt-4o") is False for prober, _ in probers)
+    assert sum(prober.stats["shared"] for prober, _ in probers) == 2
+
+
+@pytest.mark.asyncio
+async def test_default_models_skip_models_the_prober_marked_down(monkeypatch):
+    from app.services import model_catalog
+    from app.services import orchestration_service as module
+
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "sk-ant")
+    for name in ("GOOGLE_API_KEY", "HUGGINGFACE_API_KEY"):
+        monkeypatch.delenv(name, raising=False)
+
+    prober, calls = _prober({}, clock=_Clock(time.time()))
+    prober._snapshot = HealthSnapshot(
+        {"gpt-4o": ProbeResult("gpt-4o", False, checked_at=prober.clock())}
+    )
+    monkeypatch.setattr(model_catalog, "get_health_prober", lambda: prober)
+    monkeypatch.setattr(model_catalog, "_catalog", None)
+    model_catalog.refresh_model_catalog("test")
+
+    service = module.OrchestrationService.__new__(module.OrchestrationService)
+    models = await service._default_models_from_env()
+    assert "gpt-4o" not in models
+    assert "gpt-3.5-turbo" in models
+    assert "claude-3-5-sonnet-20241022" in models
+    assert calls == []  # request path never probes
+
+
+@pytest.mark.asyncio
+async def test_probe_model_answers_from_snapshot_without_blocking(monkeypatch):
+    from app.services import model_health_cache as module
+
+    gate, started = asyncio.Event(), asyncio.Event()
+
+    async def slow_probe(model, api_key):
+        started.set()
+        await gate.wait()
+        return True
+
+    prober = HealthProber(probe=slow_probe, targets=lambda: {"gpt-4o": "key"}, interval=3600.0)
+    monkeypatch.setattr(module, "get_health_prober", lambda: prober)
+    module.model_health_cache.clear_cache()
+    prober.start()
+    try:
+        result = await asyncio.wait_for(
+            module.model_health_cache.probe_model("gpt-4o", "key"), timeout=1.0
+        )
+        assert result is True
+        # The request queued an immediate background probe instead of waiting for it
+        await asyncio.wait_for(started.wait(), timeout=1.0)
+        assert prober.is_healthy("gpt-4o") is None
+    finally:
+        gate.set()
+        await prober.stop()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "model,status,healthy",
+    [
+        ("gpt-4o", 200, True),
+        ("gpt-4o", 429, True),
+        ("claude-3-5-sonnet-20241022", 529, True),
+        ("gemini-1.5-pro", 401, False),
+        ("meta-llama/Meta-Llama-3-8B-Instruct", 503, True),
+        ("meta-llama/Meta-Llama-3-8B-Instruct", 500, False),
+    ],
+)
+async def test_throttled_probe_counts_as_up(monkeypatch, model, status, healthy):
+    from unittest.mock import AsyncMock, Mock
+
+    from app.services import model_health_cache as module
+
+    monkeypatch.setattr(module.CLIENT, "post", AsyncMock(return_value=Mock(status_code=status)))
+    assert await module.model_health_cache._do_probe(model, "key") is healthy
+
+
+def test_health_check_joins_a_hung_run_instead_of_spawning_another():
+    release = __import__("threading").Event()
+    runs = []
+
+    def hung():
+        runs.append(1)
+        release.wait(5)
+        return {"status": HealthStatus.OK}
+
+    check = HealthCheck("slow", ServiceType.CUSTOM, hung, timeout=0.05)
+    try:
+        assert check.check()["status"] == HealthStatus.UNAVAILABLE
+        assert check.check(force=True)["status"] == HealthStatus.UNAVAILABLE
+        assert len(runs) == 1
+    finally:
+        release.set()
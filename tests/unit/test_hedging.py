@@ -0,0 +1,147 @@
+"""
+Unit tests for hedged requests.
+"""
+
+import asyncio
+
+import pytest
+
+from app.services.hedging import HedgeBudget, HedgedRequestManager, LatencyTracker
+
+
+def make_call(delays, failing=(), calls=None):
+    async def call(model):
+        if calls is not None:
+            calls.append(model)
+        await asyncio.sleep(delays[model])
+        if model in failing:
+            return model, {"error": f"{model} failed"}
+        return model, {"generated_text": f"answer from {model}"}
+
+    return call
+
+
+def warm_manager(model="slow", p95=0.05, **budget_kwargs):
+    tracker = LatencyTracker(window=50, min_samples=5)
+    for _ in range(10):
+        tracker.record(model, p95)
+    budget = HedgeBudget(**({"ratio": 1.0, "burst": 5} | budget_kwargs))
+    return HedgedRequestManager(tracker=tracker, budget=budget, min_delay=0.0)
+
+
+class TestLatencyTracker:
+    def test_percentile_requires_min_samples(self):
+        tracker = LatencyTracker(window=100, min_samples=5)
+        for v in (1, 2, 3, 4):
+            tracker.record("m", v)
+        assert tracker.percentile("m") is None
+        tracker.record("m", 100)
+        assert tracker.percentile("m", 50) == 3
+
+    def test_percentile_interpolates_between_ranks(self):
+        tracker = LatencyTracker(window=100, min_samples=1)
+        for v in (1, 2, 3, 4):
+            tracker.record("m", v)
+        assert tracker.percentile("m", 50) == pytest.approx(2.5)
+        assert tracker.percentile("m", 95) == pytest.approx(3.85)
+
+    def test_window_is_rolling(self):
+        tracker = LatencyTracker(window=3, min_samples=1)
+        for v in (100, 1, 1, 1):
+            tracker.record("m", v)
+        assert tracker.percentile("m", 100) == 1
+
+
+class TestHedgeBudget:
+    def test_ratio_plus_burst(self):
+        budget = HedgeBudget(ratio=0.1, burst=1, max_per_minute=100)
+        for _ in range(10):
+            budget.record_primary()
+        # 0.1 * 10 + 1 = 2 hedges allowed
+        assert budget.try_acquire() is True
+        assert budget.try_acquire() is True
+        assert budget.try_acquire() is False
+
+    def test_absolute_cap(self):
+        budget = HedgeBudget(ratio=1.0, burst=100, max_per_minute=1)
+        budget.record_primary()
+        assert budget.try_acquire() is True
+        assert budget.try_acquire() is False
+
+
+class TestHedgedRequestManager:
+    @pytest.mark.asyncio
+    async def test_no_hedge_without_latency_history(self):
+        manager = HedgedRequestManager(
+            tracker=LatencyTracker(min_samples=5), budget=HedgeBudget(ratio=1, burst=5)
+        )
+        calls = []
+        model, output = await manager.run(
+            "slow", make_call({"slow": 0.05, "backup": 0.0}, calls=calls), ["backup"]
+        )
+        assert calls == ["slow"]
+        assert output == {"generated_text": "answer from slow"}
+
+    @pytest.mark.asyncio
+    async def test_backup_wins_when_primary_exceeds_p95(self):
+        manager = warm_manager(p95=0.02)
+        calls = []
+
+        model, output = await manager.run(
+            "slow", make_call({"slow": 1.0, "backup": 0.01}, calls=calls), ["backup"]
+        )
+
+        # Keyed by the model that answered, never relabelled as the request
+        assert model == "backup"
+        assert output["generated_text"] == "answer from backup"
+        assert output["served_by"] == "backup" and output["hedged"] is True
+        assert output["hedged_for"] == "slow"
+        assert calls == ["slow", "backup"]
+        assert manager.stats["hedges_fired"] == 1
+        assert manager.stats["hedge_wins"] == 1
+
+    @pytest.mark.asyncio
+    async def test_primary_still_wins_if_it_finishes_first(self):
+        manager = warm_manager(p95=0.01)
+        model, output = await manager.run(
+            "slow", make_call({"slow": 0.03, "backup": 0.5}), ["backup"]
+        )
+        assert output == {"generated_text": "answer from slow"}
+        assert manager.stats["hedge_wins"] == 0
+
+    @pytest.mark.asyncio
+    async def test_fast_failure_triggers_speculative_fallback(self):
+        manager = warm_manager(p95=1.0)
+        model, output = await manager.run(
+            "slow", make_call({"slow": 0.0, "backup": 0.0}, failing={"slow"}), ["backup"]
+        )
+        assert model == "backup"
+        assert output["served_by"] == "backup" and output["hedged_for"] == "slow"
+
+    @pytest.mark.asyncio
+    async def test_budget_exhaustion_waits_for_primary(self):
+        manager = warm_manager(p95=0.01, ratio=0.0, burst=0)
+        calls = []
+        model, output = await manager.run(
+            "slow", make_call({"slow": 0.05, "backup": 0.0}, calls=calls), ["backup"]
+        )
+        assert calls == ["slow"]
+        assert output == {"generated_text": "answer from slow"}
+        assert manager.stats["budget_denied"] == 1
+
+    @pytest.mark.asyncio
+    async def test_losing_request_is_cancelled(self):
+        manager = warm_manager(p95=0.01)
+        cancelled = []
+
+        async def call(model):
+            try:
+                await asyncio.sleep(1.0 if model == "slow" else 0.02)
+            except asyncio.CancelledError:
+                cancelled.append(model)
+                raise
+            return model, {"generated_text": model}
+
+        await manager.run("slow", call, ["backup"])
+        await asyncio.sleep(0)
+        assert cancelled == ["slow"]
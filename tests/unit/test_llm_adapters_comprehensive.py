@@ -386,6 +386,125 @@ class TestAdapterErrorScenarios:
             assert "Error:" in result["generated_text"]
 
 
+def _sse_client(body: str, status_code: int = 200, captured: list = None) -> httpx.AsyncClient:
+    """Build a client whose transport replies with a canned SSE body."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if captured is not None:
+            captured.append(request)
+        return httpx.Response(
+            status_code,
+            content=body.encode(),
+            headers={"content-type": "text/event-stream"},
+        )
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+class TestAdapterStreaming:
+    """Test incremental streaming via adapter.stream()"""
+
+    async def _collect(self, adapter, client):
+        with patch.object(adapter.__class__, "CLIENT", client):
+            return [chunk async for chunk in adapter.stream("test prompt")]
+
+    @pytest.mark.asyncio
+    async def test_openai_stream_parses_deltas(self):
+        captured = []
+        body = (
+            'data: {"choices":[{"delta":{"role":"assistant"}}]}\n\n'
+            'data: {"choices":[{"delta":{"content":"Hel"}}]}\n\n'
+            ": keep-alive\n\n"
+            'data: {"choices":[{"delta":{"content":"lo"}}]}\n\n'
+            "data: [DONE]\n\n"
+        )
+        adapter = OpenAIAdapter(api_key="test-key", model="gpt-4")
+        chunks = await self._collect(adapter, _sse_client(body, captured=captured))
+
+        assert chunks == ["Hel", "lo"]
+        assert json.loads(captured[0].content)["stream"] is True
+
+    @pytest.mark.asyncio
+    async def test_anthropic_stream_parses_content_block_deltas(self):
+        body = (
+            "event: message_start\n"
+            'data: {"type":"message_start","message":{}}\n\n'
+            "event: content_block_delta\n"
+            'data: {"type":"content_block_delta","delta":{"type":"text_delta","text":"Hi"}}\n\n'
+            "event: content_block_delta\n"
+            'data: {"type":"content_block_delta","delta":{"type":"text_delta","text":" there"}}\n\n'
+            "event: message_stop\n"
+            'data: {"type":"message_stop"}\n\n'
+        )
+        adapter = AnthropicAdapter(api_key="test-key", model="claude-3")
+        chunks = await self._collect(adapter, _sse_client(body))
+
+        assert chunks == ["Hi", " there"]
+
+    @pytest.mark.asyncio
+    async def test_anthropic_stream_surfaces_midstream_error(self):
+        body = (
+            'data: {"type":"content_block_delta","delta":{"text":"partial"}}\n\n'
+            'data: {"type":"error","error":{"type":"overloaded_error","message":"Overloaded"}}\n\n'
+        )
+        adapter = AnthropicAdapter(api_key="test-key", model="claude-3")
+        chunks = await self._collect(adapter, _sse_client(body))
+
+        assert chunks[0] == "partial"
+        assert chunks[-1].startswith("Error:")
+        assert "Overloaded" in chunks[-1]
+
+    @pytest.mark.asyncio
+    async def test_gemini_stream_uses_sse_endpoint(self):
+        captured = []
+        body = (
+            'data: {"candidates":[{"content":{"parts":[{"text":"One "}]}}]}\r\n\r\n'
+            'data: {"candidates":[{"content":{"parts":[{"text":"two"}]}}]}\r\n\r\n'
+        )
+        adapter = GeminiAdapter(api_key="test-key", model="gemini-1.5-pro")
+        chunks = await self._collect(adapter, _sse_client(body, captured=captured))
+
+        assert chunks == ["One ", "two"]
+        assert captured[0].url.path.endswith(":streamGenerateContent")
+        assert captured[0].url.params["alt"] == "sse"
+        assert "key=" not in str(captured[0].url)
+
+    @pytest.mark.asyncio
+    async def test_huggingface_stream_skips_special_tokens(self):
+        body = (
+            'data:{"token":{"text":"Bon","special":false}}\n\n'
+            'data:{"token":{"text":"jour","special":false}}\n\n'
+            'data:{"token":{"text":"</s>","special":true},"generated_text":"Bonjour"}\n\n'
+        )
+        adapter = HuggingFaceAdapter(api_key="test-key", model="mistralai/Mistral-7B")
+        chunks = await self._collect(adapter, _sse_client(body))
+
+        assert chunks == ["Bon", "jour"]
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("adapter_class,model", [
+        (OpenAIAdapter, "gpt-4"),
+        (AnthropicAdapter, "claude-3"),
+        (GeminiAdapter, "gemini-pro"),
+    ])
+    async def test_stream_rate_limit_matches_generate(self, adapter_class, model):
+        adapter = adapter_class(api_key="test-key", model=model)
+        chunks = await self._collect(adapter, _sse_client("", status_code=429))
+
+        assert len(chunks) == 1
+        assert chunks[0].startswith("Error:")
+        assert "rate limit" in chunks[0].lower()
+
+    @pytest.mark.asyncio
+    async def test_base_adapter_stream_falls_back_to_generate(self):
+        adapter = BaseAdapter(api_key="test-key", model="test-model")
+        adapter.generate = AsyncMock(return_value={"generated_text": "whole answer"})
+
+        chunks = [chunk async for chunk in adapter.stream("test")]
+
+        assert chunks == ["whole answer"]
+
+
 # Tests merged from test_resilient_llm_adapter.py
 class TestCircuitBreaker:
     """Test circuit breaker functionality for resilient adapters"""
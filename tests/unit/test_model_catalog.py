@@ -0,0 +1,108 @@
+"""Tests for the precomputed model catalog."""
+
+import time
+
+import pytest
+
+from app.services import model_catalog
+from app.services.health_prober import HealthProber, ProbeResult
+from app.services.model_catalog import (
+    MODEL_SPECS,
+    ALLOWED_MODEL_PATTERNS,
+    get_model_catalog,
+    refresh_model_catalog,
+)
+
+PROVIDER_KEYS = ("OPENAI_API_KEY", "ANTHROPIC_API_KEY", "GOOGLE_API_KEY", "HUGGINGFACE_API_KEY")
+
+
+@pytest.fixture
+def prober(monkeypatch):
+    async def probe(model, api_key):
+        return True
+
+    prober = HealthProber(probe=probe, targets=dict)
+    monkeypatch.setattr(model_catalog, "get_health_prober", lambda: prober)
+    monkeypatch.setattr(model_catalog, "_catalog", None)
+    monkeypatch.setattr(model_catalog, "_price_overrides", {})
+    monkeypatch.setattr(model_catalog.Config, "MINIMUM_MODELS_REQUIRED", 3)
+    for name in PROVIDER_KEYS:
+        monkeypatch.setenv(name, "key")
+    return prober
+
+
+def test_catalog_is_built_once_and_indexes_models(prober):
+    catalog = get_model_catalog()
+    assert get_model_catalog() is catalog  # no rebuild per request
+
+    # Diversified: one model per provider before a second from any provider
+    assert catalog.defaults[:3] == ("gpt-4o", "claude-3-5-sonnet-20241022", "gemini-1.5-pro")
+    assert catalog.provider_of("claude-3-haiku-20240307") == "anthropic"
+    assert catalog.provider_of("not-in-catalog/model") == "huggingface"
+    assert "o1-mini" in catalog.models_by_provider["openai"]
+    assert "reasoning" in catalog.specs["o1-mini"].capabilities
+    assert catalog.price_of("gpt-4o") == 0.005
+
+
+def test_removing_a_provider_key_swaps_in_a_new_catalog(prober, monkeypatch):
+    first = get_model_catalog()
+    monkeypatch.delenv("OPENAI_API_KEY")
+    second = get_model_catalog()
+    assert second is not first
+    assert second.version == first.version + 1
+    assert "openai" not in second.configured_providers
+    assert not any(m.startswith("gpt") for m in second.defaults)
+    assert all(spec.provider != "openai" for spec in second.listing)
+    # The old snapshot is untouched for readers still holding it
+    assert "gpt-4o" in first.defaults
+
+
+def test_health_change_rebuilds_defaults(prober):
+    prober.add_listener(lambda _snapshot: refresh_model_catalog("health changed"))
+    before = get_model_catalog()
+    prober._publish(ProbeResult("gpt-4o", False, checked_at=time.time()))
+
+    after = get_model_catalog()
+    assert after.version == before.version + 1
+    assert "gpt-4o" not in after.defaults
+    assert after.unhealthy == frozenset({"gpt-4o"})
+
+
+def test_probe_results_apply_without_a_listener(prober):
+    before = get_model_catalog()
+    prober._publish(ProbeResult("gpt-4o", False, checked_at=time.time()))
+
+    after = get_model_catalog()
+    assert after is not before
+    assert "gpt-4o" not in after.defaults
+    assert get_model_catalog() is after  # unchanged health: no further rebuilds
+
+    prober._publish(ProbeResult("gpt-4o", True, checked_at=time.time()))
+    assert "gpt-4o" in get_model_catalog().defaults
+
+
+def test_stale_unhealthy_result_stops_excluding_the_model(prober):
+    prober._publish(
+        ProbeResult("gpt-4o", False, checked_at=time.time() - prober.stale_seconds - 1)
+    )
+    assert "gpt-4o" in get_model_catalog().defaults
+
+    prober._publish(ProbeResult("gpt-4o", False, checked_at=time.time()))
+    catalog = get_model_catalog()
+    assert "gpt-4o" not in catalog.defaults
+    assert catalog.health_expires_at <= time.time() + prober.stale_seconds
+
+
+def test_price_updates_are_applied_on_refresh(prober):
+    catalog = refresh_model_catalog("pricing", prices={"gpt-4o": 0.0025})
+    assert catalog.price_of("gpt-4o") == 0.0025
+    assert refresh_model_catalog("health").price_of("gpt-4o") == 0.0025
+
+
+def test_precomputed_validation_matches_the_patterns(prober):
+    catalog = get_model_catalog()
+    for spec in MODEL_SPECS:
+        expected = any(p.match(spec.name) for p in ALLOWED_MODEL_PATTERNS)
+        assert catalog.is_allowed(spec.name) is expected
+    assert catalog.is_allowed("org/custom-model")
+    assert not catalog.is_allowed("gpt-4o; DROP TABLE")
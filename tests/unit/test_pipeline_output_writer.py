@@ -0,0 +1,91 @@
+"""Tests for write-behind pipeline output persistence."""
+
+import asyncio
+import gzip
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.pipeline_output_writer import PipelineOutputWriter, build_output_record
+
+
+def _read_records(directory):
+    records = []
+    for path in sorted(directory.rglob("segment-*")):
+        raw = path.read_bytes()
+        if path.suffix == ".gz":
+            raw = gzip.decompress(raw)
+        records.extend(json.loads(line) for line in raw.decode("utf-8").splitlines())
+    return records
+
+
+def test_build_output_record_flattens_stage_results():
+    results = {
+        "initial_response": SimpleNamespace(
+            output={"responses": {"gpt-4o": "hi"}}, error=None, performance_metrics={"d": 1}
+        ),
+        "_metadata": {"cached": False},
+    }
+    record = build_output_record(results, "query", ["gpt-4o"], "user-1")
+    assert record["input_query"] == "query"
+    assert record["user_id"] == "user-1"
+    assert record["pipeline_results"]["initial_response"]["success"] is True
+    assert record["pipeline_results"]["_metadata"]["output"] == {"cached": False}
+    assert len(record["record_id"]) == 32
+
+
+@pytest.mark.asyncio
+async def test_records_are_batched_into_jsonl_segments(tmp_path):
+    writer = PipelineOutputWriter(directory=str(tmp_path), batch_size=10, flush_interval=0.01)
+    for i in range(25):
+        assert await writer.submit({"n": i})
+    await writer.aclose()
+
+    assert [r["n"] for r in _read_records(tmp_path)] == list(range(25))
+    assert writer.stats["written"] == 25
+    assert writer.stats["batches"] >= 3
+    assert writer.current_segment.endswith(".jsonl")
+
+
+@pytest.mark.asyncio
+async def test_gzip_segments_rotate_by_size(tmp_path):
+    writer = PipelineOutputWriter(
+        directory=str(tmp_path),
+        compression="gzip",
+        segment_max_bytes=1,
+        batch_size=1,
+        flush_interval=0,
+    )
+    for i in range(3):
+        await writer.submit({"n": i, "text": "x" * 100})
+        await writer.flush()
+    await writer.aclose()
+
+    segments = sorted(tmp_path.rglob("segment-*.jsonl.gz"))
+    assert len(segments) == 3
+    assert [r["n"] for r in _read_records(tmp_path)] == [0, 1, 2]
+
+
+@pytest.mark.asyncio
+async def test_full_queue_drops_after_enqueue_timeout(tmp_path):
+    writer = PipelineOutputWriter(
+        directory=str(tmp_path), queue_size=1, batch_size=1, enqueue_timeout=0.01
+    )
+    gate = asyncio.Event()
+    original = writer._flush
+
+    async def slow_flush(batch):
+        await gate.wait()
+        await original(batch)
+
+    writer._flush = slow_flush
+    assert await writer.submit({"n": 0})
+    await asyncio.sleep(0)  # writer takes record 0 and blocks on the disk
+    assert await writer.submit({"n": 1})  # fills the queue
+    assert not await writer.submit({"n": 2})
+    assert writer.stats["dropped"] == 1
+
+    gate.set()
+    await writer.aclose()
+    assert [r["n"] for r in _read_records(tmp_path)] == [0, 1]
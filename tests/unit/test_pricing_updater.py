@@ -0,0 +1,178 @@
+"""Tests for the incremental pricing updater, run against recorded provider pages."""
+
+import json
+import threading
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("bs4")
+
+from app.services import pricing_updater  # noqa: E402
+from app.services.pricing_updater import PricingUpdater  # noqa: E402
+
+FIXTURES = Path(__file__).parent.parent / "fixtures" / "pricing"
+
+MODELS_FILE = '''
+MODELS = {
+    "gpt4o": ModelConfig(input_cost_per_1k_tokens=0.0025, output_cost_per_1k_tokens=0.01, cost_per_1k_tokens=0.0125, context_window=128000),
+    "gpt35_turbo": ModelConfig(input_cost_per_1k_tokens=0.0005, output_cost_per_1k_tokens=0.0015, cost_per_1k_tokens=0.002, context_window=16000),
+}
+'''
+
+SIMULATOR_FILE = '''
+class PricingSimulator:
+    def __init__(self):
+        self.model_pricing = {
+            "gpt4o": {"input_cost_per_1k": 0.0025, "output_cost_per_1k": 0.01, "total_cost_per_1k": 0.0125},
+            "gpt35_turbo": {"input_cost_per_1k": 0.0005, "output_cost_per_1k": 0.0015, "total_cost_per_1k": 0.002}
+        }
+'''
+
+
+class _Response:
+    def __init__(self, status_code, text="", headers=None):
+        self.status_code = status_code
+        self.text = text
+        self.content = text.encode("utf-8")
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+
+class RecordedSession:
+    """Serves recorded pages and honours If-None-Match like a real server."""
+
+    def __init__(self, pages, etags=True, barrier=None):
+        self.pages = dict(pages)
+        self.etags = etags
+        self.barrier = barrier
+        self.requests = []
+
+    def get(self, url, headers=None, timeout=None):
+        headers = headers or {}
+        self.requests.append((url, headers))
+        if self.barrier is not None:
+            self.barrier.wait(timeout=5)
+        body = self.pages[url]
+        etag = f'"{hash(body) & 0xFFFFFFFF:x}"'
+        if self.etags and headers.get("If-None-Match") == etag:
+            return _Response(304)
+        return _Response(200, body, {"ETag": etag} if self.etags else {})
+
+
+def _pages(openai_fixture="openai_pricing.html"):
+    return {
+        pricing_updater.OPENAI_PRICING_URL: (FIXTURES / openai_fixture).read_text(),
+        pricing_updater.ANTHROPIC_PRICING_URL: (FIXTURES / "anthropic_pricing.html").read_text(),
+        pricing_updater.GOOGLE_PRICING_URL: "<html><body></body></html>",
+    }
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    (tmp_path / "models.py").write_text(MODELS_FILE)
+    (tmp_path / "simulator.py").write_text(SIMULATOR_FILE)
+    return tmp_path
+
+
+def _updater(workspace, session, **kwargs):
+    return PricingUpdater(
+        session=session,
+        data_dir=workspace,
+        models_file=workspace / "models.py",
+        simulator_file=workspace / "simulator.py",
+        **kwargs,
+    )
+
+
+def _count_parses(updater, monkeypatch):
+    parsed = []
+    for name in ("_parse_openai_pricing", "_parse_anthropic_pricing", "_parse_google_pricing"):
+        original = getattr(updater, name)
+
+        def counting(html, _original=original, _name=name):
+            parsed.append(_name)
+            return _original(html)
+
+        monkeypatch.setattr(updater, name, counting)
+    return parsed
+
+
+def test_recorded_pages_parse_into_rows():
+    updater = PricingUpdater(session=RecordedSession({}), data_dir=Path("/nonexistent"))
+    rows = updater._parse_openai_pricing((FIXTURES / "openai_pricing.html").read_text())
+    assert [r[0] for r in rows] == ["OpenAI GPT-4o", "OpenAI GPT-4o-mini", "OpenAI GPT-3.5 Turbo"]
+    pricing = updater._convert_scraped_data(rows)
+    assert pricing["gpt4o"]["input_cost_per_1k"] == 0.0025
+    assert pricing["gpt4o"]["total_cost_per_1k"] == pytest.approx(0.0125)
+    assert pricing["gpt35_turbo"]["context_window"] == 16000
+
+
+def test_unchanged_pages_are_not_parsed_or_rewritten(workspace, monkeypatch):
+    session = RecordedSession(_pages())
+    assert _updater(workspace, session).run() is True  # first run records everything
+    saved = (workspace / "current_pricing.json").read_text()
+    models = (workspace / "models.py").read_text()
+
+    updater = _updater(workspace, session)
+    parsed = _count_parses(updater, monkeypatch)
+    assert updater.run() is False
+
+    assert parsed == []
+    assert updater.unchanged_providers == {"openai", "anthropic", "google"}
+    # Validators from the first run were sent back
+    assert all(h.get("If-None-Match") for _, h in session.requests[-3:])
+    assert (workspace / "current_pricing.json").read_text() == saved
+    assert (workspace / "models.py").read_text() == models
+
+
+def test_identical_content_without_etag_is_detected_by_hash(workspace, monkeypatch):
+    session = RecordedSession(_pages(), etags=False)
+    _updater(workspace, session).run()
+
+    updater = _updater(workspace, session)
+    parsed = _count_parses(updater, monkeypatch)
+    updater.run()
+    assert parsed == []
+    assert updater.unchanged_providers == {"openai", "anthropic", "google"}
+
+
+def test_price_change_produces_a_diff_only_update(workspace, monkeypatch):
+    _updater(workspace, RecordedSession(_pages())).run()
+    before = json.loads((workspace / "current_pricing.json").read_text())
+
+    updater = _updater(workspace, RecordedSession(_pages("openai_pricing_repriced.html")))
+    parsed = _count_parses(updater, monkeypatch)
+    assert updater.run() is True
+
+    assert parsed == ["_parse_openai_pricing"]  # only the changed page was parsed
+    assert [(c["model_id"], c["field"]) for c in updater.changes] == [("gpt4o", "input_cost_per_1k")]
+    assert updater._diff_update() == {"gpt4o": updater.updated_pricing["gpt4o"]}
+
+    after = json.loads((workspace / "current_pricing.json").read_text())
+    assert after["gpt4o"]["input_cost_per_1k"] == 0.005
+    assert {k: v for k, v in after.items() if k != "gpt4o"} == {
+        k: v for k, v in before.items() if k != "gpt4o"
+    }
+
+    models = (workspace / "models.py").read_text()
+    assert "input_cost_per_1k_tokens=0.005," in models
+    # Untouched model keeps its original text
+    assert '"gpt35_turbo": ModelConfig(input_cost_per_1k_tokens=0.0005,' in models
+    simulator = (workspace / "simulator.py").read_text()
+    assert '"input_cost_per_1k": 0.005' in simulator
+    assert '"gpt35_turbo": {"input_cost_per_1k": 0.0005' in simulator
+
+
+def test_provider_pages_are_fetched_concurrently(workspace):
+    # Each of the three page fetches waits for the other two; a sequential
+    # scraper would break the barrier and fall back to stored pricing.
+    barrier = threading.Barrier(3)
+    session = RecordedSession(_pages(), barrier=barrier)
+    updater = _updater(workspace, session, dry_run=True)
+    updater._scrape_all_providers()
+    assert not barrier.broken
+    assert len(session.requests) == 3
@@ -0,0 +1,130 @@
+"""Tests for the authenticated-principal cache and its use in CombinedAuthMiddleware."""
+
+import threading
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.middleware import combined_auth_middleware
+from app.middleware.combined_auth_middleware import CombinedAuthMiddleware
+from app.services.principal_cache import PrincipalCache, credential_key
+
+
+class _Clock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class _User:
+    def __init__(self, user_id: int):
+        self.id = user_id
+
+
+def test_entries_expire_with_the_token_and_respect_the_lru_bound():
+    clock = _Clock()
+    cache = PrincipalCache(ttl=60.0, max_entries=2, clock=clock)
+    cache.put("a", _User(1), "1", jti="j-a", token_expires_at=clock.now + 10)
+    cache.put("b", _User(2), "2")
+    assert cache.get("a").user_id == "1"
+
+    cache.put("c", _User(3), "3")  # evicts "b", the least recently used
+    assert cache.get("b") is None
+    assert cache.stats["evictions"] == 1
+
+    clock.now += 11  # past the token's exp, well inside the TTL
+    assert cache.get("a") is None
+    assert cache.get("c") is not None
+    clock.now += 60
+    assert cache.get("c") is None
+    assert len(cache) == 0
+
+
+def test_revocation_and_user_invalidation():
+    clock = _Clock()
+    cache = PrincipalCache(ttl=60.0, clock=clock)
+    cache.put("t1", _User(1), "1", jti="j1", token_expires_at=clock.now + 300)
+    cache.put("t2", _User(1), "1", jti="j2")
+    cache.put("k", _User(2), "2")
+
+    cache.revoke_token("j1", expires_at=clock.now + 300)
+    assert cache.get("t1") is None
+    assert cache.is_revoked("j1")
+    cache.put("t1", _User(1), "1", jti="j1")  # a revoked token is not re-admitted
+    assert cache.get("t1") is None
+
+    cache.invalidate_user(1)
+    assert cache.get("t2") is None
+    assert cache.get("k") is not None
+
+    clock.now += 301
+    assert not cache.is_revoked("j1")
+
+
+def _app(monkeypatch, cache, users):
+    monkeypatch.setattr(combined_auth_middleware.Config, "ENABLE_AUTH", True)
+    monkeypatch.setattr(combined_auth_middleware.Config, "TESTING", False)
+    calls = {"decode": 0, "load": [], "verify": 0}
+
+    def decode(token):
+        calls["decode"] += 1
+        return {"sub": "1", "jti": f"jti-{token}", "exp": time.time() + 600}
+
+    def load_user(user_id):
+        calls["load"].append(threading.get_ident())
+        return users.get(user_id)
+
+    def verify_api_key(api_key):
+        calls["verify"] += 1
+        return users.get(2) if api_key == "key-2" else None
+
+    monkeypatch.setattr(combined_auth_middleware, "decode_token", decode)
+    monkeypatch.setattr(CombinedAuthMiddleware, "_load_user", staticmethod(load_user))
+    monkeypatch.setattr(CombinedAuthMiddleware, "_verify_api_key", staticmethod(verify_api_key))
+
+    app = FastAPI()
+
+    @app.get("/api/admin/whoami")
+    async def whoami():
+        return {"loop_thread": threading.get_ident()}
+
+    app.add_middleware(CombinedAuthMiddleware, principal_cache=cache)
+    return TestClient(app), calls
+
+
+def test_repeat_requests_skip_decode_and_database(monkeypatch):
+    cache = PrincipalCache(ttl=60.0)
+    client, calls = _app(monkeypatch, cache, {1: _User(1), 2: _User(2)})
+
+    responses = []
+    for _ in range(3):
+        responses.append(client.get("/api/admin/whoami", headers={"Authorization": "Bearer abc"}))
+        assert client.get("/api/admin/whoami", headers={"X-API-Key": "key-2"}).status_code == 200
+    assert all(r.status_code == 200 for r in responses)
+
+    assert calls["decode"] == 1
+    assert len(calls["load"]) == 1
+    assert calls["verify"] == 1
+    # The user lookup ran in a worker thread, not on the event loop
+    assert calls["load"][0] != responses[0].json()["loop_thread"]
+    assert cache.stats["hits"] == 4
+
+
+def test_revoked_token_and_invalidated_key_are_rejected(monkeypatch):
+    cache = PrincipalCache(ttl=60.0)
+    users = {1: _User(1), 2: _User(2)}
+    client, calls = _app(monkeypatch, cache, users)
+    bearer = {"Authorization": "Bearer abc"}
+
+    assert client.get("/api/admin/whoami", headers=bearer).status_code == 200
+    cache.revoke_token("jti-abc", expires_at=time.time() + 600)
+    assert client.get("/api/admin/whoami", headers=bearer).status_code == 401
+
+    assert client.get("/api/admin/whoami", headers={"X-API-Key": "key-2"}).status_code == 200
+    del users[2]  # key revoked in the database
+    cache.invalidate_user(2)
+    assert client.get("/api/admin/whoami", headers={"X-API-Key": "key-2"}).status_code == 401
+    assert cache.get(credential_key("api_key", "key-2")) is None
@@ -0,0 +1,167 @@
+"""Tests for header-driven provider quota buckets."""
+
+import httpx
+import pytest
+
+from app.services import llm_adapters
+from app.services.provider_fallback_manager import ProviderFallbackManager
+from app.services.provider_quota import (
+    ProviderQuotaManager,
+    QuotaExhausted,
+    parse_rate_limit_headers,
+    parse_reset,
+)
+
+
+def test_parse_reset_formats():
+    assert parse_reset("20ms") == pytest.approx(0.02)
+    assert parse_reset("6m0s") == pytest.approx(360)
+    assert parse_reset("1h2m3.5s") == pytest.approx(3723.5)
+    assert parse_reset("30") == 30
+    assert parse_reset("2024-01-01T00:01:00Z", now=1704067200.0) == pytest.approx(60)
+    assert parse_reset("soon") is None
+
+
+def test_parse_openai_and_anthropic_headers():
+    openai = parse_rate_limit_headers(
+        "openai",
+        httpx.Headers(
+            {
+                "x-ratelimit-limit-requests": "500",
+                "x-ratelimit-remaining-requests": "499",
+                "x-ratelimit-reset-requests": "120ms",
+                "x-ratelimit-limit-tokens": "30000",
+                "x-ratelimit-remaining-tokens": "29000",
+                "x-ratelimit-reset-tokens": "2s",
+            }
+        ),
+    )
+    assert openai["requests"] == (500, 499, pytest.approx(0.12))
+    assert openai["tokens"] == (30000, 29000, pytest.approx(2))
+
+    anthropic = parse_rate_limit_headers(
+        "anthropic",
+        {
+            "anthropic-ratelimit-input-tokens-limit": "40000",
+            "anthropic-ratelimit-input-tokens-remaining": "100",
+        },
+    )
+    assert anthropic == {"input_tokens": (40000, 100, None)}
+    assert parse_rate_limit_headers("google", {"x-ratelimit-remaining-tokens": "1"}) == {}
+
+
+def test_unknown_quota_never_blocks():
+    quota = ProviderQuotaManager()
+    reservation = quota.reserve("openai", "sk-test", "gpt-4o", 100, 100)
+    assert reservation.amounts == {}
+
+
+def test_empty_bucket_fails_fast_and_refills():
+    quota = ProviderQuotaManager()
+    key_id = quota.key_id("sk-test")
+    quota.observe_headers(
+        "openai",
+        key_id,
+        "gpt-4o",
+        {
+            "x-ratelimit-limit-tokens": "1000",
+            "x-ratelimit-remaining-tokens": "50",
+            "x-ratelimit-reset-tokens": "10s",
+        },
+    )
+    with pytest.raises(QuotaExhausted) as exc:
+        quota.reserve("openai", "sk-test", "gpt-4o", 100, 100)
+    assert exc.value.bucket == "tokens"
+    # 950 tokens refill over 10s, so 150 more arrive in about 1.6s
+    assert exc.value.retry_after == pytest.approx(1.58, abs=0.1)
+    assert quota.stats["rejections"] == 1
+
+
+def test_settle_refunds_estimate_and_tracks_outstanding():
+    quota = ProviderQuotaManager()
+    key_id = quota.key_id("sk-test")
+    headers = {
+        "x-ratelimit-limit-tokens": "1000",
+        "x-ratelimit-remaining-tokens": "1000",
+        "x-ratelimit-reset-tokens": "0s",
+    }
+    quota.observe_headers("openai", key_id, "gpt-4o", headers)
+    first = quota.reserve("openai", "sk-test", "gpt-4o", 100, 300)
+    second = quota.reserve("openai", "sk-test", "gpt-4o", 100, 300)
+    bucket = quota._buckets[("openai", key_id, "gpt-4o")]["tokens"]
+    assert bucket.tokens == pytest.approx(200, abs=1)
+    assert bucket.outstanding == 800
+
+    # First response: provider has seen only it; the second is still outstanding
+    quota.settle(
+        first,
+        headers={**headers, "x-ratelimit-remaining-tokens": "850"},
+        used_tokens=150,
+    )
+    assert bucket.outstanding == 400
+    assert bucket.tokens == pytest.approx(450, abs=1)
+
+    quota.settle(second, used_tokens=100)
+    assert bucket.outstanding == 0
+    assert bucket.tokens == pytest.approx(750, abs=1)
+
+
+def test_429_retry_after_blocks_key_only():
+    quota = ProviderQuotaManager()
+    reservation = quota.reserve("anthropic", "key-a", "claude", 10, 10)
+    quota.settle(reservation, headers={"retry-after": "30"}, status_code=429)
+    with pytest.raises(QuotaExhausted):
+        quota.reserve("anthropic", "key-a", "claude", 10, 10)
+    quota.reserve("anthropic", "key-b", "claude", 10, 10)
+    # Routing sees the model as exhausted while every known key is blocked
+    assert not quota.available("anthropic", "claude")
+    assert quota.available("anthropic", "claude-haiku")
+
+
+def test_fallback_manager_blocks_expire(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "sk-ant")
+    quota = ProviderQuotaManager()
+    manager = ProviderFallbackManager(quota_manager=quota)
+    manager.mark_rate_limited("openai", retry_after=0.0)
+    assert not manager.is_rate_limited("openai")
+
+    manager.mark_rate_limited("openai", retry_after=30)
+    assert manager.is_rate_limited("openai")
+    assert "openai" not in manager.get_available_providers()
+    assert manager.get_environment_config_summary()["rate_limited_providers"] == ["openai"]
+    manager.clear_rate_limit("openai")
+    assert "openai" in manager.get_available_providers()
+
+
+@pytest.mark.asyncio
+async def test_adapter_syncs_headers_and_fails_fast(monkeypatch):
+    quota = ProviderQuotaManager()
+    monkeypatch.setattr(llm_adapters, "get_quota_manager", lambda: quota)
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(
+            200,
+            json={
+                "choices": [{"message": {"content": "hi"}}],
+                "usage": {"total_tokens": 12},
+            },
+            headers={
+                "x-ratelimit-limit-requests": "100",
+                "x-ratelimit-remaining-requests": "0",
+                "x-ratelimit-reset-requests": "30s",
+            },
+        )
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(llm_adapters.OpenAIAdapter, "CLIENT", client)
+    adapter = llm_adapters.OpenAIAdapter("sk-test", "gpt-4o")
+
+    assert (await adapter.generate("hello"))["generated_text"] == "hi"
+    result = await adapter.generate("hello again")
+    assert result["error_details"]["error"] == "QUOTA_EXHAUSTED"
+    assert result["generated_text"].startswith("Error: Rate limit exceeded")
+    assert len(calls) == 1
+    await client.aclose()
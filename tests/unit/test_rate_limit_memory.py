@@ -0,0 +1,73 @@
+"""Tests for the bounded in-memory path of the utils rate limiter."""
+
+import pytest
+
+from app.utils import rate_limit_service as module
+from app.utils.rate_limit_service import RateLimitService, SecondRing
+
+T0 = 1_700_000_000
+
+
+@pytest.fixture
+def service():
+    service = RateLimitService()
+    service.redis = None
+    return service
+
+
+def _check(service, key, second, limit=3, path=None, method=None, request_id=None):
+    return service._check_rate_limit_memory(
+        key, limit, second, second - 60, path, method, request_id
+    )
+
+
+def test_window_counts_match_the_timestamp_list_it_replaces(service):
+    hits = [T0, T0, T0 + 1, T0 + 30, T0 + 60, T0 + 61, T0 + 61, T0 + 200]
+    seen = []
+    for second in hits:
+        _, info = _check(service, "ip:1.1.1.1", second, limit=100)
+        seen.append(second)
+        assert info["count"] == sum(1 for ts in seen if ts >= second - 60)
+
+    ring = SecondRing(61, T0)
+    for second in hits[:4]:
+        ring.add(second)
+    assert ring.count_between(T0, T0 + 2) == 3
+    assert ring.count_between(T0 - 100, T0 + 100) == 4
+
+
+def test_limit_is_enforced_per_client(service):
+    results = [_check(service, "user:1", T0)[0] for _ in range(4)]
+    assert results == [False, False, False, True]
+    assert _check(service, "user:2", T0)[0] is False
+    assert _check(service, "user:1", T0 + 61)[0] is False
+
+
+def test_idle_clients_are_evicted_and_the_client_count_is_capped(service, monkeypatch):
+    monkeypatch.setattr(module, "MEMORY_MAX_CLIENTS", 50)
+    for i in range(40):
+        _check(service, f"ip:10.0.0.{i}", T0)
+    # A minute later every earlier client is idle; new arrivals sweep them out
+    for i in range(40):
+        _check(service, f"ip:10.0.1.{i}", T0 + 61)
+    clients = service.in_memory_store["ip"]
+    assert len(clients) == 40
+    assert all(key.startswith("10.0.1.") for key in clients)
+    assert service.memory_stats["idle_evictions"] == 40
+
+    for i in range(100):
+        _check(service, f"ip:10.0.2.{i}", T0 + 62)
+    assert len(clients) == 50
+    assert service.memory_stats["capacity_evictions"] == 90
+
+
+def test_path_counters_and_telemetry_are_capped(service, monkeypatch):
+    monkeypatch.setattr(module, "MEMORY_MAX_PATHS", 5)
+    monkeypatch.setattr(module, "MEMORY_MAX_TELEMETRY", 10)
+    service.telemetry_sample_rate = 1.0
+    for i in range(100):
+        _check(service, "ip:1.1.1.1", T0, limit=1000, path=f"/api/document/{i}",
+               method="GET", request_id=f"r{i}")
+    assert len(service.in_memory_store["path"]) == 5
+    assert service.memory_stats["paths_dropped"] == 95
+    assert list(service.telemetry_store) == [f"r{i}" for i in range(90, 100)]
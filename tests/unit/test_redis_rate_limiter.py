@@ -0,0 +1,112 @@
+"""Tests for the Lua sliding-window rate limiter and its local pre-check."""
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("lupa")  # fakeredis needs lupa to run Lua scripts
+
+from app.services.redis_rate_limiter import RedisRateLimiter  # noqa: E402
+from app.utils.rate_limit_service import RateLimitService as PathRateLimitService  # noqa: E402
+
+
+class _Clock:
+    def __init__(self, now: float = 1_700_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.mark.asyncio
+async def test_same_instant_hits_are_all_counted_and_denials_are_not_recorded():
+    redis = fakeredis.aioredis.FakeRedis()
+    clock = _Clock()
+    limiter = RedisRateLimiter(redis, local_fraction=0, clock=clock)
+
+    decisions = [await limiter.hit("k", limit=3, window=60) for _ in range(5)]
+    assert [d.allowed for d in decisions] == [True, True, True, False, False]
+    assert [d.remaining for d in decisions] == [2, 1, 0, 0, 0]
+    assert decisions[-1].retry_after == 60.0
+    assert await redis.zcard("k") == 3
+    assert limiter.stats["redis"] == 5
+
+    # The oldest hit leaves the window after 60s
+    clock.now += 30
+    assert not (await limiter.hit("k", limit=3, window=60)).allowed
+    clock.now += 30.001
+    assert (await limiter.hit("k", limit=3, window=60)).allowed
+
+
+@pytest.mark.asyncio
+async def test_local_pre_check_skips_redis_and_syncs_its_hits_later():
+    redis = fakeredis.aioredis.FakeRedis()
+    clock = _Clock()
+    limiter = RedisRateLimiter(redis, local_fraction=0.1, sync_interval=1.0, clock=clock)
+
+    first = await limiter.hit("k", limit=100, window=60)
+    assert not first.local
+    local = [await limiter.hit("k", limit=100, window=60) for _ in range(10)]
+    assert all(d.local and d.allowed for d in local)
+    assert local[-1].remaining == 89
+    assert await redis.zcard("k") == 1
+
+    # The local budget (10% of the limit) is spent: the next check goes to
+    # Redis and carries the locally admitted hits with it
+    synced = await limiter.hit("k", limit=100, window=60)
+    assert not synced.local
+    assert await redis.zcard("k") == 12
+    assert synced.remaining == 88
+
+    # A stale count is not trusted
+    clock.now += 1.0
+    assert not (await limiter.hit("k", limit=100, window=60)).local
+    assert limiter.stats["local"] == 10
+
+
+@pytest.mark.asyncio
+async def test_no_local_admission_near_the_limit():
+    redis = fakeredis.aioredis.FakeRedis()
+    clock = _Clock()
+    limiter = RedisRateLimiter(redis, local_fraction=0.5, clock=clock)
+    await redis.zadd("k", {f"seed-{i}": clock.now * 1000 for i in range(5)})
+
+    decisions = [await limiter.hit("k", limit=10, window=60) for _ in range(6)]
+    assert not any(d.local for d in decisions)
+    assert [d.allowed for d in decisions] == [True] * 5 + [False]
+
+
+@pytest.mark.asyncio
+async def test_redis_errors_fail_open():
+    server = fakeredis.FakeServer()
+    server.connected = False
+    limiter = RedisRateLimiter(fakeredis.aioredis.FakeRedis(server=server))
+
+    decision = await limiter.hit("k", limit=1, window=60)
+    assert decision.allowed and decision.remaining == 1
+    assert decision.enforced is False
+    assert limiter.stats["errors"] == 1
+
+
+def test_path_limiter_counts_same_second_requests_in_one_round_trip():
+    service = PathRateLimitService()
+    service.redis = fakeredis.FakeRedis()
+    commands = []
+    original = service.redis.execute_command
+
+    def execute_command(*args, **kwargs):
+        commands.append(args[0])
+        return original(*args, **kwargs)
+
+    service.redis.execute_command = execute_command
+    service.telemetry_enabled = False
+
+    results = [
+        service._check_rate_limit_redis("ip:1.2.3.4", 3, 1_700_000_000, "/api/x", "GET")
+        for _ in range(4)
+    ]
+    # One EVALSHA per check, after a NOSCRIPT miss and SCRIPT LOAD on the first
+    assert commands == ["EVALSHA", "SCRIPT LOAD"] + ["EVALSHA"] * 4
+    assert [limited for limited, _ in results] == [False, False, False, True]
+    assert [info["count"] for _, info in results] == [1, 2, 3, 4]
+    assert service.redis.zcard("ip:1.2.3.4") == 3
+    assert int(service.redis.get("path:/api/x:GET")) == 4
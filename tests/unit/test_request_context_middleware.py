@@ -0,0 +1,104 @@
+"""Tests for the pure-ASGI middleware stack and the fused request context."""
+
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.middleware.combined_auth_middleware import CombinedAuthMiddleware
+from app.middleware.performance_middleware import CacheControlMiddleware
+from app.middleware.request_context_middleware import RequestContextMiddleware
+from app.middleware.security_headers_middleware import SecurityHeadersMiddleware
+from app.utils.unified_error_handler import GlobalErrorHandlingMiddleware
+
+
+def _app():
+    app = FastAPI()
+
+    @app.get("/api/context")
+    async def context(request: Request):
+        return {
+            "request_id": request.state.request_id,
+            "correlation_id": request.state.correlation_id,
+            "locale": request.state.locale,
+        }
+
+    @app.get("/api/boom")
+    async def boom():
+        raise RuntimeError("kaboom")
+
+    @app.get("/api/stream")
+    async def stream():
+        async def frames():
+            for i in range(3):
+                yield f"data: {i}\n\n"
+
+        return StreamingResponse(frames(), media_type="text/event-stream")
+
+    app.add_middleware(SecurityHeadersMiddleware)
+    app.add_middleware(CacheControlMiddleware)
+    app.add_middleware(GlobalErrorHandlingMiddleware)
+    app.add_middleware(RequestContextMiddleware)
+    return app
+
+
+def test_context_is_computed_once_and_echoed():
+    client = TestClient(_app())
+    response = client.get(
+        "/api/context",
+        headers={"X-Request-ID": "req-1", "X-Trace-ID": "trace-9", "Accept-Language": "fr-CA,fr;q=0.8"},
+    )
+    assert response.json() == {"request_id": "req-1", "correlation_id": "trace-9", "locale": "fr_FR"}
+    assert response.headers["x-request-id"] == "req-1"
+    assert response.headers["x-correlation-id"] == "trace-9"
+    assert response.headers["content-language"] == "fr_FR"
+    assert float(response.headers["x-process-time"]) >= 0
+    # Inner layers add their headers without a BaseHTTPMiddleware round trip
+    assert response.headers["cache-control"] == "private, max-age=60"
+    assert response.headers["x-frame-options"] == "DENY"
+    # The error handler reused the context instead of minting its own id
+    assert response.headers.get_list("x-correlation-id") == ["trace-9"]
+
+
+def test_generated_ids_and_default_locale():
+    response = TestClient(_app()).get("/api/context")
+    body = response.json()
+    assert body["request_id"].startswith("req_")
+    assert body["correlation_id"] == body["request_id"]
+    assert body["locale"] == "en_US"
+    assert "content-language" not in response.headers
+
+
+def test_unhandled_errors_become_json_with_the_request_correlation_id():
+    client = TestClient(_app(), raise_server_exceptions=False)
+    response = client.get("/api/boom", headers={"X-Correlation-ID": "corr-7"})
+    assert response.status_code == 500
+    assert response.headers["x-correlation-id"] == "corr-7"
+    assert response.json()["status"] == "error"
+
+
+def test_streaming_body_is_not_buffered():
+    client = TestClient(_app())
+    with client.stream("GET", "/api/stream") as response:
+        chunks = list(response.iter_raw())
+    assert response.headers["x-request-id"].startswith("req_")
+    assert b"".join(chunks) == b"data: 0\n\ndata: 1\n\ndata: 2\n\n"
+
+
+def test_auth_rejects_protected_paths_without_calling_the_app(monkeypatch):
+    from app.middleware import combined_auth_middleware
+
+    monkeypatch.setattr(combined_auth_middleware.Config, "ENABLE_AUTH", True)
+    monkeypatch.setattr(combined_auth_middleware.Config, "TESTING", False)
+    called = []
+    app = FastAPI()
+
+    @app.get("/api/admin/stats")
+    async def stats():
+        called.append(True)
+        return {}
+
+    app.add_middleware(CombinedAuthMiddleware, public_paths=["/health"])
+    response = TestClient(app).get("/api/admin/stats")
+    assert response.status_code == 401
+    assert response.headers["www-authenticate"].startswith("Bearer")
+    assert called == []
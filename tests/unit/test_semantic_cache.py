@@ -0,0 +1,241 @@
+"""
+Unit tests for the semantic (embedding-similarity) cache.
+"""
+
+import time
+from unittest.mock import Mock
+
+import numpy as np
+import pytest
+
+from app.config import Config
+from app.services.semantic_cache import (
+    HashingEmbedder,
+    SemanticCache,
+    SemanticIndex,
+    anchor_terms,
+)
+
+
+class TestHashingEmbedder:
+    """Test the dependency-free embedder"""
+
+    def test_vectors_are_normalized_and_deterministic(self):
+        embedder = HashingEmbedder(dim=256)
+        a = embedder.embed("What is the capital of France?")
+        b = embedder.embed("What is the capital of France?")
+        assert a.shape == (256,)
+        assert np.isclose(np.linalg.norm(a), 1.0)
+        assert np.array_equal(a, b)
+
+    def test_rephrasing_is_closer_than_unrelated(self):
+        embedder = HashingEmbedder()
+        q = embedder.embed("What is the capital of France?")
+        rephrased = embedder.embed("what is the capital of france")
+        unrelated = embedder.embed("Explain quantum entanglement to a child")
+        assert float(q @ rephrased) > 0.95
+        assert float(q @ unrelated) < 0.3
+
+    def test_empty_text(self):
+        assert not HashingEmbedder(dim=8).embed("   ").any()
+
+
+class TestSemanticCache:
+    """Test lookup, namespaces, eviction and stats"""
+
+    def test_similar_query_hits_and_unrelated_misses(self):
+        cache = SemanticCache(threshold=0.9)
+        cache.store("pipeline:x", "What is the capital of France?", {"answer": "Paris"})
+
+        assert cache.lookup("pipeline:x", "what is the capital of France") == {"answer": "Paris"}
+        assert cache.lookup("pipeline:x", "How do vaccines work?") is None
+
+        stats = cache.get_stats()
+        assert stats["hits"] == 1 and stats["misses"] == 1
+        assert stats["namespaces"]["pipeline:x"] == {"hits": 1, "misses": 1}
+
+    def test_different_entities_never_match(self):
+        cache = SemanticCache(threshold=0.9)
+        embedder = cache.embedder
+        ca = "What is the average cost of car insurance for a new driver in California?"
+        tx = "What is the average cost of car insurance for a new driver in Texas?"
+        # Close enough on bag-of-words alone to pass the threshold...
+        assert float(embedder.embed(ca) @ embedder.embed(tx)) >= 0.9
+        cache.store("pipeline:x", ca, "California answer")
+
+        # ...but the differing proper noun blocks the hit
+        assert cache.lookup("pipeline:x", tx) is None
+        assert cache.lookup("pipeline:x", ca.lower()) == "California answer"
+
+    def test_different_numbers_never_match(self):
+        cache = SemanticCache(threshold=0.8)
+        cache.store("ns", "Summarise the top 5 risks of this plan", "five")
+        assert cache.lookup("ns", "Summarise the top 10 risks of this plan") is None
+        assert cache.lookup("ns", "summarise the top 5 risks of this plan") == "five"
+
+    def test_anchor_terms_skip_sentence_initial_words(self):
+        assert anchor_terms("What is the GDP of France in 2020? Explain briefly.") == {
+            "gdp",
+            "france",
+            "2020",
+        }
+
+    def test_namespaces_are_isolated(self):
+        cache = SemanticCache()
+        cache.store("model:gpt-4o", "hello world", "from gpt")
+        assert cache.lookup("model:claude-3-opus", "hello world") is None
+        assert cache.lookup("model:gpt-4o", "hello world") == "from gpt"
+
+    def test_expired_entries_never_match(self):
+        cache = SemanticCache()
+        cache.store("ns", "hello world", "v", ttl=0.01)
+        time.sleep(0.02)
+        assert cache.lookup("ns", "hello world") is None
+        assert cache.purge_expired() == 1
+        assert cache.get_stats()["entries"] == 0
+        assert "ns" not in cache.get_stats()["namespaces"]  # empty namespace is released
+
+    def test_least_recently_used_namespace_is_dropped(self):
+        cache = SemanticCache(max_namespaces=2)
+        cache.store("a", "hello world", "a")
+        cache.store("b", "hello world", "b")
+        assert cache.lookup("a", "hello world") == "a"
+        cache.store("c", "hello world", "c")
+
+        assert cache.lookup("b", "hello world") is None
+        assert cache.lookup("a", "hello world") == "a"
+        assert cache.lookup("c", "hello world") == "c"
+        assert cache.get_stats()["namespace_evictions"] == 1
+        assert set(cache.get_stats()["namespaces"]) == {"a", "c"}
+
+    def test_lru_eviction_at_capacity(self):
+        cache = SemanticCache(max_entries=2)
+        cache.store("ns", "first question about apples", 1)
+        cache.store("ns", "second question about bananas", 2)
+        # Touch the first entry so the second becomes least recently used
+        assert cache.lookup("ns", "first question about apples") == 1
+        cache.store("ns", "third question about cherries", 3)
+
+        assert cache.lookup("ns", "second question about bananas") is None
+        assert cache.lookup("ns", "first question about apples") == 1
+        assert cache.lookup("ns", "third question about cherries") == 3
+        assert cache.get_stats()["evictions"] == 1
+
+    def test_index_storage_grows_on_demand(self):
+        index = SemanticIndex(dim=4, capacity=100)
+        assert len(index._vectors) == SemanticIndex.INITIAL_ROWS
+        now = time.time()
+        for i in range(SemanticIndex.INITIAL_ROWS + 1):
+            vec = np.zeros(4, dtype=np.float32)
+            vec[i % 4] = 1.0
+            index.put(f"k{i}", vec, i, now + 60, now)
+
+        assert len(index._vectors) == 100  # doubled, capped at capacity
+        assert len(index) == SemanticIndex.INITIAL_ROWS + 1
+        assert index.peek(0) == 0 and index.peek(SemanticIndex.INITIAL_ROWS) == 64
+
+    def test_restoring_same_text_replaces_value(self):
+        index = SemanticIndex(dim=4, capacity=4)
+        vec = np.array([1, 0, 0, 0], dtype=np.float32)
+        index.put("k", vec, "old", time.time() + 60, time.time())
+        index.put("k", vec, "new", time.time() + 60, time.time())
+        assert len(index) == 1
+        [(row, sim)] = index.candidates(vec, time.time(), threshold=0.5)
+        assert index.get(row, time.time()) == "new" and sim == pytest.approx(1.0)
+
+
+class TestSemanticCacheIntegration:
+    """Test the semantic layer in front of run_pipeline"""
+
+    @pytest.mark.asyncio
+    async def test_rephrased_pipeline_query_skips_execution(self, monkeypatch):
+        from app.services import orchestration_service as orch_module
+        from app.services import semantic_cache as semantic_module
+        from app.services.cache_service import CacheService
+
+        cache = CacheService()
+        cache.redis = cache.redis_client = None
+        monkeypatch.setattr(orch_module, "get_cache_service", lambda: cache)
+        monkeypatch.setattr(Config, "SEMANTIC_CACHE_ENABLED", True)
+        monkeypatch.setattr(semantic_module, "_semantic_cache", None)
+
+        service = orch_module.OrchestrationService(model_registry=Mock())
+        service.pipeline_flight = None
+        calls = []
+
+        async def fake_execute(input_data, options, user_id, selected_models, key=None):
+            calls.append(input_data)
+            return {"ultra_synthesis": "Paris"}
+
+        monkeypatch.setattr(service, "_execute_pipeline", fake_execute)
+
+        first = await service.run_pipeline(
+            "What is the capital of France?", selected_models=["gpt-4o"]
+        )
+        second = await service.run_pipeline(
+            "what is the capital of france", selected_models=["gpt-4o"]
+        )
+        other_models = await service.run_pipeline(
+            "what is the capital of france", selected_models=["claude-3-opus"]
+        )
+
+        assert first == second == other_models == {"ultra_synthesis": "Paris"}
+        assert len(calls) == 2  # different models -> different namespace
+        monkeypatch.setattr(semantic_module, "_semantic_cache", None)
+
+    @pytest.mark.asyncio
+    async def test_per_request_options_share_a_namespace(self, monkeypatch):
+        from app.services import orchestration_service as orch_module
+        from app.services import semantic_cache as semantic_module
+        from app.services.cache_service import CacheService
+
+        cache = CacheService()
+        cache.redis = cache.redis_client = None
+        monkeypatch.setattr(orch_module, "get_cache_service", lambda: cache)
+        monkeypatch.setattr(Config, "SEMANTIC_CACHE_ENABLED", True)
+        monkeypatch.setattr(semantic_module, "_semantic_cache", None)
+
+        service = orch_module.OrchestrationService(model_registry=Mock())
+        service.pipeline_flight = None
+        calls = []
+
+        async def fake_execute(input_data, options, user_id, selected_models, key=None):
+            calls.append(input_data)
+            return {"ultra_synthesis": "Paris"}
+
+        monkeypatch.setattr(service, "_execute_pipeline", fake_execute)
+
+        for i, prompt in enumerate(
+            ["What is the capital of France?", "what is the capital of france"]
+        ):
+            await service.run_pipeline(
+                prompt,
+                options={"correlation_id": f"req-{i}", "save_outputs": True},
+                selected_models=["gpt-4o"],
+            )
+
+        assert len(calls) == 1
+        assert len(semantic_module._semantic_cache.get_stats()["namespaces"]) == 1
+        monkeypatch.setattr(semantic_module, "_semantic_cache", None)
+
+    @pytest.mark.asyncio
+    async def test_cache_sweeper_purges_semantic_entries(self, monkeypatch):
+        import asyncio
+
+        from app.services import semantic_cache as semantic_module
+        from app.services.cache_service import CacheService
+
+        monkeypatch.setattr(Config, "SEMANTIC_CACHE_ENABLED", True)
+        monkeypatch.setattr(semantic_module, "_semantic_cache", None)
+        semantic = semantic_module.get_semantic_cache()
+        semantic.store("ns", "hello world", "v", ttl=0.01)
+
+        cache = CacheService()
+        cache.redis = cache.redis_client = None
+        cache.start_sweeper(interval=0.02)
+        try:
+            await asyncio.sleep(0.1)
+            assert semantic.get_stats()["entries"] == 0
+        finally:
+            await cache.stop_sweeper()
+        monkeypatch.setattr(semantic_module, "_semantic_cache", None)
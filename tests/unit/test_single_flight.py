@@ -0,0 +1,176 @@
+"""
+Unit tests for single-flight request coalescing.
+"""
+
+import asyncio
+
+import pytest
+
+from app.services.single_flight import RedisSingleFlight, SingleFlight
+
+
+class TestSingleFlight:
+    """Test in-process coalescing"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_execution(self):
+        flight = SingleFlight()
+        calls = 0
+
+        async def work():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return {"ultra_synthesis": "result"}
+
+        results = await asyncio.gather(*(flight.do("k", work) for _ in range(10)))
+
+        assert calls == 1
+        assert all(r == {"ultra_synthesis": "result"} for r in results)
+        # Followers get their own top-level dict
+        assert len({id(r) for r in results}) == 10
+        assert flight.stats == {"leaders": 1, "followers": 9}
+        assert not flight.in_flight("k")
+
+    @pytest.mark.asyncio
+    async def test_errors_propagate_to_all_waiters(self):
+        flight = SingleFlight()
+
+        async def boom():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("provider down")
+
+        results = await asyncio.gather(
+            *(flight.do("k", boom) for _ in range(3)), return_exceptions=True
+        )
+
+        assert all(isinstance(r, RuntimeError) for r in results)
+        # Next call starts a fresh execution
+        assert not flight.in_flight("k")
+
+    @pytest.mark.asyncio
+    async def test_cancelled_leader_does_not_cancel_followers(self):
+        flight = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0.05)
+            return "done"
+
+        leader = asyncio.create_task(flight.do("k", work))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flight.do("k", work))
+        await asyncio.sleep(0)
+        leader.cancel()
+
+        assert await follower == "done"
+
+
+class TestRedisSingleFlight:
+    """Test cross-worker coalescing through a shared Redis"""
+
+    @pytest.mark.asyncio
+    async def test_workers_share_leader_result_via_cache(self):
+        fakeredis = pytest.importorskip("fakeredis")
+        backend = fakeredis.FakeAsyncRedis()
+        shared_cache = {}
+        calls = 0
+
+        async def lookup(key):
+            return shared_cache.get(key)
+
+        async def work():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.1)
+            shared_cache["pipeline:abc"] = {"ultra_synthesis": "result"}
+            return shared_cache["pipeline:abc"]
+
+        # Two independent instances stand in for two Gunicorn workers
+        workers = [
+            RedisSingleFlight(lambda: backend, lookup, lock_ttl=5, poll_interval=0.01)
+            for _ in range(2)
+        ]
+        results = await asyncio.gather(
+            *(w.do("pipeline:abc", work) for w in workers for _ in range(3))
+        )
+
+        assert calls == 1
+        assert all(r == {"ultra_synthesis": "result"} for r in results)
+        assert sum(w.stats["remote_followers"] for w in workers) == 1
+        await backend.aclose()
+
+    @pytest.mark.asyncio
+    async def test_redis_errors_fall_back_to_local_execution(self):
+        class BrokenRedis:
+            async def set(self, *args, **kwargs):
+                raise ConnectionError("redis down")
+
+        async def lookup(key):
+            return None
+
+        async def work():
+            return "local"
+
+        flight = RedisSingleFlight(lambda: BrokenRedis(), lookup)
+        assert await flight.do("k", work) == "local"
+        assert flight.stats["lock_errors"] == 1
+
+
+class TestRunPipelineCoalescing:
+    """Test identical concurrent run_pipeline calls share one execution"""
+
+    @pytest.fixture
+    def service(self, monkeypatch):
+        from unittest.mock import Mock
+
+        from app.services import orchestration_service as orch_module
+        from app.services.cache_service import CacheService
+
+        cache = CacheService()
+        cache.redis = cache.redis_client = None
+        monkeypatch.setattr(orch_module, "get_cache_service", lambda: cache)
+
+        service = orch_module.OrchestrationService(model_registry=Mock())
+        service.pipeline_flight = SingleFlight()
+        service.calls = []
+
+        async def fake_execute(input_data, options, user_id, selected_models, key=None):
+            service.calls.append(options)
+            await asyncio.sleep(0.05)
+            return {"ultra_synthesis": f"answer to {input_data}"}
+
+        monkeypatch.setattr(service, "_execute_pipeline", fake_execute)
+        return service
+
+    @pytest.mark.asyncio
+    async def test_identical_requests_run_pipeline_once(self, service):
+        results = await asyncio.gather(
+            *(service.run_pipeline("popular prompt", selected_models=["gpt-4o"]) for _ in range(5)),
+            service.run_pipeline("other prompt", selected_models=["gpt-4o"]),
+        )
+
+        assert len(service.calls) == 2
+        assert results[0] == results[4] == {"ultra_synthesis": "answer to popular prompt"}
+        assert results[5] == {"ultra_synthesis": "answer to other prompt"}
+
+    @pytest.mark.asyncio
+    async def test_per_request_options_do_not_split_the_flight(self, service):
+        # The analyze route sets a fresh correlation_id and save_outputs on every request
+        results = await asyncio.gather(
+            *(
+                service.run_pipeline(
+                    "popular prompt",
+                    options={"correlation_id": f"req-{i}", "save_outputs": i % 2 == 0},
+                    selected_models=["gpt-4o"],
+                )
+                for i in range(4)
+            ),
+            service.run_pipeline(
+                "popular prompt",
+                options={"correlation_id": "req-x", "query_type": "analysis"},
+                selected_models=["gpt-4o"],
+            ),
+        )
+
+        assert len(service.calls) == 2  # only query_type changes the result
+        assert all(r == {"ultra_synthesis": "answer to popular prompt"} for r in results)
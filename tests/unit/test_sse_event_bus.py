@@ -0,0 +1,162 @@
+"""Tests for the SSE event bus: replay, backpressure, lifetimes and Redis fan-out."""
+
+import asyncio
+
+import pytest
+
+from app.services import sse_event_bus as bus_module
+from app.services.sse_event_bus import (
+    CONNECTED_FRAME,
+    RedisSSEEventBus,
+    SSECapacityError,
+    SSEEventBus,
+)
+
+
+async def _take(frames, n):
+    return [await frames.__anext__() for _ in range(n)]
+
+
+def _ids(frames):
+    return [f.split("\n", 1)[0][len("id: "):] for f in frames if f.startswith("id: ")]
+
+
+@pytest.mark.asyncio
+async def test_last_event_id_resumes_from_replay_buffer():
+    bus = SSEEventBus(replay_size=3)
+    for i in range(5):
+        await bus.publish("c1", "tick", {"n": i})
+
+    frames = bus.subscribe("c1", last_event_id="3")
+    received = await _take(frames, 3)
+    assert received[0] == CONNECTED_FRAME
+    assert _ids(received) == ["4", "5"]
+    assert '"n": 4' in received[2]
+
+    # Live events continue after the replayed ones
+    await bus.publish("c1", "tick", {"n": 5})
+    assert _ids(await _take(frames, 1)) == ["6"]
+    await frames.aclose()
+
+    # Without Last-Event-ID everything still buffered is replayed (oldest evicted)
+    frames = bus.subscribe("c1")
+    assert _ids(await _take(frames, 4)) == ["4", "5", "6"]
+    await frames.aclose()
+
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_drops_oldest_frames():
+    bus = SSEEventBus(queue_size=2)
+    frames = bus.subscribe("c1")
+    await _take(frames, 1)  # connected; subscriber is now registered
+    for i in range(5):
+        await bus.publish("c1", "tick", {"n": i})
+
+    assert _ids(await _take(frames, 2)) == ["4", "5"]
+    assert bus.stats["dropped"] == 3
+    await frames.aclose()
+    assert bus.get_stats()["subscribers"] == 0
+
+
+@pytest.mark.asyncio
+async def test_complete_ends_subscribers_and_channels_are_collected():
+    bus = SSEEventBus(gc_interval=0)
+    frames = bus.subscribe("c1")
+    await _take(frames, 1)
+    await bus.publish("c1", "done", {})
+    await bus.complete("c1")
+    remaining = [f async for f in frames]
+    assert [f.split("\n")[1] for f in remaining] == ["event: done"]
+    await bus.publish("c1", "late", {})
+    assert bus.stats["dropped"] == 1
+
+    bus.completed_ttl = 0
+    await asyncio.sleep(0.001)
+    await bus.publish("other", "tick", {})  # triggers collection
+    assert "c1" not in bus._channels
+    assert bus.stats["collected"] == 1
+
+
+@pytest.mark.asyncio
+async def test_channel_and_memory_caps():
+    bus = SSEEventBus(max_channels=1, max_buffered_bytes=200)
+    busy = bus.subscribe("busy")
+    await _take(busy, 1)
+    with pytest.raises(SSECapacityError):
+        bus.subscribe("another")
+    await bus.publish("another", "tick", {})
+    assert bus.stats["dropped"] == 1
+
+    for i in range(10):
+        await bus.publish("busy", "tick", {"n": i})
+    assert bus.get_stats()["buffered_bytes"] <= 200
+    # Live subscriber still received every frame
+    assert len(await _take(busy, 10)) == 10
+    await busy.aclose()
+
+    # Idle channels are evicted to make room for new ones
+    await bus.publish("another", "tick", {})
+    assert list(bus._channels) == ["another"]
+    assert bus.stats["evicted"] == 1
+
+
+@pytest.mark.asyncio
+async def test_connection_lifetime_and_heartbeat():
+    bus = SSEEventBus(heartbeat_seconds=0.01, max_connection_seconds=0.05)
+    frames = [f async for f in bus.subscribe("c1")]
+    assert frames[0] == CONNECTED_FRAME
+    assert bus_module.HEARTBEAT_FRAME in frames
+
+
+@pytest.mark.asyncio
+async def test_redis_streams_fan_out_across_workers():
+    fakeredis = pytest.importorskip("fakeredis")
+    server = fakeredis.FakeServer()
+    publisher = RedisSSEEventBus(fakeredis.FakeAsyncRedis(server=server, decode_responses=True))
+    worker = RedisSSEEventBus(
+        fakeredis.FakeAsyncRedis(server=server, decode_responses=True), heartbeat_seconds=0.05
+    )
+
+    await publisher.publish("c1", "stage_started", {"stage": "initial_response"})
+    await publisher.publish("c1", "stage_completed", {"stage": "initial_response"})
+    frames = [f async for f in _until_complete(worker, publisher, "c1")]
+    assert frames[0] == CONNECTED_FRAME
+    event_frames = [f for f in frames if f.startswith("id: ")]
+    assert [f.split("\n")[1] for f in event_frames] == [
+        "event: stage_started",
+        "event: stage_completed",
+    ]
+
+    # Resume after the first entry id replays only the second
+    first_id = _ids(event_frames)[0]
+    resumed = worker.subscribe("c1", last_event_id=first_id)
+    assert [f.split("\n")[1] for f in (await _take(resumed, 2))[1:]] == ["event: stage_completed"]
+    await resumed.aclose()
+
+
+async def _until_complete(worker, publisher, correlation_id):
+    frames = worker.subscribe(correlation_id)
+    await publisher.complete(correlation_id)
+    async for frame in frames:
+        yield frame
+
+
+def test_events_route_resumes_with_last_event_id(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from app.app import create_app
+    from app.routes import orchestrator_minimal
+
+    bus = SSEEventBus(max_connection_seconds=0.2)
+    monkeypatch.setattr(orchestrator_minimal, "sse_event_bus", bus)
+    asyncio.run(bus.publish("route-1", "tick", {"n": 1}))
+    asyncio.run(bus.publish("route-1", "tick", {"n": 2}))
+
+    client = TestClient(create_app())
+    response = client.get(
+        "/api/orchestrator/events?correlation_id=route-1", headers={"Last-Event-ID": "1"}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert "id: 2\n" in response.text
+    assert "id: 1\n" not in response.text
@@ -0,0 +1,130 @@
+"""Tests for per-stream sessions: sequencing, backpressure and cancellation."""
+
+import asyncio
+from unittest.mock import Mock
+
+import pytest
+
+from app.models.streaming_response import StreamEventType, StreamingConfig
+from app.services.model_registry import ModelRegistry
+from app.services.quality_evaluation import QualityEvaluationService
+from app.services.rate_limiter import RateLimiter
+from app.services.stream_session import StreamSession
+from app.services.streaming_orchestration_service import StreamingOrchestrationService
+
+
+@pytest.fixture
+def streaming_service():
+    return StreamingOrchestrationService(
+        model_registry=Mock(spec=ModelRegistry),
+        quality_evaluator=Mock(spec=QualityEvaluationService),
+        rate_limiter=Mock(spec=RateLimiter),
+    )
+
+
+@pytest.mark.asyncio
+async def test_concurrent_streams_number_events_independently(streaming_service):
+    async def fake_stream(model, prompt):
+        for word in ("a", "b", "c"):
+            await asyncio.sleep(0)
+            yield word
+
+    streaming_service._stream_model = fake_stream
+    config = StreamingConfig(include_partial_responses=True)
+
+    async def collect():
+        return [
+            event.sequence
+            async for event in streaming_service._stream_initial_response(
+                "prompt", ["gpt-4o"], None, config, session=StreamSession()
+            )
+        ]
+
+    first, second = await asyncio.gather(collect(), collect())
+    assert first == second == [1, 2, 3, 4]
+
+
+@pytest.mark.asyncio
+async def test_slow_consumer_pauses_the_pipeline():
+    produced = []
+
+    async def frames():
+        for i in range(20):
+            produced.append(i)
+            yield f"frame {i}"
+
+    session = StreamSession(buffer_size=2)
+    relay = session.run(frames())
+    assert await relay.__anext__() == "frame 0"
+    await asyncio.sleep(0.01)
+    # One frame delivered, two buffered, one blocked on the full buffer
+    assert len(produced) <= 4
+    assert session.stats["stalls"] >= 1
+
+    remaining = [frame async for frame in relay]
+    assert remaining[-1] == "frame 19" and len(remaining) == 19
+    assert session.close_reason == "completed"
+
+
+@pytest.mark.asyncio
+async def test_stalled_client_closes_the_session():
+    async def frames():
+        for i in range(10):
+            yield f"frame {i}"
+
+    session = StreamSession(buffer_size=1, stall_timeout=0.01)
+    relay = session.run(frames())
+    await relay.__anext__()
+    await asyncio.sleep(0.05)
+    assert session.close_reason == "stalled"
+    assert [frame async for frame in relay] == []
+
+
+@pytest.mark.asyncio
+async def test_disconnect_cancels_in_flight_model_calls(streaming_service):
+    started, cancelled = [], []
+
+    async def hanging_call(model, prompt):
+        started.append(model)
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            cancelled.append(model)
+            raise
+
+    streaming_service._execute_model_with_retry = hanging_call
+    disconnected = False
+
+    async def is_disconnected():
+        return disconnected
+
+    session = StreamSession(is_disconnected=is_disconnected, poll_interval=0.01)
+
+    async def pipeline():
+        async for event in streaming_service._stream_initial_response(
+            "prompt", ["gpt-4o", "claude-3-5-sonnet-20241022"], session=session
+        ):
+            yield streaming_service._format_sse(event)
+
+    consumer = asyncio.create_task(_drain(session.run(pipeline())))
+    while len(started) < 2:
+        await asyncio.sleep(0.005)
+
+    disconnected = True
+    assert await asyncio.wait_for(consumer, 1) == []
+    assert session.close_reason == "client_disconnected"
+    assert sorted(cancelled) == ["claude-3-5-sonnet-20241022", "gpt-4o"]
+    assert session.stats["cancelled_tasks"] == 2
+
+
+def test_session_events_are_numbered_per_session():
+    session, other = StreamSession(), StreamSession()
+    session.next_sequence()
+    assert session.event(StreamEventType.MODEL_START.value, {}).sequence == 2
+    assert session.event(StreamEventType.MODEL_START.value, {}).sequence == 3
+    # Another stream's numbering is independent
+    assert other.event(StreamEventType.MODEL_START.value, {}).sequence == 1
+
+
+async def _drain(frames):
+    return [frame async for frame in frames]
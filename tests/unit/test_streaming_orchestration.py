@@ -10,6 +10,7 @@ import json
 import asyncio
 from unittest.mock import AsyncMock, Mock, patch
 
+from app.services.stream_session import StreamSession
 from app.services.streaming_orchestration_service import StreamingOrchestrationService
 from app.models.streaming_response import StreamEventType, StreamingConfig
 from app.services.model_registry import ModelRegistry
@@ -66,7 +67,7 @@ class TestStreamingOrchestrationService:
     @pytest.mark.asyncio
     async def test_sse_format(self, streaming_service):
         """Test Server-Sent Event formatting."""
-        event = streaming_service._create_event(
+        event = StreamSession().event(
             StreamEventType.MODEL_START,
             {"model": "gpt-4", "stage": "initial_response"}
         )
@@ -201,6 +202,52 @@ class TestStreamingOrchestrationService:
         assert len(error_events) > 0
         assert "No valid models" in str(error_events[0]["data"])
     
+    @pytest.mark.asyncio
+    async def test_synthesis_forwards_provider_tokens(self, streaming_service):
+        """Test that synthesis chunks are the adapter's deltas, not re-chunked text."""
+        async def fake_stream(model, prompt):
+            for delta in ["Ultra", " synth", "esis"]:
+                yield delta
+
+        streaming_service._stream_model = fake_stream
+        streaming_service._execute_model_with_retry = AsyncMock()
+
+        events = []
+        async for event in streaming_service._stream_ultra_synthesis(
+            {"revised_responses": {"gpt-4": "A"}, "prompt": "Q"},
+            ["gpt-4"],
+            None,
+            StreamingConfig(synthesis_streaming=True),
+        ):
+            events.append(event)
+
+        chunks = [e.data["chunk_text"] for e in events if e.event == StreamEventType.SYNTHESIS_CHUNK.value]
+        assert chunks == ["Ultra", " synth", "esis"]
+        assert events[-1].event == StreamEventType.SYNTHESIS_COMPLETE.value
+        streaming_service._execute_model_with_retry.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_partial_responses_emit_model_chunks(self, streaming_service):
+        """Test that partial mode forwards per-model deltas before the final response."""
+        async def fake_stream(model, prompt):
+            yield f"{model}-a"
+            yield f"{model}-b"
+
+        streaming_service._stream_model = fake_stream
+
+        events = []
+        async for event in streaming_service._stream_initial_response(
+            "Test prompt", ["gpt-4"], None, StreamingConfig(include_partial_responses=True)
+        ):
+            events.append(event)
+
+        assert [e.event for e in events] == [
+            StreamEventType.MODEL_CHUNK.value,
+            StreamEventType.MODEL_CHUNK.value,
+            StreamEventType.MODEL_RESPONSE.value,
+        ]
+        assert events[-1].data["response_text"] == "gpt-4-agpt-4-b"
+
     async def _async_generator(self, items):
         """Helper to create async generator from list."""
         for item in items:
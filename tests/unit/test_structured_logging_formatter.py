@@ -0,0 +1,100 @@
+"""Tests for the JSON log formatter's redaction, backends and queue mode."""
+
+import io
+import json
+import logging
+import re
+import threading
+
+import pytest
+
+from app.utils import structured_logging
+from app.utils.structured_logging import EnhancedJSONFormatter, RequestContext
+
+BACKENDS = ["json"] + (["orjson"] if structured_logging.orjson is not None else [])
+
+
+def _record(**extra) -> logging.LogRecord:
+    record = logging.LogRecord(
+        "orchestration", logging.INFO, __file__, 7, "user %s paid with %s",
+        ("bob@example.com", "4111 1111 1111 1111"), None,
+    )
+    record.__dict__.update(extra)
+    return record
+
+
+def _sequential_redaction(text: str) -> str:
+    for pattern in EnhancedJSONFormatter.PII_PATTERNS:
+        text = pattern.sub("[REDACTED]", text)
+    return text
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_redaction_and_fields(backend):
+    formatter = EnhancedJSONFormatter(json_backend=backend)
+    record = _record(
+        request_id="req-1",
+        category="PERFORMANCE",
+        extra={
+            "stage": "peer_review",
+            "responses": [{"text": "call 123-45-6789 or mail a.b@c.io", "score": 12}],
+            "Authorization": "Bearer abc",
+            "ids": {1, 2},
+        },
+        model_api_key="sk-1",
+    )
+    output = json.loads(formatter.format(record))
+
+    assert re.fullmatch(r"\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d\.\d{6}Z", output["timestamp"])
+    assert output["message"] == "user [REDACTED] paid with [REDACTED]"
+    assert output["request_id"] == "req-1"
+    assert output["category"] == "PERFORMANCE"
+    assert output["stage"] == "peer_review"
+    assert output["responses"] == [{"text": "call [REDACTED] or mail [REDACTED]", "score": 12}]
+    assert output["Authorization"] == "[REDACTED]"
+    assert output["model_api_key"] == "[REDACTED]"
+    assert sorted(output["ids"]) == [1, 2]
+    assert "args" not in output and "msecs" not in output
+
+
+def test_combined_pattern_matches_the_individual_patterns():
+    formatter = EnhancedJSONFormatter(json_backend="json")
+    samples = [
+        "card 4111-1111-1111-1111, ssn 123 45 6789",
+        "x4111111111111111 and 123456789x stay",
+        "mail first.last+tag@mail.example.org, then 123-45-6789@x.com",
+        "no pii here at all, only words",
+        "12345678901234567890",
+    ]
+    for text in samples * 2:  # the second pass is served from the memo
+        assert formatter._redact_string(text) == _sequential_redaction(text)
+
+
+def test_queue_mode_formats_on_the_listener_with_the_callers_context():
+    stream = io.StringIO()
+    formatted_on = []
+
+    class RecordingFormatter(EnhancedJSONFormatter):
+        def format(self, record):
+            formatted_on.append(threading.get_ident())
+            return super().format(record)
+
+    target = logging.StreamHandler(stream)
+    target.setFormatter(RecordingFormatter(json_backend="json"))
+    logger = logging.getLogger("test.structured_logging.queue")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    structured_logging.start_queue_logging([target], logger=logger)
+    try:
+        RequestContext.set_request_id("req-queued")
+        logger.info("stage %s done", "initial_response", extra={"model": "m1"})
+    finally:
+        RequestContext.clear()
+        structured_logging.stop_queue_logging()
+
+    assert formatted_on and formatted_on[0] != threading.get_ident()
+    output = json.loads(stream.getvalue())
+    assert output["message"] == "stage initial_response done"
+    assert output["request_id"] == "req-queued"
+    assert output["model"] == "m1"
+    assert logger.handlers == []